@@ -169,7 +169,8 @@ class S3Storage(StorageStrategy):
                 "uploaded": True,
                 "message": "File and metadata successfully uploaded",
                 "document_id": document_id,
-                "s3_keys": {"pdf": pdf_key, "metadata": metadata_key}
+                "s3_keys": {"pdf": pdf_key, "metadata": metadata_key},
+                "last_modified": last_modified
             }
 
         except ValueError as ve:
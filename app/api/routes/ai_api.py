@@ -1,19 +1,31 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends
+from typing import Optional
+
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
 from app.schemas.ai_schema import AiRequest
 from app.services.ai_service import ai_service
-from auth_app.app.api.routes.deps import dynamic_permission_check
+from auth_app.app.api.routes.deps import dynamic_permission_check, get_user_email_from_token
 
 router = APIRouter()
 
 
+def _require_document(pdf: Optional[UploadFile], document_hash: Optional[str]):
+    # Follow-up calls may send the document_hash returned earlier instead of the file.
+    if pdf is None and not document_hash:
+        raise HTTPException(status_code=422, detail="Either a PDF file or a document_hash is required.")
+
+
 @router.post("/ai-assistants/summarize", dependencies=[Depends(dynamic_permission_check)])
-async def summarize(pdf: UploadFile = File(...)):
-    return await ai_service.summarize(pdf)
+async def summarize(pdf: Optional[UploadFile] = File(None), document_hash: Optional[str] = Form(None),
+                    user_email: str = Depends(get_user_email_from_token)):
+    _require_document(pdf, document_hash)
+    return await ai_service.summarize(user_email, pdf, document_hash)
 
 
 @router.post("/ai-assistants/ask-pdf", dependencies=[Depends(dynamic_permission_check)])
-async def ask_pdf(pdf: UploadFile = File(...), question: str = Form(...)):
-    return await ai_service.ask_pdf(pdf, question)
+async def ask_pdf(question: str = Form(...), pdf: Optional[UploadFile] = File(None),
+                  document_hash: Optional[str] = Form(None), user_email: str = Depends(get_user_email_from_token)):
+    _require_document(pdf, document_hash)
+    return await ai_service.ask_pdf(user_email, pdf, question, document_hash)
 
 
 @router.post("/ai-assistants/generate", dependencies=[Depends(dynamic_permission_check)])
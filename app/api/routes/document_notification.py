@@ -1,52 +1,107 @@
-from fastapi import APIRouter, HTTPException, Response
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Response, Query, Header
 from fastapi import Depends
+from starlette.responses import StreamingResponse
+from app.schemas.notification_schema import MarkNotificationsRead
+from app.services.email_outbox_service import email_outbox_service
+from app.services.event_stream_service import document_channel, event_stream, user_channel
+from app.services.notification_inbox_service import notification_inbox
 from auth_app.app.api.routes.deps import dynamic_permission_check, get_email_from_token, get_user_email_from_token
-from repositories.s3_repo import s3_download_json, s3_delete_object, \
-    s3_list_objects
 
 
 router = APIRouter()
 
 @router.get("/notifications", dependencies=[Depends(dynamic_permission_check)])
-def get_all_notifications(email: str = Depends(get_email_from_token), user_email: str = Depends(get_user_email_from_token)):
-    prefix = f"{email}/notifications/{user_email}/"
-    keys = s3_list_objects(prefix)
+async def get_all_notifications(email: str = Depends(get_email_from_token), user_email: str = Depends(get_user_email_from_token)):
+    return await notification_inbox.list(email, user_email)
 
-    if not keys:
-        return []
+@router.get("/notifications/unread-count", dependencies=[Depends(dynamic_permission_check)])
+async def get_unread_count(email: str = Depends(get_email_from_token), user_email: str = Depends(get_user_email_from_token)):
+    return {"unread": await notification_inbox.unread_count(email, user_email)}
 
-    notifications = []
-    for key in keys:
-        notification = s3_download_json(key)
-        if notification:
-            notifications.append(notification)
+@router.get("/notifications/sync", dependencies=[Depends(dynamic_permission_check)])
+async def sync_notifications(
+    since: Optional[str] = None,
+    email: str = Depends(get_email_from_token),
+    user_email: str = Depends(get_user_email_from_token)
+):
+    return await notification_inbox.sync(email, user_email, since)
 
-    return notifications
+@router.post("/notifications/read", dependencies=[Depends(dynamic_permission_check)])
+async def mark_notifications_read(
+    data: MarkNotificationsRead,
+    email: str = Depends(get_email_from_token),
+    user_email: str = Depends(get_user_email_from_token)
+):
+    return await notification_inbox.mark_read(email, user_email, data.notification_ids)
+
+@router.delete("/notifications/all", dependencies=[Depends(dynamic_permission_check)])
+async def delete_all_notifications(email: str = Depends(get_email_from_token), user_email: str = Depends(get_user_email_from_token)):
+    deleted = await notification_inbox.delete(email, user_email)
+    if not deleted:
+        return {"message": "No notifications to delete"}
+    return {"message": f"Deleted {deleted} notifications"}
 
 @router.delete("/notifications/{notification_id}", dependencies=[Depends(dynamic_permission_check)])
-def delete_notification(notification_id: str, email: str = Depends(get_email_from_token), user_email: str = Depends(get_user_email_from_token)):
-    s3_key = f"{email}/notifications/{user_email}/{notification_id}.json"
-    s3_delete_object(s3_key)
+async def delete_notification(notification_id: str, email: str = Depends(get_email_from_token), user_email: str = Depends(get_user_email_from_token)):
+    await notification_inbox.delete(email, user_email, notification_id)
     return {"message": "Notification deleted"}
 
 @router.get("/notifications/{notification_id}", dependencies=[Depends(dynamic_permission_check)])
-def get_notification(notification_id: str, email: str = Depends(get_email_from_token), user_email: str = Depends(get_user_email_from_token)):
-    s3_key = f"{email}/notifications/{user_email}/{notification_id}.json"
-    notification = s3_download_json(s3_key)
+async def get_notification(notification_id: str, email: str = Depends(get_email_from_token), user_email: str = Depends(get_user_email_from_token)):
+    notification = await notification_inbox.get(email, user_email, notification_id)
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
     return notification
 
 
-@router.delete("/notifications/all", dependencies=[Depends(dynamic_permission_check)])
-def delete_all_notifications(email: str = Depends(get_email_from_token), user_email: str = Depends(get_user_email_from_token)):
-    prefix = f"{email}/notifications/{user_email}/"
-    keys = s3_list_objects(prefix)
-    if not keys:
-        return {"message": "No notifications to delete"}
-    for key in keys:
-        s3_delete_object(key)
-    return {"message": f"Deleted {len(keys)} notifications"}
+@router.get("/events/stream", dependencies=[Depends(dynamic_permission_check)])
+async def stream_events(
+    document_id: Optional[List[str]] = Query(None),
+    last_event_id: Optional[str] = Query(None),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    email: str = Depends(get_email_from_token),
+    user_email: str = Depends(get_user_email_from_token)
+):
+    """
+    Server-sent events: the user's new notifications, plus status changes of the given
+    documents. Browsers reconnect with Last-Event-ID (or ?last_event_id=) and receive
+    what they missed first.
+    """
+    if document_id and len(document_id) > 50:
+        raise HTTPException(status_code=400, detail="At most 50 documents per stream")
+    from auth_app.app.services.auth_service import auth_service
+    owner = await auth_service.get_domain_if_master(email)
+    channels = [user_channel(email, user_email)]
+    channels += [document_channel(owner, doc_id) for doc_id in dict.fromkeys(document_id or [])]
+    return StreamingResponse(
+        event_stream.events(channels, last_event_id_header or last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/emails/outbox", dependencies=[Depends(dynamic_permission_check)])
+async def list_outbox_messages(
+    state: Optional[str] = Query(None, pattern="^(pending|sending|sent|dead)$"),
+    limit: int = Query(50, ge=1, le=500),
+    email: str = Depends(get_email_from_token)
+):
+    from auth_app.app.services.auth_service import auth_service
+    email = await auth_service.get_domain_if_master(email)
+    return await email_outbox_service.list_messages(email, state, limit)
+
 
+@router.get("/emails/outbox/{message_id}", dependencies=[Depends(dynamic_permission_check)])
+async def get_outbox_message(message_id: str, email: str = Depends(get_email_from_token)):
+    from auth_app.app.services.auth_service import auth_service
+    email = await auth_service.get_domain_if_master(email)
+    return await email_outbox_service.get_status(email, message_id)
 
 
+@router.post("/emails/outbox/{message_id}/retry", dependencies=[Depends(dynamic_permission_check)])
+async def retry_outbox_message(message_id: str, email: str = Depends(get_email_from_token)):
+    from auth_app.app.services.auth_service import auth_service
+    email = await auth_service.get_domain_if_master(email)
+    return await email_outbox_service.retry_dead(email, message_id)
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, UploadFile, File, Query, Form, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, UploadFile, File, Query, Form, Depends, HTTPException, status, Path, Header
+from typing import List, Optional
 from starlette.responses import JSONResponse
 
 from DataAccessLayer.storage.storage_factory import get_storage_strategy
 from DataAccessLayer.storage.storage_manager import StorageManager
 from app.schemas.files_schema import MoveFilesRequest
 from app.services.files_service import FileService
+from app.services.preview_service import preview_service, DEFAULT_PREVIEW_DPI, MIN_PREVIEW_DPI, MAX_PREVIEW_DPI, \
+    THUMBNAIL_DPI
 from app.services.security_service import EncryptionService, AESCipher
 from app.threadsafe.redis_lock import with_redis_lock
 from auth_app.app.api.routes.deps import dynamic_permission_check, get_email_from_token, get_user_email_from_token, \
@@ -177,6 +179,34 @@ async def get_file(
     file_service = FileService(storage)
     return await file_service.get_pdf(result, return_pdf)
 
+@router.get("/files/{document_id}/pages/{page}/preview", dependencies=[Depends(dynamic_permission_check)])
+async def get_page_preview(
+    document_id: str,
+    page: int = Path(..., ge=1),
+    dpi: int = Query(DEFAULT_PREVIEW_DPI, ge=MIN_PREVIEW_DPI, le=MAX_PREVIEW_DPI),
+    fmt: str = Query("webp", alias="format", pattern="^(webp|png)$"),
+    if_none_match: Optional[str] = Header(None),
+    email: str = Depends(get_email_from_token)
+):
+    storage = get_storage(config.STORAGE_TYPE)
+    encryption_service = EncryptionService()
+    encryption_email = await encryption_service.resolve_encryption_email(email)
+    cipher = AESCipher(encryption_email)
+    entry = storage.get(cipher, email, document_id=document_id)
+
+    if isinstance(entry, dict) and entry.get("error"):
+        return JSONResponse(status_code=404, content=entry)
+
+    return await preview_service.page_response(email, document_id, entry, cipher, page, dpi, fmt, if_none_match)
+
+@router.get("/files/{document_id}/thumbnail", dependencies=[Depends(dynamic_permission_check)])
+async def get_thumbnail(
+    document_id: str,
+    if_none_match: Optional[str] = Header(None),
+    email: str = Depends(get_email_from_token)
+):
+    return await get_page_preview(document_id, 1, THUMBNAIL_DPI, "webp", if_none_match, email)
+
 @router.get("/files/", dependencies=[Depends(dynamic_permission_check)])
 async def list_files(
     email: str = Depends(get_email_from_token),
@@ -4,14 +4,11 @@ import uuid
 from typing import List
 from fastapi import APIRouter, Depends, Request, Query, UploadFile, File, Form
 from starlette import status
-import io
-import zipfile
 from fastapi import Response
 from app.model.form_model import FormModel
 from app.schemas.form_schema import RegistrationForm, FormRequest, FormSubmissionRequest, OtpFormVerification, \
     ResendFormRequest, OtpFormSend, FormCancelled
 from app.services.FormService import FormService
-from app.services.pdf_converter import AttachmentConverter
 from app.services.security_service import AESCipher, EncryptionService
 from app.threadsafe.redis_lock import with_redis_lock
 from auth_app.app.api.routes.deps import dynamic_permission_check, get_email_from_token, get_current_user, \
@@ -20,7 +17,8 @@ from config import config
 from database.db_config import s3_client
 from database.redis_db import redis_client
 from app.services.otp_service import OtpService
-from repositories.s3_repo import s3_download_bytes
+from app.services.zip_stream_service import ZipEntry, ZipStreamService
+from repositories.s3_repo import _list_objects
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -348,49 +346,42 @@ async def download_all_attachments(
     if not filenames:
         raise HTTPException(status_code=404, detail="No attachments found for this party")
 
-    # 4️⃣ Fetch & ZIP only those files
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for filename in filenames:
-            key = prefix + filename
-            try:
-                file_obj = s3_client.get_object(Bucket=config.S3_BUCKET, Key=key)
-                encrypted_file = file_obj["Body"].read()
-                encryption_service = EncryptionService()
-                encryption_email = await encryption_service.resolve_encryption_email(email)
-                cipher = AESCipher(encryption_email)
-                decrypted_file = cipher.decrypt(encrypted_file)
-                zipf.writestr(filename, decrypted_file)
-            except ClientError as e:
-                # skip missing file but continue
-                logger.warning(f"File not found in S3: {key} ({str(e)})")
-                continue
-
-    if not zip_buffer.getbuffer().nbytes:
+    # 4️⃣ Keep only the files that actually exist (one listing instead of a GET per file)
+    existing = set(_list_objects(prefix))
+    available = [filename for filename in filenames if prefix + filename in existing]
+    for filename in filenames:
+        if prefix + filename not in existing:
+            logger.warning(f"File not found in S3: {prefix + filename}")
+    if not available:
         raise HTTPException(status_code=404, detail="No matching files found in S3")
 
-    # 5️⃣ Return ZIP
-    zip_buffer.seek(0)
-    return Response(
-        content=zip_buffer.read(),
-        media_type="application/zip",
-        headers={
-            "Content-Disposition": f"attachment; filename={form_id}_{party_email}_attachments.zip"
-        }
-    )
+    encryption_service = EncryptionService()
+    encryption_email = await encryption_service.resolve_encryption_email(email)
+    cipher = AESCipher(encryption_email)
+
+    def load(key: str):
+        return lambda: cipher.decrypt(s3_client.get_object(Bucket=config.S3_BUCKET, Key=key)["Body"].read())
+
+    # 5️⃣ Stream the ZIP as files are fetched
+    entries = [ZipEntry(filename, load(prefix + filename)) for filename in available]
+    return ZipStreamService.response(entries, f"{form_id}_{party_email}_attachments.zip")
 
 
 from fastapi import HTTPException, Depends
+from fastapi import Header
 from fastapi.responses import StreamingResponse
-from PyPDF2 import PdfMerger
 from botocore.exceptions import ClientError
 from io import BytesIO
+from typing import Optional
+
+from app.services.pdf_merge_service import pdf_merge_service
 
 @router.get("/forms/merged/pdf", dependencies=[Depends(dynamic_permission_check)])
 async def get_merged_pdf(
     form_id: str,
     party_email: str,
     email: str = Depends(get_email_from_token),
+    if_none_match: Optional[str] = Header(None),
 ):
     # 1️⃣ Get form path from form metadata
     form_data = FormService.get_form(form_id, email)
@@ -404,45 +395,22 @@ async def get_merged_pdf(
     s3_prefix = f"{email}/files/{form_path}/{party_email}/"
     try:
         resp = s3_client.list_objects_v2(Bucket=config.S3_BUCKET, Prefix=s3_prefix)
-        object_keys = [obj["Key"] for obj in resp.get("Contents", [])]
+        sources = resp.get("Contents", [])
     except ClientError as e:
         raise HTTPException(status_code=500, detail=f"S3 error: {str(e)}")
 
-    if not object_keys:
+    if not sources:
         raise HTTPException(status_code=404, detail="No signed documents found.")
 
     # 🚫 Exclude the main filled form
     exclude_file = f"{formTitle}-filled.pdf"
-    object_keys = [k for k in object_keys if not k.endswith(exclude_file)]
+    sources = [obj for obj in sources if not obj["Key"].endswith(exclude_file)]
 
-    if not object_keys:
+    if not sources:
         raise HTTPException(status_code=404, detail="No attachments to merge (all excluded).")
 
-    # 3️⃣ Merge PDFs
-    merger = PdfMerger()
-    for key in object_keys:
-        try:
-            encrypted_file = s3_download_bytes(key)
-            decrypted = AESCipher(email).decrypt(encrypted_file)
-            pdf_bytes = AttachmentConverter.convert_to_pdf_if_needed(decrypted, key.split("/")[-1])
-            merger.append(BytesIO(pdf_bytes))
-        except Exception as e:
-            logger.error(f"Failed to merge key {key}: {e}")
-            continue
-
-    # 4️⃣ Return merged PDF
-    output_stream = BytesIO()
-    merger.write(output_stream)
-    merger.close()
-    output_stream.seek(0)
-
-    return StreamingResponse(
-        output_stream,
-        media_type="application/pdf",
-        # headers={
-        #     "Content-Disposition": f'inline; filename="merged_{form_id}_{party_email}.pdf"'
-        # }
-    )
+    # 3️⃣ Merge PDFs and stream the result (cached by source ETags)
+    return await pdf_merge_service.merged_pdf_response(email, sources, AESCipher(email), if_none_match)
 
 
 @router.get("/forms/{form_id}/attachments/{filename}", dependencies=[Depends(dynamic_permission_check)])
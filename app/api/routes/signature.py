@@ -1,22 +1,23 @@
-from io import BytesIO
+from datetime import datetime
 from typing import Optional, List
 
-from PyPDF2 import PdfMerger
 from botocore.exceptions import ClientError
-from fastapi import APIRouter, HTTPException, Response, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Response, UploadFile, File, Form, Header, Query
 from fastapi import Depends
-from starlette.responses import StreamingResponse
 
 from app.schemas.tracking_schemas import DocumentRequest, OTPVerification, SignField, LogActionRequest, \
-    DocumentFieldRequest, DocumentResendRequest, OTPSend, MultiPartyUpdateRequest
+    DocumentFieldRequest, DocumentResendRequest, OTPSend, MultiPartyUpdateRequest, BatchSignRequest, BulkSendRequest
+from app.services.audit_log_store import AUDIT_PAGE_LIMIT
 from app.services.audit_service import DocumentTrackingManager, document_tracking_manager
+from app.services.bulk_send_service import bulk_send_service
+from app.services.completion_service import completion_pipeline
 from app.services.global_audit_service import GlobalAuditService
 from app.services.metadata_service import MetadataService
 from app.services.otp_service import OtpService
-from app.services.pdf_converter import AttachmentConverter
+from app.services.pdf_merge_service import pdf_merge_service
 from app.services.pdf_service import PDFSigner, PDFGenerator
 from app.services.security_service import AESCipher, EncryptionService
-from app.services.signature_service import SignatureHandler
+from app.services.signature_service import SIGN_LOCK_TTL, SignatureHandler
 from app.services.tracking_service import TrackingService
 from app.threadsafe.redis_lock import with_redis_lock
 from auth_app.app.api.routes.deps import dynamic_permission_check, get_email_from_token, get_current_user, \
@@ -27,7 +28,7 @@ from config import config
 from database.db_config import s3_client, S3_user
 from database.redis_db import redis_client
 from repositories.s3_repo import get_document_details, save_defaults_fields, load_tracking_metadata_by_tracking_id, \
-    s3_upload_bytes, _list_objects, s3_download_bytes, update_parties_tracking
+    s3_upload_bytes, update_parties_tracking, list_objects_with_etags
 from utils.logger import logger
 
 router = APIRouter()
@@ -37,39 +38,20 @@ async def get_merged_pdf(
     document_id: str,
     tracking_id: str,
     email: str = Depends(get_email_from_token),
+    if_none_match: Optional[str] = Header(None),
 ):
     from auth_app.app.services.auth_service import auth_service
     email = await auth_service.get_domain_if_master(email)
     # List signed documents from the correct folder
     s3_prefix = f"{email}/signed/{document_id}/{tracking_id}/"
-    object_keys = _list_objects(s3_prefix)
+    sources = list_objects_with_etags(s3_prefix)
 
-    if not object_keys:
+    if not sources:
         raise HTTPException(status_code=404, detail="No signed documents found.")
 
-    merger = PdfMerger()
-
-    for key in object_keys:
-        try:
-            encrypted_file = s3_download_bytes(key)
-            encryption_service = EncryptionService()
-            encryption_email = await encryption_service.resolve_encryption_email(email)
-            cipher = AESCipher(encryption_email)
-            decrypted = cipher.decrypt(encrypted_file)
-            pdf_bytes = AttachmentConverter.convert_to_pdf_if_needed(decrypted, key.split("/")[-1])
-            merger.append(BytesIO(pdf_bytes))
-        except Exception as e:
-            logger.error(f"Failed to merge key {key}: {e}")
-            continue
-
-    output_stream = BytesIO()
-    merger.write(output_stream)
-    merger.close()
-    output_stream.seek(0)
-
-    return StreamingResponse(
-        output_stream,
-        media_type="application/pdf"
+    encryption_email = await EncryptionService().resolve_encryption_email(email)
+    return await pdf_merge_service.merged_pdf_response(
+        email, sources, AESCipher(encryption_email), if_none_match
     )
 
 
@@ -123,6 +105,16 @@ async def get_signed_pdf(tracking_id: str,document_id: str,email: str = Depends(
     pdfSigner = PDFSigner()
     return await pdfSigner.get_signed_file(email, tracking_id, document_id)
 
+@router.get("/documents/completion-status", dependencies=[Depends(dynamic_permission_check)])
+async def get_completion_status(document_id: str, tracking_id: str, email: str = Depends(get_email_from_token)):
+    from auth_app.app.services.auth_service import auth_service
+    email = await auth_service.get_domain_if_master(email)
+    job = await completion_pipeline.get_status(email, document_id, tracking_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No completion job for this tracking.")
+    return job
+
+
 @router.get("/documents/signed-package", dependencies=[Depends(dynamic_permission_check)])
 async def download_signed_document_package(
     document_id: str,
@@ -219,7 +211,44 @@ async def save_default_fields(payload: DocumentFieldRequest,email: str = Depends
 async def get_document_logs_by_id(document_id: str, email: str = Depends(get_email_from_token)):
     from auth_app.app.services.auth_service import auth_service
     email = await auth_service.get_domain_if_master(email)
-    return GlobalAuditService.get_document_logs_by_id(email, document_id)
+    return await GlobalAuditService.get_document_logs_by_id(email, document_id)
+
+@router.get("/audit/logs", summary="Query audit logs with filters and cursor pagination", dependencies=[Depends(dynamic_permission_check)])
+async def query_audit_logs(
+    entity: str = Query("document", pattern="^(document|form)$"),
+    entity_id: Optional[str] = None,
+    actor: Optional[str] = None,
+    action: Optional[List[str]] = Query(None),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=AUDIT_PAGE_LIMIT),
+    email: str = Depends(get_email_from_token)
+):
+    from auth_app.app.services.auth_service import auth_service
+    email = await auth_service.get_domain_if_master(email)
+    return await GlobalAuditService.query_logs(
+        email, entity, cursor=cursor, limit=limit,
+        entity_id=entity_id, actor=actor, actions=action, since=since, until=until
+    )
+
+@router.get("/audit/logs/export", summary="Export audit logs as CSV or NDJSON", dependencies=[Depends(dynamic_permission_check)])
+async def export_audit_logs(
+    entity: str = Query("document", pattern="^(document|form)$"),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    entity_id: Optional[str] = None,
+    actor: Optional[str] = None,
+    action: Optional[List[str]] = Query(None),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    email: str = Depends(get_email_from_token)
+):
+    from auth_app.app.services.auth_service import auth_service
+    email = await auth_service.get_domain_if_master(email)
+    return GlobalAuditService.export_logs(
+        email, entity, format,
+        entity_id=entity_id, actor=actor, actions=action, since=since, until=until
+    )
 
 @router.post(
     "/documents/send",
@@ -276,7 +305,7 @@ async def get_tracking_metadata(
 
 # Signature-related endpoints
 @router.post("/documents/sign", dependencies=[Depends(dynamic_permission_check)])
-@with_redis_lock(redis_client, lock_key_template="sign:{document_id}:{tracking_id}", ttl=10)
+@with_redis_lock(redis_client, lock_key_template="sign:{document_id}:{tracking_id}", ttl=SIGN_LOCK_TTL)
 async def sign_field_api(
     data: SignField,
     user_email: str = Depends(get_user_email_from_token),
@@ -287,6 +316,62 @@ async def sign_field_api(
     return await SignatureHandler.sign_field(email, user_email, data)
 
 
+@router.post("/documents/sign/batch", dependencies=[Depends(dynamic_permission_check)])
+async def sign_batch_api(
+    data: BatchSignRequest,
+    user_email: str = Depends(get_user_email_from_token),
+    email: str = Depends(get_email_from_token)
+):
+    from auth_app.app.services.auth_service import auth_service
+    email = await auth_service.get_domain_if_master(email)
+    return await SignatureHandler.sign_batch(email, user_email, data.documents)
+
+
+@router.post("/documents/bulk-send", dependencies=[Depends(dynamic_permission_check)])
+async def bulk_send(
+    request: BulkSendRequest,
+    email: str = Depends(get_email_from_token),
+    user_email: str = Depends(get_user_email_from_token)
+):
+    from auth_app.app.services.auth_service import auth_service
+    email = await auth_service.get_domain_if_master(email)
+    return await bulk_send_service.create_job(email, user_email, request, request.recipients)
+
+
+@router.post("/documents/bulk-send/csv", dependencies=[Depends(dynamic_permission_check)])
+async def bulk_send_csv(
+    request: str = Form(..., description="BulkSendRequest as JSON; recipients come from the CSV"),
+    file: UploadFile = File(...),
+    email: str = Depends(get_email_from_token),
+    user_email: str = Depends(get_user_email_from_token)
+):
+    from auth_app.app.services.auth_service import auth_service
+    from pydantic import ValidationError
+    email = await auth_service.get_domain_if_master(email)
+    try:
+        bulk_request = BulkSendRequest.model_validate_json(request)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+
+    template = bulk_send_service.resolve_template(email, user_email, bulk_request)
+    recipients = bulk_send_service.parse_recipients_csv(await file.read(), [p["id"] for p in template["parties"]])
+    return await bulk_send_service.create_job(email, user_email, bulk_request, recipients)
+
+
+@router.get("/documents/bulk-send/{job_id}", dependencies=[Depends(dynamic_permission_check)])
+async def bulk_send_progress(job_id: str, email: str = Depends(get_email_from_token)):
+    from auth_app.app.services.auth_service import auth_service
+    email = await auth_service.get_domain_if_master(email)
+    return await bulk_send_service.get_progress(email, job_id)
+
+
+@router.post("/documents/bulk-send/{job_id}/resume", dependencies=[Depends(dynamic_permission_check)])
+async def bulk_send_resume(job_id: str, email: str = Depends(get_email_from_token)):
+    from auth_app.app.services.auth_service import auth_service
+    email = await auth_service.get_domain_if_master(email)
+    return await bulk_send_service.resume(email, job_id)
+
+
 @router.post("/documents/upload-attachment", dependencies=[Depends(dynamic_permission_check)])
 async def upload_attachments(
     files: List[UploadFile] = File(...),
@@ -0,0 +1,56 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.schemas.webhook_schema import WebhookSubscriptionCreate, WebhookSubscriptionUpdate
+from app.services.webhook_service import webhook_service
+from auth_app.app.api.routes.deps import dynamic_permission_check, get_email_from_token
+
+router = APIRouter()
+
+
+async def _owner(email: str) -> str:
+    from auth_app.app.services.auth_service import auth_service
+    return await auth_service.get_domain_if_master(email)
+
+
+@router.post("/webhooks", dependencies=[Depends(dynamic_permission_check)])
+async def create_webhook(data: WebhookSubscriptionCreate, email: str = Depends(get_email_from_token)):
+    return await webhook_service.create_subscription(await _owner(email), data.url, data.events, data.description)
+
+
+@router.get("/webhooks", dependencies=[Depends(dynamic_permission_check)])
+async def list_webhooks(email: str = Depends(get_email_from_token)):
+    return await webhook_service.list_subscriptions(await _owner(email))
+
+
+@router.get("/webhooks/deliveries", dependencies=[Depends(dynamic_permission_check)])
+async def list_webhook_deliveries(
+    subscription_id: Optional[str] = None,
+    state: Optional[str] = Query(None, pattern="^(pending|sending|delivered|dead)$"),
+    limit: int = Query(50, ge=1, le=500),
+    email: str = Depends(get_email_from_token)
+):
+    return await webhook_service.list_deliveries(await _owner(email), subscription_id, state, limit)
+
+
+@router.post("/webhooks/deliveries/{delivery_id}/retry", dependencies=[Depends(dynamic_permission_check)])
+async def retry_webhook_delivery(delivery_id: str, email: str = Depends(get_email_from_token)):
+    return await webhook_service.retry_dead(await _owner(email), delivery_id)
+
+
+@router.patch("/webhooks/{subscription_id}", dependencies=[Depends(dynamic_permission_check)])
+async def update_webhook(subscription_id: str, data: WebhookSubscriptionUpdate,
+                         email: str = Depends(get_email_from_token)):
+    return await webhook_service.update_subscription(await _owner(email), subscription_id, data.dict())
+
+
+@router.post("/webhooks/{subscription_id}/rotate-secret", dependencies=[Depends(dynamic_permission_check)])
+async def rotate_webhook_secret(subscription_id: str, email: str = Depends(get_email_from_token)):
+    return await webhook_service.rotate_secret(await _owner(email), subscription_id)
+
+
+@router.delete("/webhooks/{subscription_id}", dependencies=[Depends(dynamic_permission_check)])
+async def delete_webhook(subscription_id: str, email: str = Depends(get_email_from_token)):
+    await webhook_service.delete_subscription(await _owner(email), subscription_id)
+    return {"message": "Webhook deleted"}
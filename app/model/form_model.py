@@ -11,6 +11,7 @@ from datetime import datetime, timezone
 import requests
 from user_agents import parse
 import json
+from typing import Dict
 
 
 class FormModel:
@@ -322,8 +323,17 @@ class FormModel:
 
     @staticmethod
     def send_form(email: str, form_id: str, party_email: str, form_metadata: dict):
+        FormModel.send_form_batch(email, form_id, {party_email: form_metadata})
+
+    @staticmethod
+    def send_form_batch(email: str, form_id: str, entries: Dict[str, dict]):
+        """
+        Record the 'sent' state of every party in `entries` (party_email -> tracking entry)
+        with one read and one write of trackings.json and form_user_data.json.
+        """
         track_key = f"{email}/forms/submissions/{form_id}/trackings.json"
         user_data_key = f"{email}/forms/submissions/{form_id}/form_user_data.json"
+        party_emails = ", ".join(entries)
 
         try:
             # --- Load tracking.json ---
@@ -336,48 +346,6 @@ class FormModel:
                 else:
                     raise
 
-            party_data = tracking_data.get(party_email, {})
-            status = party_data.get("status", {})
-
-            if "sent" not in status:
-                client_info = form_metadata.get("client_info")
-                if client_info and hasattr(client_info, "dict"):
-                    client_info = client_info.dict()
-
-                status["sent"] = {
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                    "client_info": client_info or {}
-                }
-
-            form_metadata_copy = form_metadata.copy()
-
-            form_metadata_copy["email_responses"] = [
-                resp.dict() if hasattr(resp, "dict") else resp
-                for resp in form_metadata_copy.get("email_responses", [])
-            ]
-
-            holder = form_metadata_copy.get("holder")
-            if holder and hasattr(holder, "dict"):
-                form_metadata_copy["holder"] = holder.dict()
-
-            def serialize_parties(parties):
-                return [p.dict() if hasattr(p, "dict") else p for p in parties]
-
-            party_data.update({
-                "form_id": form_id,
-                "status": status,
-                "validityDate": form_metadata_copy.get("validityDate"),
-                "remainder": form_metadata_copy.get("remainder"),
-                "party_id": form_metadata_copy.get("party_id"),
-                "party_email": form_metadata_copy.get("party_email"),
-                "party_name": form_metadata_copy.get("party_name"),
-                "email_responses": form_metadata_copy.get("email_responses", []),
-                "holder": form_metadata_copy.get("holder", {}),
-                "created_at": form_metadata_copy.get("created_at"),
-                "cc_emails": form_metadata_copy.get("cc_emails", [])
-            })
-            tracking_data[party_email] = party_data
-
             # --- Load form_user_data.json ---
             try:
                 resp = s3_client.get_object(Bucket=config.S3_BUCKET, Key=user_data_key)
@@ -388,27 +356,63 @@ class FormModel:
                 else:
                     raise
 
-            # Prepopulate with id/label if not already present
-            existing_fields = form_user_data.get(party_email, [])
-            if not existing_fields:
-                form_metadata_copy.get("fields", [])
-
-                form_user_data[party_email] = [
-                    {
-                        "id": f["id"] if isinstance(f, dict) else getattr(f, "id"),
-                        "label": f["label"] if isinstance(f, dict) else getattr(f, "label"),
-                        "type": f["type"] if isinstance(f, dict) else getattr(f, "type"),
-                        "required": f.get("required", False) if isinstance(f, dict) else getattr(f, "required", False),
-                        "sensitive": f.get("sensitive", False) if isinstance(f, dict) else getattr(f, "sensitive",False),
-                        "disclaimerText": f.get("disclaimerText", None) if isinstance(f, dict) else getattr(f, "disclaimerText",None),
-                        "value": "",
+            for party_email, form_metadata in entries.items():
+                party_data = tracking_data.get(party_email, {})
+                status = party_data.get("status", {})
+
+                if "sent" not in status:
+                    client_info = form_metadata.get("client_info")
+                    if client_info and hasattr(client_info, "dict"):
+                        client_info = client_info.dict()
+
+                    status["sent"] = {
+                        "timestamp": datetime.utcnow().isoformat() + "Z",
+                        "client_info": client_info or {}
                     }
-                    for f in form_metadata_copy.get("fields", [])
+
+                form_metadata_copy = form_metadata.copy()
+
+                form_metadata_copy["email_responses"] = [
+                    resp.dict() if hasattr(resp, "dict") else resp
+                    for resp in form_metadata_copy.get("email_responses", [])
                 ]
 
-            # --- Save both files ---
+                holder = form_metadata_copy.get("holder")
+                if holder and hasattr(holder, "dict"):
+                    form_metadata_copy["holder"] = holder.dict()
+
+                party_data.update({
+                    "form_id": form_id,
+                    "status": status,
+                    "validityDate": form_metadata_copy.get("validityDate"),
+                    "remainder": form_metadata_copy.get("remainder"),
+                    "party_id": form_metadata_copy.get("party_id"),
+                    "party_email": form_metadata_copy.get("party_email"),
+                    "party_name": form_metadata_copy.get("party_name"),
+                    "email_responses": form_metadata_copy.get("email_responses", []),
+                    "holder": form_metadata_copy.get("holder", {}),
+                    "created_at": form_metadata_copy.get("created_at"),
+                    "cc_emails": form_metadata_copy.get("cc_emails", [])
+                })
+                tracking_data[party_email] = party_data
+
+                # Prepopulate with id/label if not already present
+                existing_fields = form_user_data.get(party_email, [])
+                if not existing_fields:
+                    form_user_data[party_email] = [
+                        {
+                            "id": f["id"] if isinstance(f, dict) else getattr(f, "id"),
+                            "label": f["label"] if isinstance(f, dict) else getattr(f, "label"),
+                            "type": f["type"] if isinstance(f, dict) else getattr(f, "type"),
+                            "required": f.get("required", False) if isinstance(f, dict) else getattr(f, "required", False),
+                            "sensitive": f.get("sensitive", False) if isinstance(f, dict) else getattr(f, "sensitive",False),
+                            "disclaimerText": f.get("disclaimerText", None) if isinstance(f, dict) else getattr(f, "disclaimerText",None),
+                            "value": "",
+                        }
+                        for f in form_metadata_copy.get("fields", [])
+                    ]
 
-            logger.info(existing_fields)
+            # --- Save both files ---
             s3_client.put_object(
                 Bucket=config.S3_BUCKET,
                 Key=track_key,
@@ -423,10 +427,10 @@ class FormModel:
                 ContentType='application/json'
             )
 
-            logger.info(f"Sent metadata updated for {party_email} in form {form_id}")
+            logger.info(f"Sent metadata updated for {party_emails} in form {form_id}")
 
         except Exception as e:
-            logger.error(f"Failed to update sent metadata for {party_email} in form {form_id}: {str(e)}")
+            logger.error(f"Failed to update sent metadata for {party_emails} in form {form_id}: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to update sent metadata")
 
     @staticmethod
@@ -0,0 +1,8 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class MarkNotificationsRead(BaseModel):
+    # None marks every notification as read
+    notification_ids: Optional[List[str]] = None
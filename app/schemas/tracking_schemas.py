@@ -127,6 +127,45 @@ class SignField(BaseModel):
     fields: List[UserFields]
     client_info: ClientInfo
 
+class BatchSignRequest(BaseModel):
+    documents: List[SignField]
+
+class BulkSendParty(BaseModel):
+    id: str
+    color: str
+    priority: Optional[int] = None
+
+class BulkRecipient(BaseModel):
+    name: str
+    email: EmailStr
+
+class BulkSendRequest(BaseModel):
+    """
+    One document sent to many recipient sets. Parties and fields come either from a
+    saved template (template_name) or inline; each recipient set maps a party id to
+    the person filling that role.
+    """
+    document_id: str
+    template_name: Optional[str] = None
+    is_global: bool = False
+    parties: Optional[List[BulkSendParty]] = None
+    fields: Optional[List["Field"]] = None
+    validityDate: str
+    remainder: int
+    pdfSize: PdfSize
+    email_response: List[EmailResponse]
+    cc_emails: Optional[List[EmailStr]] = None
+    client_info: ClientInfo
+    holder: Optional[Holder] = None
+    scheduled_datetime: Optional[datetime] = None
+    recipients: List[Dict[str, BulkRecipient]] = []
+
+    @field_validator("scheduled_datetime", mode="before")
+    def empty_string_to_none(cls, v):
+        if v == "" or v is None:
+            return None
+        return v
+
 class FieldSubmission(BaseModel):
     id: str
     type: str
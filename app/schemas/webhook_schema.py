@@ -0,0 +1,17 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class WebhookSubscriptionCreate(BaseModel):
+    url: str
+    # Event names such as "document.completed", or "*" for all of them
+    events: List[str]
+    description: Optional[str] = None
+
+
+class WebhookSubscriptionUpdate(BaseModel):
+    url: Optional[str] = None
+    events: Optional[List[str]] = None
+    description: Optional[str] = None
+    active: Optional[bool] = None
@@ -1,3 +1,4 @@
+import asyncio
 import json
 from datetime import datetime, timezone
 
@@ -9,6 +10,7 @@ from app.schemas.form_schema import EmailResponse, FormRequest, FormSubmissionRe
 from app.services.email_service import email_service
 from app.services.notification_service import NotificationService
 from app.services.pdf_service import PDFGenerator
+from app.services.webhook_service import webhook_service
 from config import config
 from database.db_config import s3_client
 from repositories import s3_repo
@@ -16,6 +18,7 @@ from repositories.form_repository import FormRepository
 from fastapi import HTTPException, status
 from typing import Dict, List
 
+from utils.fan_out import fan_out
 from utils.logger import logger
 
 
@@ -56,6 +59,10 @@ class FormService:
     def update_tracking(form_id: str, new_entry: dict, party_email: str, email: str):
         FormRepository.update_trackings(email, form_id, party_email, new_entry)
 
+    @staticmethod
+    def update_trackings(form_id: str, entries: List[dict], email: str):
+        FormRepository.update_trackings_batch(email, form_id, {entry["party_email"]: entry for entry in entries})
+
     @staticmethod
     def get_tracking_entry(form_id: str, party_email: str, email: str) -> dict:
         tracking = FormRepository.get_tracking(email, form_id, party_email)
@@ -125,6 +132,12 @@ class FormService:
             )
             party_name = data.get("party_name", "-")
             await NotificationService.store_form_notification(email, user_email, submission.form_id, formTitle, submission.party_email, timestamp, party_name)
+            await webhook_service.emit(email, "form.submitted", {
+                "form_id": submission.form_id,
+                "form_title": formTitle,
+                "party": {"name": party_name, "email": submission.party_email},
+                "occurred_at": timestamp,
+            })
 
 
             holder = data.get("holder", {})
@@ -187,45 +200,39 @@ class FormService:
 
         try:
             parties_tracking_entries = await self.form_tracking_payload(data, email)
+            # One trackings.json write for all parties, then each party's link is sent concurrently
+            await asyncio.to_thread(self.update_trackings, data.form_id, parties_tracking_entries, email)
 
-            for tracking_entry in parties_tracking_entries:
+            async def send_party(tracking_entry: dict):
                 party_email = tracking_entry["party_email"]
-                party_id = tracking_entry["party_id"]
-                party_name = tracking_entry["party_name"]
-                self.update_tracking(data.form_id, tracking_entry, party_email, email)
-
-                try:
-                    token_data = await create_form_token(
-                        sent_email=party_email,
-                        party_id=party_id,
-                        email=user_email,
-                        form_id=data.form_id,
-                        validity_date_str=data.validityDate,
-                        remainder_days=data.remainder,
-                    )
-                    logger.info(f"{token_data}")
-                    token = token_data["token"]
-                    validity_datetime = token_data["validity_datetime"]
-                    email_resp = data.email_responses[0]
-
-                    await email_service.send_form_link(
-                        recipient_email=party_email,
-                        form_id=data.form_id,
-                        party_id=party_id,
-                        party_name = party_name,
-                        token=token,
-                        email_response=email_resp,
-                        validity_datetime=validity_datetime,
-                        reply_name=data.holder.name if data.holder else None,
-                        reply_email=data.holder.email if data.holder else None,
-                        cc_emails=data.cc_emails
-                    )
+                token_data = await create_form_token(
+                    sent_email=party_email,
+                    party_id=tracking_entry["party_id"],
+                    email=user_email,
+                    form_id=data.form_id,
+                    validity_date_str=data.validityDate,
+                    remainder_days=data.remainder,
+                )
+                await email_service.send_form_link(
+                    recipient_email=party_email,
+                    form_id=data.form_id,
+                    party_id=tracking_entry["party_id"],
+                    party_name=tracking_entry["party_name"],
+                    token=token_data["token"],
+                    email_response=data.email_responses[0],
+                    validity_datetime=token_data["validity_datetime"],
+                    reply_name=data.holder.name if data.holder else None,
+                    reply_email=data.holder.email if data.holder else None,
+                    cc_emails=data.cc_emails,
+                    owner=email
+                )
 
-                    # FormRepository.update_tracking_status(
-                    #     email, data.form_id, party_email,  "Sent",request
-                    # )
-                except Exception as email_error:
-                    logger.error(f"Failed to send email to {party_email}: {str(email_error)}")
+            failed_parties = []
+            for outcome in await fan_out(parties_tracking_entries, send_party):
+                if not outcome.ok:
+                    party_email = outcome.item["party_email"]
+                    logger.error(f"Failed to send email to {party_email}: {str(outcome.error)}")
+                    failed_parties.append({"party_email": party_email, "error": str(outcome.error)})
 
             # self.audit_trail(email, data.form_id, "FORM_SENT",
             #                  {"parties": [p["party_email"] for p in parties_tracking_entries]})
@@ -233,6 +240,7 @@ class FormService:
             return {
                 "message": "Form sent and tracking updated successfully",
                 "tracked_parties": [p["party_email"] for p in parties_tracking_entries],
+                "failed_parties": failed_parties,
                 "form_id": data.form_id,
             }
 
@@ -241,11 +249,6 @@ class FormService:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal error: {str(e)}")
 
 
-        except Exception as e:
-            logger.error(f"Error in send_form for form_id={data.form_id}, user={email}: {str(e)}")
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal error: {str(e)}")
-
-
     async def resend_form(
             self,
             data: ResendFormRequest,
@@ -362,6 +365,7 @@ class FormService:
                         reply_name=party_data.get("holder", {}).get("name"),
                         reply_email=party_data.get("holder", {}).get("email"),
                         cc_emails=party_data.get("cc_emails", []),
+                        owner=email,
                     )
                 except ValidationError as ve:
                     logger.error(f"Invalid email_response for {party_email}: {ve}")
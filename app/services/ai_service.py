@@ -1,24 +1,139 @@
+import hashlib
+import json
+import re
+from typing import List, Optional, Tuple
+
+import fitz  # PyMuPDF
 import httpx
 from fastapi import HTTPException
 from config import config
+from utils.fitz_executor import run_fitz
+from utils.logger import logger
 
 API_KEY = config.AI_API_KEY
 AI_SERVICE_URL = config.AI_SERVICE_URL
 
+AI_TEXT_CACHE_TTL = 24 * 60 * 60
+AI_TEXT_CHUNK_CHARS = 4000
+# Upper bound on the text sent with one request; ask-pdf picks the chunks closest to the question.
+AI_MAX_CONTEXT_CHARS = 60000
+AI_TEXT_KEY = "ai:text:{}:{}"
+
+
+class DocumentTextCache:
+    """
+    Text layer of PDFs sent to the AI assistant, extracted once with PyMuPDF and kept
+    in Redis as page-tagged chunks under the uploader and the SHA-256 of the PDF. Callers
+    get the hash back and can pass it instead of re-uploading the file for follow-up
+    questions; a hash only resolves for the user who uploaded that PDF, since hashes of
+    signed documents are printed on completion certificates.
+    """
+
+    @staticmethod
+    def document_hash(pdf_bytes: bytes) -> str:
+        return hashlib.sha256(pdf_bytes).hexdigest()
+
+    @staticmethod
+    def extract_chunks(pdf_bytes: bytes) -> List[str]:
+        chunks = []
+        with fitz.open("pdf", pdf_bytes) as pdf_doc:
+            for page_number, page in enumerate(pdf_doc, start=1):
+                text = page.get_text("text").strip()
+                for start in range(0, len(text), AI_TEXT_CHUNK_CHARS):
+                    chunks.append(f"[page {page_number}]\n{text[start:start + AI_TEXT_CHUNK_CHARS]}")
+        return chunks
+
+    @staticmethod
+    def _redis():
+        from database.redis_db import redis_client
+        return redis_client
+
+    @staticmethod
+    def load(owner: str, document_hash: str) -> Optional[List[str]]:
+        redis_client = DocumentTextCache._redis()
+        key = AI_TEXT_KEY.format(owner, document_hash)
+        cached = redis_client.get(key)
+        if cached is None:
+            return None
+        redis_client.expire(key, AI_TEXT_CACHE_TTL)
+        return json.loads(cached)
+
+    @staticmethod
+    def store(owner: str, document_hash: str, chunks: List[str]):
+        DocumentTextCache._redis().setex(AI_TEXT_KEY.format(owner, document_hash), AI_TEXT_CACHE_TTL, json.dumps(chunks))
+
+    @staticmethod
+    def select_context(chunks: List[str], question: Optional[str] = None) -> str:
+        if sum(len(chunk) for chunk in chunks) <= AI_MAX_CONTEXT_CHARS or not question:
+            return "\n\n".join(chunks)[:AI_MAX_CONTEXT_CHARS]
+
+        terms = set(re.findall(r"\w{3,}", question.lower()))
+        ranked = sorted(
+            range(len(chunks)),
+            key=lambda i: -len(terms & set(re.findall(r"\w{3,}", chunks[i].lower())))
+        )
+        selected, size = [], 0
+        for index in ranked:
+            if size + len(chunks[index]) > AI_MAX_CONTEXT_CHARS:
+                continue
+            selected.append(index)
+            size += len(chunks[index])
+        return "\n\n".join(chunks[i] for i in sorted(selected))
+
 
 class AIService:
     @staticmethod
-    async def summarize(pdf_file):
+    async def _document_text(owner: str, pdf_file,
+                             document_hash: Optional[str]) -> Tuple[Optional[str], Optional[List[str]], Optional[bytes]]:
+        """
+        Resolve (hash, chunks, pdf_bytes) for a request. chunks is None when the PDF has
+        to be sent itself: text input is off, or the PDF has no text layer (e.g. a scan).
+        """
+        if pdf_file is None:
+            chunks = DocumentTextCache.load(owner, document_hash) if document_hash and config.AI_TEXT_INPUT else None
+            if chunks is None:
+                raise HTTPException(status_code=404, detail="Document text not found or expired; upload the PDF again.")
+            return document_hash, chunks, None
+
+        pdf_bytes = await pdf_file.read()
+        if not config.AI_TEXT_INPUT:
+            return None, None, pdf_bytes
+
+        document_hash = DocumentTextCache.document_hash(pdf_bytes)
+        chunks = DocumentTextCache.load(owner, document_hash)
+        if chunks is not None:
+            logger.info(f"[ai] Text cache hit for {document_hash}")
+            return document_hash, chunks, None
+
+        chunks = await run_fitz(DocumentTextCache.extract_chunks, pdf_bytes)
+        if not chunks:
+            return document_hash, None, pdf_bytes
+        DocumentTextCache.store(owner, document_hash, chunks)
+        logger.info(f"[ai] Extracted {len(chunks)} text chunks for {document_hash}")
+        return document_hash, chunks, None
+
+    @staticmethod
+    async def _post_document(path: str, pdf_file, chunks, pdf_bytes, data: dict):
+        headers = {"X-API-Key": API_KEY}
+        async with httpx.AsyncClient(timeout=1000.0) as client:
+            if chunks is None:
+                files = {"pdf": (pdf_file.filename, pdf_bytes, pdf_file.content_type)}
+                return await client.post(f"{AI_SERVICE_URL}{path}", files=files, data=data, headers=headers)
+            data = {**data, "text": DocumentTextCache.select_context(chunks, data.get("question"))}
+            return await client.post(f"{AI_SERVICE_URL}{path}", data=data, headers=headers)
+
+    @staticmethod
+    async def summarize(owner: str, pdf_file=None, document_hash: Optional[str] = None):
         try:
-            async with httpx.AsyncClient(timeout=1000.0) as client:
-                files = {"pdf": (pdf_file.filename, await pdf_file.read(), pdf_file.content_type)}
-                headers = {"X-API-Key": API_KEY}
-                resp = await client.post(f"{AI_SERVICE_URL}/summarize", files=files, headers=headers)
+            document_hash, chunks, pdf_bytes = await AIService._document_text(owner, pdf_file, document_hash)
+            resp = await AIService._post_document("/summarize", pdf_file, chunks, pdf_bytes, {})
 
             if resp.status_code != 200:
                 raise HTTPException(status_code=resp.status_code, detail=resp.text)
 
-            return resp.json()
+            return {**resp.json(), "document_hash": document_hash} if document_hash else resp.json()
+        except HTTPException:
+            raise
         except httpx.TimeoutException:
             raise HTTPException(status_code=504, detail="Summarization service timed out.")
         except httpx.RequestError as e:
@@ -27,18 +142,17 @@ class AIService:
             raise HTTPException(status_code=500, detail=f"Summarize failed: {str(e)}")
 
     @staticmethod
-    async def ask_pdf(pdf_file, question: str):
+    async def ask_pdf(owner: str, pdf_file, question: str, document_hash: Optional[str] = None):
         try:
-            async with httpx.AsyncClient(timeout=1000.0) as client:
-                files = {"pdf": (pdf_file.filename, await pdf_file.read(), pdf_file.content_type)}
-                data = {"question": question}
-                headers = {"X-API-Key": API_KEY}
-                resp = await client.post(f"{AI_SERVICE_URL}/ask-pdf", files=files, data=data, headers=headers)
+            document_hash, chunks, pdf_bytes = await AIService._document_text(owner, pdf_file, document_hash)
+            resp = await AIService._post_document("/ask-pdf", pdf_file, chunks, pdf_bytes, {"question": question})
 
             if resp.status_code != 200:
                 raise HTTPException(status_code=resp.status_code, detail=resp.text)
 
-            return resp.json()
+            return {**resp.json(), "document_hash": document_hash} if document_hash else resp.json()
+        except HTTPException:
+            raise
         except httpx.TimeoutException:
             raise HTTPException(status_code=504, detail="Ask-PDF service timed out.")
         except httpx.RequestError as e:
@@ -0,0 +1,215 @@
+import asyncio
+import base64
+import hashlib
+import threading
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pymongo.errors import BulkWriteError
+
+from auth_app.app.database.connection import db
+from database.db_config import s3_client
+from repositories.s3_repo import get_logs
+from utils.logger import logger
+
+audit_logs = db["audit_logs"]
+audit_imports = db["audit_log_imports"]
+
+AUDIT_FLUSH_INTERVAL = 2  # seconds between background flushes
+AUDIT_FLUSH_BATCH = 500
+AUDIT_PAGE_LIMIT = 500
+AUDIT_EXPORT_BATCH = 1000
+DUPLICATE_KEY = 11000
+# Sort position of legacy entries whose timestamp cannot be parsed
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_PROJECTION = {"_id": 0, "owner": 0, "ts": 0}
+
+_buffer: List[dict] = []
+# log_document_action is also called from worker threads
+_buffer_lock = threading.Lock()
+# Tenants whose legacy S3 audit array is already in Mongo, per (owner, entity)
+_imported = set()
+
+
+def _parse_ts(timestamp) -> datetime:
+    try:
+        ts = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+    except ValueError:
+        return EPOCH
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def _legacy_id(marker: str, index: int) -> ObjectId:
+    return ObjectId(hashlib.md5(f"{marker}:{index}".encode()).hexdigest()[:24])
+
+
+def _encode_cursor(doc: dict) -> str:
+    raw = f"{doc['ts'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        ts, oid = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return _parse_ts(ts), ObjectId(oid)
+    except (ValueError, InvalidId, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class AuditLogStore:
+    """
+    Append-only audit trail in Mongo, one document per event. Writers only buffer the
+    entry in memory; the buffer is flushed with insert_many every AUDIT_FLUSH_INTERVAL
+    seconds, before every read and on shutdown, so logging an event no longer downloads
+    and rewrites the tenant's whole history. Entries are never updated once written.
+
+    Audit history from before this store lives in one S3 JSON array per tenant and
+    entity. It is imported on the first read and the array is left untouched from then
+    on as a read-only archive.
+    """
+
+    @staticmethod
+    async def ensure_indexes():
+        await audit_logs.create_index([("owner", 1), ("entity", 1), ("entity_id", 1), ("ts", 1)])
+        await audit_logs.create_index([("owner", 1), ("entity", 1), ("ts", 1)])
+        await audit_logs.create_index([("owner", 1), ("entity", 1), ("actor.email", 1), ("ts", 1)])
+        await audit_logs.create_index([("owner", 1), ("entity", 1), ("action", 1), ("ts", 1)])
+
+    @staticmethod
+    def append(owner: str, entry: Dict):
+        record = {**entry, "_id": ObjectId(), "owner": owner, "ts": _parse_ts(entry.get("timestamp"))}
+        with _buffer_lock:
+            _buffer.append(record)
+
+    @staticmethod
+    async def flush() -> int:
+        """Write buffered entries; whatever could not be written goes back to the buffer."""
+        with _buffer_lock:
+            batch = _buffer[:]
+            _buffer.clear()
+        if not batch:
+            return 0
+
+        failed: List[dict] = []
+        for start in range(0, len(batch), AUDIT_FLUSH_BATCH):
+            chunk = batch[start:start + AUDIT_FLUSH_BATCH]
+            try:
+                await audit_logs.insert_many(chunk, ordered=False)
+            except BulkWriteError as e:
+                # Ids are assigned on append, so a duplicate means the entry is already stored
+                failed.extend(
+                    chunk[err["index"]] for err in e.details.get("writeErrors", []) if err.get("code") != DUPLICATE_KEY
+                )
+            except Exception as e:
+                logger.error(f"[audit] Failed to flush {len(chunk)} audit entries: {e}")
+                failed.extend(chunk)
+
+        if failed:
+            with _buffer_lock:
+                _buffer[:0] = failed
+        return len(batch) - len(failed)
+
+    @staticmethod
+    async def _import_legacy(owner: str, entity: str, legacy_key: str):
+        marker = f"{owner}:{entity}"
+        if marker in _imported:
+            return
+        if await audit_imports.find_one({"_id": marker, "done": True}):
+            _imported.add(marker)
+            return
+
+        try:
+            legacy = await asyncio.to_thread(get_logs, legacy_key)
+        except s3_client.exceptions.NoSuchKey:
+            legacy = []
+        if legacy:
+            # Deterministic ids keep a retried or concurrent import from duplicating entries
+            records = [
+                {**entry, "_id": _legacy_id(marker, index), "owner": owner, "entity": entry.get("entity", entity),
+                 "ts": _parse_ts(entry.get("timestamp"))}
+                for index, entry in enumerate(legacy)
+            ]
+            try:
+                await audit_logs.insert_many(records, ordered=False)
+            except BulkWriteError as e:
+                if any(err.get("code") != DUPLICATE_KEY for err in e.details.get("writeErrors", [])):
+                    raise
+        await audit_imports.update_one(
+            {"_id": marker},
+            {"$set": {"done": True, "entries": len(legacy), "imported_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        _imported.add(marker)
+        logger.info(f"[audit] Imported {len(legacy)} legacy {entity} audit entries for {owner}")
+
+    @staticmethod
+    def _query(owner: str, entity: str, entity_id: Optional[str] = None, actor: Optional[str] = None,
+               actions: Optional[List[str]] = None, since: Optional[datetime] = None,
+               until: Optional[datetime] = None) -> dict:
+        query = {"owner": owner, "entity": entity}
+        if entity_id is not None:
+            query["entity_id"] = entity_id
+        if actor:
+            query["actor.email"] = actor
+        if actions:
+            query["action"] = {"$in": actions}
+        if since or until:
+            query["ts"] = {}
+            if since:
+                query["ts"]["$gte"] = _utc(since)
+            if until:
+                query["ts"]["$lt"] = _utc(until)
+        return query
+
+    @staticmethod
+    async def _prepare(owner: str, entity: str, legacy_key: str):
+        await AuditLogStore.flush()
+        await AuditLogStore._import_legacy(owner, entity, legacy_key)
+
+    @staticmethod
+    async def find(owner: str, entity: str, legacy_key: str, entity_id: Optional[str] = None) -> List[Dict]:
+        """Entries of one tenant and entity type, optionally for one entity, oldest first."""
+        await AuditLogStore._prepare(owner, entity, legacy_key)
+        query = AuditLogStore._query(owner, entity, entity_id)
+        return await audit_logs.find(query, _PROJECTION).sort([("ts", 1), ("_id", 1)]).to_list(length=None)
+
+    @staticmethod
+    async def page(owner: str, entity: str, legacy_key: str, cursor: Optional[str] = None, limit: int = 50,
+                   **filters) -> Dict:
+        """
+        One page of matching entries, oldest first, with the cursor of the next page (None
+        on the last one). Filters: entity_id, actor (email), actions, since/until.
+        """
+        await AuditLogStore._prepare(owner, entity, legacy_key)
+        query = AuditLogStore._query(owner, entity, **filters)
+        if cursor:
+            ts, oid = _decode_cursor(cursor)
+            query = {"$and": [query, {"$or": [{"ts": {"$gt": ts}}, {"ts": ts, "_id": {"$gt": oid}}]}]}
+
+        docs = await audit_logs.find(query, {"owner": 0}).sort([("ts", 1), ("_id", 1)]).limit(limit + 1).to_list(
+            length=limit + 1
+        )
+        next_cursor = _encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+        items = [{k: v for k, v in doc.items() if k not in ("_id", "ts")} for doc in docs[:limit]]
+        return {"items": items, "next_cursor": next_cursor}
+
+    @staticmethod
+    async def stream(owner: str, entity: str, legacy_key: str, **filters) -> AsyncIterator[Dict]:
+        """Every matching entry, oldest first, read from Mongo in batches for exports."""
+        await AuditLogStore._prepare(owner, entity, legacy_key)
+        query = AuditLogStore._query(owner, entity, **filters)
+        cursor = audit_logs.find(query, _PROJECTION).sort([("ts", 1), ("_id", 1)]).batch_size(AUDIT_EXPORT_BATCH)
+        async for doc in cursor:
+            yield doc
+
+audit_log_store = AuditLogStore()
@@ -9,6 +9,7 @@ from fastapi import HTTPException
 from app.schemas.tracking_schemas import ClientInfo, LogActionRequest
 from app.services.metadata_service import MetadataService
 from app.services.notification_service import NotificationService
+from app.services.webhook_service import webhook_service
 from repositories.s3_repo import (
     load_document_metadata,
     generate_summary_from_trackings,
@@ -22,6 +23,13 @@ from repositories.s3_repo import (
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+WEBHOOK_EVENTS_BY_ACTION = {
+    "INITIATED": "document.sent",
+    "RE-INITIATED": "document.sent",
+    "OTP_VERIFIED": "document.viewed",
+    "ALL_FIELDS_SIGNED": "document.signed",
+}
+
 
 class DocumentTrackingManager:
 
@@ -93,6 +101,9 @@ class DocumentTrackingManager:
             }
         }
 
+        # Webhook events to emit once the tracking is saved: (event, party)
+        webhook_events = []
+
         # Initialize tracking status if not completed
         if tracking.get("tracking_status", {}).get("status") != "completed":
             tracking["tracking_status"] = {
@@ -120,6 +131,7 @@ class DocumentTrackingManager:
                     **context_data
                 })
 
+            webhook_events.append(("document.cancelled", None))
             tracking.setdefault("cancelled_by", [])
             tracking["cancelled_by"].append({
                 "email": user_email,
@@ -172,6 +184,8 @@ class DocumentTrackingManager:
                 **context_data
             }
 
+            webhook_events.append(("document.declined", party_entry))
+
             # Store decline notification
             NotificationService.store_notification(
                 email=email,
@@ -219,6 +233,10 @@ class DocumentTrackingManager:
                     **context_data
                 })
 
+                webhook_event = WEBHOOK_EVENTS_BY_ACTION.get(action)
+                if webhook_event:
+                    webhook_events.append((webhook_event, party_entry))
+
                 # Special handling for signature completion
                 if action == "ALL_FIELDS_SIGNED":
                     # Activate next party
@@ -233,6 +251,7 @@ class DocumentTrackingManager:
                             **context_data
                         }
                         logger.info(f"[log_action] Next party ID {next_party['id']} marked as SENT")
+                        webhook_events.append(("document.sent", next_party))
 
                     # Check if all  signed
                     all_signed = all(
@@ -249,12 +268,24 @@ class DocumentTrackingManager:
                             **context_data
                         }
                         logger.info(f"[log_action] All parties signed. Tracking marked COMPLETED.")
+                        webhook_events.append(("document.completed", None))
                 else:
                     logger.info(f"[log_action] Updated party {party_id} status: {field}")
 
         # Save updated tracking metadata
         save_tracking_metadata(email, document_id, tracking_id, tracking)
 
+        for event, party in webhook_events:
+            await webhook_service.emit(email, event, {
+                "document_id": document_id,
+                "tracking_id": tracking_id,
+                "status": tracking["tracking_status"]["status"],
+                "party": {"id": str(party.get("id")), "name": party.get("name"), "email": party.get("email")}
+                if party else None,
+                "reason": reason if event in ("document.cancelled", "document.declined") else None,
+                "occurred_at": current_time,
+            })
+
         # Update document summary
         document_summary["trackings"][tracking_id] = {
             "status": tracking["tracking_status"]["status"],
@@ -0,0 +1,350 @@
+import asyncio
+import csv
+import io
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from pymongo import ReturnDocument
+
+from app.schemas.tracking_schemas import BulkRecipient, BulkSendRequest, DocumentRequest
+from app.services.audit_service import document_tracking_manager
+from app.services.metadata_service import MetadataService
+from auth_app.app.aspects.subscription_guard import enforce_bulk_send_policy
+from auth_app.app.database.connection import db, increment_send_counter_for_user
+from repositories.s3_repo import upload_meta_batch_s3
+from utils.logger import logger
+from utils.rate_limiter import RateLimiter
+
+bulk_send_jobs = db["bulk_send_jobs"]
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+BULK_SEND_MAX_RECIPIENTS = 10000
+BULK_SEND_BATCH_SIZE = 100
+BULK_SEND_EMAIL_CONCURRENCY = 8
+BULK_SEND_EMAILS_PER_SECOND = 10
+BULK_SEND_MAX_FAILURES_KEPT = 500
+LEASE_SECONDS = 300
+
+# Strong references so running jobs are not garbage collected mid-flight
+_background_tasks = set()
+
+
+def _spawn(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+class BulkSendService:
+    """
+    Sends one document to many recipient sets as a background job. Trackings are
+    created a batch at a time (one document summary write per batch), signing links
+    go out through a rate-limited pool, and the job in Mongo records a checkpoint
+    after every batch so an interrupted job resumes where it stopped. A job with a
+    future scheduled_datetime stays queued until then and is started by resume_pending.
+    """
+
+    @staticmethod
+    async def ensure_indexes():
+        await bulk_send_jobs.create_index("job_id", unique=True)
+        await bulk_send_jobs.create_index([("state", 1), ("locked_until", 1)])
+
+    @staticmethod
+    def tracking_id(job_id: str, index: int) -> str:
+        # Deterministic, so re-running a batch after a crash rewrites the same trackings
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"bulk-send:{job_id}:{index}"))
+
+    @staticmethod
+    def parse_recipients_csv(content: bytes, party_ids: List[str]) -> List[Dict[str, dict]]:
+        """
+        One recipient set per row, with `<party_id>_name` and `<party_id>_email`
+        columns for every party. Single-party documents may use plain `name`/`email`.
+        """
+        try:
+            reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=422, detail="CSV must be UTF-8 encoded")
+
+        recipients = []
+        for row in reader:
+            row = {(k or "").strip(): (v or "").strip() for k, v in row.items()}
+            if not any(row.values()):
+                continue
+            recipient_set = {}
+            for party_id in party_ids:
+                name = row.get(f"{party_id}_name")
+                email = row.get(f"{party_id}_email")
+                if len(party_ids) == 1 and email is None:
+                    name, email = row.get("name"), row.get("email")
+                recipient_set[party_id] = {"name": name or "", "email": email or ""}
+            recipients.append(recipient_set)
+        return recipients
+
+    @staticmethod
+    def resolve_template(email: str, user_email: str, request: BulkSendRequest) -> dict:
+        parties = [p.model_dump() for p in request.parties] if request.parties else None
+        fields = [f.model_dump() for f in request.fields] if request.fields else None
+
+        if request.template_name:
+            from app.services.template_service import TemplateManager
+            template = TemplateManager(email, user_email).get_template(request.template_name, request.is_global)
+            if not template:
+                raise HTTPException(status_code=404, detail="Template not found")
+            parties = parties or [
+                {"id": p["id"], "color": p["color"], "priority": p.get("priority")}
+                for p in template.get("parties", [])
+            ]
+            fields = fields or template.get("fields", [])
+
+        if not parties or not fields:
+            raise HTTPException(status_code=422, detail="Bulk send needs parties and fields, inline or from a template")
+
+        template = request.model_dump(exclude={"template_name", "is_global", "recipients", "scheduled_datetime"})
+        template.update(parties=parties, fields=fields)
+        return template
+
+    @staticmethod
+    def validate_recipients(recipients: List[dict], party_ids: List[str]) -> List[Dict[str, dict]]:
+        if not recipients:
+            raise HTTPException(status_code=422, detail="No recipients given")
+        if len(recipients) > BULK_SEND_MAX_RECIPIENTS:
+            raise HTTPException(
+                status_code=422,
+                detail=f"At most {BULK_SEND_MAX_RECIPIENTS} recipient sets per bulk send"
+            )
+
+        errors, validated = [], []
+        for index, recipient_set in enumerate(recipients):
+            missing = [party_id for party_id in party_ids if party_id not in recipient_set]
+            if missing:
+                errors.append({"index": index, "error": f"Missing recipients for parties {missing}"})
+                continue
+            try:
+                validated.append({
+                    party_id: BulkRecipient.model_validate(recipient_set[party_id]).model_dump()
+                    for party_id in party_ids
+                })
+            except ValidationError as e:
+                errors.append({"index": index, "error": e.errors(include_url=False)[0]["msg"]})
+
+        if errors:
+            raise HTTPException(status_code=422, detail={"message": "Invalid recipients", "errors": errors[:50]})
+        return validated
+
+    @staticmethod
+    async def create_job(email: str, user_email: str, request: BulkSendRequest, recipients: List[dict]) -> dict:
+        template = BulkSendService.resolve_template(email, user_email, request)
+        party_ids = [p["id"] for p in template["parties"]]
+        recipients = BulkSendService.validate_recipients(recipients, party_ids)
+        quota_year, quota_month = await enforce_bulk_send_policy(user_email, len(recipients))
+
+        now = datetime.now(timezone.utc)
+        start_at = request.scheduled_datetime
+        if start_at and start_at.tzinfo is None:
+            start_at = start_at.replace(tzinfo=timezone.utc)
+        if not start_at or start_at <= now:
+            start_at = None
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "email": email,
+            "user_email": user_email,
+            "document_id": request.document_id,
+            "template": template,
+            "recipients": recipients,
+            "total": len(recipients),
+            "cursor": 0,
+            "sent": 0,
+            "failed": 0,
+            "failures": [],
+            "batch_sent": [],
+            "state": QUEUED,
+            "error": None,
+            "quota_period": {"year": quota_year, "month": quota_month},
+            "scheduled_datetime": start_at,
+            # resume_pending only claims the job once this has passed
+            "locked_until": start_at or now,
+            "created_at": now,
+            "updated_at": now,
+        }
+        try:
+            await bulk_send_jobs.insert_one(job)
+        except Exception:
+            await increment_send_counter_for_user(user_email, quota_year, quota_month, -len(recipients))
+            raise
+
+        if start_at:
+            logger.info(f"[bulk-send] Job {job['job_id']} scheduled for {start_at.isoformat()}: "
+                        f"{len(recipients)} recipient sets for {request.document_id}")
+        else:
+            logger.info(f"[bulk-send] Job {job['job_id']} queued: {len(recipients)} recipient sets for {request.document_id}")
+            _spawn(BulkSendService.run(job["job_id"]))
+        return BulkSendService._progress(job)
+
+    @staticmethod
+    def _progress(job: dict) -> dict:
+        return {
+            "job_id": job["job_id"],
+            "document_id": job["document_id"],
+            "state": job["state"],
+            "total": job["total"],
+            "processed": job["cursor"],
+            "sent": job["sent"],
+            "failed": job["failed"],
+            "failures": job.get("failures", []),
+            "error": job.get("error"),
+            "scheduled_datetime": job.get("scheduled_datetime"),
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+        }
+
+    @staticmethod
+    async def get_progress(email: str, job_id: str) -> dict:
+        job = await bulk_send_jobs.find_one({"job_id": job_id, "email": email}, {"recipients": 0, "template": 0})
+        if not job:
+            raise HTTPException(status_code=404, detail="Bulk send job not found")
+        return BulkSendService._progress(job)
+
+    @staticmethod
+    async def resume(email: str, job_id: str) -> dict:
+        """Restart a failed job from its last checkpoint."""
+        now = datetime.now(timezone.utc)
+        job = await bulk_send_jobs.find_one_and_update(
+            {"job_id": job_id, "email": email, "state": FAILED},
+            {"$set": {"state": QUEUED, "error": None, "locked_until": now, "updated_at": now}},
+            projection={"recipients": 0, "template": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not job:
+            raise HTTPException(status_code=409, detail="Only failed bulk send jobs can be resumed")
+        _spawn(BulkSendService.run(job_id))
+        return BulkSendService._progress(job)
+
+    @staticmethod
+    async def resume_pending():
+        """Pick up jobs interrupted by a restart (their lease has run out)."""
+        now = datetime.now(timezone.utc)
+        cursor = bulk_send_jobs.find(
+            {"state": {"$in": [QUEUED, RUNNING]}, "locked_until": {"$lte": now}},
+            {"job_id": 1},
+        )
+        async for job in cursor:
+            await BulkSendService.run(job["job_id"])
+
+    @staticmethod
+    async def _claim(job_id: str) -> dict | None:
+        now = datetime.now(timezone.utc)
+        return await bulk_send_jobs.find_one_and_update(
+            {"job_id": job_id, "state": {"$in": [QUEUED, RUNNING]}, "locked_until": {"$lte": now}},
+            {"$set": {"state": RUNNING, "locked_until": now + timedelta(seconds=LEASE_SECONDS), "updated_at": now}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @staticmethod
+    async def run(job_id: str):
+        job = await BulkSendService._claim(job_id)
+        if not job:
+            logger.debug(f"[bulk-send] Job {job_id} not runnable right now")
+            return
+
+        limiter = RateLimiter(BULK_SEND_EMAILS_PER_SECOND)
+        try:
+            while job["cursor"] < job["total"]:
+                await BulkSendService._run_batch(job, limiter)
+        except Exception as e:
+            now = datetime.now(timezone.utc)
+            await bulk_send_jobs.update_one(
+                {"job_id": job_id},
+                {"$set": {"state": FAILED, "error": str(e), "locked_until": now, "updated_at": now}},
+            )
+            logger.error(f"[bulk-send] Job {job_id} failed at {job['cursor']}/{job['total']}: {e}", exc_info=True)
+            return
+
+        now = datetime.now(timezone.utc)
+        await bulk_send_jobs.update_one(
+            {"job_id": job_id},
+            {"$set": {"state": DONE, "locked_until": now, "updated_at": now}},
+        )
+        logger.info(f"[bulk-send] Job {job_id} done: {job['sent']} sent, {job['failed']} failed")
+
+    @staticmethod
+    def _document_request(template: dict, recipient_set: Dict[str, dict]) -> DocumentRequest:
+        parties = [
+            {**party, **recipient_set[party["id"]]}
+            for party in template["parties"]
+        ]
+        return DocumentRequest(**{**template, "parties": parties})
+
+    @staticmethod
+    async def _run_batch(job: dict, limiter: RateLimiter):
+        job_id, email = job["job_id"], job["email"]
+        start = job["cursor"]
+        end = min(start + BULK_SEND_BATCH_SIZE, job["total"])
+
+        # Rows mailed before an interruption keep their trackings; rewriting them would reset their state
+        already_sent = set(job.get("batch_sent", []))
+        batch = []
+        for index in range(start, end):
+            if index in already_sent:
+                continue
+            doc_data = BulkSendService._document_request(job["template"], job["recipients"][index])
+            tracking_id = BulkSendService.tracking_id(job_id, index)
+            parties_status = document_tracking_manager.initialize_parties_status(doc_data)
+            metadata = MetadataService.generate_document_metadata(email, doc_data, parties_status, tracking_id)
+            batch.append((index, doc_data, tracking_id, metadata))
+
+        if batch:
+            await asyncio.to_thread(upload_meta_batch_s3, email, job["document_id"], [m for *_, m in batch])
+
+        semaphore = asyncio.Semaphore(BULK_SEND_EMAIL_CONCURRENCY)
+
+        async def send(index: int, doc_data: DocumentRequest, tracking_id: str):
+            from app.services.signature_service import SignatureHandler
+            async with semaphore:
+                await limiter.wait()
+                try:
+                    await SignatureHandler.initiate_singing_schedule(doc_data, tracking_id, email, job["user_email"])
+                except Exception as e:
+                    detail = e.detail if isinstance(e, HTTPException) else str(e)
+                    return {"index": index, "email": doc_data.parties[0].email, "error": detail}
+                # Recorded per recipient set so re-running the batch never mails it twice
+                await bulk_send_jobs.update_one({"job_id": job_id}, {"$addToSet": {"batch_sent": index}})
+                return None
+
+        results = await asyncio.gather(*[
+            send(index, doc_data, tracking_id) for index, doc_data, tracking_id, _ in batch
+        ])
+        failures = [r for r in results if r]
+        sent = len(results) - len(failures) + len(already_sent)
+
+        now = datetime.now(timezone.utc)
+        await bulk_send_jobs.update_one(
+            {"job_id": job_id},
+            {
+                "$set": {
+                    "cursor": end,
+                    "batch_sent": [],
+                    "locked_until": now + timedelta(seconds=LEASE_SECONDS),
+                    "updated_at": now,
+                },
+                "$inc": {"sent": sent, "failed": len(failures)},
+                "$push": {"failures": {"$each": failures, "$slice": BULK_SEND_MAX_FAILURES_KEPT}},
+            },
+        )
+        job.update(cursor=end, batch_sent=[], sent=job["sent"] + sent, failed=job["failed"] + len(failures))
+        if failures:
+            # The whole job was reserved against the quota up front; failed rows give theirs back
+            period = job["quota_period"]
+            await increment_send_counter_for_user(job["user_email"], period["year"], period["month"], -len(failures))
+        logger.info(f"[bulk-send] Job {job_id}: {end}/{job['total']} processed ({sent} sent, {len(failures)} failed)")
+
+
+bulk_send_service = BulkSendService()
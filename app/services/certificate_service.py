@@ -1,18 +1,46 @@
 import hashlib
-from jinja2 import Environment, FileSystemLoader
+from functools import lru_cache
+
 from weasyprint import HTML
+from weasyprint.text.fonts import FontConfiguration
+
+from app.services.certificate_renderer import fast_certificate_renderer
+from app.services.template_env import template_env
+from config import config
+from utils.logger import logger
+
+# Shared process-wide environment: templates are compiled once and their bytecode cached on disk
+env = template_env
+
+# Standard layouts that have an equivalent template for the fast PyMuPDF renderer.
+FAST_CERTIFICATE_TEMPLATES = {
+    "template.html": "certificate_fast.html",
+}
+
+
+@lru_cache(maxsize=1)
+def get_font_config() -> FontConfiguration:
+    # Shared so WeasyPrint does not rebuild its fontconfig state for every document
+    return FontConfiguration()
 
-env = Environment(loader=FileSystemLoader("./app/templates"))
 
 class CertificateService:
 
 
     @staticmethod
     def render_certificate_pdf(data: dict, template_name: str = "template.html") -> bytes:
+        fast_template = FAST_CERTIFICATE_TEMPLATES.get(template_name)
+        if fast_template and config.CERTIFICATE_RENDERER == "fast":
+            try:
+                html_out = env.get_template(fast_template).render(**data)
+                return fast_certificate_renderer.render(html_out)
+            except Exception as e:
+                logger.warning(f"[Certificate] Fast renderer failed, falling back to WeasyPrint: {e}")
+
         template = env.get_template(template_name)
 
         html_out = template.render(**data)
-        pdf_bytes = HTML(string=html_out).write_pdf()
+        pdf_bytes = HTML(string=html_out).write_pdf(font_config=get_font_config())
         return pdf_bytes
 
 
@@ -21,7 +49,7 @@ class CertificateService:
         template = env.get_template(template_name)
 
         html_out = template.render(**data)
-        pdf_bytes = HTML(string=html_out).write_pdf()
+        pdf_bytes = HTML(string=html_out).write_pdf(font_config=get_font_config())
         return pdf_bytes
 
 
@@ -0,0 +1,380 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import fitz  # PyMuPDF
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.schemas.form_schema import EmailResponse
+from app.services.certificate_service import certificate_service
+from app.services.email_service import EmailService
+from app.services.metadata_service import MetadataService
+from app.services.notification_service import NotificationService
+from app.services.pdf_service import PDFSigner
+from auth_app.app.database.connection import db
+from repositories.s3_repo import (
+    get_signed, load_tracking_metadata, upload_file, get_document_name, get_file_name
+)
+from utils.drive_client import get_base64_logo
+from utils.fitz_executor import run_fitz
+from utils.logger import logger
+from utils.security import format_user_datetime
+
+completion_jobs = db["completion_jobs"]
+
+# Job states, in the order a job moves through them
+QUEUED = "queued"
+RENDERING = "rendering"
+SIGNING = "signing"
+MAILING = "mailing"
+DONE = "done"
+FAILED = "failed"
+
+STAGES = (RENDERING, SIGNING, MAILING)
+NEXT_STATE = {QUEUED: RENDERING, RENDERING: SIGNING, SIGNING: MAILING, MAILING: DONE}
+
+MAX_STAGE_RETRIES = 3
+RETRY_BASE_DELAY = 30  # seconds, doubled on every attempt of the same stage
+LEASE_SECONDS = 300
+
+# Strong references so running jobs are not garbage collected mid-flight
+_background_tasks = set()
+
+
+def _spawn(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+class CompletionPipeline:
+    """
+    Durable post-signing work for fully signed documents: certificate rendering,
+    certificate signing/upload and the final emails. One job per tracking, stored in
+    Mongo so it survives restarts; every stage is retried independently.
+    """
+
+    @staticmethod
+    def idempotency_key(email: str, document_id: str, tracking_id: str) -> str:
+        return f"{email}:{document_id}:{tracking_id}"
+
+    @staticmethod
+    async def ensure_indexes():
+        await completion_jobs.create_index("idempotency_key", unique=True)
+        await completion_jobs.create_index([("state", 1), ("next_attempt_at", 1)])
+
+    @staticmethod
+    async def enqueue(email: str, user_email: str, document_id: str, tracking_id: str,
+                      file_name: str, completed_at: str) -> dict:
+        """
+        Create the completion job for a tracking (no-op if it already exists) and
+        start it in the background.
+        """
+        key = CompletionPipeline.idempotency_key(email, document_id, tracking_id)
+        now = datetime.now(timezone.utc)
+        try:
+            job = await CompletionPipeline._upsert_job(key, {
+                "idempotency_key": key,
+                "email": email,
+                "user_email": user_email,
+                "document_id": document_id,
+                "tracking_id": tracking_id,
+                "file_name": file_name,
+                "completed_at": completed_at,
+                "state": QUEUED,
+                "attempts": {stage: 0 for stage in STAGES},
+                "mailed_to": [],
+                "error": None,
+                "next_attempt_at": now,
+                "locked_until": now,
+                "created_at": now,
+                "updated_at": now,
+            })
+        except DuplicateKeyError:
+            # Lost a race with a concurrent request for the same tracking
+            job = await completion_jobs.find_one({"idempotency_key": key})
+        logger.info(f"[completion] Job {key} is {job['state']}")
+
+        if job["state"] not in (DONE, FAILED):
+            _spawn(CompletionPipeline.run(key))
+        return job
+
+    @staticmethod
+    async def _upsert_job(key: str, job: dict) -> dict:
+        return await completion_jobs.find_one_and_update(
+            {"idempotency_key": key},
+            {"$setOnInsert": job},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @staticmethod
+    async def get_status(email: str, document_id: str, tracking_id: str) -> dict | None:
+        key = CompletionPipeline.idempotency_key(email, document_id, tracking_id)
+        return await completion_jobs.find_one(
+            {"idempotency_key": key},
+            {"_id": 0, "certificate_pdf": 0, "locked_until": 0},
+        )
+
+    @staticmethod
+    async def resume_pending():
+        """
+        Pick up jobs that are due: interrupted by a restart or waiting for a retry.
+        """
+        now = datetime.now(timezone.utc)
+        cursor = completion_jobs.find(
+            {
+                "state": {"$nin": [DONE, FAILED]},
+                "next_attempt_at": {"$lte": now},
+                "locked_until": {"$lte": now},
+            },
+            {"idempotency_key": 1},
+        )
+        async for job in cursor:
+            await CompletionPipeline.run(job["idempotency_key"])
+
+    @staticmethod
+    async def _claim(key: str) -> dict | None:
+        now = datetime.now(timezone.utc)
+        return await completion_jobs.find_one_and_update(
+            {
+                "idempotency_key": key,
+                "state": {"$nin": [DONE, FAILED]},
+                "next_attempt_at": {"$lte": now},
+                "locked_until": {"$lte": now},
+            },
+            {"$set": {"locked_until": now + timedelta(seconds=LEASE_SECONDS), "updated_at": now}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @staticmethod
+    async def _transition(key: str, state: str, **fields):
+        now = datetime.now(timezone.utc)
+        update = {"$set": {"state": state, "updated_at": now, "error": None, **fields}}
+        if state in (DONE, FAILED):
+            update["$set"]["locked_until"] = now
+        await completion_jobs.update_one({"idempotency_key": key}, update)
+
+    @staticmethod
+    async def run(key: str):
+        job = await CompletionPipeline._claim(key)
+        if not job:
+            logger.debug(f"[completion] Job {key} not runnable right now")
+            return
+
+        state = job["state"]
+        if state == QUEUED:
+            state = RENDERING
+            await CompletionPipeline._transition(key, state)
+
+        while state != DONE:
+            try:
+                fields = await CompletionPipeline._run_stage(state, job)
+            except Exception as e:
+                await CompletionPipeline._stage_failed(key, job, state, e)
+                return
+
+            state = NEXT_STATE[state]
+            job.update(fields)
+            await CompletionPipeline._transition(key, state, **fields)
+            logger.info(f"[completion] Job {key} -> {state}")
+
+    @staticmethod
+    async def _stage_failed(key: str, job: dict, stage: str, error: Exception):
+        attempts = job.get("attempts", {}).get(stage, 0) + 1
+        now = datetime.now(timezone.utc)
+
+        if attempts >= MAX_STAGE_RETRIES:
+            await completion_jobs.update_one(
+                {"idempotency_key": key},
+                {"$set": {
+                    "state": FAILED,
+                    "failed_stage": stage,
+                    f"attempts.{stage}": attempts,
+                    "error": str(error),
+                    "locked_until": now,
+                    "updated_at": now,
+                }},
+            )
+            logger.error(f"[completion] Job {key} failed permanently in {stage}: {error}", exc_info=True)
+            return
+
+        delay = RETRY_BASE_DELAY * (2 ** (attempts - 1))
+        await completion_jobs.update_one(
+            {"idempotency_key": key},
+            {"$set": {
+                f"attempts.{stage}": attempts,
+                "error": str(error),
+                "next_attempt_at": now + timedelta(seconds=delay),
+                "locked_until": now,
+                "updated_at": now,
+            }},
+        )
+        logger.warning(
+            f"[completion] Job {key} failed in {stage} ({error}), "
+            f"retry {attempts}/{MAX_STAGE_RETRIES - 1} in {delay}s"
+        )
+        _spawn(CompletionPipeline._retry_later(key, delay))
+
+    @staticmethod
+    async def _retry_later(key: str, delay: int):
+        await asyncio.sleep(delay)
+        await CompletionPipeline.run(key)
+
+    @staticmethod
+    async def _run_stage(stage: str, job: dict) -> dict:
+        if stage == RENDERING:
+            return {"certificate_pdf": await CompletionPipeline._render_certificate(job)}
+        if stage == SIGNING:
+            await CompletionPipeline._sign_and_upload_certificate(job)
+            return {"certificate_pdf": None}
+        if stage == MAILING:
+            await CompletionPipeline._mail_parties(job)
+            return {}
+        raise ValueError(f"Unknown completion stage '{stage}'")
+
+    @staticmethod
+    async def _render_certificate(job: dict) -> bytes:
+        from app.services.signature_service import SignatureHandler, format_holder_address
+
+        email, user_email = job["email"], job["user_email"]
+        document_id, tracking_id = job["document_id"], job["tracking_id"]
+
+        tracking = load_tracking_metadata(email, document_id, tracking_id)
+        signdata = MetadataService.load_metadata_from_s3(email, tracking_id, document_id)
+        pdf_bytes = await get_signed(email, tracking_id, document_id)
+        document_name = get_document_name(email, document_id)
+
+        # Last sent timestamp
+        first_party_sent = tracking["parties"][0].get("status", {}).get("sent", [])
+        sent_at = first_party_sent[-1]["dateTime"] if first_party_sent else "-"
+
+        page_count = await run_fitz(CompletionPipeline._page_count, pdf_bytes)
+        recipients = []
+
+        # Get all parties' signatures
+        signatures = SignatureHandler.get_parties_signatures_with_type(signdata)
+
+        for p in tracking.get("parties", []):
+            party_id = str(p.get("id"))
+            sig_data = signatures.get(party_id, {"b64_signature": None, "style": "-"})
+            signature_style = sig_data["style"]
+            b64_signature = sig_data["b64_signature"]
+
+            signature_type = {
+                "typed": "Pre-Selected Signature",
+                "uploaded": "Uploaded Signature",
+                "drawn": "Drawn Signature"
+            }.get(signature_style, "No Signature Required")
+
+            # Last timestamps from lists
+            sent_time = p.get("status", {}).get("sent", [])
+            opened_time = p.get("status", {}).get("opened", [])
+            signed_time = p.get("status", {}).get("signed", [])
+
+            recipients.append({
+                "name": p["name"],
+                "email": p["email"],
+                "ip_address": signed_time[-1]["ip"] if signed_time else "",
+                "device": f"{signed_time[-1]['browser']} via {signed_time[-1]['os']}" if signed_time else "",
+                "signature_type": signature_type,
+                "sent_time": await format_user_datetime(user_email, sent_time[-1]["dateTime"] if sent_time else "-"),
+                "opened_time": await format_user_datetime(user_email, opened_time[-1]["dateTime"] if opened_time else "-"),
+                "signed_time": await format_user_datetime(user_email, signed_time[-1]["dateTime"] if signed_time else "-"),
+                "authentication": "Email, OTP",
+                "consent": "Accepted",
+                "sign_path": b64_signature or "N/A"
+            })
+
+        holder = tracking.get("holder", {})
+        certificate_data = {
+            "title": "Signed PDF",
+            "heading": "Certificate of Completion",
+            "logo_path": get_base64_logo("./images/doculan-logo.png"),
+            "tracking_id": tracking_id,
+            "document_name": document_name,
+            "type": "Digital Signature",
+            "status": "Completed",
+            "page_count": page_count,
+            "signer_count": len(tracking["parties"]),
+            "sent_at": await format_user_datetime(user_email, sent_at),
+            "completed_at": await format_user_datetime(user_email, job["completed_at"]),
+            "signing_order": "Enabled",
+            "hash": certificate_service.compute_sha256(pdf_bytes),
+            "signer": user_email,
+            "recipients": recipients,
+            "generated_at": await format_user_datetime(user_email, datetime.now().strftime("%Y-%m-%dT%H:%M:%S")),
+            "timestamp": await format_user_datetime(user_email, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            "holder": {
+                "name": holder.get("name"),
+                "email": holder.get("email"),
+                "address": format_holder_address(holder.get("address")) if holder.get("address") else "-"
+            }
+        }
+
+        # WeasyPrint/PyMuPDF layout is CPU bound; keep it off the event loop, on the PyMuPDF thread
+        # because the fast renderer lays out with fitz
+        return await run_fitz(certificate_service.render_certificate_pdf, certificate_data)
+
+    @staticmethod
+    def _page_count(pdf_bytes: bytes) -> int:
+        with fitz.open("pdf", pdf_bytes) as pdf_doc:
+            return pdf_doc.page_count
+
+    @staticmethod
+    async def _sign_and_upload_certificate(job: dict):
+        certificate_pdf_bytes = job.get("certificate_pdf")
+        if not certificate_pdf_bytes:
+            # Rendered artifact lost (e.g. manual requeue); render again
+            certificate_pdf_bytes = await CompletionPipeline._render_certificate(job)
+
+        certificate_bytes = await PDFSigner().sign_pdf_with_user_cert(
+            job["email"], bytes(certificate_pdf_bytes), job["tracking_id"]
+        )
+        await upload_file(job["email"], certificate_bytes, job["document_id"], job["tracking_id"])
+        logger.info(f"[completion] Certificate uploaded for tracking_id={job['tracking_id']}")
+
+    @staticmethod
+    async def _mail_parties(job: dict):
+        email, document_id, tracking_id = job["email"], job["document_id"], job["tracking_id"]
+
+        tracking = load_tracking_metadata(email, document_id, tracking_id)
+        email_response = [EmailResponse(**e) if isinstance(e, dict) else e
+                          for e in tracking.get("email_response", [])]
+        pdf_bytes = await get_signed(email, tracking_id, document_id)
+        document_name = await get_file_name(email, document_id)
+
+        holder = tracking.get("holder", {})
+        mailed_to = set(job.get("mailed_to", []))
+        pending = list(dict.fromkeys(
+            p["email"] for p in tracking.get("parties", []) if p.get("email") and p["email"] not in mailed_to
+        ))
+        if pending:
+            # Every party gets the same email: queue it once so the body and the signed PDF are
+            # built and encoded once and sent in one SMTP transaction with a RCPT per party
+            await EmailService().send_signed_pdf_email(
+                document_name, holder.get("name"), holder.get("email"), pending, pdf_bytes, email_response,
+                owner=email,
+                context={"document_id": document_id, "tracking_id": tracking_id},
+                dedupe_key=f"completion:{job['idempotency_key']}",
+            )
+            # Recorded once queued so a retry never queues the same parties twice
+            await completion_jobs.update_one(
+                {"idempotency_key": job["idempotency_key"]},
+                {"$addToSet": {"mailed_to": {"$each": pending}}},
+            )
+            logger.info(f"[completion] Final signed PDF queued for: {', '.join(pending)}")
+
+        NotificationService().store_notification(
+            email=email,
+            user_email=job["user_email"],
+            document_id=document_id,
+            tracking_id=tracking_id,
+            document_name=job.get("file_name"),
+            parties_status=tracking["parties"],
+            timestamp=job["completed_at"]
+        )
+
+
+completion_pipeline = CompletionPipeline()
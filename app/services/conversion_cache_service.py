@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from app.services.pdf_converter import AttachmentConverter
+from app.services.security_service import AESCipher
+from config import config
+from database.db_config import s3_client
+from utils.logger import logger
+
+CONVERTER_WORKERS = 2
+CONVERSION_CACHE_PREFIX = "cache/converted"
+# Bump when converter output changes so stale derivatives are not reused.
+CONVERSION_VERSION = "v1"
+
+_converter_pool = ThreadPoolExecutor(max_workers=CONVERTER_WORKERS, thread_name_prefix="pdf-convert")
+
+
+class ConversionCacheService:
+    """
+    PDF derivatives of non-PDF attachments (docx, images, txt). Derivatives are stored
+    encrypted under the owner's folder, keyed by the SHA-256 of the decrypted source,
+    so an attachment is converted once no matter how many packages or merges use it.
+    Conversions run on a small dedicated pool to keep pdfkit/PIL work off the event
+    loop and to stop a burst of downloads from converting everything at once.
+    """
+
+    @staticmethod
+    def needs_conversion(filename: str) -> bool:
+        return not filename.lower().endswith(".pdf")
+
+    @staticmethod
+    def derivative_key(source_key: str, file_bytes: bytes) -> str:
+        owner = source_key.split("/", 1)[0]
+        digest = hashlib.sha256(file_bytes).hexdigest()
+        return f"{owner}/{CONVERSION_CACHE_PREFIX}/{CONVERSION_VERSION}/{digest}.pdf"
+
+    @staticmethod
+    def _read(key: str, cipher: AESCipher) -> Optional[bytes]:
+        try:
+            response = s3_client.get_object(Bucket=config.S3_BUCKET, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("NoSuchKey", "404"):
+                logger.warning(f"[convert] Cache lookup failed for {key}: {e}")
+            return None
+        return cipher.decrypt(response["Body"].read())
+
+    @staticmethod
+    def _write(key: str, cipher: AESCipher, pdf_bytes: bytes):
+        try:
+            s3_client.put_object(
+                Bucket=config.S3_BUCKET,
+                Key=key,
+                Body=cipher.encrypt(pdf_bytes),
+                ContentType="application/pdf",
+                ServerSideEncryption="aws:kms",
+                SSEKMSKeyId=config.KMS_KEY_ID
+            )
+        except Exception as e:
+            logger.warning(f"[convert] Failed to cache derivative {key}: {e}")
+
+    @staticmethod
+    async def convert(source_key: str, file_bytes: bytes, cipher: AESCipher) -> bytes:
+        """
+        Return the PDF form of a decrypted attachment, converting it only on a cache miss.
+        Raises ValueError for file types AttachmentConverter does not support.
+        """
+        filename = source_key.split("/")[-1]
+        if not ConversionCacheService.needs_conversion(filename):
+            return file_bytes
+
+        key = ConversionCacheService.derivative_key(source_key, file_bytes)
+        cached = await asyncio.to_thread(ConversionCacheService._read, key, cipher)
+        if cached is not None:
+            logger.info(f"[convert] Cache hit for {filename}")
+            return cached
+
+        loop = asyncio.get_running_loop()
+        pdf_bytes = await loop.run_in_executor(
+            _converter_pool, AttachmentConverter.convert_to_pdf_if_needed, file_bytes, filename
+        )
+        await asyncio.to_thread(ConversionCacheService._write, key, cipher, pdf_bytes)
+        logger.info(f"[convert] Converted {filename} and cached it as {key}")
+        return pdf_bytes
+
+
+conversion_cache_service = ConversionCacheService()
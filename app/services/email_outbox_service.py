@@ -0,0 +1,320 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from auth_app.app.database.connection import db
+from repositories.s3_repo import s3_delete_object, s3_download_bytes, s3_upload_bytes
+from utils.logger import logger
+from utils.rate_limiter import RateLimiter
+
+email_outbox = db["email_outbox"]
+
+# Message states
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+DEAD = "dead"
+
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_RETRY_BASE_DELAY = 30  # seconds, doubled on every failed attempt
+OUTBOX_RETRY_MAX_DELAY = 3600
+OUTBOX_WORKERS = 8
+OUTBOX_BATCH_SIZE = 200
+LEASE_SECONDS = 120
+OUTBOX_ATTACHMENT_PATH = "{}/outbox/{}"
+
+# Messages per second per receiving provider. Domains not listed are limited
+# individually at the default rate.
+PROVIDER_DOMAINS = {
+    "gmail.com": "google", "googlemail.com": "google",
+    "outlook.com": "microsoft", "hotmail.com": "microsoft", "live.com": "microsoft",
+    "yahoo.com": "yahoo",
+}
+PROVIDER_RATES = {"google": 5, "microsoft": 3, "yahoo": 2}
+DEFAULT_PROVIDER_RATE = 10
+
+_limiters: Dict[str, RateLimiter] = {}
+_workers: Optional[asyncio.Semaphore] = None
+
+# Strong references so in-flight deliveries are not garbage collected
+_background_tasks = set()
+
+
+def _spawn(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+class EmailOutbox:
+    """
+    Durable queue for outgoing email. Callers enqueue the message (stored in Mongo,
+    with its attachment in S3) and return straight away; delivery happens in background
+    workers that respect per-provider rate limits and retry with exponential backoff.
+    Messages that keep failing end up dead-lettered and can be inspected and retried.
+    """
+
+    @staticmethod
+    async def ensure_indexes():
+        await email_outbox.create_index("message_id", unique=True)
+        await email_outbox.create_index(
+            "dedupe_key", unique=True, partialFilterExpression={"dedupe_key": {"$type": "string"}}
+        )
+        await email_outbox.create_index([("state", 1), ("next_attempt_at", 1)])
+        await email_outbox.create_index([("owner", 1), ("state", 1), ("created_at", -1)])
+
+    @staticmethod
+    def provider(recipient_email: str) -> str:
+        domain = recipient_email.rsplit("@", 1)[-1].lower()
+        return PROVIDER_DOMAINS.get(domain, domain)
+
+    @staticmethod
+    def recipients(payload: dict) -> List[str]:
+        return payload.get("recipient_emails") or [payload["recipient_email"]]
+
+    @staticmethod
+    def _limiter(provider: str) -> RateLimiter:
+        if provider not in _limiters:
+            _limiters[provider] = RateLimiter(PROVIDER_RATES.get(provider, DEFAULT_PROVIDER_RATE))
+        return _limiters[provider]
+
+    @staticmethod
+    def _semaphore() -> asyncio.Semaphore:
+        global _workers
+        if _workers is None:
+            _workers = asyncio.Semaphore(OUTBOX_WORKERS)
+        return _workers
+
+    @staticmethod
+    async def enqueue(owner: str, kind: str, payload: dict, attachment_bytes: Optional[bytes] = None,
+                      context: Optional[dict] = None, notification: Optional[dict] = None,
+                      dedupe_key: Optional[str] = None) -> str:
+        """
+        Store one message and start delivering it. `payload` holds the
+        EmailService.send_email keyword arguments other than the attachment, or the
+        send_email_to_many ones (`recipient_emails`) for one message to several recipients.
+        `notification`, when given, is passed to NotificationService.store_notification
+        with action "dispatched" once sent, or "failed" once dead-lettered.
+        Enqueuing the same dedupe_key twice is a no-op.
+        """
+        now = datetime.now(timezone.utc)
+        recipients = EmailOutbox.recipients(payload)
+        message_id = str(uuid.uuid4())
+        # Attachments (signed PDFs) can exceed Mongo's 16 MB document limit, so only the S3 key is stored
+        attachment_key = None
+        if attachment_bytes:
+            attachment_key = OUTBOX_ATTACHMENT_PATH.format(owner, message_id)
+            if not await asyncio.to_thread(s3_upload_bytes, attachment_bytes, attachment_key, "application/pdf"):
+                raise HTTPException(status_code=500, detail="Failed to store email attachment")
+        message = {
+            "message_id": message_id,
+            "owner": owner,
+            "kind": kind,
+            "recipient": ", ".join(recipients),
+            "provider": EmailOutbox.provider(recipients[0]),
+            "payload": payload,
+            "attachment_key": attachment_key,
+            "context": context or {},
+            "notification": notification,
+            "state": PENDING,
+            "attempts": 0,
+            "last_error": None,
+            "next_attempt_at": now,
+            "locked_until": now,
+            "created_at": now,
+            "updated_at": now,
+            "sent_at": None,
+        }
+        if dedupe_key:
+            message["dedupe_key"] = dedupe_key
+        try:
+            await email_outbox.insert_one(message)
+        except DuplicateKeyError:
+            if attachment_key:
+                await asyncio.to_thread(s3_delete_object, attachment_key)
+            existing = await email_outbox.find_one({"dedupe_key": dedupe_key}, {"message_id": 1})
+            logger.info(f"[outbox] {kind} for {message['recipient']} already queued as {existing['message_id']}")
+            return existing["message_id"]
+
+        logger.info(f"[outbox] Queued {kind} {message['message_id']} for {message['recipient']}")
+        _spawn(EmailOutbox.deliver(message["message_id"]))
+        return message["message_id"]
+
+    @staticmethod
+    async def _claim(query: dict) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await email_outbox.find_one_and_update(
+            {**query, "state": {"$in": [PENDING, SENDING]}, "next_attempt_at": {"$lte": now},
+             "locked_until": {"$lte": now}},
+            {"$set": {"state": SENDING, "locked_until": now + timedelta(seconds=LEASE_SECONDS), "updated_at": now}},
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @staticmethod
+    async def deliver(message_id: str):
+        message = await EmailOutbox._claim({"message_id": message_id})
+        if message:
+            await EmailOutbox._send(message)
+
+    @staticmethod
+    async def process_due():
+        """
+        Worker loop run by the scheduler: deliver retries that are due and messages
+        orphaned by a restart. A message is only claimed once a worker is free to send
+        it, so its lease does not run out while it waits behind the rest of the batch.
+        """
+        running, delivered = set(), 0
+        while delivered < OUTBOX_BATCH_SIZE:
+            if len(running) >= OUTBOX_WORKERS:
+                _, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            message = await EmailOutbox._claim({})
+            if not message:
+                break
+            running.add(asyncio.create_task(EmailOutbox._send(message)))
+            delivered += 1
+        if running:
+            await asyncio.gather(*running)
+        if delivered:
+            logger.info(f"[outbox] Worker pass delivered {delivered} due messages")
+
+    @staticmethod
+    async def _send(message: dict):
+        from app.services.email_service import EmailService
+
+        payload = message["payload"]
+        recipients = EmailOutbox.recipients(payload)
+        async with EmailOutbox._semaphore():
+            for provider in sorted({EmailOutbox.provider(recipient) for recipient in recipients}):
+                await EmailOutbox._limiter(provider).wait()
+            attachment_key = message.get("attachment_key")
+            try:
+                attachment_bytes = await asyncio.to_thread(s3_download_bytes, attachment_key) if attachment_key else None
+                if "recipient_emails" in payload:
+                    refused = await asyncio.to_thread(
+                        EmailService().send_email_to_many, **payload, attachment_bytes=attachment_bytes
+                    )
+                else:
+                    await asyncio.to_thread(EmailService().send_email, **payload, attachment_bytes=attachment_bytes)
+                    refused = {}
+            except Exception as e:
+                await EmailOutbox._failed(message, e)
+                return
+
+        if refused:
+            # The accepted recipients have their copy; only the refused ones are retried
+            retry = [recipient for recipient in recipients if recipient in refused]
+            await EmailOutbox._failed(message, RuntimeError(f"Refused recipients: {refused}"),
+                                      payload={**payload, "recipient_emails": retry})
+            return
+
+        now = datetime.now(timezone.utc)
+        await email_outbox.update_one(
+            {"message_id": message["message_id"]},
+            {"$set": {"state": SENT, "sent_at": now, "updated_at": now, "locked_until": now, "last_error": None,
+                      "attempts": message["attempts"] + 1},
+             "$unset": {"attachment_key": ""}},
+        )
+        if message.get("attachment_key"):
+            try:
+                await asyncio.to_thread(s3_delete_object, message["attachment_key"])
+            except Exception as e:
+                logger.warning(f"[outbox] Failed to delete attachment of {message['message_id']}: {e}")
+        logger.info(f"[outbox] Sent {message['kind']} {message['message_id']} to {message['recipient']}")
+        EmailOutbox._notify(message, "dispatched")
+
+    @staticmethod
+    async def _failed(message: dict, error: Exception, payload: Optional[dict] = None):
+        attempts = message["attempts"] + 1
+        now = datetime.now(timezone.utc)
+        # A narrowed payload replaces the stored one (partially delivered multi-recipient messages)
+        narrowed = {"payload": payload, "recipient": ", ".join(EmailOutbox.recipients(payload))} if payload else {}
+
+        if attempts >= OUTBOX_MAX_ATTEMPTS:
+            await email_outbox.update_one(
+                {"message_id": message["message_id"]},
+                {"$set": {"state": DEAD, "attempts": attempts, "last_error": str(error),
+                          "locked_until": now, "updated_at": now, **narrowed}},
+            )
+            logger.error(f"[outbox] {message['kind']} {message['message_id']} to {message['recipient']} "
+                         f"dead-lettered after {attempts} attempts: {error}")
+            EmailOutbox._notify(message, "failed", reason=str(error))
+            return
+
+        delay = min(OUTBOX_RETRY_BASE_DELAY * (2 ** (attempts - 1)), OUTBOX_RETRY_MAX_DELAY)
+        await email_outbox.update_one(
+            {"message_id": message["message_id"]},
+            {"$set": {"state": PENDING, "attempts": attempts, "last_error": str(error),
+                      "next_attempt_at": now + timedelta(seconds=delay), "locked_until": now, "updated_at": now,
+                      **narrowed}},
+        )
+        logger.warning(f"[outbox] {message['kind']} {message['message_id']} failed ({error}), "
+                       f"retry {attempts}/{OUTBOX_MAX_ATTEMPTS - 1} in {delay}s")
+
+    @staticmethod
+    def _notify(message: dict, action: str, **extra):
+        notification = message.get("notification")
+        if not notification:
+            return
+        from app.services.notification_service import notification_service
+        try:
+            notification_service.store_notification(
+                **notification, action=action, timestamp=datetime.utcnow().isoformat(), **extra
+            )
+        except Exception as e:
+            logger.warning(f"[outbox] Failed to store {action} notification for {message['message_id']}: {e}")
+
+    @staticmethod
+    def _status(message: dict) -> dict:
+        return {
+            "message_id": message["message_id"],
+            "kind": message["kind"],
+            "recipient": message["recipient"],
+            "state": message["state"],
+            "attempts": message["attempts"],
+            "last_error": message.get("last_error"),
+            "context": message.get("context", {}),
+            "next_attempt_at": message.get("next_attempt_at"),
+            "created_at": message["created_at"],
+            "sent_at": message.get("sent_at"),
+        }
+
+    @staticmethod
+    async def get_status(owner: str, message_id: str) -> dict:
+        message = await email_outbox.find_one({"message_id": message_id, "owner": owner},
+                                              {"payload": 0})
+        if not message:
+            raise HTTPException(status_code=404, detail="Message not found")
+        return EmailOutbox._status(message)
+
+    @staticmethod
+    async def list_messages(owner: str, state: Optional[str] = None, limit: int = 50) -> List[dict]:
+        query = {"owner": owner}
+        if state:
+            query["state"] = state
+        cursor = email_outbox.find(query, {"payload": 0}).sort("created_at", -1).limit(limit)
+        return [EmailOutbox._status(message) async for message in cursor]
+
+    @staticmethod
+    async def retry_dead(owner: str, message_id: str) -> dict:
+        now = datetime.now(timezone.utc)
+        message = await email_outbox.find_one_and_update(
+            {"message_id": message_id, "owner": owner, "state": DEAD},
+            {"$set": {"state": PENDING, "attempts": 0, "next_attempt_at": now, "locked_until": now,
+                      "updated_at": now}},
+            projection={"payload": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not message:
+            raise HTTPException(status_code=409, detail="Only dead-lettered messages can be retried")
+        _spawn(EmailOutbox.deliver(message_id))
+        return EmailOutbox._status(message)
+
+
+email_outbox_service = EmailOutbox()
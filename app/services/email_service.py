@@ -1,5 +1,4 @@
 import asyncio
-import os
 from datetime import datetime
 from email.utils import formataddr
 from typing import Union, Optional, List
@@ -7,10 +6,12 @@ import io
 from smtplib import SMTPException
 
 from fastapi import HTTPException
-from jinja2 import FileSystemLoader, Environment
 
 from app.schemas.form_schema import EmailResponse
+from app.services.email_outbox_service import email_outbox_service
 from app.services.notification_service import notification_service
+from app.services.smtp_pool import get_smtp_pool
+from app.services.template_env import render_branded, template_env
 from auth_app.app.database.connection import save_document_url, tracker_collection
 from config import config
 import base64
@@ -27,35 +28,34 @@ class EmailService:
         self.password = config.MAIL_PASSWORD
         self.sender = config.MAIL_FROM
         self.base_url = config.BASE_URL
-        BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # <- goes up from /services to /app
-        templates_dir = os.path.join(BASE_DIR, "templates")
-        self.env = Environment(loader=FileSystemLoader(templates_dir))
+        self.env = template_env
 
 
-    def send_email(
+    def build_message(
         self,
         reply_name: str,
         reply_email: str,
-        recipient_email: str,
+        recipient_emails: List[str],
         subject: str,
         body: str,
         attachment_bytes=None,
         attachment_filename=None,
         is_html: bool = False,
         inline_images: Optional[dict] = None,
-        cc_emails: Optional[List[str]] = None
+        cc_emails: Optional[List[str]] = None,
+        to_header: Optional[str] = None
     ):
         from email.mime.multipart import MIMEMultipart
         from email.mime.text import MIMEText
         from email.mime.image import MIMEImage
         from email.mime.application import MIMEApplication
-        import smtplib, io, base64
+        import io, base64
         from email.utils import formataddr
         message = MIMEMultipart("related")
         sender_email = self.sender
         message["From"] = formataddr((reply_name, sender_email))
         message.add_header("Reply-To", reply_email)
-        message["To"] = recipient_email
+        message["To"] = to_header or ", ".join(recipient_emails)
         message["Subject"] = subject
         if cc_emails:
             message["Cc"] = ", ".join(cc_emails)
@@ -85,21 +85,71 @@ class EmailService:
             part["Content-Disposition"] = f'attachment; filename="{attachment_filename}"'
             message.attach(part)
 
-        # Send email
+        return message
+
+    def send_email(
+        self,
+        reply_name: str,
+        reply_email: str,
+        recipient_email: str,
+        subject: str,
+        body: str,
+        attachment_bytes=None,
+        attachment_filename=None,
+        is_html: bool = False,
+        inline_images: Optional[dict] = None,
+        cc_emails: Optional[List[str]] = None
+    ):
+        message = self.build_message(
+            reply_name, reply_email, [recipient_email], subject, body,
+            attachment_bytes=attachment_bytes, attachment_filename=attachment_filename,
+            is_html=is_html, inline_images=inline_images, cc_emails=cc_emails
+        )
+
+        # Send email over a pooled, already authenticated SMTP session
         try:
-            with smtplib.SMTP(self.mail_server, self.mail_port) as server:
-                server.starttls()
-                server.login(self.username, self.password)
-                all_recipients = [recipient_email] + (cc_emails if cc_emails else [])
-                result = server.sendmail(sender_email, all_recipients, message.as_string())
+            pool = get_smtp_pool(self.mail_server, self.mail_port, self.username, self.password)
+            all_recipients = [recipient_email] + (cc_emails if cc_emails else [])
+            result = pool.sendmail(self.sender, all_recipients, message.as_string())
 
-                # Check if any recipient failed
-                if result:  # non-empty dict = failure
-                    raise RuntimeError(f"Failed recipients: {result}")
+            # Check if any recipient failed
+            if result:  # non-empty dict = failure
+                raise RuntimeError(f"Failed recipients: {result}")
 
         except Exception as e:
             raise RuntimeError(f"Failed to send email to {recipient_email}: {e}") from e
 
+    def send_email_to_many(
+        self,
+        reply_name: str,
+        reply_email: str,
+        recipient_emails: List[str],
+        subject: str,
+        body: str,
+        attachment_bytes=None,
+        attachment_filename=None,
+        is_html: bool = False,
+        inline_images: Optional[dict] = None
+    ) -> dict:
+        """
+        Send one identical message to several recipients: the MIME message (and its
+        base64-encoded attachment) is built once and delivered in a single SMTP
+        transaction with one RCPT per recipient. The recipients are not listed in the
+        To header, so no one sees the others' addresses. Returns the refused recipients
+        ({} if all were accepted); raises if none were.
+        """
+        message = self.build_message(
+            reply_name, reply_email, recipient_emails, subject, body,
+            attachment_bytes=attachment_bytes, attachment_filename=attachment_filename,
+            is_html=is_html, inline_images=inline_images,
+            to_header="undisclosed-recipients:;" if len(recipient_emails) > 1 else None
+        )
+        try:
+            pool = get_smtp_pool(self.mail_server, self.mail_port, self.username, self.password)
+            return pool.sendmail(self.sender, recipient_emails, message.as_string())
+        except Exception as e:
+            raise RuntimeError(f"Failed to send email to {', '.join(recipient_emails)}: {e}") from e
+
     @staticmethod
     def decode_and_format_body_form(theme: str,org: str,
             raw_body: str,
@@ -153,14 +203,9 @@ class EmailService:
 
         formatted_validity = validity_dt.strftime("%Y-%m-%d %H:%M %Z") or validity_dt.strftime("%Y-%m-%d %H:%M")
 
-        # Load template
-        BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # <- goes up from /services to /app
-        templates_dir = os.path.join(BASE_DIR, "templates")
-        env = Environment(loader=FileSystemLoader(templates_dir))
-        template = env.get_template("email_form_template.html")
-
-        # Render template
-        rendered_html = template.render(
+        # Render the tenant-branded template
+        rendered_html = render_branded(
+            "email_form_template.html",
             theme=theme,
             org=org,
             html_body_with_br=html_body_with_br,
@@ -224,13 +269,9 @@ class EmailService:
 
         formatted_validity = validity_dt.strftime("%Y-%m-%d %H:%M %Z")
 
-        # Step 5: Load Jinja template
-        BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # <- goes up from /services to /app
-        templates_dir = os.path.join(BASE_DIR, "templates")
-        env = Environment(loader=FileSystemLoader(templates_dir))
-        template = env.get_template("email.html")
-        # Step 6: Render with variables
-        full_html = template.render(
+        # Step 5: Render the tenant-branded template with the message variables
+        full_html = render_branded(
+            "email.html",
             theme=theme,
             org=org,
             html_body_with_br=html_body_with_br,
@@ -311,43 +352,41 @@ class EmailService:
             party_name=party_name
         )
 
-        # Try sending email
+        notification = {
+            "email": domain_name,
+            "user_email": reply_email,
+            "document_id": document_id,
+            "tracking_id": tracking_id,
+            "document_name": document_name,
+            "parties_status": [{"id": party_id, "name": party_name, "email": recipient_email}],
+            "party_name": party_name,
+            "party_email": recipient_email,
+        }
+
+        # Queue the email; the outbox delivers it, retries and records the dispatched/failed notification
         try:
-            self.send_email(
-                recipient_email=recipient_email,
-                subject=subject,
-                body=email_body,
-                is_html=True,
-                inline_images={"company_logo": f"{logo}"},
-                cc_emails=cc_list_cleaned,
-                reply_name=reply_name,
-                reply_email=reply_email
-            )
-            notification_service.store_notification(
-                email=domain_name,
-                user_email=reply_email,
-                document_id=document_id,
-                tracking_id=tracking_id,
-                document_name=document_name,
-                parties_status=[{"id": party_id, "name": party_name, "email": recipient_email}],
-                timestamp=datetime.utcnow().isoformat(),
-                action="dispatched",
-                party_name=party_name,
-                party_email=recipient_email
+            return await email_outbox_service.enqueue(
+                owner=domain_name,
+                kind="signing_link",
+                payload={
+                    "recipient_email": recipient_email,
+                    "subject": subject,
+                    "body": email_body,
+                    "is_html": True,
+                    "inline_images": {"company_logo": f"{logo}"},
+                    "cc_emails": cc_list_cleaned,
+                    "reply_name": reply_name,
+                    "reply_email": reply_email,
+                },
+                context={"document_id": document_id, "tracking_id": tracking_id, "party_id": party_id},
+                notification=notification,
             )
         except Exception as e:
-            # ❌ Email failed → store notification as failed
+            # ❌ Could not even queue the email → store notification as failed
             notification_service.store_notification(
-                email=domain_name,
-                user_email=reply_email,
-                document_id=document_id,
-                tracking_id=tracking_id,
-                document_name=document_name,
-                parties_status=[{"id": party_id, "name": party_name, "email": recipient_email}],
+                **notification,
                 timestamp=datetime.utcnow().isoformat(),
                 action="failed",
-                party_name=party_name,
-                party_email=recipient_email,
                 reason=str(e)
             )
             # Stop API request with 400 instead of 500
@@ -356,8 +395,60 @@ class EmailService:
                 detail=f"Failed to send email to {recipient_email}: {str(e)}"
             ) from e
 
+    async def send_reminder_digest(self, reply_name: str, reply_email: str, recipient_email: str,
+                                   party_name: Optional[str], items: List[dict], owner: str,
+                                   cc_emails: Optional[List[str]] = None, dedupe_key: Optional[str] = None) -> str:
+        """
+        Queue one reminder listing every pending signing link of `recipient_email`.
+        Each item carries document_name, document_url and validity_datetime.
+        """
+        from auth_app.app.services.auth_service import AuthService
+
+        user_style = await AuthService().get_logo_and_theme(reply_email)
+        theme = "#0EA5E9"
+        logo = "images/doculan-logo.png"
+        org = "Doculan"
+        if user_style:
+            logo = user_style.get("logo") if user_style.get("logo") != "string" else logo
+            theme = user_style.get("theme") if user_style.get("theme") != "string" else theme
+            org = user_style.get("organization", org)
+
+        body = self.env.get_template("reminder_digest.html").render(
+            theme=theme,
+            org=org,
+            party_name=party_name,
+            items=[
+                {
+                    **item,
+                    "formatted_validity": datetime.fromisoformat(item["validity_datetime"]).strftime("%Y-%m-%d %H:%M %Z"),
+                }
+                for item in items
+            ],
+        )
+        return await email_outbox_service.enqueue(
+            owner=owner,
+            kind="reminder_digest",
+            payload={
+                "recipient_email": recipient_email,
+                "subject": f"Reminder: {len(items)} documents are awaiting your signature",
+                "body": body,
+                "is_html": True,
+                "inline_images": {"company_logo": f"{logo}"},
+                "cc_emails": cc_emails or [],
+                "reply_name": reply_name,
+                "reply_email": reply_email,
+            },
+            context={"tracking_ids": [item["tracking_id"] for item in items]},
+            dedupe_key=dedupe_key,
+        )
+
     async def send_signed_pdf_email(self, document_name : str, reply_name: str,
-            reply_email: str, recipient_email: str, pdf_bytes: bytes, email_response):
+            reply_email: str, recipient_email: Union[str, List[str]], pdf_bytes: bytes, email_response,
+            owner: Optional[str] = None, context: Optional[dict] = None, dedupe_key: Optional[str] = None):
+        """
+        Queue the completion email. Given a list of recipients, it is queued as a single
+        message that is built once and sent to all of them in one SMTP transaction.
+        """
         subject = email_response[0].email_subject
         from auth_app.app.services.auth_service import AuthService
 
@@ -467,16 +558,27 @@ class EmailService:
         </html>
         """
 
-        self.send_email(
-        reply_name = reply_name,
-        reply_email = reply_email,
-            recipient_email=recipient_email,
-            subject=subject,
-            body=body,
+        payload = {
+            "reply_name": reply_name,
+            "reply_email": reply_email,
+            "subject": subject,
+            "body": body,
+            "attachment_filename": f"{document_name}",
+            "is_html": True,
+            "inline_images": {"company_logo": f"{logo}"},
+        }
+        if isinstance(recipient_email, list):
+            payload["recipient_emails"] = recipient_email
+        else:
+            payload["recipient_email"] = recipient_email
+
+        return await email_outbox_service.enqueue(
+            owner=owner or reply_email,
+            kind="signed_pdf",
+            payload=payload,
             attachment_bytes=pdf_bytes,
-            attachment_filename=f"{document_name}",
-            is_html=True,
-            inline_images={"company_logo": f"{logo}"}
+            context=context,
+            dedupe_key=dedupe_key,
         )
 
     async def send_reminder_email(self, email: str, tracking_id: str):
@@ -491,7 +593,8 @@ class EmailService:
                 <p>Regards,<br>Virtualan Software</p>
             </body></html>
             """
-            self.send_email("DoculanSign","support@doculan.ai",email, subject, body, is_html=True)
+            await asyncio.to_thread(self.send_email, "DoculanSign", "support@doculan.ai", email, subject, body,
+                                    is_html=True)
         else:
             print(f"❌ No document URL found for tracking_id: {tracking_id}")
 
@@ -509,7 +612,8 @@ class EmailService:
             validity_datetime: str,
             reply_name: Optional[str] = None,
             reply_email: Optional[str] = None,
-            cc_emails: Optional[List[str]] = None
+            cc_emails: Optional[List[str]] = None,
+            owner: Optional[str] = None
     ):
         subject = email_response.email_subject
         raw_body = email_response.email_body
@@ -529,15 +633,20 @@ class EmailService:
             org = user_style.get("organization", org)
         html_body = self.decode_and_format_body_form(theme,org,raw_body, '[Form Link]', form_url, validity_datetime,party_name)
 
-        self.send_email(
-            reply_name=reply_name,
-            reply_email=reply_email,
-            inline_images={"company_logo": f"{logo}"},
-            recipient_email=recipient_email,
-            subject=subject,
-            body=html_body,
-            is_html=True,
-            cc_emails=cc_emails
+        return await email_outbox_service.enqueue(
+            owner=owner or reply_email,
+            kind="form_link",
+            payload={
+                "reply_name": reply_name,
+                "reply_email": reply_email,
+                "inline_images": {"company_logo": f"{logo}"},
+                "recipient_email": recipient_email,
+                "subject": subject,
+                "body": html_body,
+                "is_html": True,
+                "cc_emails": cc_emails,
+            },
+            context={"form_id": form_id, "party_id": party_id},
         )
 
     def send_filled_pdf_email(
@@ -612,7 +721,8 @@ class EmailService:
         reply_name = name
         reply_email = reply_email
 
-        self.send_email(
+        await asyncio.to_thread(
+            self.send_email,
             reply_name=reply_name,
             reply_email=reply_email,
             recipient_email=recipient_email,
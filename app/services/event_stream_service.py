@@ -0,0 +1,189 @@
+import asyncio
+import json
+import re
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from utils.logger import logger
+
+EVENT_HISTORY_LENGTH = 1000  # events kept per channel for Last-Event-ID replay
+EVENT_HISTORY_TTL = 24 * 3600  # seconds an idle channel keeps its history
+EVENT_HEARTBEAT_SECONDS = 15
+EVENT_RETRY_MS = 3000  # reconnect delay suggested to browsers
+EVENT_QUEUE_SIZE = 256  # events buffered per connection before a slow client starts losing them
+
+_EVENT_ID = re.compile(r"^\d+-\d+$")
+
+
+def user_channel(owner: str, user_email: str) -> str:
+    return f"events:user:{owner}:{user_email}"
+
+
+def document_channel(owner: str, document_id: str) -> str:
+    return f"events:document:{owner}:{document_id}"
+
+
+def _history_key(channel: str) -> str:
+    return f"{channel}:history"
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _id_key(event_id: str) -> Tuple[int, int]:
+    ms, seq = event_id.split("-")
+    return int(ms), int(seq)
+
+
+def _format(event_id: str, event: str, data: str) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+def _async_redis():
+    # The redis package is only needed once a client actually connects
+    from database.redis_db import get_async_redis_client
+    return get_async_redis_client()
+
+
+class _Hub:
+    """
+    One Redis subscription per process, shared by every open stream. A channel is
+    subscribed while at least one connection listens to it, and the reader task only
+    runs while there are listeners, so idle tabs cost a queue each and nothing else.
+    """
+
+    def __init__(self):
+        self._queues: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def join(self, channels: List[str], queue: asyncio.Queue):
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = _async_redis().pubsub(ignore_subscribe_messages=True)
+            new = [channel for channel in channels if not self._queues.get(channel)]
+            for channel in channels:
+                self._queues[channel].add(queue)
+            if new:
+                await self._pubsub.subscribe(*new)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+
+    async def leave(self, channels: List[str], queue: asyncio.Queue):
+        async with self._lock:
+            gone = []
+            for channel in channels:
+                listeners = self._queues.get(channel)
+                if listeners is None:
+                    continue
+                listeners.discard(queue)
+                if not listeners:
+                    del self._queues[channel]
+                    gone.append(channel)
+            if gone and self._pubsub is not None:
+                try:
+                    await self._pubsub.unsubscribe(*gone)
+                except Exception as e:
+                    logger.warning(f"[events] Failed to unsubscribe {len(gone)} channels: {e}")
+
+    async def _read(self):
+        while self._queues:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except Exception as e:
+                logger.error(f"[events] Redis subscription failed: {e}")
+                await asyncio.sleep(1)
+                continue
+            if not message or message.get("type") != "message":
+                continue
+            channel = _text(message["channel"])
+            for queue in list(self._queues.get(channel, ())):
+                try:
+                    queue.put_nowait((channel, _text(message["data"])))
+                except asyncio.QueueFull:
+                    # The client catches up with /notifications/sync or a reconnect
+                    logger.warning("[events] Dropped an event for a slow client")
+
+
+class EventStream:
+    """
+    Server-sent events for notifications and tracking status changes. Every event is
+    appended to a capped Redis stream per channel (its id becomes the SSE id) and then
+    published, so a reconnecting client replays what it missed from Last-Event-ID before
+    it goes live. Publishing is best-effort and never fails the write that triggered it.
+    """
+
+    hub = _Hub()
+
+    @staticmethod
+    def publish(channel: str, event: str, data: dict) -> Optional[str]:
+        try:
+            from database.redis_db import redis_client
+
+            payload = json.dumps(data, default=str)
+            pipe = redis_client.pipeline()
+            pipe.xadd(_history_key(channel), {"event": event, "data": payload},
+                      maxlen=EVENT_HISTORY_LENGTH, approximate=True)
+            pipe.expire(_history_key(channel), EVENT_HISTORY_TTL)
+            event_id = _text(pipe.execute()[0])
+            redis_client.publish(channel, json.dumps({"id": event_id, "event": event, "data": payload}))
+            return event_id
+        except Exception as e:
+            logger.warning(f"[events] Failed to publish {event} on {channel}: {e}")
+            return None
+
+    @staticmethod
+    def notify_user(owner: str, user_email: str, event: str, data: dict) -> Optional[str]:
+        return EventStream.publish(user_channel(owner, user_email), event, data)
+
+    @staticmethod
+    def notify_document(owner: str, document_id: str, event: str, data: dict) -> Optional[str]:
+        return EventStream.publish(document_channel(owner, document_id), event, data)
+
+    @staticmethod
+    async def _replay(channels: List[str], last_event_id: str) -> List[Tuple[str, str, str, str]]:
+        client = _async_redis()
+        missed = []
+        for channel in channels:
+            entries = await client.xrange(
+                _history_key(channel), min=f"({last_event_id}", max="+", count=EVENT_HISTORY_LENGTH
+            )
+            for event_id, fields in entries:
+                fields = {_text(k): _text(v) for k, v in fields.items()}
+                missed.append((channel, _text(event_id), fields.get("event", "message"), fields.get("data", "{}")))
+        return sorted(missed, key=lambda item: _id_key(item[1]))
+
+    @staticmethod
+    async def events(channels: List[str], last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """SSE frames for the channels: missed events first, then live ones and heartbeats."""
+        if last_event_id and not _EVENT_ID.match(last_event_id):
+            last_event_id = None
+        queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        # Subscribe before replaying so nothing published in between is lost
+        await EventStream.hub.join(channels, queue)
+        try:
+            yield f"retry: {EVENT_RETRY_MS}\n\n"
+            # Newest id sent per channel, to skip live events that were also replayed
+            sent: Dict[str, Tuple[int, int]] = {}
+            if last_event_id:
+                sent = {channel: _id_key(last_event_id) for channel in channels}
+                for channel, event_id, event, data in await EventStream._replay(channels, last_event_id):
+                    yield _format(event_id, event, data)
+                    sent[channel] = _id_key(event_id)
+            while True:
+                try:
+                    channel, raw = await asyncio.wait_for(queue.get(), timeout=EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                message = json.loads(raw)
+                if channel in sent and _id_key(message["id"]) <= sent[channel]:
+                    continue
+                yield _format(message["id"], message["event"], message["data"])
+        finally:
+            await EventStream.hub.leave(channels, queue)
+
+
+event_stream = EventStream()
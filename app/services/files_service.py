@@ -6,6 +6,7 @@ from pathlib import PurePosixPath
 from starlette.responses import JSONResponse, StreamingResponse
 from fastapi import HTTPException
 
+from app.services.preview_service import preview_service
 from app.services.security_service import EncryptionService, AESCipher
 from repositories.s3_repo import s3_head_upload
 
@@ -58,6 +59,7 @@ class FileService:
                 encryption_email = await encryption_service.resolve_encryption_email(email)
                 cipher = AESCipher(encryption_email)
                 result = self.storage.upload(cipher, email, user_email, name, document_id, file, raw_path, overwrite)
+                await self._store_thumbnail(cipher, email, document_id, file, result)
                 results.append({
                     "document_id": document_id,
                     "filename": full_path,
@@ -72,6 +74,16 @@ class FileService:
 
         return results
 
+    async def _store_thumbnail(self, cipher, email, document_id, file, result):
+        # Listing screens show this instead of fetching the PDF; a failure here must not fail the upload.
+        if not isinstance(result, dict) or not result.get("last_modified"):
+            return
+        try:
+            file.file.seek(0)
+            await preview_service.store_thumbnail(email, document_id, result["last_modified"], file.file.read(), cipher)
+        except Exception as e:
+            logger.warning(f"Thumbnail generation failed for {document_id}: {e}")
+
     async def get_pdf(self, result, return_pdf: bool):
         try:
             if return_pdf:
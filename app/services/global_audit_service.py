@@ -1,8 +1,16 @@
+import csv
+import io
+import json
 from datetime import datetime, timezone
-from typing import Dict, Optional, List
+from typing import AsyncIterator, Dict, Optional, List
 from fastapi import HTTPException, APIRouter
-from database.db_config import s3_client
-from repositories.s3_repo import append_logs, get_logs
+from starlette.responses import StreamingResponse
+from app.services.audit_log_store import audit_log_store
+from utils.logger import logger
+
+EXPORT_COLUMNS = ["timestamp", "entity", "entity_id", "action", "actor", "targets", "metadata"]
+EXPORT_CHUNK_SIZE = 64 * 1024
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
 
 router = APIRouter()
 
@@ -17,9 +25,15 @@ class GlobalAuditService:
         return f"{email}/audit/all_logs_form.json"
 
     @staticmethod
-    def _append_log(key: str, entry: dict):
+    def _get_audit_key(email: str, entity: str) -> str:
+        if entity == "form":
+            return GlobalAuditService._get_form_audit_key(email)
+        return GlobalAuditService._get_doc_audit_key(email)
+
+    @staticmethod
+    def _append_log(email: str, entry: dict):
         try:
-            append_logs(entry, key)
+            audit_log_store.append(email, entry)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to write audit log: {str(e)}")
 
@@ -53,9 +67,8 @@ class GlobalAuditService:
         metadata: Optional[Dict] = None,
         targets: Optional[List[Dict]] = None
     ):
-        key = GlobalAuditService._get_doc_audit_key(email)
         entry = GlobalAuditService._create_entry("document", document_id, action, actor, metadata, targets)
-        GlobalAuditService._append_log(key, entry)
+        GlobalAuditService._append_log(email, entry)
 
     @staticmethod
     def log_form_action(
@@ -66,41 +79,78 @@ class GlobalAuditService:
         metadata: Optional[Dict] = None,
         targets: Optional[List[Dict]] = None
     ):
-        key = GlobalAuditService._get_form_audit_key(email)
         entry = GlobalAuditService._create_entry("form", form_id, action, actor, metadata, targets)
-        GlobalAuditService._append_log(key, entry)
+        GlobalAuditService._append_log(email, entry)
 
     @staticmethod
-    def get_document_logs(email: str) -> List[Dict]:
+    async def get_document_logs(email: str, document_id: Optional[str] = None) -> List[Dict]:
         key = GlobalAuditService._get_doc_audit_key(email)
         try:
-            return get_logs(key)
-        except s3_client.exceptions.NoSuchKey:
-            return []
+            return await audit_log_store.find(email, "document", key, entity_id=document_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch document audit logs: {str(e)}")
 
-
-
     @staticmethod
-    def get_form_logs(email: str) -> List[Dict]:
+    async def get_form_logs(email: str, form_id: Optional[str] = None) -> List[Dict]:
         key = GlobalAuditService._get_form_audit_key(email)
         try:
-            return get_logs(key)
-        except s3_client.exceptions.NoSuchKey:
-            return []
+            return await audit_log_store.find(email, "form", key, entity_id=form_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch form audit logs: {str(e)}")
 
     @staticmethod
-    def get_document_logs_by_id(email: str, document_id: str) -> List[Dict]:
-        logs = GlobalAuditService.get_document_logs(email)
-        return [log for log in logs if log.get("entity_id") == document_id]
+    async def get_document_logs_by_id(email: str, document_id: str) -> List[Dict]:
+        return await GlobalAuditService.get_document_logs(email, document_id)
 
     @staticmethod
-    def get_form_logs_by_id(email: str, form_id: str) -> List[Dict]:
-        logs = GlobalAuditService.get_form_logs(email)
-        return [log for log in logs if log.get("entity_id") == form_id]
+    async def get_form_logs_by_id(email: str, form_id: str) -> List[Dict]:
+        return await GlobalAuditService.get_form_logs(email, form_id)
 
+    @staticmethod
+    async def query_logs(email: str, entity: str, cursor: Optional[str] = None, limit: int = 50, **filters) -> Dict:
+        key = GlobalAuditService._get_audit_key(email, entity)
+        try:
+            return await audit_log_store.page(email, entity, key, cursor=cursor, limit=limit, **filters)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to fetch {entity} audit logs: {str(e)}")
 
+    @staticmethod
+    async def _export_chunks(email: str, entity: str, fmt: str, filters: Dict) -> AsyncIterator[str]:
+        key = GlobalAuditService._get_audit_key(email, entity)
+        entries = audit_log_store.stream(email, entity, key, **filters)
+        exported = 0
+        try:
+            if fmt == "ndjson":
+                async for entry in entries:
+                    exported += 1
+                    yield json.dumps(entry, default=str) + "\n"
+                return
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            async for entry in entries:
+                exported += 1
+                writer.writerow([
+                    value if isinstance(value, str) or value is None else json.dumps(value, default=str)
+                    for value in (entry.get(column) for column in EXPORT_COLUMNS)
+                ])
+                if buffer.tell() >= EXPORT_CHUNK_SIZE:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        finally:
+            logger.info(f"[audit] Exported {exported} {entity} audit entries for {email} as {fmt}")
 
+    @staticmethod
+    def export_logs(email: str, entity: str, fmt: str, **filters) -> StreamingResponse:
+        """Stream every matching entry as CSV or NDJSON without holding the export in memory."""
+        filename = f"{entity}_audit_{datetime.now(timezone.utc):%Y%m%d%H%M%S}.{fmt}"
+        return StreamingResponse(
+            GlobalAuditService._export_chunks(email, entity, fmt, filters),
+            media_type=EXPORT_MEDIA_TYPES[fmt],
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
@@ -0,0 +1,215 @@
+import asyncio
+import base64
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pymongo.errors import BulkWriteError
+
+from auth_app.app.database.connection import DB_NAME, db, sync_client
+from config import config
+from repositories.s3_repo import s3_download_json, s3_list_objects
+from utils.logger import logger
+
+notifications = db["notifications"]
+counters = db["notification_counters"]
+imports = db["notification_imports"]
+# store_notification is synchronous and also runs outside the event loop
+notifications_sync = sync_client[DB_NAME]["notifications"]
+counters_sync = sync_client[DB_NAME]["notification_counters"]
+
+NOTIFICATION_LIST_LIMIT = 500
+NOTIFICATION_SYNC_LIMIT = 500
+DUPLICATE_KEY = 11000
+
+_PRIVATE_FIELDS = ("_id", "owner", "user_email", "created_at", "updated_at", "deleted")
+
+# Inboxes whose legacy S3 notifications are already in Mongo
+_imported = set()
+
+
+def _public(doc: dict, with_deleted: bool = False) -> dict:
+    item = {k: v for k, v in doc.items() if k not in _PRIVATE_FIELDS}
+    if with_deleted:
+        item["deleted"] = bool(doc.get("deleted"))
+    return item
+
+
+def _encode_cursor(doc: dict) -> str:
+    raw = f"{doc['updated_at'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        updated_at, oid = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(updated_at), ObjectId(oid)
+    except (ValueError, InvalidId, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _counter_id(owner: str, user_email: str) -> str:
+    return f"{owner}:{user_email}"
+
+
+class NotificationInbox:
+    """
+    In-app notifications of each user, one Mongo document per notification. The unread
+    count is kept in a counter document, bumped on every new notification and recounted
+    from the index whenever notifications are read or deleted, so it never drifts for long.
+    Clients poll `sync` with the cursor of their previous call and only receive what was
+    added, read or deleted since. Notifications expire NOTIFICATION_RETENTION_DAYS after
+    they were created (TTL index); deletes are tombstones so other devices see them.
+    """
+
+    @staticmethod
+    async def ensure_indexes():
+        await notifications.create_index([("owner", 1), ("user_email", 1), ("notification_id", 1)], unique=True)
+        await notifications.create_index([("owner", 1), ("user_email", 1), ("deleted", 1), ("created_at", -1)])
+        await notifications.create_index([("owner", 1), ("user_email", 1), ("updated_at", 1), ("_id", 1)])
+        await notifications.create_index([("owner", 1), ("user_email", 1), ("read", 1), ("deleted", 1)])
+        await notifications.create_index(
+            "created_at", expireAfterSeconds=config.NOTIFICATION_RETENTION_DAYS * 24 * 3600
+        )
+
+    @staticmethod
+    def add(owner: str, user_email: str, notification: dict):
+        now = datetime.now(timezone.utc)
+        notifications_sync.insert_one({
+            **notification,
+            "owner": owner,
+            "user_email": user_email,
+            "created_at": now,
+            "updated_at": now,
+            "deleted": False,
+        })
+        if not notification.get("read"):
+            counters_sync.update_one(
+                {"_id": _counter_id(owner, user_email)}, {"$inc": {"unread": 1}}, upsert=True
+            )
+
+    @staticmethod
+    async def _import_legacy(owner: str, user_email: str):
+        """Move the user's per-file S3 notifications into the inbox the first time it is opened."""
+        marker = _counter_id(owner, user_email)
+        if marker in _imported:
+            return
+        if await imports.find_one({"_id": marker, "done": True}):
+            _imported.add(marker)
+            return
+
+        keys = await asyncio.to_thread(s3_list_objects, f"{owner}/notifications/{user_email}/")
+        legacy = [n for n in await asyncio.gather(*(asyncio.to_thread(s3_download_json, key) for key in keys)) if n]
+        if legacy:
+            now = datetime.now(timezone.utc)
+            records = []
+            for notification in legacy:
+                try:
+                    created_at = datetime.fromisoformat(str(notification.get("timestamp")).replace("Z", "+00:00"))
+                    created_at = created_at if created_at.tzinfo else created_at.replace(tzinfo=timezone.utc)
+                except ValueError:
+                    created_at = now
+                records.append({**notification, "owner": owner, "user_email": user_email,
+                                "created_at": created_at, "updated_at": now, "deleted": False})
+            try:
+                await notifications.insert_many(records, ordered=False)
+            except BulkWriteError as e:
+                # Imported concurrently by another request
+                if any(err.get("code") != DUPLICATE_KEY for err in e.details.get("writeErrors", [])):
+                    raise
+        await imports.update_one(
+            {"_id": marker}, {"$set": {"done": True, "imported_at": datetime.now(timezone.utc)}}, upsert=True
+        )
+        _imported.add(marker)
+        await NotificationInbox._recount(owner, user_email)
+        logger.info(f"[inbox] Imported {len(legacy)} legacy notifications for {user_email}")
+
+    @staticmethod
+    async def _recount(owner: str, user_email: str) -> int:
+        unread = await notifications.count_documents(
+            {"owner": owner, "user_email": user_email, "read": False, "deleted": False}
+        )
+        await counters.update_one({"_id": _counter_id(owner, user_email)}, {"$set": {"unread": unread}}, upsert=True)
+        return unread
+
+    @staticmethod
+    async def list(owner: str, user_email: str, limit: int = NOTIFICATION_LIST_LIMIT) -> List[Dict]:
+        """Newest notifications first."""
+        await NotificationInbox._import_legacy(owner, user_email)
+        docs = await notifications.find(
+            {"owner": owner, "user_email": user_email, "deleted": False}
+        ).sort([("created_at", -1), ("_id", -1)]).limit(limit).to_list(length=limit)
+        return [_public(doc) for doc in docs]
+
+    @staticmethod
+    async def get(owner: str, user_email: str, notification_id: str) -> Optional[Dict]:
+        await NotificationInbox._import_legacy(owner, user_email)
+        doc = await notifications.find_one(
+            {"owner": owner, "user_email": user_email, "notification_id": notification_id, "deleted": False}
+        )
+        return _public(doc) if doc else None
+
+    @staticmethod
+    async def unread_count(owner: str, user_email: str) -> int:
+        await NotificationInbox._import_legacy(owner, user_email)
+        counter = await counters.find_one({"_id": _counter_id(owner, user_email)})
+        if counter is None:
+            return await NotificationInbox._recount(owner, user_email)
+        return max(counter.get("unread", 0), 0)
+
+    @staticmethod
+    async def sync(owner: str, user_email: str, since: Optional[str] = None,
+                   limit: int = NOTIFICATION_SYNC_LIMIT) -> Dict:
+        """
+        Notifications added, read or deleted after `since` (everything on the first call),
+        oldest change first, with the cursor to pass next time. `has_more` is set when the
+        page is full and the client should call again straight away.
+        """
+        await NotificationInbox._import_legacy(owner, user_email)
+        query = {"owner": owner, "user_email": user_email}
+        if since:
+            updated_at, oid = _decode_cursor(since)
+            query["$or"] = [{"updated_at": {"$gt": updated_at}}, {"updated_at": updated_at, "_id": {"$gt": oid}}]
+        else:
+            # A first sync only needs what is still visible
+            query["deleted"] = False
+
+        docs = await notifications.find(query).sort([("updated_at", 1), ("_id", 1)]).limit(limit).to_list(
+            length=limit
+        )
+        return {
+            "items": [_public(doc, with_deleted=True) for doc in docs],
+            "cursor": _encode_cursor(docs[-1]) if docs else since,
+            "has_more": len(docs) == limit,
+            "unread": await NotificationInbox.unread_count(owner, user_email),
+        }
+
+    @staticmethod
+    async def mark_read(owner: str, user_email: str, notification_ids: Optional[List[str]] = None) -> Dict:
+        """Mark the given notifications, or all of them, as read."""
+        await NotificationInbox._import_legacy(owner, user_email)
+        query = {"owner": owner, "user_email": user_email, "read": False, "deleted": False}
+        if notification_ids is not None:
+            query["notification_id"] = {"$in": notification_ids}
+        result = await notifications.update_many(
+            query, {"$set": {"read": True, "updated_at": datetime.now(timezone.utc)}}
+        )
+        return {"updated": result.modified_count, "unread": await NotificationInbox._recount(owner, user_email)}
+
+    @staticmethod
+    async def delete(owner: str, user_email: str, notification_id: Optional[str] = None) -> int:
+        """Delete one notification, or all of them when no id is given. Returns how many were deleted."""
+        await NotificationInbox._import_legacy(owner, user_email)
+        query = {"owner": owner, "user_email": user_email, "deleted": False}
+        if notification_id is not None:
+            query["notification_id"] = notification_id
+        result = await notifications.update_many(
+            query, {"$set": {"deleted": True, "updated_at": datetime.now(timezone.utc)}}
+        )
+        await NotificationInbox._recount(owner, user_email)
+        return result.modified_count
+
+
+notification_inbox = NotificationInbox()
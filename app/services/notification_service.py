@@ -1,6 +1,7 @@
 import uuid
 from typing import Optional
-from repositories.s3_repo import s3_upload_json
+from app.services.event_stream_service import event_stream
+from app.services.notification_inbox_service import notification_inbox
 
 from central_logger import CentralLogger
 logger = CentralLogger.get_logger()
@@ -61,9 +62,9 @@ class NotificationService:
                 ]
             }
 
-            s3_key = f"{email}/notifications/{user_email}/{notification_id}.json"
-            s3_upload_json(notification, s3_key)
-            logger.info(f"[NotificationService] Notification stored: {s3_key}")
+            notification_inbox.add(email, user_email, notification)
+            event_stream.notify_user(email, user_email, "notification", notification)
+            logger.info(f"[NotificationService] Notification {notification_id} stored for {user_email}")
         except Exception as e:
             logger.exception(f"[NotificationService] Failed to store notification: {e}")
 
@@ -99,9 +100,10 @@ class NotificationService:
                 ]
             }
 
-            s3_key = f"{email}/notifications/{notification_id}.json"
-            s3_upload_json(notification, s3_key)
-            logger.info(f"[FormNotification] Notification stored: {s3_key}")
+            # Filed in the sender's inbox; the tenant-level S3 file was never listed anywhere
+            notification_inbox.add(email, user_email, notification)
+            event_stream.notify_user(email, user_email, "notification", notification)
+            logger.info(f"[FormNotification] Notification {notification_id} stored for {user_email}")
 
         except Exception as e:
             logger.exception(f"[FormNotification] Failed to store notification: {e}")
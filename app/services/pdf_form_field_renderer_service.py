@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 import fitz  # PyMuPDF
@@ -15,6 +16,9 @@ from PIL import Image, ImageDraw, ImageFont
 import base64
 from io import BytesIO
 from pathlib import Path
+from functools import lru_cache
+
+
 def get_font_path_by_name(font_name: str) -> str:
     # Map font names to actual .ttf files
     font_map = {
@@ -30,18 +34,21 @@ def get_font_path_by_name(font_name: str) -> str:
         # Add more mappings as needed
     }
     return font_map.get(font_name.lower())
-def generate_signature_b64_from_fontname(
-    text: str,
-    font_name: str,
-    font_size: int = 28,  # Optimal for the box
-    image_size = (250, 60),
-    text_color=(0, 0, 0),
-    bg_color=(255, 255, 255, 0)
-) -> str:
-    font_path = get_font_path_by_name(font_name)
-    if not font_path or not Path(font_path).exists():
-        raise ValueError(f"Font '{font_name}' is not available or path invalid.")
+# Typed signatures are re-rendered for every signed page, certificate and
+# signature listing; the same (text, font, size, color) combination always
+# yields identical PNG bytes, so keep a bounded set of them in memory.
+SIGNATURE_IMAGE_CACHE_SIZE = 512
+
 
+@lru_cache(maxsize=SIGNATURE_IMAGE_CACHE_SIZE)
+def _render_signature_png(
+    text: str,
+    font_path: str,
+    font_size: int,
+    image_size: tuple,
+    text_color: tuple,
+    bg_color: tuple
+) -> bytes:
     font = ImageFont.truetype(font_path, font_size)
     image = Image.new("RGBA", image_size, bg_color)
     draw = ImageDraw.Draw(image)
@@ -57,8 +64,35 @@ def generate_signature_b64_from_fontname(
 
     buffer = BytesIO()
     image.save(buffer, format="PNG")
-    b64_str = base64.b64encode(buffer.getvalue()).decode("utf-8")
-    return f"data:image/png;base64,{b64_str}"
+    return buffer.getvalue()
+
+
+def generate_signature_b64_from_fontname(
+    text: str,
+    font_name: str,
+    font_size: int = 28,  # Optimal for the box
+    image_size = (250, 60),
+    text_color=(0, 0, 0),
+    bg_color=(255, 255, 255, 0)
+) -> str:
+    font_path = get_font_path_by_name(font_name)
+    if not font_path or not Path(font_path).exists():
+        raise ValueError(f"Font '{font_name}' is not available or path invalid.")
+
+    png_bytes = _render_signature_png(
+        str(text), font_path, font_size, tuple(image_size), tuple(text_color), tuple(bg_color)
+    )
+    return _png_data_uri(png_bytes)
+
+
+@lru_cache(maxsize=SIGNATURE_IMAGE_CACHE_SIZE)
+def _png_data_uri(png_bytes: bytes) -> str:
+    return f"data:image/png;base64,{base64.b64encode(png_bytes).decode('ascii')}"
+
+
+def decode_data_uri(value: str) -> bytes:
+    """Raw bytes of a base64 data URI (or of a bare base64 string)."""
+    return base64.b64decode(value[value.find(",") + 1:])
 
 
 
@@ -67,6 +101,12 @@ class PDFFieldInserter:
         self.fonts_dir = fonts_dir
         self.font_name_to_file = {}
         self._registered_fonts = {}
+        self._image_xrefs = {}
+        self._image_document = None
+        # Drawn signatures, checkboxes and attachments arrive as data URIs that repeat on
+        # every field a party fills; decode each distinct URI once per render. Kept on the
+        # instance (one per render) so signature images are not held after the render ends.
+        self._decoded_uris = {}
         self.load_fonts_from_directory()
 
     def load_fonts_from_directory(self):
@@ -164,9 +204,8 @@ class PDFFieldInserter:
 
         elif field_type == "signature":
             if style == "drawn" and isinstance(value, str) and value.startswith("data:image"):
-                data = value.split(",")[1]
                 metadata_key = f"{email}/signatures/{tracking_id}/signatures/{party_id}.json"
-                logger.info(f"drawn : {value}")
+                logger.info(f"drawn : {len(value)} chars")
                 metadata_dict = {
                     str(party_id): {
                         "style": style,
@@ -177,12 +216,8 @@ class PDFFieldInserter:
 
                 s3_upload_bytes(json_data, metadata_key, content_type="application/json")
 
-                image_data = base64.b64decode(data)
-                image = Image.open(BytesIO(image_data))
-                if image.mode == "RGBA":
-                    self.insert_transparent_signature(height, image, page, width, x, y)
-                else:
-                    self.insert_flat_signature_image(height, image, page, width, x, y)
+                image_data = self._decode_data_uri(value)
+                self.insert_signature_image_bytes(image_data, height, page, width, x, y)
             elif style == "typed":
                 try:
                     font_name_req = field.get("font", "helv")
@@ -190,9 +225,8 @@ class PDFFieldInserter:
                     font_size = field.get("font_size", 14)
                     page.insert_text((x, y), str(value), fontsize=font_size, fontname=font_name, color=(0, 0, 0))
                     data1 = generate_signature_b64_from_fontname(text=value, font_name=font_name)
-                    data = data1.split(",")[1]
                     metadata_key = f"{email}/signatures/{tracking_id}/signatures/{party_id}.json"
-                    logger.info(f"typed : {data1}")
+                    logger.info(f"typed : {len(data1)} chars")
                     metadata_dict = {
                         str(party_id): {
                             "style": style,
@@ -211,19 +245,22 @@ class PDFFieldInserter:
 
         elif field_type == "checkbox":
             if value.startswith("data:image"):
-                data = value.split(",")[1]
-                image_data = base64.b64decode(data)
-                image = Image.open(BytesIO(image_data))
+                image_data = self._decode_data_uri(value)
                 fixed_width, fixed_height = 15, 15
-                image = image.resize((fixed_width, fixed_height))
+                rect = fitz.Rect(x, y, x + fixed_width, y + fixed_height)
+                cache_key = self._image_cache_key(page, "checkbox", image_data)
+                cached = self._image_xrefs.get(cache_key)
+                if cached:
+                    page.insert_image(rect, xref=cached[0])
+                else:
+                    image = Image.open(BytesIO(image_data))
+                    image = image.resize((fixed_width, fixed_height))
 
-                img_byte_arr = BytesIO()
-                image.save(img_byte_arr, format="PNG")
+                    img_byte_arr = BytesIO()
+                    image.save(img_byte_arr, format="PNG")
 
-                page.insert_image(
-                    fitz.Rect(x, y, x + fixed_width, y + fixed_height),
-                    stream=img_byte_arr.getvalue()
-                )
+                    xref = page.insert_image(rect, stream=img_byte_arr.getvalue())
+                    self._remember_image(cache_key, xref, image.mode)
 
         elif field_type == "date":
             self.insert_date_field(field, page, pdf_doc, value, x, y)
@@ -235,13 +272,8 @@ class PDFFieldInserter:
             self.insert_typed_signature_text(field, page, value, x, y)
 
         elif field_type == "attach":
-            data = value.split(",")[1]
-            image_data = base64.b64decode(data)
-            image = Image.open(BytesIO(image_data))
-            if image.mode == "RGBA":
-                self.insert_transparent_signature(height, image, page, width, x, y)
-            else:
-                self.insert_flat_signature_image(height, image, page, width, x, y)
+            image_data = self._decode_data_uri(value)
+            self.insert_signature_image_bytes(image_data, height, page, width, x, y)
 
 
         else:
@@ -276,7 +308,7 @@ class PDFFieldInserter:
 
     def insert_checkbox_image(self, checkbox_value, height, page, width, x, y):
         try:
-            checkbox_image_data = base64.b64decode(self.get_checkbox_base64(checkbox_value))
+            checkbox_image_data = self._decode_data_uri(self.get_checkbox_base64(checkbox_value))
             image = Image.open(BytesIO(checkbox_image_data)).convert("RGB")
             img_byte_arr = BytesIO()
             image.save(img_byte_arr, format="PNG")
@@ -295,12 +327,57 @@ class PDFFieldInserter:
             "PHN2ZyB3aWR0aD0iMjQiIGhlaWdodD0iMjQiIHhtbG5zPSJodHRwOi8vd3d3..."
         )
 
+    def _decode_data_uri(self, value):
+        if value not in self._decoded_uris:
+            self._decoded_uris[value] = decode_data_uri(value)
+        return self._decoded_uris[value]
+
+    def _image_cache_key(self, page, variant, image_data):
+        # xrefs only exist in the document they were embedded in, so the cache starts over
+        # for each new document. The document itself is kept to compare against, not its
+        # id(), which CPython hands to a new object once the old one is freed.
+        if page.parent is not self._image_document:
+            self._image_document = page.parent
+            self._image_xrefs = {}
+        return variant, hashlib.sha256(image_data).hexdigest()
+
+    def _remember_image(self, cache_key, xref, mode):
+        if xref:
+            self._image_xrefs[cache_key] = (xref, mode)
+
+    def insert_signature_image_bytes(self, image_data, height, page, width, x, y):
+        """
+        Places an encoded signature/attachment image, embedding each distinct image
+        only once per document and reusing its xref for every later placement.
+        """
+        cache_key = self._image_cache_key(page, "signature", image_data)
+        cached = self._image_xrefs.get(cache_key)
+        if cached:
+            xref, mode = cached
+            try:
+                if mode == "RGBA":
+                    page.insert_image(fitz.Rect(x, y - 30, x + width, y + height), xref=xref, overlay=True)
+                else:
+                    page.insert_image(fitz.Rect(x, y - 10, x + width, y + height), xref=xref)
+                return xref
+            except Exception as e:
+                logger.error(f"Failed to reuse signature image xref {xref}: {e}")
+                return None
+
+        image = Image.open(BytesIO(image_data))
+        if image.mode == "RGBA":
+            xref = self.insert_transparent_signature(height, image, page, width, x, y)
+        else:
+            xref = self.insert_flat_signature_image(height, image, page, width, x, y)
+        self._remember_image(cache_key, xref, image.mode)
+        return xref
+
     def insert_flat_signature_image(self, height, image, page, width, x, y):
         try:
             image = image.convert("RGB")
             img_byte_arr = BytesIO()
             image.save(img_byte_arr, format="PNG")
-            page.insert_image(
+            return page.insert_image(
                 fitz.Rect(x, y - 10, x + width, y + height),
                 stream=img_byte_arr.getvalue()
             )
@@ -325,6 +402,6 @@ class PDFFieldInserter:
             rect = fitz.Rect(x, y-30, x + width, y + height)
 
             # Embed image directly with transparency
-            page.insert_image(rect, stream=img_bytes.read(), overlay=True)
+            return page.insert_image(rect, stream=img_bytes.read(), overlay=True)
         except Exception as e:
             logger.error(f"Failed to insert signature-only image: {e}")
\ No newline at end of file
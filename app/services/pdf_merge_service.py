@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from collections import deque
+from typing import Iterator, List, Optional
+
+import fitz  # PyMuPDF
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from starlette.responses import Response, StreamingResponse
+
+from app.services.conversion_cache_service import ConversionCacheService
+from app.services.security_service import AESCipher
+from config import config
+from database.db_config import s3_client
+from repositories.s3_repo import s3_download_bytes
+from utils.fitz_executor import run_fitz
+from utils.logger import logger
+
+MERGE_CONCURRENCY = 4
+STREAM_CHUNK_SIZE = 1024 * 1024
+MERGE_CACHE_PREFIX = "cache/merged"
+
+
+class PDFMergeService:
+    """
+    Merges encrypted S3 objects into a single PDF. Sources are downloaded, decrypted
+    and converted a few at a time, appended in listing order with PyMuPDF and the
+    result is streamed from disk. Merged output is cached (encrypted) under a key
+    derived from the source keys and ETags, so any change to a source is a miss.
+    """
+
+    @staticmethod
+    def cache_key(sources: List[dict]) -> str:
+        digest = hashlib.sha256()
+        for obj in sources:
+            digest.update(f"{obj['Key']}\0{obj.get('ETag', '')}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _cache_object_key(email: str, cache_key: str) -> str:
+        return f"{email}/{MERGE_CACHE_PREFIX}/{cache_key}.pdf"
+
+    @staticmethod
+    def _download(key: str, cipher: AESCipher) -> bytes:
+        return cipher.decrypt(s3_download_bytes(key))
+
+    @staticmethod
+    async def _load_source(key: str, cipher: AESCipher) -> Optional[bytes]:
+        try:
+            decrypted = await asyncio.to_thread(PDFMergeService._download, key, cipher)
+            return await ConversionCacheService.convert(key, decrypted, cipher)
+        except Exception as e:
+            logger.error(f"Failed to merge key {key}: {e}")
+            return None
+
+    @staticmethod
+    def _append(merged: fitz.Document, key: str, pdf_bytes: bytes):
+        try:
+            with fitz.open("pdf", pdf_bytes) as source:
+                merged.insert_pdf(source)
+        except Exception as e:
+            logger.error(f"Failed to merge key {key}: {e}")
+
+    @staticmethod
+    async def merge_to_file(keys: List[str], cipher: AESCipher) -> str:
+        """
+        Merge the given objects in order and return the path of the merged PDF.
+        At most MERGE_CONCURRENCY sources are held in memory at any time.
+        """
+        merged = await run_fitz(fitz.open)
+        remaining = iter(keys)
+        pending = deque()
+
+        def schedule_next():
+            key = next(remaining, None)
+            if key is not None:
+                pending.append((key, asyncio.create_task(PDFMergeService._load_source(key, cipher))))
+
+        for _ in range(MERGE_CONCURRENCY):
+            schedule_next()
+
+        try:
+            while pending:
+                key, task = pending.popleft()
+                pdf_bytes = await task
+                schedule_next()
+                if pdf_bytes:
+                    await run_fitz(PDFMergeService._append, merged, key, pdf_bytes)
+
+            if await run_fitz(lambda: merged.page_count) == 0:
+                raise HTTPException(status_code=422, detail="None of the documents could be merged.")
+
+            fd, path = tempfile.mkstemp(suffix=".pdf")
+            os.close(fd)
+            await run_fitz(merged.save, path, garbage=1, deflate=True)
+            return path
+        finally:
+            for _, task in pending:
+                task.cancel()
+            await run_fitz(merged.close)
+
+    @staticmethod
+    def _read_cache(email: str, cache_key: str, cipher: AESCipher) -> Optional[bytes]:
+        try:
+            response = s3_client.get_object(
+                Bucket=config.S3_BUCKET, Key=PDFMergeService._cache_object_key(email, cache_key)
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("NoSuchKey", "404"):
+                logger.warning(f"[merge] Cache lookup failed for {cache_key}: {e}")
+            return None
+        return cipher.decrypt(response["Body"].read())
+
+    @staticmethod
+    def _write_cache(email: str, cache_key: str, cipher: AESCipher, path: str):
+        try:
+            with open(path, "rb") as merged_file:
+                encrypted = cipher.encrypt(merged_file.read())
+            s3_client.put_object(
+                Bucket=config.S3_BUCKET,
+                Key=PDFMergeService._cache_object_key(email, cache_key),
+                Body=encrypted,
+                ContentType="application/pdf",
+                ServerSideEncryption="aws:kms",
+                SSEKMSKeyId=config.KMS_KEY_ID
+            )
+        except Exception as e:
+            logger.warning(f"[merge] Failed to cache merged PDF {cache_key}: {e}")
+
+    @staticmethod
+    def _iter_file(path: str) -> Iterator[bytes]:
+        try:
+            with open(path, "rb") as merged_file:
+                while chunk := merged_file.read(STREAM_CHUNK_SIZE):
+                    yield chunk
+        finally:
+            os.remove(path)
+
+    @staticmethod
+    def _iter_bytes(data: bytes) -> Iterator[bytes]:
+        view = memoryview(data)
+        for start in range(0, len(view), STREAM_CHUNK_SIZE):
+            yield bytes(view[start:start + STREAM_CHUNK_SIZE])
+
+    @staticmethod
+    async def merged_pdf_response(email: str, sources: List[dict], cipher: AESCipher,
+                                  if_none_match: Optional[str] = None) -> Response:
+        cache_key = PDFMergeService.cache_key(sources)
+        etag = f'"{cache_key}"'
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
+        headers = {"ETag": etag}
+        cached = await asyncio.to_thread(PDFMergeService._read_cache, email, cache_key, cipher)
+        if cached is not None:
+            logger.info(f"[merge] Cache hit {cache_key} ({len(sources)} sources)")
+            return StreamingResponse(PDFMergeService._iter_bytes(cached), media_type="application/pdf",
+                                     headers=headers)
+
+        path = await PDFMergeService.merge_to_file([obj["Key"] for obj in sources], cipher)
+        await asyncio.to_thread(PDFMergeService._write_cache, email, cache_key, cipher, path)
+        logger.info(f"[merge] Merged {len(sources)} sources into {cache_key}")
+        return StreamingResponse(PDFMergeService._iter_file(path), media_type="application/pdf", headers=headers)
+
+
+pdf_merge_service = PDFMergeService()
@@ -1,7 +1,6 @@
 import io
 import logging
 import tempfile
-import zipfile
 from io import BytesIO
 from datetime import datetime, timezone
 from typing import Dict
@@ -23,6 +22,7 @@ from app.services.audit_service import document_tracking_manager
 from app.services.certificate_service import certificate_service
 from app.services.pdf_form_field_renderer_service import PDFFieldInserter
 from app.services.security_service import AESCipher, EncryptionService
+from app.services.zip_stream_service import ZipEntry, ZipStreamService
 from config import config
 from database.db_config import s3_client
 from repositories.s3_repo import (
@@ -33,6 +33,7 @@ from repositories.s3_repo import (
     store_tracking_metadata,s3_download_bytes, _list_objects, get_document_name
 )
 from utils.drive_client import get_base64_logo
+from utils.fitz_executor import run_fitz
 from utils.security import format_user_datetime
 from pyhanko.sign.timestamps import HTTPTimeStamper
 
@@ -129,39 +130,49 @@ class PDFSigner:
                 logger.error("[Render] Failed to load PDF document.")
                 return None
 
-            ui_pdf_width = pdf_size.get("pdfWidth", 595)
-            ui_pdf_height = pdf_size.get("pdfHeight", 842)
-
-            pdfFieldInserter = PDFFieldInserter()
-            logger.info(fields)
-            for field in fields:
-                if not field.get("signed") or not field.get("value"):
-                    continue
-                page_number = field.get("page", 0)
-                try:
-                    self.sign_type(email, field, page_number, pdf_doc, ui_pdf_height, ui_pdf_width, tracking_id, party_id)
-                except Exception as e:
-                    logger.error(f"[Render] Error rendering field on page {page_number}: {e}")
-
-            pdfFieldInserter.insert_tracking_id(pdf_doc, tracking_id)
-
-            signed_bytes = pdf_doc.write()
+            # Field drawing and serialisation are CPU bound; keep them off the event loop.
+            # PyMuPDF is not thread-safe, so concurrent signings render one at a time.
+            signed_bytes = await run_fitz(
+                self._apply_fields, email, fields, pdf_doc, pdf_size, tracking_id, party_id
+            )
             final_signed_pdf = await self.sign_pdf_with_user_cert(email, signed_bytes, tracking_id)
 
-            # Save signed PDF to S3 or wherever required
-            # render_sign_update(email, final_signed_pdf, tracking_id, document_id)
-
             logger.info("[Render] Document rendering and signing completed")
-            pdf_base64 = await render_sign_update(email, final_signed_pdf, tracking_id, document_id)
-            return pdf_base64, file_name
+            final_signed_pdf = await render_sign_update(email, final_signed_pdf, tracking_id, document_id)
+            return final_signed_pdf, file_name
 
         except Exception as e:
             logger.error(f"[Render] Failed rendering/saving signed PDF: {e}", exc_info=True)
             return None
 
 
-    def sign_type(self, email, field, page_number, pdf_doc, ui_pdf_height, ui_pdf_width, tracking_id, party_id):
+    def _apply_fields(self, email, fields, pdf_doc, pdf_size, tracking_id, party_id) -> bytes:
+        ui_pdf_width = pdf_size.get("pdfWidth", 595)
+        ui_pdf_height = pdf_size.get("pdfHeight", 842)
+
         pdfFieldInserter = PDFFieldInserter()
+        logger.info(fields)
+        for field in fields:
+            if not field.get("signed") or not field.get("value"):
+                continue
+            page_number = field.get("page", 0)
+            try:
+                self.sign_type(email, field, page_number, pdf_doc, ui_pdf_height, ui_pdf_width, tracking_id, party_id,
+                               pdfFieldInserter)
+            except Exception as e:
+                logger.error(f"[Render] Error rendering field on page {page_number}: {e}")
+
+        try:
+            pdfFieldInserter.insert_tracking_id(pdf_doc, tracking_id)
+            return pdf_doc.write()
+        finally:
+            # Closed here so the document is never freed from another thread
+            pdf_doc.close()
+
+    def sign_type(self, email, field, page_number, pdf_doc, ui_pdf_height, ui_pdf_width, tracking_id, party_id,
+                  pdfFieldInserter=None):
+        # Reusing the caller's inserter lets repeated images share one embedded xref.
+        pdfFieldInserter = pdfFieldInserter or PDFFieldInserter()
         field_type, height, page, style, value, width, x, y = pdfFieldInserter.transform_field_coordinates(email=email,
             field=field, page_number=page_number, pdf_doc=pdf_doc, ui_pdf_height=ui_pdf_height, ui_pdf_width=ui_pdf_width
         )
@@ -180,7 +191,8 @@ class PDFSigner:
         response = await get_signed(email, tracking_id, document_id)
         return StreamingResponse(BytesIO(response), media_type="application/pdf")
 
-    async def finalize_party_signing_and_render_pdf(self, data, doc: ClientInfo, email, metadata, party_fields, party_status):
+    async def finalize_party_signing_and_render_pdf(self, data, doc: ClientInfo, email, metadata, party_fields, party_status,
+                                                    render: bool = True):
         logger.info(
             f"Finalizing signature for party_id={data.party_id}, tracking_id={data.tracking_id}, document_id={data.document_id}")
 
@@ -210,14 +222,15 @@ class PDFSigner:
                                                data.party_id)
 
             try:
-                logger.info(f"Rendering signed PDF for party_id={data.party_id}")
-                signed_pdf_b64 = await self.render_signed_pdf(
-                    email,
-                    metadata["fields"],
-                    data.document_id,
-                    data.tracking_id,
-                    metadata.get("pdfSize", {"pdfWidth": 595, "pdfHeight": 842}),data.party_id
-                )
+                if render:
+                    logger.info(f"Rendering signed PDF for party_id={data.party_id}")
+                    await self.render_signed_pdf(
+                        email,
+                        metadata["fields"],
+                        data.document_id,
+                        data.tracking_id,
+                        metadata.get("pdfSize", {"pdfWidth": 595, "pdfHeight": 842}),data.party_id
+                    )
             except Exception as e:
                 logger.exception(f"PDF rendering failed for party_id={data.party_id}")
                 raise HTTPException(status_code=500, detail=f"Partial PDF rendering failed: {str(e)}")
@@ -315,45 +328,27 @@ class PDFGenerator:
 
         attached_files = _list_objects(prefix)
         logger.info(attached_files)
-        # 3. Try to fetch and decrypt certificate
-        certificate_filename = f"certificate_{tracking_id}.pdf"
-        certificate_key = f"{email}/certificates/documents/{document_id}/tracking/{tracking_id}.pdf"
-        try:
-            cert_response = s3_client.get_object(Bucket=config.S3_BUCKET, Key=certificate_key)
-            encrypted_certificate_bytes = cert_response['Body'].read()
-            certificate_bytes = PDFGenerator.decrypt_or_pass(cipher, encrypted_certificate_bytes)
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'NoSuchKey':
-                certificate_bytes = None
-            else:
-                raise HTTPException(status_code=500, detail="Error retrieving certificate from S3")
-
-        # 4. ZIP packaging
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
-            # Add signed PDF
-            zipf.writestr(signed_pdf_name, decrypted_signed_pdf)
-
-            # Add attachments (decrypt or pass)
-            for file_key in attached_files:
-                file_name = file_key.split("/")[-1]
-                if file_name == signed_pdf_name or file_name=="signed-pdf.pdf":
-                    continue
-
-                try:
-                    encrypted_data = s3_download_bytes(file_key)
-                    decrypted_data = PDFGenerator.decrypt_or_pass(cipher, encrypted_data)
-                    zipf.writestr(file_name, decrypted_data)
-                except Exception as ex:
-                    raise HTTPException(status_code=500, detail=f"Error processing attachment: {file_name}") from ex
-
-            # Add certificate
-            if certificate_bytes:
-                zipf.writestr(certificate_filename, certificate_bytes)
-
-        zip_buffer.seek(0)
-        return StreamingResponse(
-            zip_buffer,
-            media_type="application/zip",
-            headers={"Content-Disposition": f"attachment; filename={document_name}_Executed_Files.zip"}
-        )
+
+        def load_attachment(file_key: str):
+            return lambda: PDFGenerator.decrypt_or_pass(cipher, s3_download_bytes(file_key))
+
+        def load_certificate():
+            certificate_key = f"{email}/certificates/documents/{document_id}/tracking/{tracking_id}.pdf"
+            try:
+                cert_response = s3_client.get_object(Bucket=config.S3_BUCKET, Key=certificate_key)
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'NoSuchKey':
+                    return None
+                raise
+            return PDFGenerator.decrypt_or_pass(cipher, cert_response['Body'].read())
+
+        # 3. Stream the ZIP: signed PDF, attachments, then the certificate (if any)
+        entries = [ZipEntry(signed_pdf_name, lambda: decrypted_signed_pdf)]
+        for file_key in attached_files:
+            file_name = file_key.split("/")[-1]
+            if file_name == signed_pdf_name or file_name == "signed-pdf.pdf":
+                continue
+            entries.append(ZipEntry(file_name, load_attachment(file_key)))
+        entries.append(ZipEntry(f"certificate_{tracking_id}.pdf", load_certificate))
+
+        return ZipStreamService.response(entries, f"{document_name}_Executed_Files.zip")
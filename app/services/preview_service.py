@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+from io import BytesIO
+from typing import Dict, Optional
+
+import fitz  # PyMuPDF
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from PIL import Image
+from starlette.responses import Response
+
+from app.services.security_service import AESCipher
+from config import config
+from database.db_config import s3_client
+from repositories.s3_repo import s3_download_bytes
+from utils.fitz_executor import run_fitz
+from utils.logger import logger
+
+THUMBNAIL_DPI = 48
+DEFAULT_PREVIEW_DPI = 96
+MIN_PREVIEW_DPI = 24
+MAX_PREVIEW_DPI = 200
+# Pages rendered past the requested one on a miss, so paging forward hits the cache.
+PREVIEW_READ_AHEAD = 3
+WEBP_QUALITY = 80
+PREVIEW_CACHE_PREFIX = "cache/previews"
+PREVIEW_FORMATS = {"webp": "image/webp", "png": "image/png"}
+
+
+class PreviewService:
+    """
+    Page images for document cards and the signing view. Pages are rendered with
+    PyMuPDF pixmaps and cached encrypted in S3 under the document id and a version
+    derived from the index entry's last_modified, so re-uploads never serve stale
+    images. The first-page thumbnail is rendered at upload time.
+    """
+
+    @staticmethod
+    def version(last_modified: str) -> str:
+        return hashlib.sha256(str(last_modified).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def cache_key(email: str, document_id: str, version: str, page: int, dpi: int, fmt: str) -> str:
+        return f"{email}/{PREVIEW_CACHE_PREFIX}/{document_id}/{version}/p{page}-{dpi}.{fmt}"
+
+    @staticmethod
+    def _encode(pix: fitz.Pixmap, fmt: str) -> bytes:
+        if fmt == "png":
+            return pix.tobytes("png")
+        image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+        buffer = BytesIO()
+        image.save(buffer, format="WEBP", quality=WEBP_QUALITY)
+        return buffer.getvalue()
+
+    @staticmethod
+    def render_pages(pdf_bytes: bytes, first_page: int, count: int, dpi: int, fmt: str) -> Dict[int, bytes]:
+        """Render up to `count` pages starting at 1-based `first_page`; pages past the end are left out."""
+        images = {}
+        with fitz.open("pdf", pdf_bytes) as pdf_doc:
+            last_page = min(first_page + count - 1, pdf_doc.page_count)
+            for page_number in range(first_page, last_page + 1):
+                pix = pdf_doc[page_number - 1].get_pixmap(dpi=dpi, alpha=False)
+                images[page_number] = PreviewService._encode(pix, fmt)
+        return images
+
+    @staticmethod
+    def _read_cache(key: str, cipher: AESCipher) -> Optional[bytes]:
+        try:
+            response = s3_client.get_object(Bucket=config.S3_BUCKET, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("NoSuchKey", "404"):
+                logger.warning(f"[preview] Cache lookup failed for {key}: {e}")
+            return None
+        return cipher.decrypt(response["Body"].read())
+
+    @staticmethod
+    def _write_cache(key: str, cipher: AESCipher, image: bytes, fmt: str):
+        try:
+            s3_client.put_object(
+                Bucket=config.S3_BUCKET,
+                Key=key,
+                Body=cipher.encrypt(image),
+                ContentType=PREVIEW_FORMATS[fmt],
+                ServerSideEncryption="aws:kms",
+                SSEKMSKeyId=config.KMS_KEY_ID
+            )
+        except Exception as e:
+            logger.warning(f"[preview] Failed to cache {key}: {e}")
+
+    @staticmethod
+    async def store_thumbnail(email: str, document_id: str, last_modified: str, pdf_bytes: bytes, cipher: AESCipher):
+        version = PreviewService.version(last_modified)
+        images = await run_fitz(PreviewService.render_pages, pdf_bytes, 1, 1, THUMBNAIL_DPI, "webp")
+        if 1 in images:
+            key = PreviewService.cache_key(email, document_id, version, 1, THUMBNAIL_DPI, "webp")
+            await asyncio.to_thread(PreviewService._write_cache, key, cipher, images[1], "webp")
+            logger.info(f"[preview] Stored thumbnail for {document_id}")
+
+    @staticmethod
+    def _download(file_path: str, cipher: AESCipher) -> bytes:
+        return cipher.decrypt(s3_download_bytes(file_path))
+
+    @staticmethod
+    async def page_image(email: str, document_id: str, entry: dict, cipher: AESCipher,
+                         page: int, dpi: int, fmt: str) -> bytes:
+        version = PreviewService.version(entry.get("last_modified", ""))
+        key = PreviewService.cache_key(email, document_id, version, page, dpi, fmt)
+        cached = await asyncio.to_thread(PreviewService._read_cache, key, cipher)
+        if cached is not None:
+            return cached
+
+        pdf_bytes = await asyncio.to_thread(PreviewService._download, entry["file_path"], cipher)
+        # Downloaded outside the PyMuPDF thread so it is only held for the render itself
+        images = await run_fitz(PreviewService.render_pages, pdf_bytes, page, 1 + PREVIEW_READ_AHEAD, dpi, fmt)
+        if page not in images:
+            raise HTTPException(status_code=404, detail=f"Page {page} not found in document")
+
+        await asyncio.gather(*[
+            asyncio.to_thread(PreviewService._write_cache,
+                              PreviewService.cache_key(email, document_id, version, number, dpi, fmt),
+                              cipher, image, fmt)
+            for number, image in images.items()
+        ])
+        logger.info(f"[preview] Rendered pages {min(images)}-{max(images)} of {document_id} at {dpi} dpi")
+        return images[page]
+
+    @staticmethod
+    async def page_response(email: str, document_id: str, entry: dict, cipher: AESCipher, page: int,
+                            dpi: int = DEFAULT_PREVIEW_DPI, fmt: str = "webp",
+                            if_none_match: Optional[str] = None) -> Response:
+        if fmt not in PREVIEW_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported preview format: {fmt}")
+        if not entry.get("file_path"):
+            raise HTTPException(status_code=404, detail="File path not available for document")
+
+        version = PreviewService.version(entry.get("last_modified", ""))
+        etag = f'"{version}-{page}-{dpi}-{fmt}"'
+        headers = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+        if if_none_match == etag:
+            return Response(status_code=304, headers=headers)
+
+        image = await PreviewService.page_image(email, document_id, entry, cipher, page, dpi, fmt)
+        return Response(content=image, media_type=PREVIEW_FORMATS[fmt], headers=headers)
+
+
+preview_service = PreviewService()
@@ -0,0 +1,156 @@
+import asyncio
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+from app.services.email_service import email_service
+from auth_app.app.database.connection import db, save_document_url
+from config import config
+from utils.logger import logger
+from utils.scheduler_manager import SchedulerManager, jobs_collection
+
+REMINDER_DIGEST_INTERVAL = 5  # minutes between digest passes
+DIGEST_CONCURRENCY = 8
+DIGEST_LEASE_SECONDS = 900
+
+# Reminder job state while a digest pass owns it
+DIGESTING = "digesting"
+
+
+class ReminderDigest:
+    """
+    Digest mode for signing reminders, on when REMINDER_DIGEST_WINDOW > 0. Reminder jobs
+    are no longer scheduled one by one; a periodic pass claims every reminder due within
+    the window, groups them by tenant, signer and CC list, and queues a single email per
+    group listing all of its pending links. Job and document state is then written in bulk.
+    """
+
+    @staticmethod
+    def enabled() -> bool:
+        return config.REMINDER_DIGEST_WINDOW > 0
+
+    @staticmethod
+    async def _claim() -> Tuple[str, List[dict]]:
+        now = datetime.now(timezone.utc)
+        digest_id = str(uuid.uuid4())
+        await jobs_collection.update_many(
+            {
+                "action": "reminder",
+                "schedule_time": {"$lte": now + timedelta(minutes=config.REMINDER_DIGEST_WINDOW)},
+                "$or": [
+                    {"status": "pending"},
+                    # Claimed by a pass that never finished (restart mid-digest)
+                    {"status": DIGESTING, "claimed_at": {"$lte": now - timedelta(seconds=DIGEST_LEASE_SECONDS)}},
+                ],
+            },
+            {"$set": {"status": DIGESTING, "digest_id": digest_id, "claimed_at": now}},
+        )
+        jobs = await jobs_collection.find({"digest_id": digest_id, "status": DIGESTING}).to_list(length=None)
+        return digest_id, jobs
+
+    @staticmethod
+    async def process_due():
+        from app.services.signature_service import SignatureHandler
+
+        digest_id, jobs = await ReminderDigest._claim()
+        if not jobs:
+            return
+
+        semaphore = asyncio.Semaphore(DIGEST_CONCURRENCY)
+
+        async def prepare(job: dict):
+            async with semaphore:
+                try:
+                    return job, await SignatureHandler.prepare_reminder(
+                        job["document_id"], job["tracking_id"], job["email"], job["user_email"]
+                    )
+                except Exception as e:
+                    return job, e
+
+        groups: Dict[Tuple[str, str, Tuple[str, ...]], List[Tuple[dict, dict]]] = defaultdict(list)
+        skipped: Dict[str, List[str]] = defaultdict(list)
+        for job, result in await asyncio.gather(*(prepare(job) for job in jobs)):
+            if isinstance(result, Exception):
+                await SchedulerManager.retry_or_fail(job, result)
+            elif "skipped" in result:
+                skipped[result["skipped"]].append(job["job_id"])
+            else:
+                recipient = result["recipient_email"].lower()
+                # Documents are only digested with others CC'd to the same people, so every
+                # CC keeps getting its reminders without seeing links of other documents
+                cc = tuple(sorted({cc.lower() for cc in result.get("cc_emails") or []} - {recipient}))
+                groups[(job["email"], recipient, cc)].append((job, result))
+
+        done = []
+        for (owner, recipient, cc), entries in groups.items():
+            try:
+                await ReminderDigest._send(digest_id, owner, recipient, list(cc), entries)
+            except Exception as e:
+                logger.error(f"[reminder-digest] Failed to queue reminders for {recipient}: {e}")
+                for job, _ in entries:
+                    await SchedulerManager.retry_or_fail(job, e)
+                continue
+            for job, item in entries:
+                try:
+                    await SignatureHandler.record_reminder(job["email"], item)
+                except Exception as e:
+                    logger.warning(f"[reminder-digest] Reminder for {item['tracking_id']} queued but not logged: {e}")
+            done.extend(job for job, _ in entries)
+
+        now = datetime.now(timezone.utc)
+        for status, job_ids in skipped.items():
+            await jobs_collection.update_many(
+                {"job_id": {"$in": job_ids}}, {"$set": {"status": status, "updated_at": now}}
+            )
+        if done:
+            await jobs_collection.update_many(
+                {"job_id": {"$in": [job["job_id"] for job in done]}},
+                {"$set": {"status": "completed", "completed_at": now}},
+            )
+            await db["documents"].update_many(
+                {"$or": [{"document_id": job["document_id"], "tracking_id": job["tracking_id"]} for job in done]},
+                {"$set": {"status": "in_progress", "updated_at": now}},
+            )
+
+        logger.info(
+            f"[reminder-digest] {len(jobs)} due reminders -> {len(groups)} emails, "
+            f"{sum(len(ids) for ids in skipped.values())} skipped, {len(jobs) - len(done)} not sent"
+        )
+
+    @staticmethod
+    async def _send(digest_id: str, owner: str, recipient: str, cc_emails: List[str],
+                    entries: List[Tuple[dict, dict]]):
+        items = [item for _, item in entries]
+        # Replies go to the holder of the first document
+        holder = items[0]["holder"]
+
+        if len(items) == 1:
+            # A single pending document keeps the regular signing email
+            item = items[0]
+            await email_service.send_link(
+                reply_name=holder.get("name"),
+                reply_email=holder.get("email"),
+                recipient_email=item["recipient_email"],
+                document_id=item["document_id"],
+                tracking_id=item["tracking_id"],
+                party_id=item["party_id"],
+                party_name=item["party_name"],
+                token=item["token"],
+                email_response=item["email_response"],
+                validity_datetime=item["validity_datetime"],
+                cc_emails=item["cc_emails"],
+            )
+            return
+
+        for item in items:
+            await asyncio.to_thread(save_document_url, item["tracking_id"], item["document_url"])
+        await email_service.send_reminder_digest(
+            holder.get("name"), holder.get("email"), items[0]["recipient_email"], items[0]["party_name"], items,
+            owner=owner,
+            cc_emails=cc_emails,
+            dedupe_key=f"reminder_digest:{digest_id}:{recipient}:{','.join(cc_emails)}",
+        )
+
+
+reminder_digest = ReminderDigest()
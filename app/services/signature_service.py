@@ -4,15 +4,14 @@ import threading
 from fastapi import HTTPException
 from datetime import datetime, timezone
 
-from app.services.certificate_service import certificate_service
-from app.services.email_service import EmailService, email_service
+from app.services.completion_service import completion_pipeline
+from app.services.email_service import email_service
 from app.services.metadata_service import MetadataService
-from app.services.notification_service import NotificationService
 from app.services.pdf_form_field_renderer_service import generate_signature_b64_from_fontname
 from app.services.pdf_service import PDFSigner
 from app.services.tracking_service import TrackingService
 from auth_app.app.database.connection import db
-from utils.drive_client import get_base64_logo, count_pages_from_base64_pdf, format_datetime
+from utils.drive_client import format_datetime
 from utils.logger import logger
 import base64
 import uuid
@@ -23,11 +22,16 @@ from auth_app.app.utils.security import create_signature_token
 from repositories.s3_repo import generate_summary_from_trackings, \
     load_all_json_from_prefix, store_tracking_status, save_tracking_metadata, store_status, \
     update_tracking_status_counts_in_place, load_tracking_metadata, load_document_metadata, get_document_name, \
-    upload_file, s3_download_string, s3_delete_object, s3_upload_bytes, get_signature_entry, get_file_name
+    s3_download_string, s3_delete_object, s3_upload_bytes, get_signature_entry
 from app.schemas.form_schema import EmailResponse
 from app.schemas.tracking_schemas import DocumentRequest, SignField, ClientInfo, Address, DocumentResendRequest
 from utils.scheduler_manager import SchedulerManager
-from utils.security import format_user_datetime
+
+BATCH_SIGN_LIMIT = 25
+BATCH_SIGN_CONCURRENCY = 4
+# Seconds a signing holds its tracking's lock: well above a render (queued behind other
+# renders on the PyMuPDF thread), the timestamped signature and the upload
+SIGN_LOCK_TTL = 120
 
 
 def format_holder_address(address: dict) -> str:
@@ -259,10 +263,12 @@ class SignatureHandler:
             )
 
             pdfSigner = PDFSigner()
-            await pdfSigner.finalize_party_signing_and_render_pdf(data, data.client_info, email, metadata, party_fields, party_status)
+            # The render below covers this party's fields; finalizing must not render a second time.
+            await pdfSigner.finalize_party_signing_and_render_pdf(data, data.client_info, email, metadata, party_fields,
+                                                                  party_status, render=False)
 
 
-            signed_pdf_base64 , file_name= await pdfSigner.render_signed_pdf(
+            signed_pdf, file_name = await pdfSigner.render_signed_pdf(
                 email=email,
                 fields=metadata["fields"],
                 document_id=data.document_id,
@@ -273,7 +279,7 @@ class SignatureHandler:
 
             MetadataService.upload_sign_metadata(email, data, metadata)
 
-            await SignatureHandler.complete_party_signature(email=email, user_email=user_email, data=data, doc=data.client_info, signed_pdf_base64=signed_pdf_base64, metadata=metadata, file_name=file_name)
+            await SignatureHandler.complete_party_signature(email=email, user_email=user_email, data=data, doc=data.client_info, signed_pdf=signed_pdf, metadata=metadata, file_name=file_name)
 
             metadata = MetadataService.load_metadata_from_s3(email, data.tracking_id, data.document_id)
             MetadataService.save_metadata_to_s3(email, data.document_id, data.tracking_id, metadata)
@@ -293,6 +299,75 @@ class SignatureHandler:
             logger.exception(f"[sign_field] Failed to process signature for document {data.document_id}: {e}")
             raise HTTPException(status_code=500, detail="Failed to process signature")
 
+    @staticmethod
+    def validate_sign_request(email: str, data: SignField):
+        """Cheap pre-flight for a sign submission; raises ValueError with the reason it would fail."""
+        try:
+            metadata = MetadataService.get_metadata(email, data.tracking_id, data.document_id)
+        except FileNotFoundError:
+            metadata = None
+        if not metadata:
+            raise ValueError("Tracking ID not found")
+        if not any(str(p.get("id")) == str(data.party_id) for p in metadata.get("parties", [])):
+            raise ValueError("Party ID not found")
+
+        party_field_ids = {f.get("id") for f in metadata.get("fields", []) if f.get("partyId") == data.party_id}
+        submitted = {field.field_id for group in data.fields for field in group.fields_ids}
+        unknown = submitted - party_field_ids
+        if not submitted or unknown:
+            raise ValueError(f"Fields not assigned to this party: {sorted(unknown) or 'none submitted'}")
+
+    @staticmethod
+    async def sign_batch(email: str, user_email: str, documents: List[SignField]) -> dict:
+        """
+        Sign several documents for one request. Every submission is validated first and
+        the whole batch is rejected if any of them is invalid; after that each document is
+        rendered and signed independently (at most BATCH_SIGN_CONCURRENCY at a time) and
+        reported on its own.
+        """
+        if not documents or len(documents) > BATCH_SIGN_LIMIT:
+            raise HTTPException(status_code=422, detail=f"A batch must contain 1 to {BATCH_SIGN_LIMIT} documents")
+        keys = [(d.document_id, d.tracking_id) for d in documents]
+        if len(set(keys)) != len(keys):
+            raise HTTPException(status_code=422, detail="Each document/tracking pair may appear only once per batch")
+
+        checks = await asyncio.gather(
+            *[asyncio.to_thread(SignatureHandler.validate_sign_request, email, d) for d in documents],
+            return_exceptions=True
+        )
+        errors = [
+            {"document_id": d.document_id, "tracking_id": d.tracking_id, "error": str(check)}
+            for d, check in zip(documents, checks) if isinstance(check, Exception)
+        ]
+        if errors:
+            raise HTTPException(status_code=422, detail={"message": "Batch rejected; nothing was signed", "errors": errors})
+
+        from app.threadsafe.redis_lock import RedisDistributedLock
+        from database.redis_db import redis_client
+        semaphore = asyncio.Semaphore(BATCH_SIGN_CONCURRENCY)
+
+        async def sign_one(data: SignField) -> dict:
+            outcome = {"document_id": data.document_id, "tracking_id": data.tracking_id}
+            async with semaphore:
+                lock = RedisDistributedLock(redis_client, f"sign:{data.document_id}:{data.tracking_id}", SIGN_LOCK_TTL)
+                try:
+                    await asyncio.to_thread(lock.acquire)
+                    try:
+                        result = await SignatureHandler.sign_field(email, user_email, data)
+                    finally:
+                        lock.release()
+                    return {**outcome, "status": "signed", "result": result}
+                except HTTPException as e:
+                    return {**outcome, "status": "failed", "error": e.detail}
+                except Exception as e:
+                    logger.exception(f"[sign_batch] Unexpected failure for document {data.document_id}: {e}")
+                    return {**outcome, "status": "failed", "error": str(e)}
+
+        results = await asyncio.gather(*[sign_one(d) for d in documents])
+        signed = sum(1 for r in results if r["status"] == "signed")
+        logger.info(f"[sign_batch] {signed}/{len(results)} documents signed for {user_email}")
+        return {"results": results, "signed": signed, "failed": len(results) - signed}
+
     @staticmethod
     def get_parties_signatures_with_type(data):
         party_signature_map = {}
@@ -358,7 +433,7 @@ class SignatureHandler:
             user_email: str,
             data: SignField,
             doc: ClientInfo,
-            signed_pdf_base64: str,
+            signed_pdf: bytes,
             metadata: dict,
             file_name: str
     ):
@@ -420,12 +495,9 @@ class SignatureHandler:
             })
             logger.info(f"[complete_party_signature] Party {data.party_id} marked as signed")
 
-            if not signed_pdf_base64:
+            if not signed_pdf:
                 raise HTTPException(status_code=400, detail="Missing signed PDF data")
 
-            # Decode PDF
-            pdf_bytes = SignatureHandler.decode_base64_with_padding(signed_pdf_base64)
-
             # Check if all parties have signed
             all_signed = all(
                 any(s.get("isSigned") for s in p.get("status", {}).get("signed", []))
@@ -440,115 +512,9 @@ class SignatureHandler:
             }
 
             if all_signed:
-                # ✅ All parties signed: generate certificate, upload, and send PDFs
-                try:
-                    signdata = MetadataService.load_metadata_from_s3(email, data.tracking_id, data.document_id)
-                    NotificationService().store_notification(
-                        email=email,
-                        user_email=user_email,
-                        document_id=data.document_id,
-                        tracking_id=data.tracking_id,
-                        document_name=file_name,
-                        parties_status=tracking["parties"],
-                        timestamp=current_time
-                    )
-
-                    document_name = get_document_name(email, data.document_id)
-
-                    # Last sent timestamp
-                    first_party_sent = tracking["parties"][0].get("status", {}).get("sent", [])
-                    sent_at = first_party_sent[-1]["dateTime"] if first_party_sent else "-"
-
-                    page_count = count_pages_from_base64_pdf(signed_pdf_base64)
-                    recipients = []
-
-                    # Get all parties' signatures
-                    signatures = SignatureHandler.get_parties_signatures_with_type(signdata)
-
-                    for p in tracking.get("parties", []):
-                        party_id = str(p.get("id"))
-                        sig_data = signatures.get(party_id, {"b64_signature": None, "style": "-"})
-                        signature_style = sig_data["style"]
-                        b64_signature = sig_data["b64_signature"]
-
-                        signature_type = {
-                            "typed": "Pre-Selected Signature",
-                            "uploaded": "Uploaded Signature",
-                            "drawn": "Drawn Signature"
-                        }.get(signature_style, "No Signature Required")
-
-                        # Last timestamps from lists
-                        sent_time = p.get("status", {}).get("sent", [])
-                        opened_time = p.get("status", {}).get("opened", [])
-                        signed_time = p.get("status", {}).get("signed", [])
-
-                        recipients.append({
-                            "name": p["name"],
-                            "email": p["email"],
-                            "ip_address": signed_time[-1]["ip"] if signed_time else "",
-                            "device": f"{signed_time[-1]['browser']} via {signed_time[-1]['os']}" if signed_time else "",
-                            "signature_type": signature_type,
-                            "sent_time": await format_user_datetime(user_email,
-                                                                    sent_time[-1]["dateTime"] if sent_time else "-"),
-                            "opened_time": await format_user_datetime(user_email, opened_time[-1][
-                                "dateTime"] if opened_time else "-"),
-                            "signed_time": await format_user_datetime(user_email, signed_time[-1][
-                                "dateTime"] if signed_time else "-"),
-                            "authentication": "Email, OTP",
-                            "consent": "Accepted",
-                            "sign_path": b64_signature or "N/A"
-                        })
-
-                    # Generate certificate PDF
-                    holder = tracking.get("holder", {})
-                    certificate_data = {
-                        "title": "Signed PDF",
-                        "heading": "Certificate of Completion",
-                        "logo_path": get_base64_logo("./images/doculan-logo.png"),
-                        "tracking_id": data.tracking_id,
-                        "document_name": document_name,
-                        "type": "Digital Signature",
-                        "status": "Completed",
-                        "page_count": page_count,
-                        "signer_count": len(tracking["parties"]),
-                        "sent_at": await format_user_datetime(user_email, sent_at),
-                        "completed_at": await format_user_datetime(user_email, current_time),
-                        "signing_order": "Enabled",
-                        "hash": certificate_service.compute_sha256(pdf_bytes),
-                        "signer": user_email,
-                        "recipients": recipients,
-                        "generated_at": await format_user_datetime(user_email, datetime.now().strftime("%Y-%m-%dT%H:%M:%S")),
-                        "timestamp": await format_user_datetime(user_email, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
-                        "holder": {
-                            "name": holder.get("name"),
-                            "email": holder.get("email"),
-                            "address": format_holder_address(holder.get("address")) if holder.get("address") else "-"
-                        }
-                    }
-
-                    certificate_pdf_bytes = certificate_service.render_certificate_pdf(certificate_data)
-                    certificate_bytes = await PDFSigner().sign_pdf_with_user_cert(email, certificate_pdf_bytes,
-                                                                                  data.tracking_id)
-                    await upload_file(email, certificate_bytes, data.document_id, data.tracking_id)
-                    logger.info("✅ Certificate PDF generated and uploaded")
-
-                    # Send final PDFs
-                    document_name = await get_file_name(email, data.document_id)
-                    email_service = EmailService()
-                    for p in tracking.get("parties", []):
-                        recipient_email = p.get("email")
-                        if recipient_email:
-                            holder = tracking.get("holder", {})
-                            holder_name = holder.get("name")
-                            holder_email = holder.get("email")
-                            await email_service.send_signed_pdf_email(document_name, holder_name, holder_email,
-                                                                      recipient_email, pdf_bytes, email_response)
-                            logger.info(f"[complete_party_signature] Final signed PDF sent to: {recipient_email}")
-
-                except Exception as e:
-                    logger.exception(
-                        f"[complete_party_signature] Certificate generation or final PDF sending failed: {e}")
-
+                # Certificate, final signing and mails run in the completion pipeline
+                # once the tracking below is saved as completed.
+                logger.info(f"[complete_party_signature] All parties signed for tracking_id={data.tracking_id}")
 
             else:
 
@@ -635,6 +601,16 @@ class SignatureHandler:
 
             threading.Thread(target=update_tracking_status_counts_in_place, args=(email,)).start()
 
+            if all_signed:
+                await completion_pipeline.enqueue(
+                    email=email,
+                    user_email=user_email,
+                    document_id=data.document_id,
+                    tracking_id=data.tracking_id,
+                    file_name=file_name,
+                    completed_at=current_time,
+                )
+
             logger.debug("[complete_party_signature] Background update task triggered for tracking status counts.")
 
 
@@ -645,43 +621,56 @@ class SignatureHandler:
             raise HTTPException(status_code=500, detail="Failed to complete signature")
 
     @staticmethod
-    async def initiate_next_party(email,user_email, next_party: Dict[str, Any], email_response: List[EmailResponse], validityDate: str, remainder: int, data: SignField, cc_emails, holder):
+    async def _send_party_link(email: str, user_email: str, document_id: str, tracking_id: str,
+                               party: Dict[str, Any], audit_action: str, email_response: List[EmailResponse],
+                               validityDate: str, remainder: int, holder: Dict[str, Any], cc_emails):
+        """
+        Audit entry, fresh token and signing email for one party. The audit append is a
+        blocking S3 read-modify-write, so it runs in a thread while the token is created
+        and the email queued rather than in front of them.
+        """
+        async def send_link():
+            token_data = await create_signature_token(
+                sent_email=party["email"],
+                tracking_id=tracking_id,
+                party_id=party["id"],
+                email=user_email,
+                document_id=document_id,
+                validity_date_str=validityDate,
+                remainder_days=remainder
+            )
+            await email_service.send_link(
+                reply_name=holder.get("name"),
+                reply_email=holder.get("email"),
+                recipient_email=party["email"],
+                document_id=document_id,
+                tracking_id=tracking_id,
+                party_id=party["id"],
+                party_name=party.get("name"),
+                token=token_data["token"],
+                email_response=email_response,
+                validity_datetime=token_data["validity_datetime"],
+                cc_emails=cc_emails
+            )
 
-        GlobalAuditService.log_document_action(
+        audit = asyncio.to_thread(
+            GlobalAuditService.log_document_action,
             email=email,
-            document_id=data.document_id,
-            action="NEXT_PARTY_INITIATED",
+            document_id=document_id,
+            action=audit_action,
             actor={"email": email},
-            targets=[{"email": next_party["email"], "party_id": next_party["id"]}],
-            metadata={"tracking_id": data.tracking_id}
+            targets=[{"email": party["email"], "party_id": party["id"]}],
+            metadata={"tracking_id": tracking_id}
         )
+        for result in await asyncio.gather(audit, send_link(), return_exceptions=True):
+            if isinstance(result, Exception):
+                raise result
 
-        token_data  = await create_signature_token(
-            sent_email=next_party["email"],
-            tracking_id=data.tracking_id,
-            party_id=next_party["id"],
-            email=user_email,
-            document_id=data.document_id,
-            validity_date_str=validityDate,
-            remainder_days=remainder
-        )
-        token = token_data["token"]
-        validity_datetime = token_data["validity_datetime"]
-
-        holder_name = holder.get("name")
-        holder_email = holder.get("email")
-        await email_service.send_link(
-            reply_name=holder_name,
-            reply_email=holder_email,
-            recipient_email=next_party["email"],
-            document_id=data.document_id,
-            tracking_id=data.tracking_id,
-            party_id=next_party["id"],
-            party_name=next_party["name"],
-            token=token,
-            email_response=email_response,
-            validity_datetime=validity_datetime,
-            cc_emails=cc_emails
+    @staticmethod
+    async def initiate_next_party(email,user_email, next_party: Dict[str, Any], email_response: List[EmailResponse], validityDate: str, remainder: int, data: SignField, cc_emails, holder):
+        await SignatureHandler._send_party_link(
+            email, user_email, data.document_id, data.tracking_id, next_party, "NEXT_PARTY_INITIATED",
+            email_response, validityDate, remainder, holder, cc_emails
         )
         logger.info(cc_emails)
 
@@ -768,7 +757,6 @@ class SignatureHandler:
                                   tracking_id: str, validityDate: str) -> str:
         for party in parties:
             party_id = party.get("id")
-            party_name = party.get("name")
             party_email = party.get("email")
             if not party_id or not party_email:
                 continue
@@ -786,41 +774,9 @@ class SignatureHandler:
                 continue
 
             try:
-                GlobalAuditService.log_document_action(
-                    email=email,
-                    document_id=document_id,
-                    action="RESEND_LINK",
-                    actor={"email": email},
-                    targets=[{"email": party_email, "party_id": party_id}],
-                    metadata={"tracking_id": tracking_id}
-                )
-
-                token_data  = await create_signature_token(
-                    sent_email=party_email,
-                    tracking_id=tracking_id,
-                    party_id=party_id,
-                    email=user_email,
-                    document_id=document_id,
-                    validity_date_str=validityDate,
-                    remainder_days=remainder
-                )
-                token = token_data["token"]
-                validity_datetime = token_data["validity_datetime"]
-                holder = tracking.get("holder", {})
-                holder_name = holder.get("name")
-                holder_email = holder.get("email")
-                await email_service.send_link(
-                    reply_name=holder_name,
-                    reply_email=holder_email,
-                    recipient_email=party_email,
-                    document_id=document_id,
-                    tracking_id=tracking_id,
-                    party_id=party_id,
-                    party_name=party_name,
-                    token=token,
-                    email_response=email_response,
-                    validity_datetime=validity_datetime,
-                    cc_emails=tracking.get("cc_emails")
+                await SignatureHandler._send_party_link(
+                    email, user_email, document_id, tracking_id, party, "RESEND_LINK",
+                    email_response, validityDate, remainder, tracking.get("holder", {}), tracking.get("cc_emails")
                 )
 
                 await document_tracking_manager.log_action(
@@ -993,90 +949,162 @@ class SignatureHandler:
         }
 
     @staticmethod
-    async def get_party_initiate_remainder(document_id: str, user_email: str, email: str,
-                                           email_response: List[EmailResponse],
-                                           parties: List[Dict[str, Any]], remainder: int,
-                                           tracking: Dict[str, Any],
-                                           tracking_id: str, validityDate: str) -> str:
+    def _first_unsigned_party(parties: List[Dict[str, Any]], tracking: Dict[str, Any]):
+        """The party a reminder goes to: the first one, in signing order, that has not signed yet."""
         for party in parties:
-            party_id = party.get("id")
-            party_name = party.get("name")
-            party_email = party.get("email")
-            if not party_id or not party_email:
+            if not party.get("id") or not party.get("email"):
                 continue
+            party_entry = next((p for p in tracking.get("parties", []) if p.get("id") == party["id"]), None)
+            if party_entry and party_entry.get("status", {}).get("signed") is not True:
+                return party
+        return None
 
-            party_entry = next((p for p in tracking.get("parties", []) if p.get("id") == party_id), None)
-            if not party_entry:
-                continue
+    @staticmethod
+    async def prepare_reminder(document_id: str, tracking_id: str, email: str, user_email: str) -> Dict[str, Any]:
+        """
+        Everything a reminder digest needs for one tracking, without sending anything: the
+        next unsigned party and a fresh signing link. Returns {"skipped": status} when the
+        tracking is already in a terminal state.
+        """
+        tracking_service = TrackingService(email)
+        email_response, parties, remainder, tracking, validityDate = await asyncio.to_thread(
+            tracking_service.get_tracking_fields, document_id, tracking_id
+        )
+        status = tracking.get("tracking_status", {}).get("status")
+        if status in ["completed", "expired", "declined", "cancelled"]:
+            return {"skipped": status}
+        if not email_response or not validityDate:
+            raise HTTPException(status_code=400, detail="Missing email response or validity date in metadata")
 
-            # ✅ Skip signed parties
-            if party_entry.get("status", {}).get("signed") is True:
-                continue
+        party = SignatureHandler._first_unsigned_party(parties, tracking)
+        if not party:
+            raise HTTPException(status_code=400, detail="No eligible unsigned party to resend")
 
-            # ✅ First unsigned party found → send reminder
-            try:
-                GlobalAuditService.log_document_action(
-                    email=email,
-                    document_id=document_id,
-                    action="RESEND_LINK",
-                    actor={"email": email},
-                    targets=[{"email": party_email, "party_id": party_id}],
-                    metadata={"tracking_id": tracking_id}
-                )
+        GlobalAuditService.log_document_action(
+            email=email,
+            document_id=document_id,
+            action="RESEND_LINK",
+            actor={"email": email},
+            targets=[{"email": party["email"], "party_id": party["id"]}],
+            metadata={"tracking_id": tracking_id}
+        )
+        token_data = await create_signature_token(
+            sent_email=party["email"],
+            tracking_id=tracking_id,
+            party_id=party["id"],
+            email=user_email,
+            document_id=document_id,
+            validity_date_str=validityDate,
+            remainder_days=remainder
+        )
+        document_url = (f"{email_service.base_url}/signing?document_id={document_id}&tracking_id={tracking_id}"
+                        f"&party_id={party['id']}&token={token_data['token']}")
+        return {
+            "document_id": document_id,
+            "tracking_id": tracking_id,
+            "party_id": party["id"],
+            "party_name": party.get("name"),
+            "recipient_email": party["email"],
+            "document_url": document_url,
+            "token": token_data["token"],
+            "validity_datetime": token_data["validity_datetime"],
+            "document_name": await asyncio.to_thread(get_document_name, email, document_id),
+            "email_response": [EmailResponse(**e) if isinstance(e, dict) else e for e in email_response],
+            "holder": tracking.get("holder", {}),
+            "cc_emails": tracking.get("cc_emails"),
+        }
 
-                token_data = await create_signature_token(
-                    sent_email=party_email,
-                    tracking_id=tracking_id,
-                    party_id=party_id,
-                    email=user_email,
-                    document_id=document_id,
-                    validity_date_str=validityDate,
-                    remainder_days=remainder
-                )
-                token = token_data["token"]
-                validity_datetime = token_data["validity_datetime"]
-                holder = tracking.get("holder", {})
-
-                await email_service.send_link(
-                    reply_name=holder.get("name"),
-                    reply_email=holder.get("email"),
-                    recipient_email=party_email,
-                    document_id=document_id,
-                    tracking_id=tracking_id,
-                    party_id=party_id,
-                    party_name=party_name,
-                    token=token,
-                    email_response=email_response,
-                    validity_datetime=validity_datetime,
-                    cc_emails=tracking.get("cc_emails")
-                )
+    @staticmethod
+    async def record_reminder(email: str, item: Dict[str, Any]):
+        """Log a reminder prepared by prepare_reminder once its email has been queued."""
+        client_info = ClientInfo(
+            ip="System", browser="System", os="System", device="System", city="System",
+            region="System", country="System", timestamp="System", timezone="System"
+        )
+        await document_tracking_manager.log_action(
+            email=email,
+            document_id=item["document_id"],
+            tracking_id=item["tracking_id"],
+            action="REMAINDER",
+            data=client_info,
+            party_id=item["party_id"],
+        )
 
-                # Log remainder action
-                client_info = ClientInfo(
-                    ip="System",
-                    browser="System",
-                    os="System",
-                    device="System",
-                    city="System",
-                    region="System",
-                    country="System",
-                    timestamp="System",
-                    timezone="System"
-                )
-                await document_tracking_manager.log_action(
-                    email=email,
-                    document_id=document_id,
-                    tracking_id=tracking_id,
-                    action="REMAINDER",
-                    data=client_info,
-                    party_id=party_id,
-                )
+    @staticmethod
+    async def get_party_initiate_remainder(document_id: str, user_email: str, email: str,
+                                           email_response: List[EmailResponse],
+                                           parties: List[Dict[str, Any]], remainder: int,
+                                           tracking: Dict[str, Any],
+                                           tracking_id: str, validityDate: str) -> str:
+        party = SignatureHandler._first_unsigned_party(parties, tracking)
+        if not party:
+            raise HTTPException(status_code=400, detail="No eligible unsigned party to resend")
+        party_id = party.get("id")
+        party_name = party.get("name")
+        party_email = party.get("email")
+
+        # ✅ First unsigned party found → send reminder
+        try:
+            GlobalAuditService.log_document_action(
+                email=email,
+                document_id=document_id,
+                action="RESEND_LINK",
+                actor={"email": email},
+                targets=[{"email": party_email, "party_id": party_id}],
+                metadata={"tracking_id": tracking_id}
+            )
 
-                return validityDate
+            token_data = await create_signature_token(
+                sent_email=party_email,
+                tracking_id=tracking_id,
+                party_id=party_id,
+                email=user_email,
+                document_id=document_id,
+                validity_date_str=validityDate,
+                remainder_days=remainder
+            )
+            token = token_data["token"]
+            validity_datetime = token_data["validity_datetime"]
+            holder = tracking.get("holder", {})
 
-            except Exception as e:
-                logger.exception(f"Failed to resend to party_id={party_id}: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Resend failed for party: {party_id}")
+            await email_service.send_link(
+                reply_name=holder.get("name"),
+                reply_email=holder.get("email"),
+                recipient_email=party_email,
+                document_id=document_id,
+                tracking_id=tracking_id,
+                party_id=party_id,
+                party_name=party_name,
+                token=token,
+                email_response=email_response,
+                validity_datetime=validity_datetime,
+                cc_emails=tracking.get("cc_emails")
+            )
 
-        raise HTTPException(status_code=400, detail="No eligible unsigned party to resend")
+            # Log remainder action
+            client_info = ClientInfo(
+                ip="System",
+                browser="System",
+                os="System",
+                device="System",
+                city="System",
+                region="System",
+                country="System",
+                timestamp="System",
+                timezone="System"
+            )
+            await document_tracking_manager.log_action(
+                email=email,
+                document_id=document_id,
+                tracking_id=tracking_id,
+                action="REMAINDER",
+                data=client_info,
+                party_id=party_id,
+            )
+
+            return validityDate
+
+        except Exception as e:
+            logger.exception(f"Failed to resend to party_id={party_id}: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Resend failed for party: {party_id}")
 
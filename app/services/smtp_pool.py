@@ -0,0 +1,153 @@
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from config import config
+from utils.logger import logger
+
+SMTP_CONNECT_TIMEOUT = 30
+# Reused sessions idle for longer than this get a NOOP before use
+SMTP_HEALTHCHECK_AFTER = 10
+# Providers cap messages per session; recycle well before the usual limits
+SMTP_MAX_MESSAGES_PER_CONNECTION = 100
+
+
+class _PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.messages = 0
+
+
+class SMTPConnectionPool:
+    """
+    Authenticated SMTP sessions kept open between messages, so the TLS handshake and
+    AUTH are paid once per connection instead of once per email. At most `size`
+    sessions exist at a time; callers beyond that wait for a free one. Sessions idle
+    past `idle_timeout`, that fail a NOOP, or that error mid-send are closed and
+    replaced.
+    """
+
+    def __init__(self, host: str, port: int, username: Optional[str], password: Optional[str],
+                 size: int = config.MAIL_POOL_SIZE, idle_timeout: int = config.MAIL_POOL_IDLE_TIMEOUT,
+                 starttls: bool = config.MAIL_STARTTLS):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.idle_timeout = idle_timeout
+        self.starttls = starttls
+        self._idle: List[_PooledConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> _PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=SMTP_CONNECT_TIMEOUT)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            self._close(smtp)
+            raise
+        logger.debug(f"[smtp] Opened connection to {self.host}:{self.port}")
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    def _close(smtp: smtplib.SMTP):
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    @staticmethod
+    def _alive(conn: _PooledConnection) -> bool:
+        try:
+            return conn.smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _checkout(self) -> Optional[_PooledConnection]:
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                # Most recently used first: the likeliest to still be open
+                conn = self._idle.pop()
+            idle_for = now - conn.last_used
+            if idle_for > self.idle_timeout:
+                self._close(conn.smtp)
+                continue
+            if idle_for > SMTP_HEALTHCHECK_AFTER and not self._alive(conn):
+                conn.smtp.close()
+                continue
+            return conn
+
+    def _checkin(self, conn: _PooledConnection):
+        conn.messages += 1
+        conn.last_used = time.monotonic()
+        if conn.messages >= SMTP_MAX_MESSAGES_PER_CONNECTION:
+            self._close(conn.smtp)
+            return
+        with self._lock:
+            self._idle.append(conn)
+
+    @contextmanager
+    def connection(self):
+        """Yield (smtp, reused). The session goes back to the pool only if the block succeeds."""
+        with self._slots:
+            conn = self._checkout()
+            reused = conn is not None
+            if conn is None:
+                conn = self._connect()
+            try:
+                yield conn.smtp, reused
+            except Exception:
+                conn.smtp.close()
+                raise
+            self._checkin(conn)
+
+    def sendmail(self, sender: str, recipients: List[str], message: str) -> Dict[str, Tuple[int, bytes]]:
+        reused = False
+        try:
+            with self.connection() as (smtp, reused):
+                return smtp.sendmail(sender, recipients, message)
+        except smtplib.SMTPServerDisconnected:
+            if not reused:
+                raise
+        # The server dropped a pooled session between our health check and the send
+        logger.info(f"[smtp] Pooled connection to {self.host} was closed by the server, retrying")
+        with self.connection() as (smtp, _):
+            return smtp.sendmail(sender, recipients, message)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn.smtp)
+
+
+_pools: Dict[Tuple[str, int, Optional[str]], SMTPConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_smtp_pool(host: str, port: int, username: Optional[str], password: Optional[str]) -> SMTPConnectionPool:
+    """Process-wide pool per (server, port, account)."""
+    key = (host, port, username)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SMTPConnectionPool(host, port, username, password)
+        return pool
+
+
+def close_smtp_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
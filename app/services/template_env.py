@@ -0,0 +1,69 @@
+import os
+import re
+from functools import lru_cache
+from typing import Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from config import config
+from utils.logger import logger
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+BRANDING_CACHE_SIZE = 512
+
+# Per-message values are rendered as these markers, then substituted into the cached fragment
+_SLOT = "\x00slot:{}\x00"
+_SLOT_PATTERN = re.compile("\x00slot:(\\w+)\x00")
+
+
+def _bytecode_cache():
+    try:
+        os.makedirs(config.JINJA_CACHE_DIR, exist_ok=True)
+        return FileSystemBytecodeCache(config.JINJA_CACHE_DIR)
+    except OSError as e:
+        logger.warning(f"[templates] Bytecode cache disabled, {config.JINJA_CACHE_DIR} is not writable: {e}")
+        return None
+
+
+# One environment for the whole process. Compiled templates are kept in memory and
+# their bytecode on disk, so a restart does not re-parse them either. Template files
+# are only re-checked for changes in development.
+template_env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    bytecode_cache=_bytecode_cache(),
+    auto_reload=config.ENV == "dev",
+)
+
+
+def _render_fragment(template_name: str, theme: str, org: str, slots: Tuple[str, ...]) -> Tuple[str, ...]:
+    html = template_env.get_template(template_name).render(
+        theme=theme, org=org, **{slot: _SLOT.format(slot) for slot in slots}
+    )
+    # Alternating literal HTML and slot names: (html, name, html, name, ..., html)
+    return tuple(_SLOT_PATTERN.split(html))
+
+
+_cached_fragment = lru_cache(maxsize=BRANDING_CACHE_SIZE)(_render_fragment)
+
+
+def render_branded(template_name: str, theme: str, org: str, **values) -> str:
+    """
+    Render a tenant-branded template. The template is rendered once per
+    (template, theme, org) with the remaining variables left as slots, so
+    each further email only substitutes `values` into the cached fragment.
+    Per-message variables must be printed as-is in the template (no filters
+    other than `safe`, no conditions on them).
+    """
+    slots = tuple(sorted(values))
+    if template_env.auto_reload:
+        parts = _render_fragment(template_name, theme, org, slots)
+    else:
+        parts = _cached_fragment(template_name, theme, org, slots)
+
+    rendered = list(parts)
+    rendered[1::2] = [str(values[name]) for name in parts[1::2]]
+    return "".join(rendered)
+
+
+def clear_branding_cache():
+    _cached_fragment.cache_clear()
@@ -0,0 +1,431 @@
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import secrets
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from auth_app.app.database.connection import db
+from config import config
+from utils.logger import logger
+
+webhook_subscriptions = db["webhook_subscriptions"]
+webhook_deliveries = db["webhook_deliveries"]
+
+WEBHOOK_EVENTS = {
+    "document.sent",
+    "document.viewed",
+    "document.signed",
+    "document.completed",
+    "document.declined",
+    "document.cancelled",
+    "document.expired",
+    "form.submitted",
+}
+ALL_EVENTS = "*"
+
+# Delivery states
+PENDING = "pending"
+SENDING = "sending"
+DELIVERED = "delivered"
+DEAD = "dead"
+
+WEBHOOK_MAX_ATTEMPTS = 8
+WEBHOOK_RETRY_BASE_DELAY = 30  # seconds, doubled on every failed attempt
+WEBHOOK_RETRY_MAX_DELAY = 6 * 3600
+WEBHOOK_TIMEOUT = 10
+WEBHOOK_WORKERS = 16
+WEBHOOK_BATCH_SIZE = 200
+WEBHOOK_LOG_RETENTION_DAYS = 30
+LEASE_SECONDS = 120
+MAX_SUBSCRIPTIONS = 20
+
+# Carrier-grade NAT space, not covered by ip_address.is_private
+_SHARED_ADDRESS_SPACE = ipaddress.ip_network("100.64.0.0/10")
+
+_http: Optional[httpx.AsyncClient] = None
+_workers: Optional[asyncio.Semaphore] = None
+
+# Strong references so in-flight deliveries are not garbage collected
+_background_tasks = set()
+
+
+def _spawn(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def _is_public(address) -> bool:
+    if address.version == 6 and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return not (
+        address.is_private or address.is_loopback or address.is_link_local or address.is_reserved
+        or address.is_unspecified or address.is_multicast
+        or (address.version == 4 and address in _SHARED_ADDRESS_SPACE)
+    )
+
+
+async def _resolve_public(host: str, port: int) -> str:
+    """
+    An address of `host` that is safe to connect to. Hosts resolving to any internal
+    address are refused outright, so a name with one public and one private record
+    cannot be used to reach the internal network.
+    """
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise ValueError(f"Cannot resolve {host}: {e}")
+    addresses = [ipaddress.ip_address(info[4][0].split("%")[0]) for info in infos]
+    if not addresses or not all(_is_public(address) for address in addresses):
+        raise ValueError(f"{host} does not resolve to a public address")
+    return str(addresses[0])
+
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    """Signature receivers recompute over "<X-Webhook-Timestamp>.<raw body>" to verify a delivery."""
+    digest = hmac.new(secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+class WebhookService:
+    """
+    Per-tenant webhook subscriptions for document and form lifecycle events, so
+    integrations get pushed updates instead of polling the status endpoints.
+    Emitting an event queues one delivery per matching subscription in Mongo; background
+    workers POST it signed with the subscription secret (HMAC-SHA256) and retry with
+    exponential backoff. Deliveries double as the delivery log and expire after
+    WEBHOOK_LOG_RETENTION_DAYS.
+    """
+
+    @staticmethod
+    async def ensure_indexes():
+        await webhook_subscriptions.create_index("subscription_id", unique=True)
+        await webhook_subscriptions.create_index([("owner", 1), ("active", 1), ("events", 1)])
+        await webhook_deliveries.create_index("delivery_id", unique=True)
+        await webhook_deliveries.create_index([("state", 1), ("next_attempt_at", 1)])
+        await webhook_deliveries.create_index([("owner", 1), ("subscription_id", 1), ("created_at", -1)])
+        await webhook_deliveries.create_index(
+            "created_at", expireAfterSeconds=WEBHOOK_LOG_RETENTION_DAYS * 24 * 3600
+        )
+
+    @staticmethod
+    def _client() -> httpx.AsyncClient:
+        global _http
+        if _http is None:
+            _http = httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT, follow_redirects=False)
+        return _http
+
+    @staticmethod
+    async def close():
+        global _http
+        if _http is not None:
+            await _http.aclose()
+            _http = None
+
+    @staticmethod
+    def _semaphore() -> asyncio.Semaphore:
+        global _workers
+        if _workers is None:
+            _workers = asyncio.Semaphore(WEBHOOK_WORKERS)
+        return _workers
+
+    # --- Subscriptions ---
+
+    @staticmethod
+    async def _validate(url: Optional[str] = None, events: Optional[List[str]] = None):
+        if url is not None:
+            parsed = urlparse(url)
+            if parsed.scheme != "https" and not (config.ENV == "dev" and parsed.scheme == "http"):
+                raise HTTPException(status_code=400, detail="Webhook URL must use https")
+            if not parsed.hostname:
+                raise HTTPException(status_code=400, detail="Webhook URL must be a public host")
+            if config.ENV != "dev":
+                try:
+                    await _resolve_public(parsed.hostname, parsed.port or 443)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=f"Webhook URL must be a public host ({e})")
+        if events is not None:
+            unknown = set(events) - WEBHOOK_EVENTS - {ALL_EVENTS}
+            if not events or unknown:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unknown webhook events: {sorted(unknown)}" if unknown else "No events given",
+                )
+
+    @staticmethod
+    def _public(subscription: dict) -> dict:
+        return {k: v for k, v in subscription.items() if k not in ("_id", "owner", "secret")}
+
+    @staticmethod
+    async def create_subscription(owner: str, url: str, events: List[str], description: Optional[str] = None) -> dict:
+        """Register an endpoint. The signing secret is only returned here and by rotate_secret."""
+        await WebhookService._validate(url, events)
+        if await webhook_subscriptions.count_documents({"owner": owner}) >= MAX_SUBSCRIPTIONS:
+            raise HTTPException(status_code=409, detail=f"At most {MAX_SUBSCRIPTIONS} webhooks per account")
+
+        now = datetime.now(timezone.utc)
+        subscription = {
+            "subscription_id": str(uuid.uuid4()),
+            "owner": owner,
+            "url": url,
+            "events": sorted(set(events)),
+            "description": description,
+            "secret": secrets.token_hex(32),
+            "active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await webhook_subscriptions.insert_one(subscription)
+        logger.info(f"[webhooks] {owner} subscribed {url} to {subscription['events']}")
+        return {**WebhookService._public(subscription), "secret": subscription["secret"]}
+
+    @staticmethod
+    async def list_subscriptions(owner: str) -> List[dict]:
+        cursor = webhook_subscriptions.find({"owner": owner}).sort("created_at", 1)
+        return [WebhookService._public(subscription) async for subscription in cursor]
+
+    @staticmethod
+    async def update_subscription(owner: str, subscription_id: str, changes: Dict) -> dict:
+        changes = {k: v for k, v in changes.items() if v is not None}
+        await WebhookService._validate(changes.get("url"), changes.get("events"))
+        if "events" in changes:
+            changes["events"] = sorted(set(changes["events"]))
+        subscription = await webhook_subscriptions.find_one_and_update(
+            {"owner": owner, "subscription_id": subscription_id},
+            {"$set": {**changes, "updated_at": datetime.now(timezone.utc)}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not subscription:
+            raise HTTPException(status_code=404, detail="Webhook not found")
+        return WebhookService._public(subscription)
+
+    @staticmethod
+    async def rotate_secret(owner: str, subscription_id: str) -> dict:
+        subscription = await webhook_subscriptions.find_one_and_update(
+            {"owner": owner, "subscription_id": subscription_id},
+            {"$set": {"secret": secrets.token_hex(32), "updated_at": datetime.now(timezone.utc)}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not subscription:
+            raise HTTPException(status_code=404, detail="Webhook not found")
+        return {**WebhookService._public(subscription), "secret": subscription["secret"]}
+
+    @staticmethod
+    async def delete_subscription(owner: str, subscription_id: str):
+        result = await webhook_subscriptions.delete_one({"owner": owner, "subscription_id": subscription_id})
+        if not result.deleted_count:
+            raise HTTPException(status_code=404, detail="Webhook not found")
+        now = datetime.now(timezone.utc)
+        await webhook_deliveries.update_many(
+            {"subscription_id": subscription_id, "state": {"$in": [PENDING, SENDING]}},
+            {"$set": {"state": DEAD, "last_error": "Webhook deleted", "locked_until": now, "updated_at": now}},
+        )
+
+    # --- Delivery ---
+
+    @staticmethod
+    async def emit(owner: str, event: str, data: dict, deliver_now: bool = True) -> int:
+        """
+        Queue `event` for every active subscription of the tenant that wants it. Never
+        raises: a failure to queue is logged and does not affect the action that emitted it.
+        Callers running outside the application's event loop (jobs run with asyncio.run)
+        pass deliver_now=False: delivery tasks spawned there would be cancelled with their
+        loop, so the deliveries are only queued and process_due sends them.
+        """
+        try:
+            subscriptions = await webhook_subscriptions.find(
+                {"owner": owner, "active": True, "events": {"$in": [event, ALL_EVENTS]}},
+                {"subscription_id": 1},
+            ).to_list(length=MAX_SUBSCRIPTIONS)
+            if not subscriptions:
+                return 0
+            now = datetime.now(timezone.utc)
+            deliveries = [
+                {
+                    "delivery_id": str(uuid.uuid4()),
+                    "subscription_id": subscription["subscription_id"],
+                    "owner": owner,
+                    "event": event,
+                    "data": data,
+                    "state": PENDING,
+                    "attempts": 0,
+                    "last_error": None,
+                    "last_status_code": None,
+                    "next_attempt_at": now,
+                    "locked_until": now,
+                    "created_at": now,
+                    "updated_at": now,
+                    "delivered_at": None,
+                }
+                for subscription in subscriptions
+            ]
+            await webhook_deliveries.insert_many(deliveries)
+        except Exception as e:
+            logger.error(f"[webhooks] Failed to queue {event} for {owner}: {e}")
+            return 0
+
+        if deliver_now:
+            for delivery in deliveries:
+                _spawn(WebhookService.deliver(delivery["delivery_id"]))
+        return len(deliveries)
+
+    @staticmethod
+    async def _claim(query: dict) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await webhook_deliveries.find_one_and_update(
+            {**query, "state": {"$in": [PENDING, SENDING]}, "next_attempt_at": {"$lte": now},
+             "locked_until": {"$lte": now}},
+            {"$set": {"state": SENDING, "locked_until": now + timedelta(seconds=LEASE_SECONDS), "updated_at": now}},
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @staticmethod
+    async def deliver(delivery_id: str):
+        delivery = await WebhookService._claim({"delivery_id": delivery_id})
+        if delivery:
+            await WebhookService._send(delivery)
+
+    @staticmethod
+    async def process_due():
+        """Worker loop run by the scheduler: deliver retries that are due and deliveries orphaned by a restart."""
+        running = set()
+        for _ in range(WEBHOOK_BATCH_SIZE):
+            delivery = await WebhookService._claim({})
+            if not delivery:
+                break
+            running.add(asyncio.create_task(WebhookService._send(delivery)))
+        if running:
+            await asyncio.gather(*running)
+            logger.info(f"[webhooks] Worker pass handled {len(running)} due deliveries")
+
+    @staticmethod
+    async def _pinned(url: str) -> Tuple[httpx.URL, Dict[str, str], Dict[str, str]]:
+        """
+        The URL rewritten to an address vetted right now, with the Host header and TLS server
+        name of the original host. Resolving again per delivery, and connecting to exactly the
+        address that was checked, keeps DNS rebinding from pointing a webhook inside the network.
+        """
+        target = httpx.URL(url)
+        if config.ENV == "dev":
+            return target, {}, {}
+        address = await _resolve_public(target.host, target.port or 443)
+        return target.copy_with(host=address), {"Host": target.netloc.decode("ascii")}, {"sni_hostname": target.host}
+
+    @staticmethod
+    async def _send(delivery: dict):
+        subscription = await webhook_subscriptions.find_one({"subscription_id": delivery["subscription_id"]})
+        if not subscription or not subscription.get("active"):
+            now = datetime.now(timezone.utc)
+            await webhook_deliveries.update_one(
+                {"delivery_id": delivery["delivery_id"]},
+                {"$set": {"state": DEAD, "last_error": "Webhook deleted or disabled", "locked_until": now,
+                          "updated_at": now}},
+            )
+            return
+
+        body = json.dumps({
+            "id": delivery["delivery_id"],
+            "event": delivery["event"],
+            "created_at": delivery["created_at"].isoformat(),
+            "data": delivery["data"],
+        }, default=str).encode()
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            "X-Webhook-Id": delivery["delivery_id"],
+            "X-Webhook-Event": delivery["event"],
+            "X-Webhook-Timestamp": timestamp,
+            "X-Webhook-Signature": sign(subscription["secret"], timestamp, body),
+        }
+
+        status_code = None
+        async with WebhookService._semaphore():
+            try:
+                url, host_headers, extensions = await WebhookService._pinned(subscription["url"])
+                response = await WebhookService._client().post(
+                    url, content=body, headers={**headers, **host_headers}, extensions=extensions
+                )
+                status_code = response.status_code
+                if not response.is_success:
+                    raise RuntimeError(f"HTTP {status_code}")
+            except Exception as e:
+                await WebhookService._failed(delivery, e, status_code)
+                return
+
+        now = datetime.now(timezone.utc)
+        await webhook_deliveries.update_one(
+            {"delivery_id": delivery["delivery_id"]},
+            {"$set": {"state": DELIVERED, "delivered_at": now, "updated_at": now, "locked_until": now,
+                      "last_error": None, "last_status_code": status_code, "attempts": delivery["attempts"] + 1}},
+        )
+        logger.info(f"[webhooks] Delivered {delivery['event']} {delivery['delivery_id']} to {subscription['url']}")
+
+    @staticmethod
+    async def _failed(delivery: dict, error: Exception, status_code: Optional[int] = None):
+        attempts = delivery["attempts"] + 1
+        now = datetime.now(timezone.utc)
+        failure = {"attempts": attempts, "last_error": str(error) or type(error).__name__,
+                   "last_status_code": status_code, "locked_until": now, "updated_at": now}
+
+        if attempts >= WEBHOOK_MAX_ATTEMPTS:
+            await webhook_deliveries.update_one(
+                {"delivery_id": delivery["delivery_id"]}, {"$set": {**failure, "state": DEAD}}
+            )
+            logger.error(f"[webhooks] {delivery['event']} {delivery['delivery_id']} dead-lettered after "
+                         f"{attempts} attempts: {error}")
+            return
+
+        delay = min(WEBHOOK_RETRY_BASE_DELAY * (2 ** (attempts - 1)), WEBHOOK_RETRY_MAX_DELAY)
+        await webhook_deliveries.update_one(
+            {"delivery_id": delivery["delivery_id"]},
+            {"$set": {**failure, "state": PENDING, "next_attempt_at": now + timedelta(seconds=delay)}},
+        )
+        logger.warning(f"[webhooks] {delivery['event']} {delivery['delivery_id']} failed ({error}), "
+                       f"retry {attempts}/{WEBHOOK_MAX_ATTEMPTS - 1} in {delay}s")
+
+    # --- Delivery log ---
+
+    @staticmethod
+    def _status(delivery: dict) -> dict:
+        return {k: v for k, v in delivery.items() if k not in ("_id", "owner", "locked_until")}
+
+    @staticmethod
+    async def list_deliveries(owner: str, subscription_id: Optional[str] = None, state: Optional[str] = None,
+                              limit: int = 50) -> List[dict]:
+        query = {"owner": owner}
+        if subscription_id:
+            query["subscription_id"] = subscription_id
+        if state:
+            query["state"] = state
+        cursor = webhook_deliveries.find(query).sort("created_at", -1).limit(limit)
+        return [WebhookService._status(delivery) async for delivery in cursor]
+
+    @staticmethod
+    async def retry_dead(owner: str, delivery_id: str) -> dict:
+        now = datetime.now(timezone.utc)
+        delivery = await webhook_deliveries.find_one_and_update(
+            {"delivery_id": delivery_id, "owner": owner, "state": DEAD},
+            {"$set": {"state": PENDING, "attempts": 0, "next_attempt_at": now, "locked_until": now,
+                      "updated_at": now}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not delivery:
+            raise HTTPException(status_code=409, detail="Only dead-lettered deliveries can be retried")
+        _spawn(WebhookService.deliver(delivery_id))
+        return WebhookService._status(delivery)
+
+
+webhook_service = WebhookService()
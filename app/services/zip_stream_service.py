@@ -0,0 +1,117 @@
+import asyncio
+import io
+import time
+import zipfile
+from collections import deque
+from typing import AsyncIterator, Callable, Iterable, NamedTuple, Optional
+
+from starlette.responses import StreamingResponse
+
+from utils.logger import logger
+
+ZIP_PREFETCH = 4
+# Formats that are already compressed; deflating them again only burns CPU.
+STORED_EXTENSIONS = (".pdf", ".zip", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".docx", ".xlsx", ".pptx")
+
+
+class ZipEntry(NamedTuple):
+    name: str
+    load: Callable[[], Optional[bytes]]
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Unseekable write target for zipfile. Because it can't seek, zipfile writes data
+    descriptors after each entry instead of patching local headers, so everything
+    written can be handed to the client straight away.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStreamService:
+    """
+    Builds ZIP archives as a stream. Entries are loaded in worker threads, up to
+    ZIP_PREFETCH ahead of the one being written, and each entry is flushed to the
+    client as soon as it is compressed, so memory is bounded by the prefetch window
+    rather than the archive size. Entries whose loader returns None or raises are
+    skipped: once the response has started there is no way to report an error.
+    """
+
+    @staticmethod
+    def compress_type(name: str) -> int:
+        return zipfile.ZIP_STORED if name.lower().endswith(STORED_EXTENSIONS) else zipfile.ZIP_DEFLATED
+
+    @staticmethod
+    def _load(entry: ZipEntry) -> Optional[bytes]:
+        try:
+            return entry.load()
+        except Exception as e:
+            logger.error(f"[zip] Skipping {entry.name}: {e}")
+            return None
+
+    @staticmethod
+    def _write(zipf: zipfile.ZipFile, name: str, data: bytes):
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = ZipStreamService.compress_type(name)
+        info.external_attr = 0o644 << 16
+        zipf.writestr(info, data)
+
+    @staticmethod
+    async def stream(entries: Iterable[ZipEntry], prefetch: Optional[int] = None) -> AsyncIterator[bytes]:
+        sink = _ChunkSink()
+        zipf = zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED)
+        remaining = iter(entries)
+        pending = deque()
+
+        def schedule_next():
+            entry = next(remaining, None)
+            if entry is not None:
+                pending.append((entry, asyncio.create_task(asyncio.to_thread(ZipStreamService._load, entry))))
+
+        for _ in range(prefetch or ZIP_PREFETCH):
+            schedule_next()
+
+        written = 0
+        try:
+            while pending:
+                entry, task = pending.popleft()
+                data = await task
+                schedule_next()
+                if data is None:
+                    continue
+                await asyncio.to_thread(ZipStreamService._write, zipf, entry.name, data)
+                del data
+                written += 1
+                yield sink.drain()
+            zipf.close()
+            yield sink.drain()
+            logger.info(f"[zip] Streamed {written} entries")
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    @staticmethod
+    def response(entries: Iterable[ZipEntry], filename: str) -> StreamingResponse:
+        return StreamingResponse(
+            ZipStreamService.stream(entries),
+            media_type="application/zip",
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+
+
+zip_stream_service = ZipStreamService()
@@ -8,6 +8,7 @@ from auth_app.app.api.routes.deps import dynamic_permission_check, get_email_fro
 from auth_app.app.model.UserModel import generate_folder_id, FolderAssignment, FolderMapping
 
 from auth_app.app.schema.RoleSchema import RoleCreate
+from auth_app.app.services.permission_cache import permission_cache
 
 from auth_app.app.database.connection import db
 from config import config
@@ -71,6 +72,7 @@ async def create_org_role(role_data: RoleCreate, org: str = Depends(get_org_from
             }]
         })
 
+    permission_cache.invalidate(org)
     return {"msg": f"Role '{role_data.role_name}' created successfully"}
 
 
@@ -102,6 +104,7 @@ async def update_org_role(
         )
 
     await db.org_roles.update_one({"org_name": org}, {"$set": {"roles": org_doc["roles"]}})
+    permission_cache.invalidate(org)
     return {"msg": f"Role '{role_name}' updated successfully"}
 
 
@@ -150,6 +153,7 @@ async def delete_org_role(role_name: str, org: str = Depends(get_org_from_token)
 
     updated_roles = [r for r in org_doc["roles"] if r["role_name"] != role_name]
     await db.org_roles.update_one({"org_name": org}, {"$set": {"roles": updated_roles}})
+    permission_cache.invalidate(org)
     return {"msg": f"Role '{role_name}' deleted successfully"}
 
 
@@ -121,6 +121,7 @@ async def reassign_user_domain(request: UserDomainReassignRequest):
             {"email": user_email},
             {"$set": {"master_id": master_id, "parent_email": parent_email}}
         )
+        AuthService.invalidate_profile(user_email)
 
         # ✅ Step 4: Update/create encryption
         encryption_email = request.encryption_email or f"doculan@{new_domain}"
@@ -297,6 +298,7 @@ async def update_user_preferences(
     updated = await AuthService.update_user_preferences(user_id, preferences.dict(exclude_unset=True))
     if not updated:
         raise HTTPException(status_code=404, detail="User not found")
+    AuthService.invalidate_profile(current_user["email"])
 
     return {"message": "Preferences updated successfully"}
 
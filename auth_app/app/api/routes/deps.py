@@ -1,8 +1,8 @@
 from typing import List, Union
-import re
 from fastapi import Request, Depends
 from auth_app.app.database.connection import db, get_document_send_count_for_user_this_month, \
     get_document_send_history_for_user
+from auth_app.app.services.permission_cache import permission_cache
 from auth_app.app.utils.auth_utils import JWTBearer
 from auth_app.app.utils.subscription_plans import SUBSCRIPTION_PLANS
 from repositories.s3_repo import get_folder_size
@@ -181,61 +181,40 @@ def get_user_email_from_token(
 
 
 
-def path_pattern_to_regex(path_pattern: str) -> str:
+async def get_roles_from_token(payload: dict = Security(jwt_bearer)) -> List[str]:
     """
-    Converts FastAPI-style path pattern to regex.
-    Example: /users/{user_email} -> ^/users/[^/]+$
+    Roles used for authorization, resolved like get_current_user does (third-party token
+    roles win, then the roles stored on the user) but with a single projected lookup.
     """
-    pattern = re.sub(r"{[^}]+}", r"[^/]+", path_pattern)
-    return "^" + pattern + "$"
+    token_roles = payload.get("role") or payload.get("roles")
+    if isinstance(token_roles, str):
+        token_roles = [token_roles]
+    for third_party in ("third-party", "third-party-form"):
+        if token_roles and third_party in token_roles:
+            return [third_party]
+
+    email = payload.get("user_email") or payload.get("email")
+    if not email:
+        raise HTTPException(status_code=401, detail="Missing email in token")
+    try:
+        user = await db["users"].find_one({"email": email}, {"roles": 1, "role": 1})
+    except PyMongoError as db_err:
+        logger.error(f"MongoDB error while fetching user: {db_err}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Database query failed")
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    user_roles = user.get("roles") or user.get("role")
+    if isinstance(user_roles, str):
+        return [user_roles]
+    return user_roles if isinstance(user_roles, list) else []
+
 
 async def dynamic_permission_check(
     request: Request,
-    user=Depends(get_current_user),
+    user_roles: List[str] = Depends(get_roles_from_token),
     org: str = Depends(get_org_from_token),
 ):
-    method = request.method
-    path = request.url.path
-
-    # Normalize user roles → always a list
-    user_roles = user.get("roles") or user.get("role")
-    if isinstance(user_roles, str):
-        user_roles = [user_roles]
-    elif not isinstance(user_roles, list):
-        user_roles = []
-
-    logger.info(f"Resolved user roles: {user_roles}, org: {org or 'None'}")
-
-    allowed = False
-
-    # 1️⃣ Check org_roles if org is provided
-    if org:
-        org_doc = await db["org_roles"].find_one({"org_name": org})
-        if org_doc and "roles" in org_doc:
-            for role in org_doc["roles"]:
-                if role["role_name"] in user_roles:
-                    for perm in role.get("api_permissions", []):
-                        if perm.get("method", "").upper() != method.upper():
-                            continue
-                        regex = path_pattern_to_regex(perm.get("url", ""))
-                        if re.match(regex, path):
-                            allowed = True
-                            break
-                if allowed:
-                    break
-
-    # 2️⃣ Fallback to default_roles if not allowed (or org is None)
-    if not allowed:
-        async for role_doc in db["default_roles"].find({"role_name": {"$in": user_roles}}):
-            for perm in role_doc.get("api_permissions", []):
-                if perm.get("method", "").upper() != method.upper():
-                    continue
-                regex = path_pattern_to_regex(perm.get("url", ""))
-                if re.match(regex, path):
-                    allowed = True
-                    break
-            if allowed:
-                break
-
-    if not allowed:
+    if not await permission_cache.is_allowed(org, user_roles, request.method, request.url.path):
+        logger.info(f"Access denied for roles {user_roles}, org: {org or 'None'}: {request.method} {request.url.path}")
         raise HTTPException(status_code=403, detail="Access denied")
@@ -52,6 +52,8 @@ async def update_user(user_email: str, user_data: UserUpdate):
     updated = await UserCRUD.update_user_by_email(user_email, user_data)
     if not updated:
         raise HTTPException(status_code=404, detail="User not found or not updated")
+    from auth_app.app.services.auth_service import AuthService
+    AuthService.invalidate_profile(user_email)
     return {"message": "User updated successfully"}
 
 @router.delete("/{user_email}", dependencies=[Depends(dynamic_permission_check)])
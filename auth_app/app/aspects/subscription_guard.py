@@ -2,9 +2,9 @@ from fastapi import Depends, HTTPException, status
 from datetime import datetime
 
 from auth_app.app.services.subscription_service import (
-    has_feature, check_send_limit
+    has_feature, check_send_limit, get_monthly_send_limit
 )
-from auth_app.app.database.connection import increment_send_counter_for_user
+from auth_app.app.database.connection import increment_send_counter_for_user, reserve_sends_for_user
 from auth_app.app.api.routes.deps import get_email_from_token, get_user_email_from_token
 
 
@@ -25,6 +25,28 @@ async def enforce_send_document_policy(email: str = Depends(get_user_email_from_
     now = datetime.utcnow()
     await increment_send_counter_for_user(email, now.year, now.month)
 
+
+async def enforce_bulk_send_policy(email: str, count: int) -> tuple[int, int]:
+    """
+    A bulk send must fit in what is left of the monthly quota. All `count` sends are
+    reserved at once, so two bulk sends cannot both pass on the same remaining quota;
+    the job gives back the rows that fail. Returns the (year, month) charged.
+    """
+    if not await has_feature(email, "can_send_doc"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Your subscription does not allow sending documents."
+        )
+
+    now = datetime.utcnow()
+    limit = await get_monthly_send_limit(email)
+    if not await reserve_sends_for_user(email, now.year, now.month, count, limit):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"This bulk send needs {count} documents, more than are left in your monthly E-Sign limit."
+        )
+    return now.year, now.month
+
 # def enforce_send_document_policy_logic(email: str):
 #     if not has_feature(email, "can_send_doc"):
 #         raise HTTPException(status_code=403, detail="Your plan does not allow document sending.")
@@ -35,12 +35,26 @@ async def get_document_send_count_for_user_this_month(email: str) -> int:
     return record["send_count"] if record else 0
 
 
-async def increment_send_counter_for_user(email: str, year: int, month: int):
+async def increment_send_counter_for_user(email: str, year: int, month: int, count: int = 1):
     await usage_collection.update_one(
         {"email": email, "year": year, "month": month},
-        {"$inc": {"send_count": 1}},
+        {"$inc": {"send_count": count}},
         upsert=True
     )
+
+
+async def reserve_sends_for_user(email: str, year: int, month: int, count: int, limit: int | None) -> bool:
+    """
+    Add `count` sends to the month's usage in one conditional update, so concurrent
+    callers cannot together go over `limit` (None: unlimited). Returns False, and
+    counts nothing, when they do not fit.
+    """
+    period = {"email": email, "year": year, "month": month}
+    await usage_collection.update_one(period, {"$setOnInsert": {"send_count": 0}}, upsert=True)
+    if limit is not None:
+        period["send_count"] = {"$lte": limit - count}
+    result = await usage_collection.update_one(period, {"$inc": {"send_count": count}})
+    return result.modified_count == 1
 from datetime import datetime
 
 async def get_remaining_document_sends(email: str, plan_name: str) -> int | None:
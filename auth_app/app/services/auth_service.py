@@ -13,6 +13,7 @@ from auth_app.app.exceptions.custom_exceptions_user import DatabaseError, Domain
     RegistrationError, DomainAlreadyRegisteredError
 from auth_app.app.schema.AuthSchema import PreferencesOut
 from auth_app.app.schema.UserSchema import UserCreate, UserCreateAdmin, AdminUserCreate
+from auth_app.app.services.profile_service import profile_service
 from auth_app.app.services.stripe_service import StripeService
 from auth_app.app.utils import security
 from auth_app.app.utils.security import create_refresh_token
@@ -181,54 +182,22 @@ class AuthService:
             ) from e
 
     @staticmethod
-    async def get_domain_by_user_email(user_email: str):
-        users_col = db["users"]
-        master_col = db["master"]
-
-        # Find the user first
-        user = await users_col.find_one({"email": user_email})
-        if not user:
+    async def get_domain_by_user_email(user_email: str, fresh: bool = False):
+        profile = await profile_service.get_profile(user_email, fresh=fresh)
+        if not profile:
             raise ValueError("User not found")
-
-        master_id = user.get("master_id")
-        if master_id:
-            logger.info(master_id)
-            # Get domain_name from master collection
-            master_id = ObjectId(master_id)
-            master_doc = await master_col.find_one({"_id": master_id})
-            if not master_doc:
-                raise ValueError("Master document not found")
-
-            domain_name = master_doc.get("domain_name")
-        else:
-            domain_name = user.get("parent_email")
-
-        return domain_name
+        if profile.master_missing:
+            raise ValueError("Master document not found")
+        return profile.domain_name
 
     @staticmethod
-    async def get_check_domain_by_user_email(user_email: str):
-        users_col = db["users"]
-        master_col = db["master"]
-
-        # Find the user first
-        user = await users_col.find_one({"email": user_email})
-        if not user:
+    async def get_check_domain_by_user_email(user_email: str, fresh: bool = False):
+        profile = await profile_service.get_profile(user_email, fresh=fresh)
+        if not profile:
             raise ValueError("User not found")
-
-        master_id = user.get("master_id")
-        if master_id:
-            logger.info(master_id)
-            # Get domain_name from master collection
-            master_id = ObjectId(master_id)
-            master_doc = await master_col.find_one({"_id": master_id})
-            if not master_doc:
-                raise ValueError("Master document not found")
-
-            domain_name = master_doc.get("domain_name")
-        else:
-            domain_name = None
-
-        return domain_name
+        if profile.master_missing:
+            raise ValueError("Master document not found")
+        return profile.master_domain
 
     @staticmethod
     def get_user_name_by_email(email: str) -> Optional[str]:
@@ -295,8 +264,9 @@ class AuthService:
                 {"_id": user["_id"]},
                 {"$set": {"subscription_status": subscription_status}}
             )
-        domain_name = await auth_service.get_domain_by_user_email(user_email)
-        org  = await auth_service.get_check_domain_by_user_email(user_email)
+        # Read past the profile cache: a domain change made on another worker must reach new tokens at once
+        domain_name = await auth_service.get_domain_by_user_email(user_email, fresh=True)
+        org  = await auth_service.get_check_domain_by_user_email(user_email, fresh=True)
         token_data = {
             "sub":user_email,
             "id": user_id,
@@ -348,40 +318,24 @@ class AuthService:
         )
         return update_result.modified_count > 0
 
+    @staticmethod
+    def invalidate_profile(email: str):
+        """Forget the cached branding, domain and preferences of `email` after its settings change."""
+        profile_service.invalidate(email)
+
     @staticmethod
     async def get_preferences_by_email(email: str) -> PreferencesOut:
-        user = await db["users"].find_one({"email": email}, {"preferences": 1})
-        if not user or "preferences" not in user:
+        profile = await profile_service.get_profile(email)
+        if not profile:
             return PreferencesOut()
-
-        prefs = user["preferences"]
-        return PreferencesOut(
-            dateFormat=prefs.get("dateFormat"),
-            timeFormat=prefs.get("timeFormat"),
-            timezone=prefs.get("timezone"),
-        )
+        return profile.preferences
 
     @staticmethod
     async def get_logo_and_theme(email: str) -> Optional[Dict[str, str]]:
-        users = db["users"]
-        user = await users.find_one(
-            {"email": email},
-            {"_id": 0, "logo": 1, "theme": 1, "organization": 1, "extra": 1}
-        )
-
-        if not user:
+        profile = await profile_service.get_profile(email)
+        if not profile:
             return None
-
-        # Priority: top-level > inside 'extra'
-        logo = user.get("logo") or user.get("extra", {}).get("logo")
-        theme = user.get("theme") or user.get("extra", {}).get("theme")
-        organization = user.get("organization") or user.get("extra", {}).get("organization")
-
-        return {
-            "logo": logo or "images/virtualan_logo.png",
-            "theme": theme or "#001f3f",
-            "organization": organization or "Doculan"
-        }
+        return profile.branding
 
     @staticmethod
     async def get_domain_if_master(email: str) -> Union[str, bool]:
@@ -0,0 +1,180 @@
+import asyncio
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from auth_app.app.database.connection import db
+from utils.logger import logger
+
+RBAC_INVALIDATION_CHANNEL = "rbac:invalidate"
+# Invalidate everything: default roles changed, or messages may have been missed
+ALL_ORGS = "*"
+# Upper bound on staleness should an invalidation message be lost
+RBAC_CACHE_TTL = 300
+
+
+class _Node:
+    __slots__ = ("children", "param", "patterns", "terminal")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        self.patterns: List[Tuple[re.Pattern, "_Node"]] = []
+        self.terminal = False
+
+
+class RouteTrie:
+    """
+    Permission URLs of one role, by method then path segment. A `{param}` segment
+    matches any non-empty segment; segments mixing text and parameters (`{id}.pdf`)
+    keep a small per-segment regex.
+    """
+
+    def __init__(self, permissions: Iterable[dict] = ()):
+        self._methods: Dict[str, _Node] = {}
+        for perm in permissions:
+            self.add(perm.get("method", ""), perm.get("url", ""))
+
+    def add(self, method: str, url: str):
+        node = self._methods.setdefault(method.upper(), _Node())
+        for segment in url.split("/"):
+            if "{" not in segment:
+                node = node.children.setdefault(segment, _Node())
+            elif re.fullmatch(r"{[^}]+}", segment):
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+            else:
+                pattern = re.compile("^" + re.sub(r"{[^}]+}", r"[^/]+", segment) + "$")
+                child = next((n for p, n in node.patterns if p.pattern == pattern.pattern), None)
+                if child is None:
+                    child = _Node()
+                    node.patterns.append((pattern, child))
+                node = child
+        node.terminal = True
+
+    def match(self, method: str, path: str) -> bool:
+        node = self._methods.get(method.upper())
+        return node is not None and self._match(node, path.split("/"), 0)
+
+    def _match(self, node: _Node, segments: List[str], index: int) -> bool:
+        if index == len(segments):
+            return node.terminal
+        segment = segments[index]
+        child = node.children.get(segment)
+        if child is not None and self._match(child, segments, index + 1):
+            return True
+        if not segment:
+            return False
+        if node.param is not None and self._match(node.param, segments, index + 1):
+            return True
+        return any(
+            pattern.match(segment) and self._match(child, segments, index + 1) for pattern, child in node.patterns
+        )
+
+
+class PermissionCache:
+    """
+    Role permissions compiled into one RouteTrie per (org, role), so authorizing a request
+    is an in-process lookup instead of reading org_roles/default_roles and compiling a regex
+    per permission. Role create/update/delete invalidates the org here and, through Redis
+    pub/sub, in every other process; entries also expire after RBAC_CACHE_TTL.
+    """
+
+    _default: Optional[Tuple[float, Dict[str, RouteTrie]]] = None
+    _orgs: Dict[str, Tuple[float, Dict[str, RouteTrie]]] = {}
+    # Bumped on every invalidation so a load that raced with one is not cached
+    _generation = 0
+
+    @staticmethod
+    def _fresh(entry) -> bool:
+        return entry is not None and time.monotonic() - entry[0] < RBAC_CACHE_TTL
+
+    @staticmethod
+    async def _default_roles() -> Dict[str, RouteTrie]:
+        entry = PermissionCache._default
+        if not PermissionCache._fresh(entry):
+            generation = PermissionCache._generation
+            roles = {}
+            async for role in db["default_roles"].find({}, {"role_name": 1, "api_permissions": 1}):
+                roles[role["role_name"]] = RouteTrie(role.get("api_permissions", []))
+            entry = (time.monotonic(), roles)
+            if generation == PermissionCache._generation:
+                PermissionCache._default = entry
+        return entry[1]
+
+    @staticmethod
+    async def _org_roles(org: str) -> Dict[str, RouteTrie]:
+        entry = PermissionCache._orgs.get(org)
+        if not PermissionCache._fresh(entry):
+            generation = PermissionCache._generation
+            org_doc = await db["org_roles"].find_one({"org_name": org}, {"roles.role_name": 1,
+                                                                         "roles.api_permissions": 1})
+            roles = {
+                role["role_name"]: RouteTrie(role.get("api_permissions", []))
+                for role in (org_doc or {}).get("roles", [])
+            }
+            entry = (time.monotonic(), roles)
+            if generation == PermissionCache._generation:
+                PermissionCache._orgs[org] = entry
+        return entry[1]
+
+    @staticmethod
+    async def is_allowed(org: Optional[str], roles: List[str], method: str, path: str) -> bool:
+        """Whether any of the roles grants method + path; org roles are checked before default roles."""
+        if org:
+            org_roles = await PermissionCache._org_roles(org)
+            if any(role in org_roles and org_roles[role].match(method, path) for role in roles):
+                return True
+        default_roles = await PermissionCache._default_roles()
+        return any(role in default_roles and default_roles[role].match(method, path) for role in roles)
+
+    @staticmethod
+    def invalidate_local(org: Optional[str] = None):
+        PermissionCache._generation += 1
+        if not org or org == ALL_ORGS:
+            PermissionCache._default = None
+            PermissionCache._orgs.clear()
+        else:
+            PermissionCache._orgs.pop(org, None)
+
+    @staticmethod
+    def invalidate(org: Optional[str] = None):
+        """Drop the compiled roles of `org` (all of them when None) in every process."""
+        PermissionCache.invalidate_local(org)
+        try:
+            from database.redis_db import redis_client
+            redis_client.publish(RBAC_INVALIDATION_CHANNEL, org or ALL_ORGS)
+        except Exception as e:
+            logger.warning(f"[rbac] Failed to broadcast invalidation of {org or 'all roles'}: {e}")
+
+    @staticmethod
+    async def listen():
+        """Apply invalidations from other processes; runs for the lifetime of the app."""
+        while True:
+            pubsub = None
+            try:
+                from database.redis_db import get_async_redis_client
+                pubsub = get_async_redis_client().pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(RBAC_INVALIDATION_CHANNEL)
+                # Anything published while unsubscribed was missed
+                PermissionCache.invalidate_local()
+                while True:
+                    message = await pubsub.get_message(timeout=5.0)
+                    if message and message.get("type") == "message":
+                        org = message["data"]
+                        PermissionCache.invalidate_local(org.decode() if isinstance(org, bytes) else org)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[rbac] Invalidation listener failed, retrying: {e}")
+                await asyncio.sleep(5)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+
+permission_cache = PermissionCache()
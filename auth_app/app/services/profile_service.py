@@ -0,0 +1,136 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from auth_app.app.database.connection import db
+from auth_app.app.schema.AuthSchema import PreferencesOut
+from utils.logger import logger
+
+PROFILE_CACHE_TTL = 300  # seconds; also bounds staleness across workers
+PROFILE_CACHE_SIZE = 5000
+
+DEFAULT_LOGO = "images/virtualan_logo.png"
+DEFAULT_THEME = "#001f3f"
+DEFAULT_ORGANIZATION = "Doculan"
+
+_PROJECTION = {
+    "_id": 0, "logo": 1, "theme": 1, "organization": 1, "extra": 1,
+    "master_id": 1, "parent_email": 1, "preferences": 1,
+}
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    email: str
+    logo: str
+    theme: str
+    organization: str
+    # Master domain, or the parent email for users without a master
+    domain_name: Optional[str]
+    # Master domain only; None for users without a master
+    master_domain: Optional[str]
+    preferences: PreferencesOut = field(default_factory=PreferencesOut)
+    # master_id set but the master record is gone
+    master_missing: bool = False
+
+    @property
+    def branding(self) -> Dict[str, str]:
+        return {"logo": self.logo, "theme": self.theme, "organization": self.organization}
+
+
+_profiles: Dict[str, Tuple[float, UserProfile]] = {}
+_loading: Dict[str, asyncio.Future] = {}
+_generation = 0
+
+
+class ProfileService:
+    """
+    Branding, domain and date/time preferences of a user, loaded together and
+    cached for PROFILE_CACHE_TTL so emails and certificates built for many
+    recipients do not query Mongo for each one. The cache is per process;
+    settings updates invalidate it locally and the TTL bounds how long other
+    workers can serve the previous values.
+    """
+
+    @staticmethod
+    async def _load(email: str) -> Optional[UserProfile]:
+        user = await db["users"].find_one({"email": email}, _PROJECTION)
+        if not user:
+            return None
+
+        extra = user.get("extra") or {}
+        prefs = user.get("preferences") or {}
+        master_domain, master_missing = None, False
+        master_id = user.get("master_id")
+        if master_id:
+            try:
+                master = await db["master"].find_one({"_id": ObjectId(master_id)}, {"domain_name": 1})
+            except InvalidId:
+                master = None
+            master_domain = master.get("domain_name") if master else None
+            master_missing = master is None
+
+        return UserProfile(
+            email=email,
+            # Priority: top-level > inside 'extra'
+            logo=user.get("logo") or extra.get("logo") or DEFAULT_LOGO,
+            theme=user.get("theme") or extra.get("theme") or DEFAULT_THEME,
+            organization=user.get("organization") or extra.get("organization") or DEFAULT_ORGANIZATION,
+            domain_name=master_domain if master_id else user.get("parent_email"),
+            master_domain=master_domain,
+            preferences=PreferencesOut(
+                dateFormat=prefs.get("dateFormat"),
+                timeFormat=prefs.get("timeFormat"),
+                timezone=prefs.get("timezone"),
+            ),
+            master_missing=master_missing,
+        )
+
+    @staticmethod
+    async def get_profile(email: str, fresh: bool = False) -> Optional[UserProfile]:
+        """
+        Cached profile of `email`, or None if there is no such user (not cached, so new users
+        show up at once). `fresh` reads Mongo regardless of the cache, for values that must not
+        lag behind a change made through another worker, such as the domain put into tokens.
+        """
+        if fresh:
+            return await ProfileService._fill(email, _generation)
+
+        cached = _profiles.get(email)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        # Concurrent misses for the same user share one load
+        pending = _loading.get(email)
+        if pending is None:
+            pending = _loading[email] = asyncio.ensure_future(ProfileService._fill(email, _generation))
+            pending.add_done_callback(lambda _: _loading.pop(email, None))
+        return await asyncio.shield(pending)
+
+    @staticmethod
+    async def _fill(email: str, generation: int) -> Optional[UserProfile]:
+        profile = await ProfileService._load(email)
+        # Skip storing if the user's settings changed while we were reading them
+        if profile is not None and generation == _generation:
+            if len(_profiles) >= PROFILE_CACHE_SIZE:
+                _profiles.pop(next(iter(_profiles)))
+            _profiles[email] = (time.monotonic() + PROFILE_CACHE_TTL, profile)
+        return profile
+
+    @staticmethod
+    def invalidate(email: Optional[str] = None):
+        """Drop the cached profile of `email`, or every profile (e.g. after a domain change)."""
+        global _generation
+        _generation += 1
+        if email is None:
+            _profiles.clear()
+        else:
+            _profiles.pop(email, None)
+        logger.debug(f"[profile] Invalidated cached profile of {email or 'all users'}")
+
+
+profile_service = ProfileService()
@@ -36,4 +36,10 @@ async def check_send_limit(email: str) -> bool:
     current_usage = await get_document_send_count_for_user_this_month(email)  # FIXED: Added `await`
     return current_usage < limit
 
+async def get_monthly_send_limit(email: str) -> int | None:
+    """Monthly send limit of the user's plan; None when the plan is unlimited."""
+    plan_name = await get_subscription_status(email)
+    plan = SUBSCRIPTION_PLANS.get(plan_name.lower(), {})
+    return plan.get("limits", {}).get("monthly_send_limit", None)
+
 
@@ -154,7 +154,7 @@ async def create_signature_token(
         exp_timestamp = int(validity_date.timestamp())
         domain = await AuthService.get_parent_email_and_domain(email)
         parent_email = domain.get("parent_email")
-        domain_name = await AuthService.get_check_domain_by_user_email(email)
+        domain_name = await AuthService.get_check_domain_by_user_email(email, fresh=True)
 
         # -------------------------
         # JWT Payload
@@ -271,7 +271,7 @@ async def create_form_token(
         exp_timestamp = int(validity_date.timestamp())
         domain = await AuthService.get_parent_email_and_domain(email)
         parent_email = domain.get("parent_email")
-        domain_name = await AuthService.get_check_domain_by_user_email(email)
+        domain_name = await AuthService.get_check_domain_by_user_email(email, fresh=True)
 
         # -------------------------
         # JWT Payload
@@ -1,6 +1,7 @@
 import logging
 import os
 import sys
+import tempfile
 from typing import Optional
 
 from dotenv import load_dotenv
@@ -53,6 +54,8 @@ class Config():
     MONGO_DB : Optional[str] = os.getenv("MONGO_DB")
     AI_SERVICE_URL : Optional[str] = os.getenv("AI_SERVICE_URL")
     AI_API_KEY: Optional[str] = os.getenv("AI_API_KEY")
+    # Send the AI service extracted text (a "text" form field) instead of the PDF; only for AI service versions that accept it
+    AI_TEXT_INPUT: bool = os.getenv("AI_TEXT_INPUT", "false").lower() == "true"
     SECRET_KEY: Optional[str] = os.getenv("SECRET_KEY")
     AWS_ACCESS_KEY: Optional[str] = os.getenv("AWS_ACCESS_KEY")
     AWS_SECRET_KEY: Optional[str] = os.getenv("AWS_SECRET_KEY")
@@ -70,6 +73,12 @@ class Config():
     MAIL_SERVER: Optional[str] = os.getenv("MAIL_SERVER")
     MAIL_STARTTLS: bool = True
     MAIL_SSL_TLS: bool = False
+    MAIL_POOL_SIZE: int = int(os.getenv("MAIL_POOL_SIZE", 4))
+    MAIL_POOL_IDLE_TIMEOUT: int = int(os.getenv("MAIL_POOL_IDLE_TIMEOUT", 60))
+    # Minutes ahead to collect due reminders into one digest per signer; 0 sends them one by one
+    REMINDER_DIGEST_WINDOW: int = int(os.getenv("REMINDER_DIGEST_WINDOW", 0))
+    # Days an in-app notification is kept before it expires from the inbox
+    NOTIFICATION_RETENTION_DAYS: int = int(os.getenv("NOTIFICATION_RETENTION_DAYS", 90))
     STORAGE_TYPE: str = "s3"
     REDIS_HOST: Optional[str] = os.getenv("REDIS_HOST")
     REDIS_PORT: Optional[int] = int(os.getenv("REDIS_PORT", 6379))
@@ -100,6 +109,8 @@ class Config():
     DIGI_CERT_CA: Optional[str] = os.getenv("DIGI_CERT_CA")
     ACCESS_TOKEN_EXPIRE_MINUTES: Optional[int] = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
     REFRESH_TOKEN_EXPIRE_MINUTES: Optional[int] = os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES")
+    CERTIFICATE_RENDERER: str = os.getenv("CERTIFICATE_RENDERER", "fast")  # "fast" or "weasyprint"
+    JINJA_CACHE_DIR: str = os.getenv("JINJA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "doculan-jinja"))
 
     ENV: str = os.getenv("ENV")
     def __init__(self):
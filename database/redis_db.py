@@ -17,6 +17,21 @@ elif config.ENV=="prod":
     redis_client = sentinel.master_for(service_name=sentinel_service_name, socket_timeout=0.5)
 OTP_EXPIRY_SECONDS = 15 * 60  # 5 minutes
 
+_async_client = None
+
+
+def get_async_redis_client():
+    """Shared asyncio client, for pub/sub listeners that live on the event loop."""
+    global _async_client
+    if _async_client is None:
+        from redis import asyncio as aioredis
+        if config.ENV == "prod":
+            async_sentinel = aioredis.Sentinel([(sentinel_dns, sentinel_port)], socket_timeout=0.5)
+            _async_client = async_sentinel.master_for(service_name=sentinel_service_name)
+        else:
+            _async_client = aioredis.Redis(host=redis_host, port=redis_port, db=redis_db)
+    return _async_client
+
 
 
 # sentinel_dns = 'redis.internal.redis-app.com'  # Your DNS that resolves to all sentinel IPs
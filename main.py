@@ -11,12 +11,21 @@ import time
 
 from app.api.routes import (
     files_api, form_api, signature, template_api,
-    contacts_api, document_notification, ai_api, library_manager_api
+    contacts_api, document_notification, ai_api, library_manager_api, webhook_api
 )
 from app.middleware.middlewareLogger import LoggerMiddleware
+from app.services.audit_log_store import AUDIT_FLUSH_INTERVAL, audit_log_store
+from app.services.bulk_send_service import bulk_send_service
+from app.services.completion_service import completion_pipeline
+from app.services.email_outbox_service import email_outbox_service
+from app.services.notification_inbox_service import notification_inbox
+from app.services.reminder_digest_service import REMINDER_DIGEST_INTERVAL, reminder_digest
+from app.services.smtp_pool import close_smtp_pools
 from app.services.signature_service import SignatureHandler
+from app.services.webhook_service import webhook_service
 from auth_app.app.api.routes import auth_verify, columns, users, admin
 from auth_app.app.database.connection import db
+from auth_app.app.services.permission_cache import permission_cache
 from auth_app.app.repository.user import UserCRUD
 from auth_app.app.utils.default_roles import seed_admin_role_with_dynamic_routes, seed_roles
 from auth_app.app.utils.security import scheduler
@@ -126,6 +135,102 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Failed to add init_scheduler job: {e}", exc_info=True)
 
+    # Resume completion jobs interrupted by a restart and pick up due retries
+    try:
+        await completion_pipeline.ensure_indexes()
+        job = scheduler.add_job(
+            completion_pipeline.resume_pending,
+            trigger="interval",
+            minutes=1,
+            id="[Completion] - pipeline",
+            replace_existing=True,
+            next_run_time=datetime.now(timezone.utc),
+        )
+        log_next_run(job)
+    except Exception as e:
+        logger.error(f"❌ Failed to start completion pipeline: {e}", exc_info=True)
+
+    # Email outbox worker: due retries and messages orphaned by a restart
+    try:
+        await email_outbox_service.ensure_indexes()
+        job = scheduler.add_job(
+            email_outbox_service.process_due,
+            trigger="interval",
+            seconds=30,
+            id="[Outbox] - delivery",
+            replace_existing=True,
+            next_run_time=datetime.now(timezone.utc),
+        )
+        log_next_run(job)
+    except Exception as e:
+        logger.error(f"❌ Failed to start email outbox worker: {e}", exc_info=True)
+
+    # Webhook worker: due retries and deliveries orphaned by a restart
+    try:
+        await webhook_service.ensure_indexes()
+        job = scheduler.add_job(
+            webhook_service.process_due,
+            trigger="interval",
+            seconds=30,
+            id="[Webhooks] - delivery",
+            replace_existing=True,
+            next_run_time=datetime.now(timezone.utc),
+        )
+        log_next_run(job)
+    except Exception as e:
+        logger.error(f"❌ Failed to start webhook delivery worker: {e}", exc_info=True)
+
+    # Audit log: buffered entries are written to Mongo in batches
+    try:
+        await audit_log_store.ensure_indexes()
+        job = scheduler.add_job(
+            audit_log_store.flush,
+            trigger="interval",
+            seconds=AUDIT_FLUSH_INTERVAL,
+            id="[Audit] - flush",
+            replace_existing=True,
+            next_run_time=datetime.now(timezone.utc),
+        )
+        log_next_run(job)
+    except Exception as e:
+        logger.error(f"❌ Failed to start audit log flush job: {e}", exc_info=True)
+
+    # Notification inbox: unread, sync and retention (TTL) indexes
+    try:
+        await notification_inbox.ensure_indexes()
+    except Exception as e:
+        logger.error(f"❌ Failed to create notification inbox indexes: {e}", exc_info=True)
+
+    # Resume bulk sends interrupted by a restart from their last checkpoint
+    try:
+        await bulk_send_service.ensure_indexes()
+        job = scheduler.add_job(
+            bulk_send_service.resume_pending,
+            trigger="interval",
+            minutes=1,
+            id="[Bulk send] - resume",
+            replace_existing=True,
+            next_run_time=datetime.now(timezone.utc),
+        )
+        log_next_run(job)
+    except Exception as e:
+        logger.error(f"❌ Failed to start bulk send resume job: {e}", exc_info=True)
+
+    # Reminder digests: one email per signer for all reminders due within the window
+    if reminder_digest.enabled():
+        try:
+            job = scheduler.add_job(
+                reminder_digest.process_due,
+                trigger="interval",
+                minutes=REMINDER_DIGEST_INTERVAL,
+                id="[Reminder] - digest",
+                replace_existing=True,
+                next_run_time=datetime.now(timezone.utc),
+            )
+            log_next_run(job)
+        except Exception as e:
+            logger.error(f"❌ Failed to start reminder digest job: {e}", exc_info=True)
+
     # ✅ Schedule tracking expiry jobs
     try:
         active_emails = await UserCRUD.get_all_active_admin_emails()
@@ -164,18 +269,35 @@ async def lifespan(app: FastAPI):
 
         await seed_admin_role_with_dynamic_routes(db, app)
         await seed_roles(db)
+        # Other instances still hold the roles compiled before this deploy
+        permission_cache.invalidate()
         logger.info("✅ Dynamic routes and roles seeded successfully.")
 
     except Exception as e:
         logger.error(f"❌ Failed during route/role seeding: {e}", exc_info=True)
 
+    # RBAC: drop compiled role permissions when another instance changes a role
+    rbac_listener = asyncio.create_task(permission_cache.listen())
+
     yield
 
+    rbac_listener.cancel()
+
     # 🛑 Shutdown scheduler
     if scheduler.running:
         scheduler.shutdown(wait=False)
         logger.info("🛑 Scheduler shutdown complete.")
 
+    # Write audit entries still buffered
+    try:
+        await audit_log_store.flush()
+    except Exception as e:
+        logger.error(f"❌ Failed to flush audit log on shutdown: {e}", exc_info=True)
+
+    # Close pooled SMTP sessions
+    close_smtp_pools()
+    await webhook_service.close()
+
 
 def init_application() -> FastAPI:
     app = FastAPI(
@@ -197,6 +319,7 @@ def init_application() -> FastAPI:
     app.include_router(document_notification.router, tags=["Document Notification"])
     app.include_router(files_api.router, tags=["Files Operation"])
     app.include_router(contacts_api.router, tags=["Contact Manage"])
+    app.include_router(webhook_api.router, tags=["Webhooks"])
 
     # Middleware
     app.add_middleware(LoggerMiddleware)
@@ -33,6 +33,10 @@ class FormRepository:
     def update_trackings(email: str, form_id: str, party_email: str, new_entry: dict):
         return FormModel.send_form(email, form_id, party_email, new_entry)
 
+    @staticmethod
+    def update_trackings_batch(email: str, form_id: str, entries: dict):
+        return FormModel.send_form_batch(email, form_id, entries)
+
     @staticmethod
     def get_tracking(email: str, form_id: str, party_email: str):
         return FormModel.get_form_track(email, form_id, party_email)
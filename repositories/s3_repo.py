@@ -7,10 +7,9 @@ from auth_app.app.model.UserModel import FolderAssignment
 from config import config
 from database.db_config import s3_client, S3_user
 import pymupdf as fitz
-import requests
 from botocore.exceptions import ClientError, NoCredentialsError
 from fastapi import HTTPException
-import base64
+from utils.fitz_executor import run_fitz
 from utils.logger import logger
 from typing import Dict, Any
 from datetime import datetime, timezone
@@ -117,6 +116,14 @@ def save_tracking_metadata(email: str, document_id: str, tracking_id: str, track
         )
         logger.info(f"[save_tracking_metadata] Updated summary saved: {document_key}")
 
+        from app.services.event_stream_service import event_stream
+        event_stream.notify_document(email, document_id, "tracking_status", {
+            "document_id": document_id,
+            "tracking_id": tracking_id,
+            "status": current_status,
+            "updated_at": now,
+        })
+
     except Exception as e:
         logger.exception(f"Failed to save tracking metadata: {e}")
         raise HTTPException(status_code=500, detail="Failed to save tracking metadata")
@@ -301,6 +308,66 @@ def upload_meta_s3(email: str, doc_data: DocumentRequest, tracking_data: dict, d
         )
         raise HTTPException(status_code=500, detail="Failed to upload metadata")
 
+def upload_meta_batch_s3(email: str, document_id: str, trackings: List[dict]):
+    """
+    Bulk-send variant of upload_meta_s3 for freshly created trackings of one document:
+    tracking files are written in parallel without reading them first, and the
+    document summary is read, updated and written once for the whole batch.
+    """
+    document_key = f"{email}/{DOCUMENT_BASE_PATH}/{document_id}.json"
+    now = datetime.now(timezone.utc).isoformat()
+
+    try:
+        try:
+            existing_data = s3_client.get_object(Bucket=config.S3_BUCKET, Key=document_key)
+            doc_metadata = json.loads(existing_data['Body'].read().decode('utf-8'))
+            is_first_upload = False
+        except s3_client.exceptions.NoSuchKey:
+            doc_metadata = {"document_id": document_id, "trackings": {}}
+            is_first_upload = True
+
+        def put_tracking(tracking_data: dict):
+            tracking_data.setdefault("tracking_status", {"status": "in_progress", "dateTime": now})
+            s3_client.put_object(
+                Bucket=config.S3_BUCKET,
+                Key=f"{email}/{TRACKING_BASE_PATH}/{document_id}/{tracking_data['tracking_id']}.json",
+                Body=json.dumps(tracking_data),
+                ContentType="application/json",
+                ServerSideEncryption="aws:kms",
+                SSEKMSKeyId=config.KMS_KEY_ID
+            )
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            for future in as_completed([executor.submit(put_tracking, t) for t in trackings]):
+                future.result()
+
+        doc_metadata.setdefault("trackings", {})
+        for tracking_data in trackings:
+            doc_metadata["trackings"][tracking_data["tracking_id"]] = {
+                "status": tracking_data["tracking_status"]["status"],
+                "updated_at": now
+            }
+        if is_first_upload and trackings:
+            doc_metadata["defaults"] = {
+                "default_fields": trackings[0].get("fields", []),
+                "parties": trackings[0].get("parties", [])
+            }
+        doc_metadata["summary"] = generate_summary_from_trackings(doc_metadata["trackings"])
+
+        s3_client.put_object(
+            Bucket=config.S3_BUCKET,
+            Key=document_key,
+            Body=json.dumps(doc_metadata),
+            ContentType="application/json",
+            ServerSideEncryption="aws:kms",
+            SSEKMSKeyId=config.KMS_KEY_ID
+        )
+    except Exception as e:
+        logger.exception(
+            f"[upload_meta_batch_s3] Failed to upload {len(trackings)} trackings for document_id={document_id}: {str(e)}"
+        )
+        raise HTTPException(status_code=500, detail="Failed to upload metadata")
+
 def update_parties_tracking(email: str, document_id: str, tracking_id: str, parties: List[PartyUpdateItem]):
     tracking_key = f"{email}/{TRACKING_BASE_PATH}/{document_id}/{tracking_id}.json"
 
@@ -744,6 +811,15 @@ async def mark_expired_trackings(email: str):
                         save_tracking_metadata(email, document_id, tracking_id, tracking_data)
                         logger.info(f"[mark_expired_trackings] Tracking {tracking_id} marked as expired.")
                         updated = True
+                        from app.services.webhook_service import webhook_service
+                        await webhook_service.emit(email, "document.expired", {
+                            "document_id": document_id,
+                            "tracking_id": tracking_id,
+                            "status": "expired",
+                            "party": None,
+                            "reason": None,
+                            "occurred_at": now.isoformat(),
+                        }, deliver_now=False)  # runs under asyncio.run in a scheduler thread
                     except Exception as e:
                         logger.error(f"Failed to save expired tracking {tracking_id}: {e}")
 
@@ -1401,17 +1477,6 @@ async def rendered_sign_s3(email, document_id: str):
         cipher = AESCipher(encryption_email)
         meta = storage.get(cipher, email=email, document_id=document_id)
 
-        metadata_key = meta["metadata_path"]
-        metadata_url = s3_client.generate_presigned_url(
-            ClientMethod='get_object',
-            Params={'Bucket': config.S3_BUCKET, 'Key': metadata_key},
-            ExpiresIn=7 * 24 * 60 * 60
-        )
-
-        response = requests.get(metadata_url)
-        response.raise_for_status()
-        metadata = response.json()
-
         file_name = meta["fileName"]
         if not file_name:
             raise ValueError("fileName not found in metadata")
@@ -1419,23 +1484,19 @@ async def rendered_sign_s3(email, document_id: str):
         # Step 1: Fetch Encrypted PDF
         pdf_key = meta["file_path"]
         pdf_obj = s3_client.get_object(Bucket=config.S3_BUCKET, Key=pdf_key)
-        encrypted_pdf_bytes = pdf_obj['Body'].read()
 
-        # Step 2: Decrypt PDF
-        encryption_service = EncryptionService()
-        encryption_email = await encryption_service.resolve_encryption_email(email)
-        cipher = AESCipher(encryption_email)
-        decrypted_pdf_bytes = cipher.decrypt(encrypted_pdf_bytes)
+        # Step 2: Decrypt PDF (same cipher as the metadata above)
+        decrypted_pdf_bytes = cipher.decrypt(pdf_obj['Body'].read())
 
-        # Step 3: Render PDF using PyMuPDF
-        pdf_doc = fitz.open(stream=decrypted_pdf_bytes, filetype="pdf")
+        # Step 3: Render PDF using PyMuPDF (on the PyMuPDF thread, like all work on the document)
+        pdf_doc = await run_fitz(fitz.open, stream=decrypted_pdf_bytes, filetype="pdf")
         return pdf_doc, file_name
 
     except Exception as e:
         raise Exception(f"PDF rendering failed: {str(e)}")
 
-# 11. Upload a rendered signed PDF to S3 and return its base64 string
-async def render_sign_update(email, output_buffer, tracking_id, document_id):
+# 11. Upload a rendered signed PDF to S3 and return its bytes
+async def render_sign_update(email, output_buffer, tracking_id, document_id) -> bytes:
     encryption_service = EncryptionService()
     encryption_email = await encryption_service.resolve_encryption_email(email)
     cipher = AESCipher(encryption_email)
@@ -1448,9 +1509,7 @@ async def render_sign_update(email, output_buffer, tracking_id, document_id):
         ServerSideEncryption="aws:kms",
         SSEKMSKeyId=config.KMS_KEY_ID
     )
-    pdf_base64 = base64.b64encode(output_buffer).decode("utf-8")
-
-    return pdf_base64
+    return output_buffer
 
 async def get_signed(email: str, tracking_id: str, document_id: str):
     try:
@@ -1644,6 +1703,21 @@ def _list_objects(prefix: str) -> List[str]:
         return []
 
 
+def list_objects_with_etags(prefix: str) -> List[Dict[str, str]]:
+    """Like _list_objects, but keeps each object's ETag alongside its key."""
+    try:
+        paginator = s3_client.get_paginator("list_objects_v2")
+        pages = paginator.paginate(Bucket=config.S3_BUCKET, Prefix=prefix)
+        return [
+            {"Key": obj["Key"], "ETag": obj.get("ETag", "")}
+            for page in pages
+            for obj in page.get("Contents", [])
+        ]
+    except Exception as e:
+        logger.error(f"Error listing objects from S3: {e}")
+        return []
+
+
 def load_tracking_metadata_by_tracking_id(email: str, tracking_id: str) -> dict:
 
     prefix = f"{email}/{TRACKING_BASE_PATH}/"
@@ -3,7 +3,7 @@ from fastapi.testclient import TestClient
 from unittest.mock import patch, AsyncMock
 from fastapi import FastAPI, HTTPException
 from app.api.routes.ai_api import router
-from auth_app.app.api.routes.deps import dynamic_permission_check
+from auth_app.app.api.routes.deps import dynamic_permission_check, get_user_email_from_token
 from unittest.mock import MagicMock
 import sys
 
@@ -22,6 +22,7 @@ def client():
     app = FastAPI()
     # Override the permission dependency to always allow
     app.dependency_overrides[dynamic_permission_check] = lambda: True
+    app.dependency_overrides[get_user_email_from_token] = lambda: "user@x.com"
     app.include_router(router)
     return TestClient(app)
 
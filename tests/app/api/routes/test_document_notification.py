@@ -1,6 +1,6 @@
 
 import sys
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 import pytest
 
 # Patch the DB connection and any side-effectful imports before importing the API module
@@ -19,49 +19,58 @@ app.dependency_overrides[document_notification.dynamic_permission_check] = lambd
 
 client = TestClient(app)
 
-@patch('app.api.routes.document_notification.s3_download_json')
-@patch('app.api.routes.document_notification.s3_list_objects')
-def test_get_all_notifications_success(mock_list, mock_download):
-    mock_list.return_value = ["test@example.com/notifications/1.json", "test@example.com/notifications/2.json"]
-    def download_side_effect(key):
-        if key.endswith("1.json"):
-            return {"id": "1", "msg": "A"}
-        elif key.endswith("2.json"):
-            return {"id": "2", "msg": "B"}
-        return None
-    mock_download.side_effect = download_side_effect
+@patch('app.api.routes.document_notification.notification_inbox.list', new_callable=AsyncMock)
+def test_get_all_notifications_success(mock_list):
+    mock_list.return_value = [{"id": "1", "msg": "A"}, {"id": "2", "msg": "B"}]
     response = client.get('/notifications', headers={"Authorization": "Bearer testtoken"})
     assert response.status_code == 200
     assert len(response.json()) == 2
     assert response.json()[0]["id"] == "1"
 
-@patch('app.api.routes.document_notification.s3_list_objects')
+@patch('app.api.routes.document_notification.notification_inbox.list', new_callable=AsyncMock)
 def test_get_all_notifications_empty(mock_list):
     mock_list.return_value = []
     response = client.get('/notifications', headers={"Authorization": "Bearer testtoken"})
     assert response.status_code == 200
     assert response.json() == []
 
-@patch('app.api.routes.document_notification.s3_delete_object')
+@patch('app.api.routes.document_notification.notification_inbox.delete', new_callable=AsyncMock)
 def test_delete_notification_success(mock_delete):
-    mock_delete.return_value = None
+    mock_delete.return_value = 1
     response = client.delete('/notifications/123', headers={"Authorization": "Bearer testtoken"})
     assert response.status_code == 200
     assert response.json()["message"] == "Notification deleted"
 
-@patch('app.api.routes.document_notification.s3_download_json')
-def test_get_notification_success(mock_download):
-    def download_side_effect(key):
-        if key.endswith("123.json"):
-            return {"id": "123", "msg": "A"}
-        return None
-    mock_download.side_effect = download_side_effect
+@patch('app.api.routes.document_notification.notification_inbox.delete', new_callable=AsyncMock)
+def test_delete_all_notifications_is_not_taken_for_an_id(mock_delete):
+    mock_delete.return_value = 3
+    response = client.delete('/notifications/all', headers={"Authorization": "Bearer testtoken"})
+    assert response.json()["message"] == "Deleted 3 notifications"
+    assert len(mock_delete.call_args.args) == 2
+
+@patch('app.api.routes.document_notification.notification_inbox.get', new_callable=AsyncMock)
+def test_get_notification_success(mock_get):
+    mock_get.return_value = {"id": "123", "msg": "A"}
     response = client.get('/notifications/123', headers={"Authorization": "Bearer testtoken"})
     assert response.status_code == 200
     assert response.json()["id"] == "123"
 
-@patch('app.api.routes.document_notification.s3_download_json')
-def test_get_notification_not_found(mock_download):
-    mock_download.return_value = None
+@patch('app.api.routes.document_notification.notification_inbox.get', new_callable=AsyncMock)
+def test_get_notification_not_found(mock_get):
+    mock_get.return_value = None
     response = client.get('/notifications/123', headers={"Authorization": "Bearer testtoken"})
     assert response.status_code == 404
+
+@patch('app.api.routes.document_notification.notification_inbox.unread_count', new_callable=AsyncMock)
+def test_get_unread_count(mock_count):
+    mock_count.return_value = 4
+    response = client.get('/notifications/unread-count', headers={"Authorization": "Bearer testtoken"})
+    assert response.json() == {"unread": 4}
+
+@patch('app.api.routes.document_notification.notification_inbox.mark_read', new_callable=AsyncMock)
+def test_mark_notifications_read(mock_mark_read):
+    mock_mark_read.return_value = {"updated": 2, "unread": 0}
+    response = client.post('/notifications/read', json={"notification_ids": ["a", "b"]},
+                           headers={"Authorization": "Bearer testtoken"})
+    assert response.json() == {"updated": 2, "unread": 0}
+    assert mock_mark_read.call_args.args[2] == ["a", "b"]
@@ -213,4 +213,38 @@ def test_delete_folders_fail(mock_delete_folder):
     assert response.status_code in (200, 500, 401)
     if response.status_code == 200:
         assert "deleted" in response.json()
-        assert response.json()["deleted"] is False
\ No newline at end of file
+        assert response.json()["deleted"] is False
+@patch('app.api.routes.files_api.preview_service')
+@patch('app.api.routes.files_api.get_storage')
+def test_get_page_preview_success(mock_get_storage, mock_preview):
+    from fastapi import Response
+    entry = {"file_path": "test@example.com/files/a.pdf", "last_modified": "2025-01-01"}
+    mock_get_storage.return_value.get.return_value = entry
+    mock_preview.page_response = AsyncMock(return_value=Response(content=b"img", media_type="image/png"))
+    response = client.get('/files/123/pages/2/preview?dpi=72&format=png')
+    assert response.status_code == 200
+    assert response.content == b"img"
+    args = mock_preview.page_response.call_args.args
+    assert args[1:] == ("123", entry, args[3], 2, 72, "png", None)
+
+@patch('app.api.routes.files_api.get_storage')
+def test_get_page_preview_rejects_bad_params(mock_get_storage):
+    assert client.get('/files/123/pages/0/preview').status_code == 422
+    assert client.get('/files/123/pages/1/preview?dpi=1000').status_code == 422
+    assert client.get('/files/123/pages/1/preview?format=gif').status_code == 422
+
+@patch('app.api.routes.files_api.get_storage')
+def test_get_page_preview_unknown_document(mock_get_storage):
+    mock_get_storage.return_value.get.return_value = {"error": "Document ID not found in index"}
+    response = client.get('/files/123/pages/1/preview')
+    assert response.status_code == 404
+
+@patch('app.api.routes.files_api.preview_service')
+@patch('app.api.routes.files_api.get_storage')
+def test_get_thumbnail_uses_first_page_webp(mock_get_storage, mock_preview):
+    from fastapi import Response
+    mock_get_storage.return_value.get.return_value = {"file_path": "k", "last_modified": "t"}
+    mock_preview.page_response = AsyncMock(return_value=Response(content=b"thumb", media_type="image/webp"))
+    response = client.get('/files/123/thumbnail')
+    assert response.status_code == 200
+    assert mock_preview.page_response.call_args.args[4:7] == (1, files_api.THUMBNAIL_DPI, "webp")
@@ -4,6 +4,7 @@ sys.modules["auth_app.app.database.connection"] = MagicMock()
 import pytest
 from unittest.mock import patch, AsyncMock
 from fastapi.testclient import TestClient
+from fastapi import Response
 from app.api.routes import form_api
 from main import app
 
@@ -411,14 +412,18 @@ def test_download_all_attachments_no_attachments(mock_service):
 @patch('app.api.routes.form_api.FormService')
 @patch('app.api.routes.form_api.s3_client')
 @patch('app.api.routes.form_api.AESCipher')
-@patch('app.api.routes.form_api.AttachmentConverter')
-def test_get_merged_pdf_success(mock_converter, mock_cipher, mock_s3, mock_service):
+@patch('app.api.routes.form_api.pdf_merge_service')
+def test_get_merged_pdf_success(mock_merge, mock_cipher, mock_s3, mock_service):
     mock_service.get_form.return_value = {"formPath": "test-path", "formTitle": "TestTitle"}
-    mock_s3.list_objects_v2.return_value = {"Contents": [{"Key": "file1.pdf"}]}
-    mock_cipher.return_value.decrypt.return_value = b"decrypted"
-    mock_converter.convert_to_pdf_if_needed.return_value = b"%PDF-1.4"
+    mock_s3.list_objects_v2.return_value = {"Contents": [
+        {"Key": "file1.pdf", "ETag": '"e1"'},
+        {"Key": "TestTitle-filled.pdf", "ETag": '"e2"'},
+    ]}
+    mock_merge.merged_pdf_response = AsyncMock(return_value=Response(content=b"%PDF", media_type="application/pdf"))
     response = client.get("/forms/merged/pdf?form_id=form1&party_email=party@example.com")
     assert response.status_code in (200, 201, 404, 500)
+    if response.status_code == 200:
+        assert mock_merge.merged_pdf_response.call_args.args[1] == [{"Key": "file1.pdf", "ETag": '"e1"'}]
 
 @patch('app.api.routes.form_api.FormService')
 def test_get_merged_pdf_no_form_path(mock_service):
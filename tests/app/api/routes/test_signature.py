@@ -21,37 +21,24 @@ app.dependency_overrides[signature.dynamic_permission_check] = override_dynamic_
 
 client = TestClient(app)
 
-@patch('app.api.routes.signature._list_objects')
-@patch('app.api.routes.signature.s3_download_bytes')
-@patch('app.api.routes.signature.AESCipher')
-@patch('app.api.routes.signature.AttachmentConverter')
-@patch('app.api.routes.signature.PdfMerger')
-def test_get_merged_pdf_all_files_fail(mock_merger, mock_converter, mock_cipher, mock_download, mock_list):
-    mock_list.return_value = ['file1.pdf', 'file2.pdf']
-    mock_download.side_effect = [Exception("fail1"), Exception("fail2")]
-    instance = mock_merger.return_value
-    instance.append.side_effect = Exception("fail")
-    instance.write.return_value = None
-    instance.close.return_value = None
+@patch('app.api.routes.signature.list_objects_with_etags')
+def test_get_merged_pdf_no_documents(mock_list):
+    mock_list.return_value = []
     response = client.get('/documents/merged-pdf?document_id=doc1&tracking_id=track1')
-    assert response.status_code in (200, 500)
-
-@patch('app.api.routes.signature._list_objects')
-@patch('app.api.routes.signature.s3_download_bytes')
-@patch('app.api.routes.signature.AESCipher')
-@patch('app.api.routes.signature.AttachmentConverter')
-@patch('app.api.routes.signature.PdfMerger')
-def test_get_merged_pdf_one_file_not_pdf(mock_merger, mock_converter, mock_cipher, mock_download, mock_list):
-    mock_list.return_value = ['file1.docx']
-    mock_download.return_value = b'encrypted'
-    mock_cipher.return_value.decrypt.return_value = b'decrypted'
-    mock_converter.convert_to_pdf_if_needed.side_effect = Exception("conversion failed")
-    instance = mock_merger.return_value
-    instance.append.side_effect = Exception("conversion failed")
-    instance.write.return_value = None
-    instance.close.return_value = None
+    assert response.status_code == 404
+
+@patch('app.api.routes.signature.list_objects_with_etags')
+@patch('app.api.routes.signature.EncryptionService')
+@patch('app.api.routes.signature.pdf_merge_service')
+def test_get_merged_pdf_delegates_to_merge_service(mock_merge, mock_enc, mock_list):
+    mock_list.return_value = [{"Key": "file1.pdf", "ETag": '"e1"'}]
+    mock_enc.return_value.resolve_encryption_email = AsyncMock(return_value="enc@example.com")
+    mock_merge.merged_pdf_response = AsyncMock(return_value=Response(content=b"%PDF", media_type="application/pdf"))
     response = client.get('/documents/merged-pdf?document_id=doc1&tracking_id=track1')
     assert response.status_code in (200, 500)
+    if response.status_code == 200:
+        args = mock_merge.merged_pdf_response.call_args.args
+        assert args[1] == [{"Key": "file1.pdf", "ETag": '"e1"'}]
 
 @patch('app.api.routes.signature.document_tracking_manager.get_all_doc_sts', new_callable=AsyncMock)
 def test_get_all_document_statuses_empty(mock_get_all_doc_sts):
@@ -156,6 +143,16 @@ def test_get_document_logs_by_id_empty(mock_get_logs):
     response = client.get('/documents/did/audit')
     assert response.status_code in (200, 500)
 
+@patch('app.api.routes.signature.GlobalAuditService.query_logs', new_callable=AsyncMock)
+def test_query_audit_logs(mock_query):
+    mock_query.return_value = {"items": [], "next_cursor": None}
+    response = client.get('/audit/logs?entity=form&action=SENT&action=SIGNED&limit=10')
+    assert response.status_code in (200, 500)
+
+def test_query_audit_logs_rejects_unknown_entity():
+    response = client.get('/audit/logs?entity=users')
+    assert response.status_code in (422, 403)
+
 @patch('app.api.routes.signature.SignatureHandler')
 def test_send_document_invalid_payload(mock_handler):
     mock_handler.return_value.initiate_signature_flow = AsyncMock(return_value={"sent": False})
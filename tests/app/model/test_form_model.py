@@ -340,4 +340,19 @@ def test_get_all_trackings(email, form_id):
             "Body": MagicMock(read=MagicMock(return_value=json.dumps({"foo": "bar"}).encode("utf-8")))
         }
         result = FormModel.get_all_trackings(email, form_id)
-        assert isinstance(result, dict)
\ No newline at end of file
+        assert isinstance(result, dict)
+def test_send_form_batch_writes_each_file_once(email, form_id):
+    entries = {
+        f"p{n}@x.com": {"party_email": f"p{n}@x.com", "party_id": str(n), "email_responses": [],
+                        "fields": [{"id": "f1", "label": "Name", "type": "text"}]}
+        for n in range(3)
+    }
+    with patch("app.model.form_model.s3_client.get_object", side_effect=ClientError({"Error": {"Code": "NoSuchKey"}}, "get_object")), \
+         patch("app.model.form_model.s3_client.put_object") as mock_put:
+        FormModel.send_form_batch(email, form_id, entries)
+
+    assert mock_put.call_count == 2
+    tracking = json.loads(mock_put.call_args_list[0].kwargs["Body"])
+    user_data = json.loads(mock_put.call_args_list[1].kwargs["Body"])
+    assert set(tracking) == set(user_data) == set(entries)
+    assert all("sent" in party["status"] for party in tracking.values())
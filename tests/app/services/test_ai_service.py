@@ -0,0 +1,133 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import fitz
+import pytest
+from fastapi import HTTPException
+
+from app.services import ai_service as ai_module
+from app.services.ai_service import AIService, DocumentTextCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def expire(self, key, ttl):
+        pass
+
+
+class UploadStub:
+    def __init__(self, content, filename="contract.pdf"):
+        self.content = content
+        self.filename = filename
+        self.content_type = "application/pdf"
+        self.read = AsyncMock(return_value=content)
+
+
+def _pdf(*pages) -> bytes:
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    return doc.tobytes()
+
+
+@pytest.fixture
+def ai():
+    redis = FakeRedis()
+    client = MagicMock()
+    client.post = AsyncMock(return_value=MagicMock(status_code=200, json=MagicMock(return_value={"answer": "ok"})))
+    http = MagicMock()
+    http.return_value.__aenter__ = AsyncMock(return_value=client)
+    http.return_value.__aexit__ = AsyncMock(return_value=False)
+    with patch.object(DocumentTextCache, "_redis", return_value=redis), patch.object(ai_module.httpx, "AsyncClient", http), \
+            patch.object(ai_module.config, "AI_TEXT_INPUT", True):
+        yield redis, client
+
+
+def test_extract_chunks_tags_pages():
+    chunks = DocumentTextCache.extract_chunks(_pdf("alpha terms", "beta terms"))
+    assert chunks == ["[page 1]\nalpha terms", "[page 2]\nbeta terms"]
+
+
+def test_select_context_prefers_chunks_matching_question():
+    chunks = [f"[page {i}]\n" + ("filler " * 900) for i in range(20)]
+    chunks[13] = "[page 13]\nindemnification clause " + "x" * 4000
+    with patch.object(ai_module, "AI_MAX_CONTEXT_CHARS", 12000):
+        context = DocumentTextCache.select_context(chunks, "What does the indemnification clause say?")
+    assert "indemnification" in context
+    assert len(context) <= 12000 + 10
+
+
+@pytest.mark.asyncio
+async def test_first_question_extracts_and_sends_text_only(ai):
+    redis, client = ai
+    pdf = _pdf("payment due in thirty days")
+    result = await AIService.ask_pdf("a@acme.com", UploadStub(pdf), "When is payment due?")
+
+    assert result == {"answer": "ok", "document_hash": DocumentTextCache.document_hash(pdf)}
+    kwargs = client.post.call_args.kwargs
+    assert "files" not in kwargs
+    assert "payment due in thirty days" in kwargs["data"]["text"]
+    assert kwargs["data"]["question"] == "When is payment due?"
+    assert len(redis.store) == 1
+
+
+@pytest.mark.asyncio
+async def test_follow_up_by_hash_skips_upload_and_extraction(ai):
+    _, client = ai
+    pdf = _pdf("renewal is automatic")
+    first = await AIService.summarize("a@acme.com", UploadStub(pdf))
+
+    with patch.object(DocumentTextCache, "extract_chunks") as extract:
+        await AIService.ask_pdf("a@acme.com", None, "Does it renew?", first["document_hash"])
+        await AIService.ask_pdf("a@acme.com", UploadStub(pdf), "Anything else?")
+    extract.assert_not_called()
+    assert "renewal is automatic" in client.post.call_args.kwargs["data"]["text"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_hash_is_404(ai):
+    with pytest.raises(HTTPException) as exc:
+        await AIService.ask_pdf("a@acme.com", None, "anything", "deadbeef")
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_pdf_without_text_layer_is_uploaded(ai):
+    redis, client = ai
+    doc = fitz.open()
+    doc.new_page()
+    pdf = doc.tobytes()
+
+    await AIService.summarize("a@acme.com", UploadStub(pdf))
+    assert client.post.call_args.kwargs["files"]["pdf"][1] == pdf
+    assert redis.store == {}
+
+
+@pytest.mark.asyncio
+async def test_hash_of_another_users_upload_is_404(ai):
+    pdf = _pdf("confidential terms")
+    first = await AIService.summarize("a@acme.com", UploadStub(pdf))
+
+    with pytest.raises(HTTPException) as exc:
+        await AIService.ask_pdf("eve@globex.com", None, "What are the terms?", first["document_hash"])
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_pdf_is_sent_as_before_without_text_input(ai):
+    redis, client = ai
+    pdf = _pdf("payment due in thirty days")
+    with patch.object(ai_module.config, "AI_TEXT_INPUT", False):
+        result = await AIService.ask_pdf("a@acme.com", UploadStub(pdf), "When is payment due?")
+
+    assert result == {"answer": "ok"}
+    kwargs = client.post.call_args.kwargs
+    assert kwargs["files"]["pdf"][1] == pdf and "text" not in kwargs["data"]
+    assert redis.store == {}
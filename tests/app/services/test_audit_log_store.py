@@ -0,0 +1,148 @@
+import importlib
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+
+class NoSuchKey(Exception):
+    pass
+
+
+@pytest.fixture
+def store():
+    stubs = {
+        "auth_app.app.database.connection": MagicMock(db=MagicMock()),
+        "database.db_config": MagicMock(s3_client=MagicMock(exceptions=MagicMock(NoSuchKey=NoSuchKey))),
+        "repositories.s3_repo": MagicMock(get_logs=MagicMock(side_effect=NoSuchKey)),
+    }
+    with patch.dict(sys.modules, stubs):
+        sys.modules.pop("app.services.audit_log_store", None)
+        module = importlib.import_module("app.services.audit_log_store")
+        stored = []
+
+        async def insert_many(docs, ordered=True):
+            stored.extend(docs)
+
+        module.audit_logs = MagicMock(insert_many=AsyncMock(side_effect=insert_many))
+        module.audit_imports = MagicMock(find_one=AsyncMock(return_value=None), update_one=AsyncMock())
+        module.stored = stored
+        yield module
+    sys.modules.pop("app.services.audit_log_store", None)
+
+
+def _entry(n, entity_id="doc1"):
+    return {"entity": "document", "entity_id": entity_id, "action": f"A{n}",
+            "timestamp": f"2026-10-0{n}T10:00:00+00:00", "actor": {}, "targets": [], "metadata": {}}
+
+
+@pytest.mark.asyncio
+async def test_append_only_buffers_until_flush(store):
+    for n in range(1, 4):
+        store.AuditLogStore.append("acme.com", _entry(n))
+    store.audit_logs.insert_many.assert_not_awaited()
+
+    assert await store.AuditLogStore.flush() == 3
+    store.audit_logs.insert_many.assert_awaited_once()
+    assert [doc["action"] for doc in store.stored] == ["A1", "A2", "A3"]
+    assert all(doc["owner"] == "acme.com" and doc["ts"].tzinfo for doc in store.stored)
+    assert await store.AuditLogStore.flush() == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_entries_for_next_flush(store):
+    store.AuditLogStore.append("acme.com", _entry(1))
+    store.audit_logs.insert_many.side_effect = RuntimeError("mongo down")
+    assert await store.AuditLogStore.flush() == 0
+
+    store.audit_logs.insert_many.side_effect = None
+    assert await store.AuditLogStore.flush() == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_already_written_are_not_retried(store):
+    for n in range(1, 4):
+        store.AuditLogStore.append("acme.com", _entry(n))
+    store.audit_logs.insert_many.side_effect = BulkWriteError({"writeErrors": [
+        {"index": 0, "code": 11000}, {"index": 2, "code": 121},
+    ]})
+
+    assert await store.AuditLogStore.flush() == 2
+    assert [doc["action"] for doc in store._buffer] == ["A3"]
+
+
+@pytest.mark.asyncio
+async def test_legacy_array_is_imported_once(store):
+    store.get_logs = MagicMock(return_value=[_entry(1), _entry(2, "doc2")])
+    store.audit_logs.find.return_value.sort.return_value.to_list = AsyncMock(return_value=[])
+
+    await store.AuditLogStore.find("acme.com", "document", "acme.com/audit/all_logs_document.json", entity_id="doc1")
+    await store.AuditLogStore.find("acme.com", "document", "acme.com/audit/all_logs_document.json")
+
+    store.get_logs.assert_called_once_with("acme.com/audit/all_logs_document.json")
+    assert [doc["_id"] for doc in store.stored] == [store._legacy_id("acme.com:document", 0),
+                                                    store._legacy_id("acme.com:document", 1)]
+    assert store.audit_imports.update_one.call_args.args[1]["$set"]["done"] is True
+    query = store.audit_logs.find.call_args_list[0].args[0]
+    assert query == {"owner": "acme.com", "entity": "document", "entity_id": "doc1"}
+
+
+@pytest.mark.asyncio
+async def test_find_flushes_buffer_first(store):
+    store.audit_imports.find_one.return_value = {"_id": "acme.com:document", "done": True}
+    store.audit_logs.find.return_value.sort.return_value.to_list = AsyncMock(return_value=[])
+    store.AuditLogStore.append("acme.com", _entry(1))
+
+    await store.AuditLogStore.find("acme.com", "document", "key")
+
+    assert len(store.stored) == 1
+
+
+def _stored(n):
+    from datetime import datetime, timezone
+    from bson import ObjectId
+    return {**_entry(n), "_id": ObjectId(), "ts": datetime(2026, 10, n, 10, tzinfo=timezone.utc)}
+
+
+@pytest.mark.asyncio
+async def test_page_returns_next_cursor_and_resumes_after_it(store):
+    store.audit_imports.find_one.return_value = {"done": True}
+    docs = [_stored(1), _stored(2), _stored(3)]
+    found = store.audit_logs.find.return_value.sort.return_value.limit.return_value
+    found.to_list = AsyncMock(return_value=docs)
+
+    page = await store.AuditLogStore.page("acme.com", "document", "key", limit=2, actor="bob@acme.com",
+                                          actions=["SIGNED"])
+
+    assert [item["action"] for item in page["items"]] == ["A1", "A2"]
+    assert "_id" not in page["items"][0] and "ts" not in page["items"][0]
+    query = store.audit_logs.find.call_args.args[0]
+    assert query == {"owner": "acme.com", "entity": "document", "actor.email": "bob@acme.com",
+                     "action": {"$in": ["SIGNED"]}}
+
+    found.to_list.return_value = docs[2:]
+    last = await store.AuditLogStore.page("acme.com", "document", "key", cursor=page["next_cursor"], limit=2)
+    assert last["next_cursor"] is None
+    after = store.audit_logs.find.call_args.args[0]["$and"][1]["$or"]
+    assert after[0] == {"ts": {"$gt": docs[1]["ts"]}}
+    assert after[1] == {"ts": docs[1]["ts"], "_id": {"$gt": docs[1]["_id"]}}
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(store):
+    from fastapi import HTTPException
+    store.audit_imports.find_one.return_value = {"done": True}
+    with pytest.raises(HTTPException) as exc:
+        await store.AuditLogStore.page("acme.com", "document", "key", cursor="not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_time_range_filter_uses_utc_bounds(store):
+    from datetime import datetime, timezone
+    query = store.AuditLogStore._query("acme.com", "form", entity_id="f1",
+                                       since=datetime(2026, 10, 1), until=datetime(2026, 11, 1, tzinfo=timezone.utc))
+    assert query["ts"] == {"$gte": datetime(2026, 10, 1, tzinfo=timezone.utc),
+                           "$lt": datetime(2026, 11, 1, tzinfo=timezone.utc)}
+    assert query["entity_id"] == "f1"
@@ -14,6 +14,8 @@ def _isolate_audit_service_module():
     sys.modules.pop('app.services.audit_service', None)
     import app.services.audit_service as audit_service  # noqa: F401
     importlib.reload(audit_service)
+    # No webhook subscriptions to look up
+    audit_service.webhook_service = MagicMock(emit=AsyncMock())
     yield
 
 
@@ -434,4 +436,48 @@ async def test_other_action_party_not_found_raises_404(
             data=None,
             party_id=999
         )
-    assert exc.value.status_code == 404
\ No newline at end of file
+    assert exc.value.status_code == 404
+
+@pytest.mark.asyncio
+@patch('app.services.audit_service.webhook_service')
+@patch('app.services.audit_service.threading.Thread', side_effect=lambda target, args=(): DummyThread(target, args))
+@patch('app.services.audit_service.save_tracking_metadata')
+@patch('app.services.audit_service.generate_summary_from_trackings', return_value={"dummy": True})
+@patch('app.services.audit_service.store_status')
+@patch('app.services.audit_service.load_tracking_metadata')
+@patch('app.services.audit_service.load_document_metadata')
+@patch('app.services.audit_service.NotificationService')
+@patch('app.services.audit_service.get_file_name', new_callable=AsyncMock, return_value='file.pdf')
+async def test_last_signature_emits_signed_and_completed_webhooks(
+    mock_get_file_name,
+    mock_NotificationService,
+    mock_load_document,
+    mock_load_tracking,
+    mock_store_status,
+    mock_generate_summary,
+    mock_save_tracking,
+    mock_thread_cls,
+    mock_webhooks
+):
+    from app.services.audit_service import DocumentTrackingManager
+
+    mock_webhooks.emit = AsyncMock()
+    tracking = _base_tracking_two_parties()
+    tracking["parties"][0]["status"]["signed"] = [{"isSigned": True}]
+    mock_load_tracking.return_value = tracking
+    mock_load_document.return_value = {"trackings": {"track123": {}}, "summary": {}}
+
+    await DocumentTrackingManager.log_action(
+        email="user@example.com",
+        document_id="doc123",
+        tracking_id="track123",
+        action="ALL_FIELDS_SIGNED",
+        party_id=2,
+    )
+
+    emitted = [c.args for c in mock_webhooks.emit.await_args_list]
+    assert [(owner, event) for owner, event, _ in emitted] == [
+        ("user@example.com", "document.signed"), ("user@example.com", "document.completed")
+    ]
+    assert emitted[0][2]["party"] == {"id": "2", "name": "P2", "email": "p2@example.com"}
+    assert emitted[1][2]["status"] == "completed"
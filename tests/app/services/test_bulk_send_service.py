@@ -0,0 +1,229 @@
+import asyncio
+import importlib
+import sys
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+
+@pytest.fixture
+def bs():
+    stubs = {
+        "auth_app.app.database.connection": MagicMock(db=MagicMock()),
+        "app.services.audit_service": MagicMock(),
+        "app.services.metadata_service": MagicMock(),
+        "repositories.s3_repo": MagicMock(),
+        "auth_app.app.aspects.subscription_guard": MagicMock(),
+    }
+    with patch.dict(sys.modules, stubs):
+        sys.modules.pop("app.services.bulk_send_service", None)
+        module = importlib.import_module("app.services.bulk_send_service")
+        module.bulk_send_jobs = MagicMock(
+            find_one_and_update=AsyncMock(),
+            find_one=AsyncMock(),
+            update_one=AsyncMock(),
+            insert_one=AsyncMock(),
+        )
+        module.MetadataService.generate_document_metadata.side_effect = \
+            lambda email, doc, parties, tracking_id: {"tracking_id": tracking_id}
+        module.upload_meta_batch_s3 = MagicMock()
+        module.increment_send_counter_for_user = AsyncMock()
+        module.enforce_bulk_send_policy = AsyncMock(return_value=(2030, 1))
+        module.BULK_SEND_EMAILS_PER_SECOND = 1000
+        yield module
+    sys.modules.pop("app.services.bulk_send_service", None)
+
+
+TEMPLATE = {
+    "document_id": "doc1",
+    "validityDate": "2030-01-01",
+    "remainder": 2,
+    "pdfSize": {"pdfWidth": 600, "pdfHeight": 800},
+    "parties": [{"id": "1", "color": "red", "priority": 1}],
+    "fields": [],
+    "email_response": [{"email_subject": "Sign", "email_body": "Please sign"}],
+    "cc_emails": None,
+    "client_info": {"ip": "1", "city": "c", "region": "r", "country": "x", "timezone": "UTC",
+                    "timestamp": "t", "browser": "b", "device": "d", "os": "o"},
+    "holder": None,
+}
+
+
+def _job(count, **extra):
+    job = {
+        "job_id": "job1",
+        "email": "admin@x.com",
+        "user_email": "user@x.com",
+        "document_id": "doc1",
+        "template": TEMPLATE,
+        "recipients": [{"1": {"name": f"R{i}", "email": f"r{i}@x.com"}} for i in range(count)],
+        "total": count,
+        "cursor": 0,
+        "sent": 0,
+        "failed": 0,
+        "failures": [],
+        "batch_sent": [],
+        "state": "running",
+        "quota_period": {"year": 2030, "month": 1},
+    }
+    job.update(extra)
+    return job
+
+
+def _checkpoints(bs):
+    return [
+        c.args[1]["$set"]["cursor"]
+        for c in bs.bulk_send_jobs.update_one.call_args_list
+        if "cursor" in c.args[1].get("$set", {})
+    ]
+
+
+def test_parse_recipients_csv_reads_party_columns(bs):
+    content = (
+        "﻿1_name,1_email,2_name,2_email\n"
+        "Ann,ann@x.com,Bob,bob@x.com\n"
+        ",,,\n"
+        "Cy,cy@x.com,Di,di@x.com\n"
+    ).encode("utf-8")
+    recipients = bs.BulkSendService.parse_recipients_csv(content, ["1", "2"])
+    assert recipients == [
+        {"1": {"name": "Ann", "email": "ann@x.com"}, "2": {"name": "Bob", "email": "bob@x.com"}},
+        {"1": {"name": "Cy", "email": "cy@x.com"}, "2": {"name": "Di", "email": "di@x.com"}},
+    ]
+
+
+def test_parse_recipients_csv_single_party_plain_columns(bs):
+    recipients = bs.BulkSendService.parse_recipients_csv(b"name,email\nAnn,ann@x.com\n", ["1"])
+    assert recipients == [{"1": {"name": "Ann", "email": "ann@x.com"}}]
+
+
+def test_validate_recipients_reports_rows(bs):
+    recipients = [
+        {"1": {"name": "Ann", "email": "ann@x.com"}},
+        {"2": {"name": "Bob", "email": "bob@x.com"}},
+        {"1": {"name": "Cy", "email": "not-an-email"}},
+    ]
+    with pytest.raises(HTTPException) as exc:
+        bs.BulkSendService.validate_recipients(recipients, ["1"])
+    assert exc.value.status_code == 422
+    assert [e["index"] for e in exc.value.detail["errors"]] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_run_sends_in_batches_with_checkpoints(bs):
+    bs.bulk_send_jobs.find_one_and_update.return_value = _job(5)
+    bs.BULK_SEND_BATCH_SIZE = 2
+    handler = MagicMock(initiate_singing_schedule=AsyncMock())
+    with patch.dict(sys.modules, {"app.services.signature_service": MagicMock(SignatureHandler=handler)}):
+        await bs.BulkSendService.run("job1")
+
+    assert bs.upload_meta_batch_s3.call_count == 3
+    assert [len(c.args[2]) for c in bs.upload_meta_batch_s3.call_args_list] == [2, 2, 1]
+    assert handler.initiate_singing_schedule.await_count == 5
+    assert _checkpoints(bs) == [2, 4, 5]
+    final = bs.bulk_send_jobs.update_one.call_args_list[-1].args[1]["$set"]
+    assert final["state"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_resumed_batch_skips_recipients_already_mailed(bs):
+    bs.bulk_send_jobs.find_one_and_update.return_value = _job(4, cursor=2, sent=2, batch_sent=[2])
+    handler = MagicMock(initiate_singing_schedule=AsyncMock())
+    with patch.dict(sys.modules, {"app.services.signature_service": MagicMock(SignatureHandler=handler)}):
+        await bs.BulkSendService.run("job1")
+
+    mailed = [c.args[0].parties[0].email for c in handler.initiate_singing_schedule.await_args_list]
+    assert mailed == ["r3@x.com"]
+    tracking_ids = [c.args[1] for c in handler.initiate_singing_schedule.await_args_list]
+    assert tracking_ids == [bs.BulkSendService.tracking_id("job1", 3)]
+    checkpoint = next(c.args[1] for c in bs.bulk_send_jobs.update_one.call_args_list if "$inc" in c.args[1])
+    assert checkpoint["$inc"] == {"sent": 2, "failed": 0}
+    # The tracking of the row mailed before the interruption is not rewritten
+    rewritten = [m["tracking_id"] for m in bs.upload_meta_batch_s3.call_args.args[2]]
+    assert rewritten == [bs.BulkSendService.tracking_id("job1", 3)]
+
+
+@pytest.mark.asyncio
+async def test_failed_email_is_recorded_and_job_continues(bs):
+    bs.bulk_send_jobs.find_one_and_update.return_value = _job(3)
+
+    async def send(doc_data, tracking_id, email, user_email):
+        if doc_data.parties[0].email == "r1@x.com":
+            raise HTTPException(status_code=500, detail="Failed to initiate signing process.")
+
+    handler = MagicMock(initiate_singing_schedule=AsyncMock(side_effect=send))
+    with patch.dict(sys.modules, {"app.services.signature_service": MagicMock(SignatureHandler=handler)}):
+        await bs.BulkSendService.run("job1")
+
+    checkpoint = next(c.args[1] for c in bs.bulk_send_jobs.update_one.call_args_list if "$inc" in c.args[1])
+    assert checkpoint["$inc"] == {"sent": 2, "failed": 1}
+    assert checkpoint["$push"]["failures"]["$each"] == [
+        {"index": 1, "email": "r1@x.com", "error": "Failed to initiate signing process."}
+    ]
+    # The failed row gives its reserved send back to the month it was charged to
+    bs.increment_send_counter_for_user.assert_awaited_once_with("user@x.com", 2030, 1, -1)
+
+
+@pytest.mark.asyncio
+async def test_metadata_failure_fails_job_at_checkpoint(bs):
+    bs.bulk_send_jobs.find_one_and_update.return_value = _job(3, cursor=1)
+    bs.upload_meta_batch_s3.side_effect = HTTPException(status_code=500, detail="Failed to upload metadata")
+    await bs.BulkSendService.run("job1")
+
+    update = bs.bulk_send_jobs.update_one.call_args.args[1]["$set"]
+    assert update["state"] == "failed"
+    assert _checkpoints(bs) == []
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_calls(bs):
+    limiter = bs.RateLimiter(50)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.gather(*[limiter.wait() for _ in range(5)])
+    assert loop.time() - start >= 4 / 50 - 0.01
+
+
+def _request(bs, **extra):
+    recipients = [{"1": {"name": "R0", "email": "r0@x.com"}}, {"1": {"name": "R1", "email": "r1@x.com"}}]
+    field = {"id": "f1", "type": "signature", "x": 1, "y": 1, "width": 10, "height": 10, "page": 0,
+             "color": "red", "style": None, "partyId": "1", "options": None}
+    return bs.BulkSendRequest(**{**TEMPLATE, "fields": [field], "recipients": recipients, **extra})
+
+
+@pytest.mark.asyncio
+async def test_create_job_reserves_quota_and_starts_now(bs):
+    with patch.object(bs, "_spawn") as spawn:
+        progress = await bs.BulkSendService.create_job("admin@x.com", "user@x.com", _request(bs), _request(bs).recipients)
+
+    bs.enforce_bulk_send_policy.assert_awaited_once_with("user@x.com", 2)
+    job = bs.bulk_send_jobs.insert_one.call_args.args[0]
+    assert job["quota_period"] == {"year": 2030, "month": 1}
+    assert progress["scheduled_datetime"] is None
+    spawn.assert_called_once()
+    spawn.call_args.args[0].close()
+
+
+@pytest.mark.asyncio
+async def test_create_job_with_future_schedule_waits_for_resume_pending(bs):
+    start_at = datetime.now(timezone.utc) + timedelta(hours=2)
+    request = _request(bs, scheduled_datetime=start_at.isoformat())
+    with patch.object(bs, "_spawn") as spawn:
+        progress = await bs.BulkSendService.create_job("admin@x.com", "user@x.com", request, request.recipients)
+
+    job = bs.bulk_send_jobs.insert_one.call_args.args[0]
+    assert job["state"] == "queued" and job["locked_until"] == start_at
+    assert "scheduled_datetime" not in job["template"]
+    assert progress["scheduled_datetime"] == start_at
+    spawn.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_job_over_quota_stores_nothing(bs):
+    bs.enforce_bulk_send_policy.side_effect = HTTPException(status_code=429, detail="limit")
+    with pytest.raises(HTTPException) as exc:
+        await bs.BulkSendService.create_job("admin@x.com", "user@x.com", _request(bs), _request(bs).recipients)
+    assert exc.value.status_code == 429
+    bs.bulk_send_jobs.insert_one.assert_not_awaited()
@@ -0,0 +1,97 @@
+"""
+Allocation benchmark for the signed-PDF hand-off. The legacy path shipped the signed
+PDF between services as base64, decoded it again and decoded it a third time to
+count pages; the bytes path hands the same buffer through. Peaks are measured with
+tracemalloc (Python heap only) on a ~2 MB PDF, so the figures are the PDF copies.
+"""
+import base64
+import io
+import os
+import tracemalloc
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import fitz
+import pytest
+from PIL import Image
+
+from app.services import pdf_form_field_renderer_service as renderer_module
+from repositories import s3_repo
+from utils.drive_client import count_pages_from_base64_pdf
+
+
+def _large_pdf(pages: int = 20) -> bytes:
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        # incompressible payload so the PDF really is ~100 KB per page
+        page.insert_image(page.rect, stream=_noise_png())
+    return doc.tobytes()
+
+
+def _noise_png() -> bytes:
+    buffer = io.BytesIO()
+    Image.frombytes("RGB", (190, 190), os.urandom(190 * 190 * 3)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _peak(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class _Cipher:
+    def __init__(self, email):
+        pass
+
+    def encrypt(self, data):
+        return b""
+
+
+@pytest.mark.asyncio
+async def test_signed_pdf_handoff_allocates_less_than_base64_round_trip():
+    pdf = _large_pdf()
+
+    def legacy():
+        encoded = base64.b64encode(pdf).decode("utf-8")  # old render_sign_update return value
+        assert base64.b64decode(encoded)  # decode_base64_with_padding in complete_party_signature
+        assert count_pages_from_base64_pdf(encoded) == 20  # page count for the certificate
+
+    enc = MagicMock()
+    enc.return_value.resolve_encryption_email = AsyncMock(return_value="a@x.com")
+    with patch.object(s3_repo, "EncryptionService", enc), patch.object(s3_repo, "AESCipher", _Cipher), \
+            patch.object(s3_repo, "s3_client"):
+        tracemalloc.start()
+        try:
+            signed = await s3_repo.render_sign_update("a@x.com", pdf, "trk", "doc")
+            with fitz.open("pdf", signed) as signed_doc:
+                assert signed_doc.page_count == 20
+            bytes_peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    legacy_peak = _peak(legacy)
+    print(f"\nsigned PDF {len(pdf) / 1e6:.1f} MB: base64 peak {legacy_peak / 1e6:.1f} MB, "
+          f"bytes peak {bytes_peak / 1e6:.2f} MB")
+    assert signed is pdf
+    assert bytes_peak < len(pdf) // 10
+    assert legacy_peak > 2 * len(pdf)
+
+
+def test_repeated_field_images_are_decoded_once():
+    image = _noise_png() * 20
+    data_uri = "data:image/png;base64," + base64.b64encode(image).decode("ascii")
+    inserter = renderer_module.PDFFieldInserter(fonts_dir="nonexistent_fonts")
+    first = inserter._decode_data_uri(data_uri)
+
+    def per_field():
+        for _ in range(25):
+            assert inserter._decode_data_uri(data_uri) is first
+
+    assert first == image
+    assert _peak(per_field) < len(image) // 10
+    # The next render starts with nothing decoded
+    assert renderer_module.PDFFieldInserter(fonts_dir="nonexistent_fonts")._decoded_uris == {}
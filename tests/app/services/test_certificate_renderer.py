@@ -0,0 +1,70 @@
+import base64
+import io
+
+import fitz
+import pytest
+from PIL import Image
+from jinja2 import Environment, FileSystemLoader
+
+from app.services import certificate_renderer
+from app.services.certificate_renderer import FastCertificateRenderer, load_stylesheet
+
+
+def _png_data_uri(size=(120, 40)):
+    buf = io.BytesIO()
+    Image.new("RGBA", size, (0, 0, 0, 255)).save(buf, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
+
+
+def _certificate_html(recipients=2):
+    env = Environment(loader=FileSystemLoader("./app/templates"))
+    data = {
+        "logo_path": _png_data_uri((40, 40)),
+        "tracking_id": "trk-123",
+        "document_name": "contract.pdf",
+        "type": "Digital Signature",
+        "status": "Completed",
+        "page_count": 3,
+        "signer_count": recipients,
+        "hash": "a" * 64,
+        "holder": {"name": "Holder", "email": "holder@example.com", "address": "-"},
+        "recipients": [
+            {"name": f"Signer {i}", "email": f"signer{i}@example.com", "sign_path": _png_data_uri()}
+            for i in range(recipients)
+        ],
+        "generated_at": "2025-01-01 10:00",
+    }
+    return env.get_template("certificate_fast.html").render(**data)
+
+
+def test_render_standard_certificate():
+    pdf_bytes = FastCertificateRenderer().render(_certificate_html())
+
+    pdf_doc = fitz.open("pdf", pdf_bytes)
+    text = pdf_doc[0].get_text()
+    assert "of Completion" in text
+    assert "trk-123" in text
+    assert "signer1@example.com" in text
+    assert pdf_doc[0].rect == certificate_renderer.PAGE_RECT
+
+
+def test_render_flows_onto_multiple_pages():
+    pdf_bytes = FastCertificateRenderer().render(_certificate_html(recipients=15))
+
+    pdf_doc = fitz.open("pdf", pdf_bytes)
+    assert len(pdf_doc) > 1
+    assert "signer14@example.com" in "".join(page.get_text() for page in pdf_doc)
+
+
+def test_render_aborts_runaway_layout(monkeypatch):
+    monkeypatch.setattr(certificate_renderer, "MAX_PAGES", 1)
+
+    with pytest.raises(RuntimeError):
+        FastCertificateRenderer().render(_certificate_html(recipients=15))
+
+
+def test_stylesheet_read_once():
+    load_stylesheet.cache_clear()
+    load_stylesheet("certificate_fast.css")
+    load_stylesheet("certificate_fast.css")
+    assert load_stylesheet.cache_info().hits == 1
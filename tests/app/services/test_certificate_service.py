@@ -78,4 +78,39 @@ def test_render_form_pdf_pdf_generation_error(mock_html, mock_env):
     data = {"field": "value"}
     with pytest.raises(Exception) as exc:
         certificate_service.CertificateService.render_form_pdf(data, template_name="form.html")
-    assert "PDF error" in str(exc.value)
\ No newline at end of file
+    assert "PDF error" in str(exc.value)
+
+@patch("app.services.certificate_service.HTML")
+@patch("app.services.certificate_service.fast_certificate_renderer")
+def test_render_certificate_pdf_uses_fast_renderer_for_standard_template(mock_fast, mock_html):
+    from app.services import certificate_service
+    mock_fast.render.return_value = b"fastpdf"
+    with patch.object(certificate_service.config, "CERTIFICATE_RENDERER", "fast"):
+        result = certificate_service.CertificateService.render_certificate_pdf({"recipients": [], "holder": {}})
+    assert result == b"fastpdf"
+    mock_html.assert_not_called()
+
+
+@patch("app.services.certificate_service.HTML")
+@patch("app.services.certificate_service.fast_certificate_renderer")
+def test_render_certificate_pdf_falls_back_to_weasyprint(mock_fast, mock_html):
+    from app.services import certificate_service
+    mock_fast.render.side_effect = RuntimeError("layout failed")
+    mock_html.return_value.write_pdf.return_value = b"weasypdf"
+    with patch.object(certificate_service.config, "CERTIFICATE_RENDERER", "fast"):
+        result = certificate_service.CertificateService.render_certificate_pdf({"recipients": [], "holder": {}})
+    assert result == b"weasypdf"
+    mock_html.return_value.write_pdf.assert_called_once()
+
+
+@patch("app.services.certificate_service.env")
+@patch("app.services.certificate_service.HTML")
+@patch("app.services.certificate_service.fast_certificate_renderer")
+def test_render_certificate_pdf_custom_template_uses_weasyprint(mock_fast, mock_html, mock_env):
+    from app.services import certificate_service
+    mock_env.get_template.return_value.render.return_value = "<html></html>"
+    mock_html.return_value.write_pdf.return_value = b"custompdf"
+    result = certificate_service.CertificateService.render_certificate_pdf({}, template_name="custom.html")
+    assert result == b"custompdf"
+    mock_fast.render.assert_not_called()
+    mock_env.get_template.assert_called_once_with("custom.html")
@@ -0,0 +1,158 @@
+import importlib
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def cs():
+    stubs = {
+        "auth_app.app.database.connection": MagicMock(db=MagicMock()),
+        "app.services.certificate_service": MagicMock(),
+        "app.services.email_service": MagicMock(),
+        "app.services.metadata_service": MagicMock(),
+        "app.services.notification_service": MagicMock(),
+        "app.services.pdf_service": MagicMock(),
+        "repositories.s3_repo": MagicMock(),
+        "utils.security": MagicMock(),
+    }
+    with patch.dict(sys.modules, stubs):
+        sys.modules.pop("app.services.completion_service", None)
+        module = importlib.import_module("app.services.completion_service")
+        module.completion_jobs = MagicMock(
+            find_one_and_update=AsyncMock(),
+            find_one=AsyncMock(),
+            update_one=AsyncMock(),
+        )
+        yield module
+
+
+def _job(cs, state="queued", **extra):
+    job = {
+        "idempotency_key": "admin@x.com:doc1:trk1",
+        "email": "admin@x.com",
+        "user_email": "user@x.com",
+        "document_id": "doc1",
+        "tracking_id": "trk1",
+        "file_name": "contract.pdf",
+        "completed_at": "2025-01-01T00:00:00+00:00",
+        "state": state,
+        "attempts": {stage: 0 for stage in cs.STAGES},
+        "mailed_to": [],
+    }
+    job.update(extra)
+    return job
+
+
+def _states(cs):
+    return [
+        c.args[1]["$set"]["state"]
+        for c in cs.completion_jobs.update_one.call_args_list
+        if "state" in c.args[1].get("$set", {})
+    ]
+
+
+@pytest.mark.asyncio
+async def test_enqueue_creates_job_and_starts_it(cs):
+    cs.completion_jobs.find_one_and_update.return_value = _job(cs)
+    with patch.object(cs, "_spawn") as spawn:
+        job = await cs.CompletionPipeline.enqueue("admin@x.com", "user@x.com", "doc1", "trk1",
+                                                  "contract.pdf", "2025-01-01T00:00:00+00:00")
+
+    assert job["state"] == "queued"
+    query, update = cs.completion_jobs.find_one_and_update.call_args.args
+    assert query == {"idempotency_key": "admin@x.com:doc1:trk1"}
+    assert "$setOnInsert" in update
+    spawn.assert_called_once()
+    spawn.call_args.args[0].close()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_is_idempotent_for_finished_job(cs):
+    cs.completion_jobs.find_one_and_update.return_value = _job(cs, state="done")
+    with patch.object(cs, "_spawn") as spawn:
+        await cs.CompletionPipeline.enqueue("admin@x.com", "user@x.com", "doc1", "trk1",
+                                            "contract.pdf", "2025-01-01T00:00:00+00:00")
+    spawn.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_walks_all_stages(cs):
+    cs.completion_jobs.find_one_and_update.return_value = _job(cs)
+    with patch.object(cs.CompletionPipeline, "_run_stage", AsyncMock(return_value={})) as run_stage:
+        await cs.CompletionPipeline.run("admin@x.com:doc1:trk1")
+
+    assert [c.args[0] for c in run_stage.call_args_list] == ["rendering", "signing", "mailing"]
+    assert _states(cs) == ["rendering", "signing", "mailing", "done"]
+
+
+@pytest.mark.asyncio
+async def test_run_resumes_from_persisted_stage(cs):
+    cs.completion_jobs.find_one_and_update.return_value = _job(cs, state="mailing")
+    with patch.object(cs.CompletionPipeline, "_run_stage", AsyncMock(return_value={})) as run_stage:
+        await cs.CompletionPipeline.run("admin@x.com:doc1:trk1")
+
+    assert [c.args[0] for c in run_stage.call_args_list] == ["mailing"]
+    assert _states(cs) == ["done"]
+
+
+@pytest.mark.asyncio
+async def test_run_skips_job_held_by_another_worker(cs):
+    cs.completion_jobs.find_one_and_update.return_value = None
+    with patch.object(cs.CompletionPipeline, "_run_stage", AsyncMock()) as run_stage:
+        await cs.CompletionPipeline.run("admin@x.com:doc1:trk1")
+    run_stage.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stage_failure_schedules_retry_with_backoff(cs):
+    cs.completion_jobs.find_one_and_update.return_value = _job(cs, state="signing", attempts={"signing": 1})
+    with patch.object(cs.CompletionPipeline, "_run_stage", AsyncMock(side_effect=RuntimeError("tsa down"))), \
+            patch.object(cs, "_spawn") as spawn:
+        await cs.CompletionPipeline.run("admin@x.com:doc1:trk1")
+
+    update = cs.completion_jobs.update_one.call_args.args[1]["$set"]
+    assert update["attempts.signing"] == 2
+    assert update["error"] == "tsa down"
+    assert "state" not in update
+    spawn.assert_called_once()
+    retry = spawn.call_args.args[0]
+    assert retry.cr_frame.f_locals["delay"] == cs.RETRY_BASE_DELAY * 2
+    retry.close()
+
+
+@pytest.mark.asyncio
+async def test_stage_failure_after_max_retries_marks_failed(cs):
+    attempts = {"rendering": cs.MAX_STAGE_RETRIES - 1}
+    cs.completion_jobs.find_one_and_update.return_value = _job(cs, state="rendering", attempts=attempts)
+    with patch.object(cs.CompletionPipeline, "_run_stage", AsyncMock(side_effect=RuntimeError("boom"))), \
+            patch.object(cs, "_spawn") as spawn:
+        await cs.CompletionPipeline.run("admin@x.com:doc1:trk1")
+
+    update = cs.completion_jobs.update_one.call_args.args[1]["$set"]
+    assert update["state"] == "failed"
+    assert update["failed_stage"] == "rendering"
+    spawn.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_mailing_skips_recipients_already_mailed(cs):
+    cs.load_tracking_metadata.return_value = {
+        "parties": [{"email": "a@x.com"}, {"email": "b@x.com"}, {"email": "c@x.com"}],
+        "holder": {"name": "Holder", "email": "holder@x.com"},
+        "email_response": [],
+    }
+    cs.get_signed = AsyncMock(return_value=b"%PDF")
+    cs.get_file_name = AsyncMock(return_value="contract.pdf")
+    mailer = MagicMock(send_signed_pdf_email=AsyncMock())
+    cs.EmailService = MagicMock(return_value=mailer)
+
+    await cs.CompletionPipeline._mail_parties(_job(cs, state="mailing", mailed_to=["a@x.com"]))
+
+    # One message for all remaining parties
+    mailer.send_signed_pdf_email.assert_awaited_once()
+    assert mailer.send_signed_pdf_email.call_args.args[3] == ["b@x.com", "c@x.com"]
+    cs.completion_jobs.update_one.assert_awaited_once_with(
+        {"idempotency_key": "admin@x.com:doc1:trk1"}, {"$addToSet": {"mailed_to": {"$each": ["b@x.com", "c@x.com"]}}}
+    )
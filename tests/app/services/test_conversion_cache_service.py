@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.services import conversion_cache_service as cache_module
+from app.services.conversion_cache_service import ConversionCacheService
+
+
+class PlainCipher:
+    def encrypt(self, data):
+        return b"enc:" + data
+
+    def decrypt(self, data):
+        return data[len(b"enc:"):]
+
+
+@pytest.fixture
+def s3():
+    stored = {}
+    client = MagicMock()
+
+    def get_object(Bucket, Key):
+        if Key not in stored:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        return {"Body": MagicMock(read=MagicMock(return_value=stored[Key]))}
+
+    client.get_object.side_effect = get_object
+    client.put_object.side_effect = lambda **kwargs: stored.__setitem__(kwargs["Key"], kwargs["Body"])
+    with patch.object(cache_module, "s3_client", client):
+        yield client, stored
+
+
+def test_derivative_key_is_content_addressed():
+    first = ConversionCacheService.derivative_key("a@x.com/signed/doc/trk/scan.png", b"image")
+    renamed = ConversionCacheService.derivative_key("a@x.com/files/form/p@x.com/other.png", b"image")
+    changed = ConversionCacheService.derivative_key("a@x.com/signed/doc/trk/scan.png", b"image2")
+
+    assert first == renamed
+    assert first != changed
+    assert first.startswith("a@x.com/cache/converted/")
+
+
+def test_pdf_sources_bypass_the_cache(s3):
+    client, _ = s3
+    assert asyncio.run(ConversionCacheService.convert("a@x.com/signed/d/t/f.pdf", b"%PDF", PlainCipher())) == b"%PDF"
+    client.get_object.assert_not_called()
+
+
+def test_miss_converts_and_stores_encrypted_derivative(s3):
+    _, stored = s3
+    with patch.object(cache_module.AttachmentConverter, "convert_to_pdf_if_needed",
+                      return_value=b"%PDF-converted") as convert:
+        result = asyncio.run(ConversionCacheService.convert("a@x.com/signed/d/t/notes.txt", b"hi", PlainCipher()))
+
+    assert result == b"%PDF-converted"
+    convert.assert_called_once_with(b"hi", "notes.txt")
+    key = ConversionCacheService.derivative_key("a@x.com/signed/d/t/notes.txt", b"hi")
+    assert stored[key] == b"enc:%PDF-converted"
+
+
+def test_hit_skips_conversion(s3):
+    _, stored = s3
+    key = ConversionCacheService.derivative_key("a@x.com/signed/d/t/notes.txt", b"hi")
+    stored[key] = b"enc:%PDF-cached"
+    with patch.object(cache_module.AttachmentConverter, "convert_to_pdf_if_needed") as convert:
+        result = asyncio.run(ConversionCacheService.convert("a@x.com/signed/d/t/notes.txt", b"hi", PlainCipher()))
+
+    assert result == b"%PDF-cached"
+    convert.assert_not_called()
+
+
+def test_unsupported_type_raises_and_caches_nothing(s3):
+    client, _ = s3
+    with pytest.raises(ValueError):
+        asyncio.run(ConversionCacheService.convert("a@x.com/signed/d/t/tool.exe", b"MZ", PlainCipher()))
+    client.put_object.assert_not_called()
+
+
+def test_conversions_are_bounded_by_pool(s3):
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def slow_convert(data, name):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return b"%PDF"
+
+    async def convert_all():
+        return await asyncio.gather(*[
+            ConversionCacheService.convert(f"a@x.com/signed/d/t/f{i}.png", bytes([i]), PlainCipher())
+            for i in range(6)
+        ])
+
+    with patch.object(cache_module.AttachmentConverter, "convert_to_pdf_if_needed", side_effect=slow_convert):
+        assert asyncio.run(convert_all()) == [b"%PDF"] * 6
+    assert peak[0] == cache_module.CONVERTER_WORKERS
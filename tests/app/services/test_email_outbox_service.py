@@ -0,0 +1,220 @@
+import asyncio
+import importlib
+import sys
+import time
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+
+@pytest.fixture
+def ob():
+    stubs = {"auth_app.app.database.connection": MagicMock(db=MagicMock())}
+    with patch.dict(sys.modules, stubs):
+        sys.modules.pop("app.services.email_outbox_service", None)
+        module = importlib.import_module("app.services.email_outbox_service")
+        module.email_outbox = MagicMock(
+            insert_one=AsyncMock(),
+            find_one=AsyncMock(),
+            find_one_and_update=AsyncMock(),
+            update_one=AsyncMock(),
+        )
+        bucket = {}
+        with patch.object(module, "s3_upload_bytes", side_effect=lambda data, key, _: bucket.update({key: data}) or True), \
+                patch.object(module, "s3_download_bytes", side_effect=lambda key: bucket[key]), \
+                patch.object(module, "s3_delete_object", side_effect=lambda key: bucket.pop(key)):
+            module.bucket = bucket
+            yield module
+    sys.modules.pop("app.services.email_outbox_service", None)
+
+
+@pytest.fixture
+def mailer():
+    service = MagicMock()
+    notifications = MagicMock()
+    stubs = {
+        "app.services.email_service": MagicMock(EmailService=MagicMock(return_value=service)),
+        "app.services.notification_service": MagicMock(notification_service=notifications),
+    }
+    with patch.dict(sys.modules, stubs):
+        yield service, notifications
+
+
+def _message(ob, attempts=0, recipient="a@gmail.com", **extra):
+    message = {
+        "message_id": "m1",
+        "owner": "admin@x.com",
+        "kind": "signing_link",
+        "recipient": recipient,
+        "provider": ob.EmailOutbox.provider(recipient),
+        "payload": {"recipient_email": recipient, "subject": "Sign", "body": "<p>hi</p>", "is_html": True},
+        "attachment_key": None,
+        "context": {},
+        "notification": {"email": "admin@x.com", "document_id": "doc1"},
+        "state": "sending",
+        "attempts": attempts,
+        "created_at": datetime.now(timezone.utc),
+    }
+    message.update(extra)
+    return message
+
+
+def _set(ob):
+    return ob.email_outbox.update_one.call_args.args[1]["$set"]
+
+
+@pytest.mark.asyncio
+async def test_enqueue_stores_message_and_starts_delivery(ob):
+    with patch.object(ob, "_spawn") as spawn:
+        message_id = await ob.EmailOutbox.enqueue(
+            "admin@x.com", "signed_pdf", {"recipient_email": "Bob@Outlook.com", "subject": "Done"},
+            attachment_bytes=b"%PDF", context={"document_id": "doc1"}, dedupe_key="completion:k:bob",
+        )
+
+    stored = ob.email_outbox.insert_one.call_args.args[0]
+    assert stored["message_id"] == message_id
+    assert (stored["state"], stored["attempts"], stored["provider"]) == ("pending", 0, "microsoft")
+    assert "attachment" not in stored
+    assert ob.bucket[stored["attachment_key"]] == b"%PDF"
+    assert stored["dedupe_key"] == "completion:k:bob"
+    spawn.assert_called_once()
+    spawn.call_args.args[0].close()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_same_dedupe_key_is_a_no_op(ob):
+    ob.email_outbox.insert_one.side_effect = DuplicateKeyError("dup")
+    ob.email_outbox.find_one.return_value = {"message_id": "existing"}
+    with patch.object(ob, "_spawn") as spawn:
+        message_id = await ob.EmailOutbox.enqueue("admin@x.com", "signed_pdf", {"recipient_email": "b@x.com"},
+                                                  attachment_bytes=b"%PDF", dedupe_key="completion:k:b@x.com")
+    assert message_id == "existing"
+    assert ob.bucket == {}
+    spawn.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_successful_delivery_marks_sent_and_notifies(ob, mailer):
+    service, notifications = mailer
+    ob.bucket["admin@x.com/outbox/m1"] = b"%PDF"
+    await ob.EmailOutbox._send(_message(ob, attachment_key="admin@x.com/outbox/m1"))
+
+    assert service.send_email.call_args.kwargs["attachment_bytes"] == b"%PDF"
+    update = ob.email_outbox.update_one.call_args.args[1]
+    assert update["$set"]["state"] == "sent"
+    assert update["$unset"] == {"attachment_key": ""}
+    assert ob.bucket == {}
+    assert notifications.store_notification.call_args.kwargs["action"] == "dispatched"
+
+
+@pytest.mark.asyncio
+async def test_multi_recipient_message_is_sent_once(ob, mailer):
+    service, _ = mailer
+    service.send_email_to_many.return_value = {}
+    payload = {"recipient_emails": ["a@gmail.com", "b@outlook.com"], "subject": "Done", "body": "<p>done</p>"}
+    ob.bucket["admin@x.com/outbox/m1"] = b"%PDF"
+    await ob.EmailOutbox._send(_message(ob, recipient="a@gmail.com, b@outlook.com", payload=payload,
+                                        attachment_key="admin@x.com/outbox/m1"))
+
+    service.send_email_to_many.assert_called_once()
+    assert service.send_email_to_many.call_args.kwargs["recipient_emails"] == ["a@gmail.com", "b@outlook.com"]
+    service.send_email.assert_not_called()
+    assert _set(ob)["state"] == "sent"
+
+
+@pytest.mark.asyncio
+async def test_refused_recipients_are_retried_alone(ob, mailer):
+    service, _ = mailer
+    service.send_email_to_many.return_value = {"b@outlook.com": (550, b"no such user")}
+    payload = {"recipient_emails": ["a@gmail.com", "b@outlook.com"], "subject": "Done", "body": "<p>done</p>"}
+    await ob.EmailOutbox._send(_message(ob, recipient="a@gmail.com, b@outlook.com", payload=payload))
+
+    update = _set(ob)
+    assert update["state"] == "pending"
+    assert update["payload"]["recipient_emails"] == ["b@outlook.com"]
+    assert update["recipient"] == "b@outlook.com"
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_backs_off_exponentially(ob, mailer):
+    service, notifications = mailer
+    service.send_email.side_effect = RuntimeError("451 try later")
+
+    delays = []
+    for attempts in range(4):
+        before = datetime.now(timezone.utc)
+        await ob.EmailOutbox._send(_message(ob, attempts=attempts))
+        update = _set(ob)
+        assert update["state"] == "pending"
+        delays.append(round((update["next_attempt_at"] - before).total_seconds()))
+    assert delays == [30, 60, 120, 240]
+    notifications.store_notification.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_last_failed_attempt_dead_letters(ob, mailer):
+    service, notifications = mailer
+    service.send_email.side_effect = RuntimeError("550 mailbox unavailable")
+    await ob.EmailOutbox._send(_message(ob, attempts=ob.OUTBOX_MAX_ATTEMPTS - 1))
+
+    update = _set(ob)
+    assert update["state"] == "dead"
+    assert update["last_error"] == "550 mailbox unavailable"
+    kwargs = notifications.store_notification.call_args.kwargs
+    assert (kwargs["action"], kwargs["reason"]) == ("failed", "550 mailbox unavailable")
+
+
+@pytest.mark.asyncio
+async def test_provider_rate_limit_spaces_same_provider_only(ob, mailer):
+    service, _ = mailer
+    sent = []
+    service.send_email.side_effect = lambda **kw: sent.append((kw["recipient_email"], time.monotonic()))
+    ob.PROVIDER_RATES["google"] = 10
+
+    await asyncio.gather(
+        ob.EmailOutbox._send(_message(ob, recipient="a@gmail.com")),
+        ob.EmailOutbox._send(_message(ob, recipient="b@googlemail.com")),
+        ob.EmailOutbox._send(_message(ob, recipient="c@example.org")),
+    )
+    times = dict(sent)
+    assert times["b@googlemail.com"] - times["a@gmail.com"] >= 0.09
+    assert times["c@example.org"] - times["a@gmail.com"] < 0.09
+
+
+@pytest.mark.asyncio
+async def test_process_due_claims_until_nothing_is_due(ob):
+    ob.email_outbox.find_one_and_update.side_effect = [_message(ob), _message(ob, message_id="m2"), None]
+    with patch.object(ob.EmailOutbox, "_send", new_callable=AsyncMock) as send:
+        await ob.EmailOutbox.process_due()
+    assert [c.args[0]["message_id"] for c in send.await_args_list] == ["m1", "m2"]
+
+
+@pytest.mark.asyncio
+async def test_process_due_claims_only_when_a_worker_is_free(ob):
+    in_flight, claimed_while = [0], []
+
+    async def claim(*args, **kwargs):
+        claimed_while.append(in_flight[0])
+        return _message(ob, message_id=f"m{len(claimed_while)}") if len(claimed_while) <= 5 else None
+
+    async def send(message):
+        in_flight[0] += 1
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+
+    ob.email_outbox.find_one_and_update.side_effect = claim
+    with patch.object(ob, "OUTBOX_WORKERS", 2), patch.object(ob.EmailOutbox, "_send", side_effect=send) as sender:
+        await ob.EmailOutbox.process_due()
+    assert sender.await_count == 5
+    assert max(claimed_while) < 2
+
+
+@pytest.mark.asyncio
+async def test_only_dead_messages_can_be_retried(ob):
+    ob.email_outbox.find_one_and_update.return_value = None
+    with pytest.raises(HTTPException) as exc:
+        await ob.EmailOutbox.retry_dead("admin@x.com", "m1")
+    assert exc.value.status_code == 409
@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import unittest
 from datetime import datetime
@@ -12,7 +13,8 @@ sys.modules['auth_app.app.database.connection'] = MagicMock(
     tracker_collection=MagicMock()
 )
 
-from app.services.email_service import EmailService
+from app.services.email_service import EmailService, email_outbox_service
+from app.services.smtp_pool import close_smtp_pools
 
 
 class TestEmailServiceSync(unittest.TestCase):
@@ -25,11 +27,15 @@ class TestEmailServiceSync(unittest.TestCase):
         self.email_service.mail_server = "smtp.example.com"
         self.email_service.mail_port = 587
         self.recipient = "to@example.com"
+        close_smtp_pools()
+
+    def tearDown(self):
+        close_smtp_pools()
 
     @patch("smtplib.SMTP")
     def test_send_email_plain_success(self, mock_smtp):
         server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = server
+        mock_smtp.return_value = server
         server.sendmail.return_value = {}
 
         self.email_service.send_email(
@@ -47,10 +53,36 @@ class TestEmailServiceSync(unittest.TestCase):
         data = server.sendmail.call_args[0][2]
         self.assertIn("Content-Type: text/plain", data)
 
+    @patch("smtplib.SMTP")
+    def test_send_email_to_many_uses_one_transaction(self, mock_smtp):
+        server = MagicMock()
+        mock_smtp.return_value = server
+        server.sendmail.return_value = {"c@example.com": (550, b"unknown")}
+        recipients = ["a@example.com", "b@example.com", "c@example.com"]
+
+        refused = self.email_service.send_email_to_many(
+            reply_name="Sender",
+            reply_email="reply@example.com",
+            recipient_emails=recipients,
+            subject="Completed",
+            body="<p>done</p>",
+            attachment_bytes=b"%PDF-1.4 " * 1000,
+            attachment_filename="signed.pdf",
+            is_html=True,
+        )
+
+        self.assertEqual(refused, {"c@example.com": (550, b"unknown")})
+        server.sendmail.assert_called_once()
+        sender, rcpts, data = server.sendmail.call_args[0]
+        self.assertEqual(rcpts, recipients)
+        self.assertIn("To: undisclosed-recipients:;", data)
+        self.assertNotIn("a@example.com", data)
+        self.assertEqual(data.count('filename="signed.pdf"'), 1)
+
     @patch("smtplib.SMTP")
     def test_send_email_html_with_cc_and_inline_image(self, mock_smtp):
         server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = server
+        mock_smtp.return_value = server
         server.sendmail.return_value = {}
 
         inline_images = {
@@ -82,7 +114,7 @@ class TestEmailServiceSync(unittest.TestCase):
     @patch("smtplib.SMTP")
     def test_send_email_with_attachment(self, mock_smtp):
         server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = server
+        mock_smtp.return_value = server
         server.sendmail.return_value = {}
 
         self.email_service.send_email(
@@ -103,7 +135,7 @@ class TestEmailServiceSync(unittest.TestCase):
     @patch("smtplib.SMTP")
     def test_send_email_failure_from_sendmail_result(self, mock_smtp):
         server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = server
+        mock_smtp.return_value = server
         # Non-empty dict indicates failures for some recipients
         server.sendmail.return_value = {"to@example.com": (550, b"error")}
 
@@ -131,14 +163,10 @@ class TestEmailServiceSync(unittest.TestCase):
             )
         self.assertIn("Failed to send email", str(ctx.exception))
 
-    @patch("app.services.email_service.Environment")
-    def test_decode_and_format_body_includes_link_and_replacements(self, mock_env_cls):
-        # Fake template: echo html_body_with_br wrapped in <html> for assertions
-        mock_tpl = MagicMock()
-        mock_tpl.render.side_effect = lambda **kw: f"<html>{kw['html_body_with_br']}</html>"
-        mock_env = MagicMock()
-        mock_env.get_template.return_value = mock_tpl
-        mock_env_cls.return_value = mock_env
+    @patch("app.services.email_service.render_branded")
+    def test_decode_and_format_body_includes_link_and_replacements(self, mock_render):
+        # Fake render: echo html_body_with_br wrapped in <html> for assertions
+        mock_render.side_effect = lambda name, **kw: f"<html>{kw['html_body_with_br']}</html>"
 
         html = self.email_service.decode_and_format_body(
             theme="#123456",
@@ -153,13 +181,9 @@ class TestEmailServiceSync(unittest.TestCase):
         self.assertIn("Alice", html)
         self.assertIn('href="https://x.test/doc"', html)
 
-    @patch("app.services.email_service.Environment")
-    def test_decode_and_format_body_form_without_name_and_iso_datetime(self, mock_env_cls):
-        mock_tpl = MagicMock()
-        mock_tpl.render.side_effect = lambda **kw: f"<html>{kw['html_body_with_br']}</html>"
-        mock_env = MagicMock()
-        mock_env.get_template.return_value = mock_tpl
-        mock_env_cls.return_value = mock_env
+    @patch("app.services.email_service.render_branded")
+    def test_decode_and_format_body_form_without_name_and_iso_datetime(self, mock_render):
+        mock_render.side_effect = lambda name, **kw: f"<html>{kw['html_body_with_br']}</html>"
 
         html = self.email_service.decode_and_format_body_form(
             theme="#0EA5E9",
@@ -176,7 +200,7 @@ class TestEmailServiceSync(unittest.TestCase):
     @patch("smtplib.SMTP")
     def test_send_email_with_multiple_cc_and_inline_images(self, mock_smtp):
         server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = server
+        mock_smtp.return_value = server
         server.sendmail.return_value = {}
 
         inline_images = {
@@ -205,13 +229,9 @@ class TestEmailServiceSync(unittest.TestCase):
         self.assertIn("logo1", data)
         self.assertIn("logo2", data)
 
-    @patch("app.services.email_service.Environment")
-    def test_decode_and_format_body_with_no_party_name(self, mock_env_cls):
-        mock_tpl = MagicMock()
-        mock_tpl.render.side_effect = lambda **kw: f"<html>{kw['html_body_with_br']}</html>"
-        mock_env = MagicMock()
-        mock_env.get_template.return_value = mock_tpl
-        mock_env_cls.return_value = mock_env
+    @patch("app.services.email_service.render_branded")
+    def test_decode_and_format_body_with_no_party_name(self, mock_render):
+        mock_render.side_effect = lambda name, **kw: f"<html>{kw['html_body_with_br']}</html>"
 
         html = self.email_service.decode_and_format_body(
             theme="#123456",
@@ -226,13 +246,9 @@ class TestEmailServiceSync(unittest.TestCase):
         self.assertNotIn("Alice", html)
         self.assertIn('href="https://x.test/doc"', html)
 
-    @patch("app.services.email_service.Environment")
-    def test_decode_and_format_body_form_with_party_name(self, mock_env_cls):
-        mock_tpl = MagicMock()
-        mock_tpl.render.side_effect = lambda **kw: f"<html>{kw['html_body_with_br']}</html>"
-        mock_env = MagicMock()
-        mock_env.get_template.return_value = mock_tpl
-        mock_env_cls.return_value = mock_env
+    @patch("app.services.email_service.render_branded")
+    def test_decode_and_format_body_form_with_party_name(self, mock_render):
+        mock_render.side_effect = lambda name, **kw: f"<html>{kw['html_body_with_br']}</html>"
 
         html = self.email_service.decode_and_format_body_form(
             theme="#0EA5E9",
@@ -247,6 +263,35 @@ class TestEmailServiceSync(unittest.TestCase):
         self.assertIn('href="https://x.test/form"', html)
         self.assertIn("Bob", html)
 
+    @patch.object(email_outbox_service, "enqueue", new_callable=AsyncMock)
+    @patch("auth_app.app.services.auth_service.AuthService")
+    def test_send_reminder_digest_lists_every_document(self, mock_auth, mock_enqueue):
+        mock_auth.return_value.get_logo_and_theme = AsyncMock(
+            return_value={"logo": "logo.png", "theme": "#112233", "organization": "Acme"}
+        )
+        mock_enqueue.return_value = "m1"
+        items = [
+            {"tracking_id": f"trk{n}", "document_name": f"Contract <{n}>", "validity_datetime": "2030-01-01T10:00:00",
+             "document_url": f"https://x.test/signing?tracking_id=trk{n}&token=t{n}"}
+            for n in range(3)
+        ]
+
+        message_id = asyncio.run(self.email_service.send_reminder_digest(
+            "Holder", "holder@acme.com", self.recipient, "Bob", items, owner="acme.com",
+            cc_emails=["legal@acme.com"]
+        ))
+
+        self.assertEqual(message_id, "m1")
+        kwargs = mock_enqueue.call_args.kwargs
+        body = kwargs["payload"]["body"]
+        self.assertIn("3 documents", kwargs["payload"]["subject"])
+        self.assertEqual(kwargs["context"], {"tracking_ids": ["trk0", "trk1", "trk2"]})
+        self.assertEqual(kwargs["payload"]["cc_emails"], ["legal@acme.com"])
+        for n in range(3):
+            self.assertIn(f"Contract &lt;{n}&gt;", body)
+            self.assertIn(f"tracking_id=trk{n}&amp;token=t{n}", body)
+        self.assertIn("2030-01-01 10:00", body)
+
     @patch.object(EmailService, "send_email")
     def test_send_filled_pdf_email_defaults(self, mock_send_email):
         # No reply_name/reply_email/cc_emails provided
@@ -333,12 +378,12 @@ class TestEmailServiceSync(unittest.TestCase):
     @patch("auth_app.app.services.auth_service.AuthService.get_logo_and_theme", new_callable=AsyncMock)
     @patch("auth_app.app.services.auth_service.AuthService.get_domain_by_user_email", new_callable=AsyncMock)
     @patch("app.services.email_service.get_document_name")
-    @patch.object(EmailService, "send_email")
+    @patch("app.services.email_service.email_outbox_service.enqueue", new_callable=AsyncMock)
     @patch("app.services.email_service.notification_service.store_notification")
     async def test_send_link_with_no_cc_emails(
         self,
         mock_store_notification,
-        mock_send_email,
+        mock_enqueue,
         mock_get_document_name,
         mock_get_domain,
         mock_get_logo,
@@ -360,10 +405,11 @@ class TestEmailServiceSync(unittest.TestCase):
             validity_datetime=datetime(2025, 8, 13, 12, 0),
             cc_emails=None
         )
-        mock_send_email.assert_called_once()
-        mock_store_notification.assert_called()
-        kwargs = mock_send_email.call_args.kwargs
-        self.assertNotIn("cc_emails", kwargs or {})
+        mock_enqueue.assert_awaited_once()
+        mock_store_notification.assert_not_called()
+        kwargs = mock_enqueue.call_args.kwargs
+        self.assertEqual(kwargs["payload"]["cc_emails"], [])
+        self.assertEqual(kwargs["notification"]["party_email"], self.recipient)
 
     @patch("app.services.email_service.tracker_collection")
     @patch.object(EmailService, "send_email")
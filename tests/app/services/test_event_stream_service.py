@@ -0,0 +1,119 @@
+import asyncio
+import importlib
+import json
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+class FakePubSub:
+    def __init__(self):
+        self.channels = set()
+        self.inbox = asyncio.Queue()
+        self.subscribe = AsyncMock(side_effect=lambda *c: self.channels.update(c))
+        self.unsubscribe = AsyncMock(side_effect=lambda *c: self.channels.difference_update(c))
+
+    async def get_message(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.inbox.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def deliver(self, channel, event_id, event, data):
+        payload = json.dumps({"id": event_id, "event": event, "data": json.dumps(data)})
+        self.inbox.put_nowait({"type": "message", "channel": channel.encode(), "data": payload.encode()})
+
+
+@pytest.fixture
+def events():
+    sys.modules.pop("app.services.event_stream_service", None)
+    module = importlib.import_module("app.services.event_stream_service")
+    pubsub = FakePubSub()
+    client = MagicMock(pubsub=MagicMock(return_value=pubsub), xrange=AsyncMock(return_value=[]))
+    module._async_redis = lambda: client
+    module.client = client
+    module.pubsub = pubsub
+    yield module
+    sys.modules.pop("app.services.event_stream_service", None)
+
+
+async def _next(stream, timeout=1):
+    return await asyncio.wait_for(stream.__anext__(), timeout)
+
+
+def test_publish_records_history_then_publishes(events):
+    client = MagicMock()
+    client.pipeline.return_value.execute.return_value = [b"1700000000000-0", True]
+
+    with patch.dict(sys.modules, {"database.redis_db": MagicMock(redis_client=client)}):
+        event_id = events.event_stream.notify_document("acme.com", "doc1", "tracking_status", {"status": "completed"})
+
+    assert event_id == "1700000000000-0"
+    pipe = client.pipeline.return_value
+    assert pipe.xadd.call_args.args[0] == "events:document:acme.com:doc1:history"
+    assert pipe.xadd.call_args.kwargs == {"maxlen": events.EVENT_HISTORY_LENGTH, "approximate": True}
+    channel, message = client.publish.call_args.args
+    assert channel == "events:document:acme.com:doc1"
+    assert json.loads(message)["id"] == "1700000000000-0"
+    assert json.loads(json.loads(message)["data"]) == {"status": "completed"}
+
+
+def test_publish_failure_does_not_raise(events):
+    client = MagicMock()
+    client.pipeline.side_effect = ConnectionError("redis down")
+
+    with patch.dict(sys.modules, {"database.redis_db": MagicMock(redis_client=client)}):
+        assert events.event_stream.notify_user("acme.com", "a@acme.com", "notification", {}) is None
+
+
+@pytest.mark.asyncio
+async def test_resume_replays_missed_events_once(events):
+    channel = events.user_channel("acme.com", "a@acme.com")
+    events.client.xrange.return_value = [
+        (b"5-0", {b"event": b"notification", b"data": b'{"n": 1}'}),
+        (b"6-0", {b"event": b"notification", b"data": b'{"n": 2}'}),
+    ]
+    stream = events.event_stream.events([channel], last_event_id="4-0")
+
+    assert (await _next(stream)).startswith("retry:")
+    assert await _next(stream) == 'id: 5-0\nevent: notification\ndata: {"n": 1}\n\n'
+    assert await _next(stream) == 'id: 6-0\nevent: notification\ndata: {"n": 2}\n\n'
+    assert events.client.xrange.call_args.kwargs["min"] == "(4-0"
+
+    # Published while replaying: delivered live as well, but only sent once
+    events.pubsub.deliver(channel, "6-0", "notification", {"n": 2})
+    events.pubsub.deliver(channel, "7-0", "notification", {"n": 3})
+    assert await _next(stream) == 'id: 7-0\nevent: notification\ndata: {"n": 3}\n\n'
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_idle_stream_sends_heartbeats(events):
+    events.EVENT_HEARTBEAT_SECONDS = 0.01
+    stream = events.event_stream.events([events.user_channel("acme.com", "a@acme.com")], last_event_id="bogus")
+
+    await _next(stream)
+    assert await _next(stream) == ": ping\n\n"
+    events.client.xrange.assert_not_awaited()
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_channel_is_subscribed_while_someone_listens(events):
+    channel = events.document_channel("acme.com", "doc1")
+    first = events.event_stream.events([channel])
+    second = events.event_stream.events([channel])
+    await _next(first)
+    await _next(second)
+    events.pubsub.subscribe.assert_awaited_once_with(channel)
+
+    events.pubsub.deliver(channel, "1-0", "tracking_status", {"status": "completed"})
+    assert (await _next(first)).startswith("id: 1-0\n")
+    assert (await _next(second)).startswith("id: 1-0\n")
+
+    await first.aclose()
+    events.pubsub.unsubscribe.assert_not_awaited()
+    await second.aclose()
+    events.pubsub.unsubscribe.assert_awaited_once_with(channel)
+    assert events.pubsub.channels == set()
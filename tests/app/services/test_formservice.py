@@ -166,12 +166,34 @@ async def test_form_tracking_payload_builds_entries():
 async def test_send_forms_success(monkeypatch):
     service = FormService()
     monkeypatch.setattr(service, "form_tracking_payload", AsyncMock(return_value=[{"party_email": "e", "party_id": "pid", "party_name": "n"}]))
-    monkeypatch.setattr(service, "update_tracking", MagicMock())
-    monkeypatch.setattr("app.services.FormService.create_form_token", AsyncMock(return_value={"token": "t", "validity_datetime": datetime.now(timezone.utc)}))
+    monkeypatch.setattr(service, "update_trackings", MagicMock())
+    monkeypatch.setattr("auth_app.app.utils.security.create_form_token", AsyncMock(return_value={"token": "t", "validity_datetime": datetime.now(timezone.utc)}))
     monkeypatch.setattr("app.services.FormService.email_service.send_form_link", AsyncMock())
     data = MagicMock(form_id="fid", email_responses=[MagicMock()], holder=MagicMock(name="h", email="e"), cc_emails=[], validityDate="v", remainder=1)
     result = await service.send_forms(data, "email", "user@email.com")
     assert result["message"].startswith("Form sent")
+    assert result["failed_parties"] == []
+    service.update_trackings.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_send_forms_reports_failed_parties(monkeypatch):
+    service = FormService()
+    entries = [{"party_email": f"p{n}@x.com", "party_id": str(n), "party_name": "n"} for n in range(3)]
+    monkeypatch.setattr(service, "form_tracking_payload", AsyncMock(return_value=entries))
+    monkeypatch.setattr(service, "update_trackings", MagicMock())
+    monkeypatch.setattr("auth_app.app.utils.security.create_form_token", AsyncMock(return_value={"token": "t", "validity_datetime": datetime.now(timezone.utc)}))
+
+    async def send_form_link(recipient_email, **kwargs):
+        if recipient_email == "p1@x.com":
+            raise RuntimeError("smtp down")
+
+    monkeypatch.setattr("app.services.FormService.email_service.send_form_link", send_form_link)
+    data = MagicMock(form_id="fid", email_responses=[MagicMock()], holder=None, cc_emails=[], validityDate="v", remainder=1)
+    result = await service.send_forms(data, "email", "user@email.com")
+
+    assert result["tracked_parties"] == ["p0@x.com", "p1@x.com", "p2@x.com"]
+    assert result["failed_parties"] == [{"party_email": "p1@x.com", "error": "smtp down"}]
+    service.update_trackings.assert_called_once_with("fid", entries, "email")
 
 @pytest.mark.asyncio
 async def test_send_forms_handles_exception(monkeypatch):
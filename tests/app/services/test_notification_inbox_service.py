@@ -0,0 +1,111 @@
+import importlib
+import sys
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+
+@pytest.fixture
+def inbox():
+    stubs = {
+        "auth_app.app.database.connection": MagicMock(db=MagicMock(), sync_client=MagicMock(), DB_NAME="test"),
+        "repositories.s3_repo": MagicMock(s3_list_objects=MagicMock(return_value=[]), s3_download_json=MagicMock()),
+    }
+    with patch.dict(sys.modules, stubs):
+        sys.modules.pop("app.services.notification_inbox_service", None)
+        module = importlib.import_module("app.services.notification_inbox_service")
+        module.notifications = MagicMock(
+            insert_many=AsyncMock(), update_many=AsyncMock(return_value=MagicMock(modified_count=2)),
+            count_documents=AsyncMock(return_value=5), find_one=AsyncMock(),
+        )
+        module.counters = MagicMock(find_one=AsyncMock(return_value=None), update_one=AsyncMock())
+        module.imports = MagicMock(find_one=AsyncMock(return_value={"done": True}), update_one=AsyncMock())
+        module.notifications_sync, module.counters_sync = MagicMock(), MagicMock()
+        yield module
+    sys.modules.pop("app.services.notification_inbox_service", None)
+
+
+def _found(inbox, docs):
+    inbox.notifications.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=docs)
+
+
+def test_add_stores_notification_and_bumps_unread(inbox):
+    inbox.NotificationInbox.add("acme.com", "bob@acme.com", {"notification_id": "n1", "read": False})
+
+    doc = inbox.notifications_sync.insert_one.call_args.args[0]
+    assert (doc["owner"], doc["user_email"], doc["deleted"]) == ("acme.com", "bob@acme.com", False)
+    assert doc["created_at"] == doc["updated_at"]
+    inbox.counters_sync.update_one.assert_called_once_with(
+        {"_id": "acme.com:bob@acme.com"}, {"$inc": {"unread": 1}}, upsert=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_unread_count_reads_materialized_counter(inbox):
+    inbox.counters.find_one.return_value = {"unread": 3}
+    assert await inbox.NotificationInbox.unread_count("acme.com", "bob@acme.com") == 3
+    inbox.notifications.count_documents.assert_not_awaited()
+
+    inbox.counters.find_one.return_value = None
+    assert await inbox.NotificationInbox.unread_count("acme.com", "bob@acme.com") == 5
+
+
+@pytest.mark.asyncio
+async def test_sync_returns_changes_after_cursor(inbox):
+    changed = datetime(2026, 10, 19, 9, tzinfo=timezone.utc)
+    docs = [{"_id": ObjectId(), "notification_id": "n1", "read": True, "owner": "acme.com",
+             "user_email": "bob@acme.com", "updated_at": changed, "created_at": changed, "deleted": True}]
+    _found(inbox, docs)
+    inbox.counters.find_one.return_value = {"unread": 0}
+
+    first = await inbox.NotificationInbox.sync("acme.com", "bob@acme.com")
+    assert inbox.notifications.find.call_args.args[0]["deleted"] is False
+    assert first["items"] == [{"notification_id": "n1", "read": True, "deleted": True}]
+
+    _found(inbox, [])
+    again = await inbox.NotificationInbox.sync("acme.com", "bob@acme.com", since=first["cursor"])
+    query = inbox.notifications.find.call_args.args[0]
+    assert query["$or"] == [{"updated_at": {"$gt": changed}}, {"updated_at": changed, "_id": {"$gt": docs[0]["_id"]}}]
+    assert "deleted" not in query
+    assert again == {"items": [], "cursor": first["cursor"], "has_more": False, "unread": 0}
+
+
+@pytest.mark.asyncio
+async def test_sync_rejects_bad_cursor(inbox):
+    with pytest.raises(HTTPException) as exc:
+        await inbox.NotificationInbox.sync("acme.com", "bob@acme.com", since="garbage")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_mark_read_in_bulk_recounts_unread(inbox):
+    inbox.notifications.count_documents.return_value = 1
+
+    result = await inbox.NotificationInbox.mark_read("acme.com", "bob@acme.com", ["n1", "n2"])
+
+    assert result == {"updated": 2, "unread": 1}
+    query, update = inbox.notifications.update_many.call_args.args
+    assert query["notification_id"] == {"$in": ["n1", "n2"]} and query["read"] is False
+    assert update["$set"]["read"] is True
+    inbox.counters.update_one.assert_awaited_with({"_id": "acme.com:bob@acme.com"}, {"$set": {"unread": 1}},
+                                                  upsert=True)
+
+
+@pytest.mark.asyncio
+async def test_legacy_s3_notifications_are_imported_once(inbox):
+    inbox.imports.find_one.return_value = None
+    inbox.s3_list_objects = MagicMock(return_value=["acme.com/notifications/bob@acme.com/n1.json"])
+    inbox.s3_download_json = MagicMock(return_value={"notification_id": "n1", "read": False,
+                                                     "timestamp": "2026-10-01T10:00:00Z"})
+    _found(inbox, [])
+
+    await inbox.NotificationInbox.list("acme.com", "bob@acme.com")
+    await inbox.NotificationInbox.list("acme.com", "bob@acme.com")
+
+    inbox.s3_list_objects.assert_called_once_with("acme.com/notifications/bob@acme.com/")
+    records = inbox.notifications.insert_many.call_args.args[0]
+    assert records[0]["created_at"] == datetime(2026, 10, 1, 10, tzinfo=timezone.utc)
+    inbox.imports.update_one.assert_awaited_once()
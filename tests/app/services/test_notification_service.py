@@ -15,11 +15,27 @@ from unittest.mock import patch, MagicMock
 
 from app.services.notification_service import NotificationService
 
+
+# Patch the objects NotificationService really uses (other test files swap the module out);
+# the event stream is stubbed as well so no test reaches Mongo or Redis
+_MODULE = NotificationService.store_notification.__globals__
+
+
+@pytest.fixture
+def mock_add():
+    with patch.object(_MODULE["notification_inbox"], "add") as add, \
+            patch.object(_MODULE["event_stream"], "notify_user"):
+        yield add
+
+
+@pytest.fixture
+def mock_logger():
+    with patch.dict(_MODULE, {"logger": MagicMock()}):
+        yield _MODULE["logger"]
+
 # --- store_notification ---
 
-@patch("app.services.notification_service.s3_upload_json")
-@patch("app.services.notification_service.logger")
-def test_store_notification_completed(mock_logger, mock_s3):
+def test_store_notification_completed(mock_logger, mock_add):
     parties_status = [{"id": "1", "name": "Alice", "email": "alice@example.com", "status": "completed"}]
     NotificationService.store_notification(
         email="user@example.com",
@@ -30,12 +46,10 @@ def test_store_notification_completed(mock_logger, mock_s3):
         parties_status=parties_status,
         timestamp="2025-09-19T12:00:00Z"
     )
-    assert mock_s3.called
+    assert mock_add.called
     assert mock_logger.info.called
 
-@patch("app.services.notification_service.s3_upload_json")
-@patch("app.services.notification_service.logger")
-def test_store_notification_cancelled(mock_logger, mock_s3):
+def test_store_notification_cancelled(mock_logger, mock_add):
     NotificationService.store_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -47,12 +61,10 @@ def test_store_notification_cancelled(mock_logger, mock_s3):
         action="cancelled",
         party_name="Bob"
     )
-    assert mock_s3.called
+    assert mock_add.called
     assert mock_logger.info.called
 
-@patch("app.services.notification_service.s3_upload_json")
-@patch("app.services.notification_service.logger")
-def test_store_notification_declined_with_reason(mock_logger, mock_s3):
+def test_store_notification_declined_with_reason(mock_logger, mock_add):
     NotificationService.store_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -65,12 +77,10 @@ def test_store_notification_declined_with_reason(mock_logger, mock_s3):
         party_name="Bob",
         reason="Not interested"
     )
-    assert mock_s3.called
+    assert mock_add.called
     assert mock_logger.info.called
 
-@patch("app.services.notification_service.s3_upload_json")
-@patch("app.services.notification_service.logger")
-def test_store_notification_dispatched_with_reason(mock_logger, mock_s3):
+def test_store_notification_dispatched_with_reason(mock_logger, mock_add):
     NotificationService.store_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -83,12 +93,10 @@ def test_store_notification_dispatched_with_reason(mock_logger, mock_s3):
         party_name="Bob",
         reason="Urgent"
     )
-    assert mock_s3.called
+    assert mock_add.called
     assert mock_logger.info.called
 
-@patch("app.services.notification_service.s3_upload_json")
-@patch("app.services.notification_service.logger")
-def test_store_notification_failed_with_reason(mock_logger, mock_s3):
+def test_store_notification_failed_with_reason(mock_logger, mock_add):
     NotificationService.store_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -101,12 +109,11 @@ def test_store_notification_failed_with_reason(mock_logger, mock_s3):
         party_name="Bob",
         reason="Network error"
     )
-    assert mock_s3.called
+    assert mock_add.called
     assert mock_logger.info.called
 
-@patch("app.services.notification_service.s3_upload_json", side_effect=Exception("S3 error"))
-@patch("app.services.notification_service.logger")
-def test_store_notification_exception(mock_logger, mock_s3):
+def test_store_notification_exception(mock_logger, mock_add):
+    mock_add.side_effect = Exception("Mongo error")
     NotificationService.store_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -120,10 +127,8 @@ def test_store_notification_exception(mock_logger, mock_s3):
 
 # --- store_form_notification ---
 
-@patch("app.services.notification_service.s3_upload_json")
-@patch("app.services.notification_service.logger")
 @pytest.mark.asyncio
-async def test_store_form_notification_success(mock_logger, mock_s3):
+async def test_store_form_notification_success(mock_logger, mock_add):
     await NotificationService.store_form_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -133,13 +138,12 @@ async def test_store_form_notification_success(mock_logger, mock_s3):
         timestamp="2025-09-19T12:00:00Z",
         party_name="Alice"
     )
-    assert mock_s3.called
+    assert mock_add.called
     assert mock_logger.info.called
 
-@patch("app.services.notification_service.s3_upload_json", side_effect=Exception("S3 error"))
-@patch("app.services.notification_service.logger")
 @pytest.mark.asyncio
-async def test_store_form_notification_exception(mock_logger, mock_s3):
+async def test_store_form_notification_exception(mock_logger, mock_add):
+    mock_add.side_effect = Exception("Mongo error")
     await NotificationService.store_form_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -149,4 +153,22 @@ async def test_store_form_notification_exception(mock_logger, mock_s3):
         timestamp="2025-09-19T12:00:00Z",
         party_name="Alice"
     )
-    assert mock_logger.exception.called
\ No newline at end of file
+    assert mock_logger.exception.called
+
+def test_store_notification_pushes_event_to_user():
+    # Patch the objects this NotificationService really uses; other test files swap the module out
+    module_globals = NotificationService.store_notification.__globals__
+    with patch.object(module_globals["notification_inbox"], "add") as mock_add, \
+            patch.object(module_globals["event_stream"], "notify_user") as mock_notify:
+        NotificationService.store_notification(
+            email="acme.com",
+            user_email="owner@acme.com",
+            document_id="doc1",
+            tracking_id="track1",
+            document_name="Doc",
+            parties_status=[],
+            timestamp="2025-09-19T12:00:00Z",
+        )
+    owner, user_email, event, notification = mock_notify.call_args.args
+    assert (owner, user_email, event) == ("acme.com", "owner@acme.com", "notification")
+    assert notification == mock_add.call_args.args[2]
@@ -12,11 +12,27 @@ import pytest
 from unittest.mock import patch, MagicMock
 from app.services.notification_service import NotificationService
 
+
+# Patch the objects NotificationService really uses (other test files swap the module out);
+# the event stream is stubbed as well so no test reaches Mongo or Redis
+_MODULE = NotificationService.store_notification.__globals__
+
+
+@pytest.fixture
+def mock_add():
+    with patch.object(_MODULE["notification_inbox"], "add") as add, \
+            patch.object(_MODULE["event_stream"], "notify_user"):
+        yield add
+
+
+@pytest.fixture
+def mock_logger():
+    with patch.dict(_MODULE, {"logger": MagicMock()}):
+        yield _MODULE["logger"]
+
 # --- store_notification ---
 
-@patch("app.services.notification_service.s3_upload_json")
-@patch("app.services.notification_service.logger")
-def test_store_notification_completed(mock_logger, mock_s3):
+def test_store_notification_completed(mock_logger, mock_add):
     NotificationService.store_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -26,12 +42,10 @@ def test_store_notification_completed(mock_logger, mock_s3):
         parties_status=[{"id": "1", "name": "Alice", "email": "alice@example.com", "status": "completed"}],
         timestamp="2025-09-19T12:00:00Z"
     )
-    mock_s3.assert_called_once()
+    mock_add.assert_called_once()
     mock_logger.info.assert_called()
 
-@patch("app.services.notification_service.s3_upload_json")
-@patch("app.services.notification_service.logger")
-def test_store_notification_cancelled(mock_logger, mock_s3):
+def test_store_notification_cancelled(mock_logger, mock_add):
     NotificationService.store_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -43,12 +57,10 @@ def test_store_notification_cancelled(mock_logger, mock_s3):
         action="cancelled",
         party_name="Bob"
     )
-    mock_s3.assert_called_once()
+    mock_add.assert_called_once()
     mock_logger.info.assert_called()
 
-@patch("app.services.notification_service.s3_upload_json")
-@patch("app.services.notification_service.logger")
-def test_store_notification_declined_with_reason(mock_logger, mock_s3):
+def test_store_notification_declined_with_reason(mock_logger, mock_add):
     NotificationService.store_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -61,12 +73,10 @@ def test_store_notification_declined_with_reason(mock_logger, mock_s3):
         party_name="Bob",
         reason="Not interested"
     )
-    mock_s3.assert_called_once()
+    mock_add.assert_called_once()
     mock_logger.info.assert_called()
 
-@patch("app.services.notification_service.s3_upload_json")
-@patch("app.services.notification_service.logger")
-def test_store_notification_dispatched_with_reason(mock_logger, mock_s3):
+def test_store_notification_dispatched_with_reason(mock_logger, mock_add):
     NotificationService.store_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -79,12 +89,10 @@ def test_store_notification_dispatched_with_reason(mock_logger, mock_s3):
         party_name="Bob",
         reason="Urgent"
     )
-    mock_s3.assert_called_once()
+    mock_add.assert_called_once()
     mock_logger.info.assert_called()
 
-@patch("app.services.notification_service.s3_upload_json")
-@patch("app.services.notification_service.logger")
-def test_store_notification_failed_with_reason(mock_logger, mock_s3):
+def test_store_notification_failed_with_reason(mock_logger, mock_add):
     NotificationService.store_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -97,12 +105,11 @@ def test_store_notification_failed_with_reason(mock_logger, mock_s3):
         party_name="Bob",
         reason="Network error"
     )
-    mock_s3.assert_called_once()
+    mock_add.assert_called_once()
     mock_logger.info.assert_called()
 
-@patch("app.services.notification_service.s3_upload_json", side_effect=Exception("S3 error"))
-@patch("app.services.notification_service.logger")
-def test_store_notification_exception(mock_logger, mock_s3):
+def test_store_notification_exception(mock_logger, mock_add):
+    mock_add.side_effect = Exception("Mongo error")
     NotificationService.store_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -118,10 +125,8 @@ def test_store_notification_exception(mock_logger, mock_s3):
 
 import asyncio
 
-@patch("app.services.notification_service.s3_upload_json")
-@patch("app.services.notification_service.logger")
 @pytest.mark.asyncio
-async def test_store_form_notification_success(mock_logger, mock_s3):
+async def test_store_form_notification_success(mock_logger, mock_add):
     await NotificationService.store_form_notification(
         email="user@example.com",
         user_email="owner@example.com",
@@ -131,13 +136,12 @@ async def test_store_form_notification_success(mock_logger, mock_s3):
         timestamp="2025-09-19T12:00:00Z",
         party_name="Alice"
     )
-    mock_s3.assert_called_once()
+    mock_add.assert_called_once()
     mock_logger.info.assert_called()
 
-@patch("app.services.notification_service.s3_upload_json", side_effect=Exception("S3 error"))
-@patch("app.services.notification_service.logger")
 @pytest.mark.asyncio
-async def test_store_form_notification_exception(mock_logger, mock_s3):
+async def test_store_form_notification_exception(mock_logger, mock_add):
+    mock_add.side_effect = Exception("Mongo error")
     await NotificationService.store_form_notification(
         email="user@example.com",
         user_email="owner@example.com",
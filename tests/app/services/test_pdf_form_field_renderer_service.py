@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import patch, MagicMock, call
 from app.services.pdf_form_field_renderer_service import (
-    PDFFieldInserter, generate_signature_b64_from_fontname, get_font_path_by_name
+    PDFFieldInserter, generate_signature_b64_from_fontname, get_font_path_by_name, _render_signature_png
 )
 import base64
 from PIL import Image
@@ -31,6 +31,24 @@ def test_generate_signature_b64_from_fontname_invalid_font(monkeypatch):
     with pytest.raises(ValueError):
         generate_signature_b64_from_fontname('sig', 'NoFont')
 
+def test_generate_signature_b64_from_fontname_cached(monkeypatch, tmp_path):
+    font_path = tmp_path / 'CachedFont.ttf'
+    font_path.write_bytes(b'fakefont')
+    _render_signature_png.cache_clear()
+    truetype = MagicMock(return_value=MagicMock())
+    monkeypatch.setattr('app.services.pdf_form_field_renderer_service.get_font_path_by_name', lambda n: str(font_path))
+    monkeypatch.setattr('PIL.ImageFont.truetype', truetype)
+    monkeypatch.setattr('PIL.ImageDraw.Draw', lambda img: MagicMock(textbbox=lambda xy, text, font: (0,0,10,10), text=lambda xy, text, font, fill: None))
+    monkeypatch.setattr('PIL.Image.new', lambda mode, size, color: MagicMock(save=lambda buf, format: buf.write(b'PNGDATA')))
+
+    first = generate_signature_b64_from_fontname('sig', 'CachedFont')
+    second = generate_signature_b64_from_fontname('sig', 'CachedFont', image_size=[250, 60])
+    other_color = generate_signature_b64_from_fontname('sig', 'CachedFont', text_color=(0, 0, 255))
+
+    assert first == second == other_color == 'data:image/png;base64,' + base64.b64encode(b'PNGDATA').decode()
+    assert truetype.call_count == 2
+    assert _render_signature_png.cache_info().hits == 1
+
 def test_load_fonts_from_directory(tmp_path):
     font_file = tmp_path / 'TestFont-Regular.ttf'
     font_file.write_bytes(b'fakefont')
@@ -219,7 +237,9 @@ import fitz  # PyMuPDF
 from io import BytesIO
 from PIL import Image
 from unittest.mock import MagicMock, patch
+import time
 
+import app.services.pdf_form_field_renderer_service as renderer_module
 from app.services.pdf_form_field_renderer_service import PDFFieldInserter
 
 
@@ -303,3 +323,71 @@ def test_insert_transparent_signature(mock_insert_image, inserter, dummy_pdf):
     page = dummy_pdf[0]
     inserter.insert_transparent_signature(100, image, page, 100, 10, 20)
     mock_insert_image.assert_called_once()
+
+
+def _noise_png(mode="RGBA", size=(300, 80)):
+    image = Image.effect_noise(size, 60).convert(mode)
+    buf = BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _render_pages(inserter, pages, value):
+    pdf = fitz.open()
+    for page_number in range(pages):
+        pdf.new_page()
+        with patch.object(renderer_module, "s3_upload_bytes"):
+            inserter.insert_field_value_to_pdf(
+                "email", {"type": "signature"}, "signature", 60, pdf[page_number], page_number, pdf,
+                "drawn", value, 150, 50, 700, "track", "party"
+            )
+    return pdf
+
+
+def test_repeated_signature_image_embedded_once(inserter):
+    png = _noise_png()
+    value = "data:image/png;base64," + base64.b64encode(png).decode()
+
+    single = _render_pages(PDFFieldInserter(fonts_dir="nonexistent_fonts"), 1, value)
+    multi = _render_pages(inserter, 40, value)
+
+    images = {img[0] for page in multi for img in page.get_images(full=True)}
+    assert len(images) == 1
+    assert len(multi.write()) < len(single.write()) + 40 * 1024
+
+
+def test_repeated_signature_image_skips_reencoding(inserter):
+    png = _noise_png(size=(600, 160))
+    value = "data:image/png;base64," + base64.b64encode(png).decode()
+
+    with patch.object(PDFFieldInserter, "insert_transparent_signature",
+                      wraps=inserter.insert_transparent_signature) as encode:
+        start = time.perf_counter()
+        _render_pages(inserter, 40, value)
+        elapsed = time.perf_counter() - start
+
+    assert encode.call_count == 1
+    assert elapsed < 2.0
+
+
+def test_signature_image_xrefs_not_shared_between_documents(inserter):
+    png = _noise_png(mode="RGB")
+    value = "data:image/png;base64," + base64.b64encode(png).decode()
+
+    first = _render_pages(inserter, 2, value)
+    second = _render_pages(inserter, 2, value)
+
+    assert first[1].get_images() and second[1].get_images()
+    assert fitz.open("pdf", second.write())[1].get_images()
+
+
+def test_signature_image_cache_starts_over_for_each_document(inserter):
+    png = _noise_png(mode="RGB")
+    value = "data:image/png;base64," + base64.b64encode(png).decode()
+
+    first = _render_pages(inserter, 2, value)
+    second = _render_pages(inserter, 1, value)
+
+    assert inserter._image_document is second
+    assert list(inserter._image_xrefs.values()) == [(second[0].get_images()[0][0], "RGB")]
+    assert first[1].get_images()
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import fitz
+import pytest
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+
+from app.services import pdf_merge_service as merge_module
+from app.services.pdf_merge_service import PDFMergeService
+
+
+class PlainCipher:
+    def encrypt(self, data):
+        return data
+
+    def decrypt(self, data):
+        return data
+
+
+def _pdf(label: str) -> bytes:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), label)
+    return doc.tobytes()
+
+
+def _collect(response) -> bytes:
+    async def consume():
+        return b"".join([chunk async for chunk in response.body_iterator])
+    return asyncio.run(consume())
+
+
+@pytest.fixture
+def storage():
+    objects = {f"a@x.com/signed/doc/trk/file{i}.pdf": _pdf(f"page-{i}") for i in range(6)}
+    s3 = MagicMock()
+    s3.get_object.side_effect = ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+    with patch.object(merge_module, "s3_download_bytes", side_effect=lambda key: objects[key]), \
+            patch.object(merge_module, "s3_client", s3):
+        yield objects, s3
+
+
+def _sources(objects):
+    return [{"Key": key, "ETag": f'"{i}"'} for i, key in enumerate(objects)]
+
+
+def test_cache_key_changes_with_etag():
+    sources = [{"Key": "a", "ETag": '"1"'}, {"Key": "b", "ETag": '"2"'}]
+    changed = [{"Key": "a", "ETag": '"1"'}, {"Key": "b", "ETag": '"3"'}]
+    assert PDFMergeService.cache_key(sources) == PDFMergeService.cache_key(list(sources))
+    assert PDFMergeService.cache_key(sources) != PDFMergeService.cache_key(changed)
+
+
+def test_merge_preserves_source_order(storage):
+    objects, _ = storage
+    path = asyncio.run(PDFMergeService.merge_to_file(list(objects), PlainCipher()))
+    try:
+        merged = fitz.open(path)
+        assert [page.get_text().strip() for page in merged] == [f"page-{i}" for i in range(6)]
+    finally:
+        os.remove(path)
+
+
+def test_merge_bounds_parallel_downloads(storage):
+    objects, _ = storage
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def slow_download(key):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return objects[key]
+
+    with patch.object(merge_module, "s3_download_bytes", side_effect=slow_download), \
+            patch.object(merge_module, "MERGE_CONCURRENCY", 2):
+        path = asyncio.run(PDFMergeService.merge_to_file(list(objects), PlainCipher()))
+    os.remove(path)
+    assert peak[0] == 2
+
+
+def test_merge_skips_broken_sources(storage):
+    objects, _ = storage
+    keys = list(objects)
+    objects[keys[1]] = b"not a pdf"
+    path = asyncio.run(PDFMergeService.merge_to_file(keys, PlainCipher()))
+    try:
+        assert fitz.open(path).page_count == 5
+    finally:
+        os.remove(path)
+
+
+def test_merge_with_nothing_mergeable_raises(storage):
+    objects, _ = storage
+    for key in objects:
+        objects[key] = b"broken"
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(PDFMergeService.merge_to_file(list(objects), PlainCipher()))
+    assert exc.value.status_code == 422
+
+
+def test_response_streams_and_populates_cache(storage):
+    objects, s3 = storage
+    response = asyncio.run(PDFMergeService.merged_pdf_response("a@x.com", _sources(objects), PlainCipher()))
+
+    body = _collect(response)
+    assert fitz.open("pdf", body).page_count == 6
+    cache_key = PDFMergeService.cache_key(_sources(objects))
+    assert response.headers["etag"] == f'"{cache_key}"'
+    put = s3.put_object.call_args.kwargs
+    assert put["Key"] == f"a@x.com/cache/merged/{cache_key}.pdf"
+    assert put["Body"] == body
+
+
+def test_response_served_from_cache(storage):
+    objects, s3 = storage
+    cached = _pdf("cached")
+    s3.get_object.side_effect = None
+    s3.get_object.return_value = {"Body": MagicMock(read=MagicMock(return_value=cached))}
+
+    with patch.object(PDFMergeService, "merge_to_file") as merge:
+        response = asyncio.run(PDFMergeService.merged_pdf_response("a@x.com", _sources(objects), PlainCipher()))
+        assert _collect(response) == cached
+    merge.assert_not_called()
+
+
+def test_response_not_modified(storage):
+    objects, s3 = storage
+    etag = f'"{PDFMergeService.cache_key(_sources(objects))}"'
+    response = asyncio.run(PDFMergeService.merged_pdf_response("a@x.com", _sources(objects), PlainCipher(), etag))
+    assert response.status_code == 304
+    s3.get_object.assert_not_called()
@@ -0,0 +1,106 @@
+import asyncio
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+import fitz
+import pytest
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from PIL import Image
+
+from app.services import preview_service as preview_module
+from app.services.preview_service import PreviewService
+
+
+class PlainCipher:
+    def encrypt(self, data):
+        return data
+
+    def decrypt(self, data):
+        return data
+
+
+def _pdf(pages: int = 6) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page(width=200, height=300).insert_text((20, 40), f"page-{i + 1}")
+    return doc.tobytes()
+
+
+ENTRY = {"file_path": "a@x.com/files/contract.pdf", "last_modified": "2025-01-01T00:00:00+00:00"}
+
+
+@pytest.fixture
+def s3():
+    stored = {}
+    client = MagicMock()
+
+    def get_object(Bucket, Key):
+        if Key not in stored:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        return {"Body": MagicMock(read=MagicMock(return_value=stored[Key]))}
+
+    client.get_object.side_effect = get_object
+    client.put_object.side_effect = lambda **kwargs: stored.__setitem__(kwargs["Key"], kwargs["Body"])
+    with patch.object(preview_module, "s3_client", client), \
+            patch.object(preview_module, "s3_download_bytes", return_value=_pdf()) as download:
+        yield stored, download
+
+
+def test_render_pages_encodes_webp_and_png_at_requested_dpi():
+    pdf = _pdf(2)
+    webp = PreviewService.render_pages(pdf, 1, 1, 72, "webp")[1]
+    png = PreviewService.render_pages(pdf, 2, 1, 144, "png")[2]
+
+    assert Image.open(BytesIO(webp)).format == "WEBP"
+    assert Image.open(BytesIO(webp)).size == (200, 300)
+    assert Image.open(BytesIO(png)).size == (400, 600)
+
+
+def test_render_pages_stops_at_last_page():
+    assert sorted(PreviewService.render_pages(_pdf(3), 2, 5, 36, "png")) == [2, 3]
+
+
+def test_version_changes_with_last_modified():
+    assert PreviewService.version("2025-01-01") != PreviewService.version("2025-01-02")
+
+
+def test_page_miss_renders_read_ahead_and_caches(s3):
+    stored, download = s3
+    image = asyncio.run(PreviewService.page_image("a@x.com", "doc1", ENTRY, PlainCipher(), 2, 48, "png"))
+
+    assert Image.open(BytesIO(image)).format == "PNG"
+    version = PreviewService.version(ENTRY["last_modified"])
+    cached_pages = sorted(int(key.rsplit("/p", 1)[1].split("-")[0]) for key in stored)
+    assert cached_pages == list(range(2, 3 + preview_module.PREVIEW_READ_AHEAD))
+    assert PreviewService.cache_key("a@x.com", "doc1", version, 2, 48, "png") in stored
+
+    asyncio.run(PreviewService.page_image("a@x.com", "doc1", ENTRY, PlainCipher(), 3, 48, "png"))
+    download.assert_called_once()
+
+
+def test_page_out_of_range_is_404(s3):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(PreviewService.page_image("a@x.com", "doc1", ENTRY, PlainCipher(), 40, 48, "png"))
+    assert exc.value.status_code == 404
+
+
+def test_thumbnail_at_upload_is_served_without_the_pdf(s3):
+    stored, download = s3
+    asyncio.run(PreviewService.store_thumbnail("a@x.com", "doc1", ENTRY["last_modified"], _pdf(), PlainCipher()))
+    assert len(stored) == 1
+
+    response = asyncio.run(PreviewService.page_response("a@x.com", "doc1", ENTRY, PlainCipher(), 1,
+                                                        preview_module.THUMBNAIL_DPI, "webp"))
+    assert response.media_type == "image/webp"
+    assert response.body == next(iter(stored.values()))
+    download.assert_not_called()
+
+
+def test_matching_etag_returns_not_modified(s3):
+    _, download = s3
+    version = PreviewService.version(ENTRY["last_modified"])
+    response = asyncio.run(PreviewService.page_response("a@x.com", "doc1", ENTRY, PlainCipher(), 1, 96, "webp",
+                                                        f'"{version}-1-96-webp"'))
+    assert response.status_code == 304
+    download.assert_not_called()
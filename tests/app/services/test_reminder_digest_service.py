@@ -0,0 +1,132 @@
+import importlib
+import sys
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def digest():
+    jobs_collection = MagicMock(update_many=AsyncMock())
+    handler = MagicMock(prepare_reminder=AsyncMock(), record_reminder=AsyncMock())
+    stubs = {
+        "app.services.email_service": MagicMock(email_service=MagicMock(
+            send_link=AsyncMock(), send_reminder_digest=AsyncMock())),
+        "app.services.signature_service": MagicMock(SignatureHandler=handler),
+        "auth_app.app.database.connection": MagicMock(db=MagicMock()),
+        "utils.scheduler_manager": MagicMock(
+            SchedulerManager=MagicMock(retry_or_fail=AsyncMock()), jobs_collection=jobs_collection),
+    }
+    with patch.dict(sys.modules, stubs):
+        sys.modules.pop("app.services.reminder_digest_service", None)
+        module = importlib.import_module("app.services.reminder_digest_service")
+        module.db = MagicMock(__getitem__=MagicMock(return_value=MagicMock(update_many=AsyncMock())))
+        module.save_document_url = MagicMock()
+        module.handler = handler
+        yield module
+    sys.modules.pop("app.services.reminder_digest_service", None)
+
+
+def _job(n, owner="acme.com"):
+    return {"job_id": f"j{n}", "document_id": f"doc{n}", "tracking_id": f"trk{n}", "email": owner,
+            "user_email": "holder@acme.com", "status": "digesting"}
+
+
+def _item(n, recipient, cc_emails=None):
+    return {"document_id": f"doc{n}", "tracking_id": f"trk{n}", "party_id": "1", "party_name": "Bob",
+            "recipient_email": recipient, "document_url": f"https://x/signing?doc{n}", "token": f"t{n}",
+            "validity_datetime": "2030-01-01T10:00:00+00:00", "document_name": f"Contract {n}",
+            "email_response": [], "holder": {"name": "Holder", "email": "holder@acme.com"},
+            "cc_emails": cc_emails}
+
+
+def _claims(digest, jobs, results):
+    digest.ReminderDigest._claim = AsyncMock(return_value=("d1", jobs))
+    by_tracking = dict(zip((job["tracking_id"] for job in jobs), results))
+
+    async def prepare(document_id, tracking_id, email, user_email):
+        result = by_tracking[tracking_id]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    digest.handler.prepare_reminder.side_effect = prepare
+
+
+@pytest.mark.asyncio
+async def test_reminders_for_one_signer_are_sent_as_one_digest(digest):
+    jobs = [_job(1), _job(2), _job(3), _job(4)]
+    _claims(digest, jobs, [_item(1, "bob@x.com"), _item(2, "Bob@X.com"), _item(3, "bob@x.com"),
+                           _item(4, "carol@x.com")])
+
+    await digest.ReminderDigest.process_due()
+
+    mailer = digest.email_service
+    mailer.send_reminder_digest.assert_awaited_once()
+    items = mailer.send_reminder_digest.call_args.args[4]
+    assert [item["tracking_id"] for item in items] == ["trk1", "trk2", "trk3"]
+    # A lone reminder keeps the regular signing email
+    mailer.send_link.assert_awaited_once()
+    assert mailer.send_link.call_args.kwargs["recipient_email"] == "carol@x.com"
+
+    completed = digest.jobs_collection.update_many.call_args.args
+    assert completed[0] == {"job_id": {"$in": ["j1", "j2", "j3", "j4"]}}
+    assert completed[1]["$set"]["status"] == "completed"
+    assert digest.handler.record_reminder.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_same_signer_in_other_tenant_gets_separate_email(digest):
+    jobs = [_job(1, owner="acme.com"), _job(2, owner="globex.com")]
+    _claims(digest, jobs, [_item(1, "bob@x.com"), _item(2, "bob@x.com")])
+
+    await digest.ReminderDigest.process_due()
+
+    assert digest.email_service.send_link.await_count == 2
+    digest.email_service.send_reminder_digest.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_documents_are_only_digested_with_the_same_cc_list(digest):
+    jobs = [_job(1), _job(2), _job(3), _job(4)]
+    _claims(digest, jobs, [_item(1, "bob@x.com", ["Legal@acme.com", "bob@x.com"]),
+                           _item(2, "bob@x.com", ["legal@acme.com"]),
+                           _item(3, "bob@x.com"), _item(4, "bob@x.com", ["sales@acme.com"])])
+
+    await digest.ReminderDigest.process_due()
+
+    mailer = digest.email_service
+    mailer.send_reminder_digest.assert_awaited_once()
+    assert [item["tracking_id"] for item in mailer.send_reminder_digest.call_args.args[4]] == ["trk1", "trk2"]
+    assert mailer.send_reminder_digest.call_args.kwargs["cc_emails"] == ["legal@acme.com"]
+    # Alone in their CC group: regular signing emails with their own CCs
+    sent = {c.kwargs["tracking_id"]: c.kwargs["cc_emails"] for c in mailer.send_link.await_args_list}
+    assert sent == {"trk3": None, "trk4": ["sales@acme.com"]}
+
+
+@pytest.mark.asyncio
+async def test_terminal_and_failed_trackings_are_not_mailed(digest):
+    jobs = [_job(1), _job(2), _job(3)]
+    _claims(digest, jobs, [{"skipped": "expired"}, RuntimeError("s3 down"), _item(3, "bob@x.com")])
+
+    await digest.ReminderDigest.process_due()
+
+    retry = digest.SchedulerManager.retry_or_fail
+    retry.assert_awaited_once()
+    assert retry.call_args.args[0]["job_id"] == "j2"
+    updates = [c.args for c in digest.jobs_collection.update_many.call_args_list]
+    assert updates[0] == ({"job_id": {"$in": ["j1"]}}, {"$set": {"status": "expired", "updated_at": ANY}})
+    assert updates[1][0] == {"job_id": {"$in": ["j3"]}}
+
+
+@pytest.mark.asyncio
+async def test_failed_digest_email_retries_its_reminders(digest):
+    jobs = [_job(1), _job(2)]
+    _claims(digest, jobs, [_item(1, "bob@x.com"), _item(2, "bob@x.com")])
+    digest.email_service.send_reminder_digest.side_effect = RuntimeError("outbox unavailable")
+
+    await digest.ReminderDigest.process_due()
+
+    assert [c.args[0]["job_id"] for c in digest.SchedulerManager.retry_or_fail.await_args_list] == ["j1", "j2"]
+    digest.handler.record_reminder.assert_not_awaited()
+    digest.jobs_collection.update_many.assert_not_awaited()
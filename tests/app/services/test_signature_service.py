@@ -142,6 +142,72 @@ async def test_sign_field_tracking_not_found(mock_get_metadata):
     with pytest.raises(Exception):
         await SignatureHandler.sign_field("user@example.com", "owner@example.com", data)
 
+# --- sign_batch ---
+
+def _submission(document_id, field_id="f1"):
+    return MagicMock(document_id=document_id, tracking_id=f"trk-{document_id}", party_id="1",
+                     fields=[MagicMock(fields_ids=[MagicMock(field_id=field_id)])])
+
+BATCH_METADATA = {"parties": [{"id": "1"}], "fields": [{"id": "f1", "partyId": "1"}]}
+
+@pytest.fixture
+def batch_redis():
+    with patch.dict(sys.modules, {"database.redis_db": MagicMock(redis_client=MagicMock())}):
+        yield
+
+@patch("app.services.signature_service.MetadataService.get_metadata", return_value=BATCH_METADATA)
+@pytest.mark.asyncio
+async def test_sign_batch_rejects_everything_when_one_is_invalid(mock_get_metadata, batch_redis):
+    documents = [_submission("doc1"), _submission("doc2", field_id="someone-elses")]
+    with patch.object(SignatureHandler, "sign_field", new_callable=AsyncMock) as sign_field:
+        with pytest.raises(HTTPException) as exc:
+            await SignatureHandler.sign_batch("user@example.com", "owner@example.com", documents)
+    assert exc.value.status_code == 422
+    assert [e["document_id"] for e in exc.value.detail["errors"]] == ["doc2"]
+    sign_field.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_sign_batch_rejects_duplicates():
+    with pytest.raises(HTTPException) as exc:
+        await SignatureHandler.sign_batch("user@example.com", "owner@example.com", [_submission("doc1")] * 2)
+    assert exc.value.status_code == 422
+
+@patch("app.services.signature_service.MetadataService.get_metadata", return_value=BATCH_METADATA)
+@pytest.mark.asyncio
+async def test_sign_batch_reports_each_document(mock_get_metadata, batch_redis):
+    async def sign(email, user_email, data):
+        if data.document_id == "doc2":
+            raise HTTPException(status_code=500, detail="Failed to process signature")
+        return {"document_id": data.document_id, "signed": True}
+
+    documents = [_submission("doc1"), _submission("doc2"), _submission("doc3")]
+    with patch.object(SignatureHandler, "sign_field", side_effect=sign):
+        result = await SignatureHandler.sign_batch("user@example.com", "owner@example.com", documents)
+
+    assert (result["signed"], result["failed"]) == (2, 1)
+    assert [r["status"] for r in result["results"]] == ["signed", "failed", "signed"]
+    assert result["results"][1]["error"] == "Failed to process signature"
+
+@patch("app.services.signature_service.MetadataService.get_metadata", return_value=BATCH_METADATA)
+@pytest.mark.asyncio
+async def test_sign_batch_bounds_parallel_signing(mock_get_metadata, batch_redis):
+    import asyncio
+    from app.services import signature_service
+    in_flight, peak = [0], [0]
+
+    async def sign(email, user_email, data):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.02)
+        in_flight[0] -= 1
+        return {}
+
+    documents = [_submission(f"doc{i}") for i in range(10)]
+    with patch.object(SignatureHandler, "sign_field", side_effect=sign):
+        result = await SignatureHandler.sign_batch("user@example.com", "owner@example.com", documents)
+    assert result["signed"] == 10
+    assert peak[0] == signature_service.BATCH_SIGN_CONCURRENCY
+
 # --- get_parties_signatures_with_type ---
 
 def test_get_parties_signatures_with_type_drawn():
@@ -212,4 +278,32 @@ def test_check_all_signed_load_error(mock_logger, mock_load, mock_audit):
     SignatureHandler.check_all_signed("user@example.com", parties, "doc1", "track1")
     mock_logger.warning.assert_called()
 
-# You can add more tests for error/edge cases as needed.
\ No newline at end of file
+# You can add more tests for error/edge cases as needed.
+
+@patch("app.services.signature_service.create_signature_token", new_callable=AsyncMock,
+       return_value={"token": "t", "validity_datetime": "2030-01-01"})
+@patch("app.services.signature_service.email_service.send_link", new_callable=AsyncMock)
+@patch("app.services.signature_service.document_tracking_manager.log_action", new_callable=AsyncMock)
+@patch("app.services.signature_service.GlobalAuditService.log_document_action")
+@pytest.mark.asyncio
+async def test_initiate_next_party_sends_while_audit_is_written(mock_audit, mock_log_action, mock_send_link, mock_create_token):
+    import threading
+    audit_started, link_sent = threading.Event(), threading.Event()
+
+    def slow_audit(**kwargs):
+        audit_started.set()
+        # The email does not wait for the blocking S3 audit append
+        assert link_sent.wait(timeout=2)
+
+    mock_audit.side_effect = slow_audit
+    mock_send_link.side_effect = lambda **kwargs: link_sent.set()
+    data = MagicMock(document_id="doc1", tracking_id="trk1")
+    party = {"id": "2", "email": "next@example.com", "name": "Next"}
+
+    await SignatureHandler.initiate_next_party("owner", "user@example.com", party, [], "2030-01-01", 1, data,
+                                               None, {"name": "Holder", "email": "holder@example.com"})
+
+    assert audit_started.is_set()
+    assert mock_audit.call_args.kwargs["action"] == "NEXT_PARTY_INITIATED"
+    assert mock_send_link.call_args.kwargs["recipient_email"] == "next@example.com"
+    mock_log_action.assert_awaited_once()
@@ -0,0 +1,212 @@
+"""
+SMTPConnectionPool against a local stand-in SMTP server (in the spirit of aiosmtpd's
+Controller) that speaks EHLO/STARTTLS/AUTH/MAIL/RCPT/DATA/NOOP/QUIT and counts
+connections, TLS handshakes and logins.
+"""
+import base64
+import datetime
+import smtplib
+import socketserver
+import ssl
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from app.services import smtp_pool as pool_module
+from app.services.smtp_pool import SMTPConnectionPool
+
+
+def _self_signed(tmp_path):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number()).not_valid_before(now)
+            .not_valid_after(now + datetime.timedelta(days=1)).sign(key, hashes.SHA256()))
+    cert_file, key_file = tmp_path / "cert.pem", tmp_path / "key.pem"
+    cert_file.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                           serialization.NoEncryption()))
+    return str(cert_file), str(key_file)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            server.active.add(self.request)
+            server.peak = max(server.peak, len(server.active))
+
+    def finish(self):
+        with self.server.lock:
+            self.server.active.discard(self.request)
+        try:
+            super().finish()
+        except OSError:
+            pass
+
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+        self.wfile.flush()
+
+    def handle(self):
+        server, tls = self.server, False
+        self.reply("220 stand-in ESMTP")
+        while True:
+            try:
+                line = self.rfile.readline()
+            except OSError:
+                return
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                extensions = ["stand-in", "AUTH PLAIN"] + ([] if tls else ["STARTTLS"])
+                for ext in extensions:
+                    self.reply(f"250-{ext}")
+                self.reply("250 OK")
+            elif verb == "STARTTLS":
+                self.reply("220 Ready to start TLS")
+                raw = self.request
+                self.request = server.tls.wrap_socket(raw, server_side=True)
+                self.rfile = self.request.makefile("rb")
+                self.wfile = self.request.makefile("wb")
+                tls = True
+                with server.lock:
+                    server.active.discard(raw)
+                    server.active.add(self.request)
+                    server.handshakes += 1
+            elif verb == "AUTH":
+                user, password = base64.b64decode(command.split()[2]).split(b"\0")[1:]
+                if (user, password) != (b"user", b"secret"):
+                    self.reply("535 Authentication failed")
+                    continue
+                with server.lock:
+                    server.logins += 1
+                self.reply("235 Authentication successful")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                    data.append(chunk)
+                with server.lock:
+                    server.messages.append(b"".join(data))
+                self.reply("250 Queued")
+            elif verb == "QUIT":
+                with server.lock:
+                    server.quits += 1
+                self.reply("221 Bye")
+                return
+            else:  # MAIL, RCPT, NOOP, RSET
+                self.reply("250 OK")
+
+
+class StandInSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, tls: ssl.SSLContext):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.tls = tls
+        self.lock = threading.Lock()
+        self.active = set()
+        self.connections = self.handshakes = self.logins = self.quits = self.peak = 0
+        self.messages = []
+
+    def drop_connections(self):
+        """Close every client socket, like a server timing out idle sessions."""
+        with self.lock:
+            active = list(self.active)
+        for sock in active:
+            sock.shutdown(2)
+
+
+@pytest.fixture(scope="module")
+def tls_context(tmp_path_factory):
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(*_self_signed(tmp_path_factory.mktemp("tls")))
+    return context
+
+
+@pytest.fixture
+def smtp_server(tls_context):
+    server = StandInSMTPServer(tls_context)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _pool(server, **kwargs):
+    return SMTPConnectionPool("127.0.0.1", server.server_address[1], "user", "secret", **kwargs)
+
+
+def _send(pool, n):
+    return pool.sendmail("from@x.com", [f"to{n}@x.com"], f"Subject: {n}\r\n\r\nbody {n}")
+
+
+def test_messages_reuse_one_authenticated_session(smtp_server):
+    pool = _pool(smtp_server)
+    for n in range(10):
+        assert _send(pool, n) == {}
+    pool.close_all()
+
+    assert len(smtp_server.messages) == 10
+    assert (smtp_server.connections, smtp_server.handshakes, smtp_server.logins) == (1, 1, 1)
+
+
+def test_concurrent_senders_are_bounded_by_pool_size(smtp_server):
+    pool = _pool(smtp_server, size=2)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda n: _send(pool, n), range(24)))
+    pool.close_all()
+
+    assert len(smtp_server.messages) == 24
+    assert smtp_server.peak <= 2
+    assert smtp_server.logins <= 2
+
+
+def test_session_dropped_by_server_is_replaced(smtp_server):
+    pool = _pool(smtp_server)
+    _send(pool, 1)
+    smtp_server.drop_connections()
+
+    assert _send(pool, 2) == {}
+    pool.close_all()
+    assert len(smtp_server.messages) == 2
+    assert smtp_server.logins == 2
+
+
+def test_idle_session_is_closed_and_reopened(smtp_server):
+    pool = _pool(smtp_server, idle_timeout=0)
+    _send(pool, 1)
+    _send(pool, 2)
+
+    assert smtp_server.connections == 2
+    assert smtp_server.quits == 1
+
+
+def test_session_is_recycled_after_message_cap(smtp_server):
+    pool = _pool(smtp_server)
+    with patch.object(pool_module, "SMTP_MAX_MESSAGES_PER_CONNECTION", 2):
+        for n in range(5):
+            _send(pool, n)
+    pool.close_all()
+    assert smtp_server.connections == 3
+
+
+def test_bad_credentials_are_not_pooled(smtp_server):
+    pool = SMTPConnectionPool("127.0.0.1", smtp_server.server_address[1], "user", "wrong")
+    with pytest.raises(smtplib.SMTPAuthenticationError):
+        _send(pool, 1)
+    assert pool._idle == []
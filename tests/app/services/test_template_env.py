@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.services import template_env as templates
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    templates.clear_branding_cache()
+    yield
+    templates.clear_branding_cache()
+
+
+VALUES = {"html_body_with_br": "<p>Sign <b>here</b></p>", "formatted_validity": "2025-01-01 10:00 <UTC>"}
+
+
+@pytest.mark.parametrize("name", ["email.html", "email_form_template.html"])
+def test_branded_render_matches_full_render(name):
+    expected = templates.template_env.get_template(name).render(theme="#123456", org="Acme", **VALUES)
+    assert templates.render_branded(name, theme="#123456", org="Acme", **VALUES) == expected
+
+
+def test_branding_fragment_is_rendered_once_per_tenant():
+    with patch.object(templates.template_env, "get_template", wraps=templates.template_env.get_template) as get:
+        first = templates.render_branded("email.html", theme="#123456", org="Acme", **VALUES)
+        second = templates.render_branded("email.html", theme="#123456", org="Acme",
+                                          html_body_with_br="<p>Other</p>", formatted_validity="later")
+        templates.render_branded("email.html", theme="#654321", org="Other Org", **VALUES)
+
+    assert get.call_count == 2
+    assert "<p>Other</p>" in second and "<p>Other</p>" not in first
+
+
+def test_values_are_not_reinterpreted_as_slots():
+    body = "\x00slot:formatted_validity\x00 {{ theme }}"
+    html = templates.render_branded("email.html", theme="#123456", org="Acme",
+                                    html_body_with_br=body, formatted_validity="soon")
+    assert body in html
+
+
+def test_dev_mode_skips_fragment_cache():
+    with patch.object(templates.template_env, "auto_reload", True), \
+            patch.object(templates, "_cached_fragment") as cached:
+        templates.render_branded("email.html", theme="#123456", org="Acme", **VALUES)
+    cached.assert_not_called()
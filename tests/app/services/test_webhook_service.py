@@ -0,0 +1,166 @@
+import asyncio
+import importlib
+import json
+import sys
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+
+@pytest.fixture
+def webhooks():
+    stubs = {"auth_app.app.database.connection": MagicMock(db=MagicMock())}
+    with patch.dict(sys.modules, stubs):
+        sys.modules.pop("app.services.webhook_service", None)
+        module = importlib.import_module("app.services.webhook_service")
+        module.webhook_subscriptions = MagicMock(find_one=AsyncMock())
+        module.webhook_deliveries = MagicMock(update_one=AsyncMock(), insert_many=AsyncMock())
+        module.config = MagicMock(ENV="prod")
+        yield module
+    sys.modules.pop("app.services.webhook_service", None)
+
+
+def _resolves_to(webhooks, *addresses):
+    infos = [(None, None, None, "", (address, 443)) for address in addresses]
+    return patch.object(webhooks.socket, "getaddrinfo", return_value=infos)
+
+
+def _delivery(attempts=0):
+    return {"delivery_id": "d1", "subscription_id": "s1", "owner": "acme.com", "event": "document.completed",
+            "data": {"document_id": "doc1"}, "attempts": attempts,
+            "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc)}
+
+
+def _subscriptions(webhooks, subscriptions):
+    webhooks.webhook_subscriptions.find.return_value.to_list = AsyncMock(return_value=subscriptions)
+
+
+@pytest.mark.asyncio
+async def test_emit_queues_one_delivery_per_matching_subscription(webhooks):
+    _subscriptions(webhooks, [{"subscription_id": "s1"}, {"subscription_id": "s2"}])
+
+    with patch.object(webhooks.WebhookService, "deliver", AsyncMock()) as deliver:
+        assert await webhooks.webhook_service.emit("acme.com", "document.completed", {"document_id": "doc1"}) == 2
+        await asyncio.gather(*webhooks._background_tasks)
+
+    query = webhooks.webhook_subscriptions.find.call_args.args[0]
+    assert query == {"owner": "acme.com", "active": True, "events": {"$in": ["document.completed", "*"]}}
+    deliveries = webhooks.webhook_deliveries.insert_many.call_args.args[0]
+    assert [d["subscription_id"] for d in deliveries] == ["s1", "s2"]
+    assert all(d["state"] == webhooks.PENDING and d["data"] == {"document_id": "doc1"} for d in deliveries)
+    assert deliver.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_emit_can_queue_without_delivering(webhooks):
+    _subscriptions(webhooks, [{"subscription_id": "s1"}])
+
+    with patch.object(webhooks, "_spawn") as spawn:
+        assert await webhooks.webhook_service.emit("acme.com", "document.expired", {}, deliver_now=False) == 1
+
+    webhooks.webhook_deliveries.insert_many.assert_awaited_once()
+    spawn.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_emit_without_subscribers_or_with_db_errors_is_a_no_op(webhooks):
+    _subscriptions(webhooks, [])
+    assert await webhooks.webhook_service.emit("acme.com", "form.submitted", {}) == 0
+    webhooks.webhook_deliveries.insert_many.assert_not_awaited()
+
+    webhooks.webhook_subscriptions.find.side_effect = RuntimeError("mongo down")
+    assert await webhooks.webhook_service.emit("acme.com", "form.submitted", {}) == 0
+
+
+@pytest.mark.asyncio
+async def test_delivery_is_signed_with_the_subscription_secret(webhooks):
+    webhooks.webhook_subscriptions.find_one.return_value = {
+        "subscription_id": "s1", "url": "https://hooks.example.com/in", "secret": "topsecret", "active": True}
+    client = MagicMock(post=AsyncMock(return_value=MagicMock(status_code=200, is_success=True)))
+    webhooks._http = client
+
+    with _resolves_to(webhooks, "93.184.216.34"):
+        await webhooks.WebhookService._send(_delivery())
+
+    url = client.post.call_args.args[0]
+    body = client.post.call_args.kwargs["content"]
+    headers = client.post.call_args.kwargs["headers"]
+    # Sent to the address that was vetted, under the subscribed host name
+    assert str(url) == "https://93.184.216.34/in"
+    assert headers["Host"] == "hooks.example.com"
+    assert client.post.call_args.kwargs["extensions"] == {"sni_hostname": "hooks.example.com"}
+    assert json.loads(body)["event"] == "document.completed"
+    assert headers["X-Webhook-Signature"] == webhooks.sign("topsecret", headers["X-Webhook-Timestamp"], body)
+    update = webhooks.webhook_deliveries.update_one.call_args.args[1]["$set"]
+    assert update["state"] == webhooks.DELIVERED and update["attempts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_backs_off_then_dead_letters(webhooks):
+    webhooks.webhook_subscriptions.find_one.return_value = {
+        "subscription_id": "s1", "url": "https://hooks.example.com/in", "secret": "s", "active": True}
+    webhooks._http = MagicMock(post=AsyncMock(return_value=MagicMock(status_code=503, is_success=False)))
+
+    with _resolves_to(webhooks, "93.184.216.34"):
+        await webhooks.WebhookService._send(_delivery(attempts=2))
+    update = webhooks.webhook_deliveries.update_one.call_args.args[1]["$set"]
+    assert update["state"] == webhooks.PENDING and update["last_status_code"] == 503
+    delay = (update["next_attempt_at"] - update["updated_at"]).total_seconds()
+    assert delay == webhooks.WEBHOOK_RETRY_BASE_DELAY * 4
+
+    with _resolves_to(webhooks, "93.184.216.34"):
+        await webhooks.WebhookService._send(_delivery(attempts=webhooks.WEBHOOK_MAX_ATTEMPTS - 1))
+    assert webhooks.webhook_deliveries.update_one.call_args.args[1]["$set"]["state"] == webhooks.DEAD
+
+
+@pytest.mark.asyncio
+async def test_deliveries_of_removed_webhooks_are_not_sent(webhooks):
+    webhooks.webhook_subscriptions.find_one.return_value = None
+    webhooks._http = MagicMock(post=AsyncMock())
+
+    await webhooks.WebhookService._send(_delivery())
+
+    webhooks._http.post.assert_not_awaited()
+    assert webhooks.webhook_deliveries.update_one.call_args.args[1]["$set"]["state"] == webhooks.DEAD
+
+
+@pytest.mark.asyncio
+async def test_host_rebound_to_an_internal_address_is_not_contacted(webhooks):
+    webhooks.webhook_subscriptions.find_one.return_value = {
+        "subscription_id": "s1", "url": "https://hooks.example.com/in", "secret": "s", "active": True}
+    webhooks._http = MagicMock(post=AsyncMock())
+
+    with _resolves_to(webhooks, "169.254.169.254"):
+        await webhooks.WebhookService._send(_delivery())
+
+    webhooks._http.post.assert_not_awaited()
+    update = webhooks.webhook_deliveries.update_one.call_args.args[1]["$set"]
+    assert update["state"] == webhooks.PENDING and "public address" in update["last_error"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("url, events, addresses", [
+    ("http://hooks.example.com/in", ["document.completed"], ["93.184.216.34"]),
+    ("https://hooks.example.com/in", ["document.exploded"], ["93.184.216.34"]),
+    ("https://hooks.example.com/in", [], ["93.184.216.34"]),
+    ("https://10.0.0.5/in", ["document.completed"], ["10.0.0.5"]),
+    ("https://internal.example.com/in", ["document.completed"], ["93.184.216.34", "192.168.1.4"]),
+    ("https://cgnat.example.com/in", ["document.completed"], ["100.64.3.2"]),
+    ("https://zero.example.com/in", ["document.completed"], ["0.0.0.0"]),
+    ("https://mapped.example.com/in", ["document.completed"], ["::ffff:127.0.0.1"]),
+    ("https://v6.example.com/in", ["document.completed"], ["fe80::1%eth0"]),
+    ("https://reserved.example.com/in", ["document.completed"], ["240.0.0.1"]),
+])
+async def test_invalid_subscriptions_are_rejected(webhooks, url, events, addresses):
+    with _resolves_to(webhooks, *addresses):
+        with pytest.raises(HTTPException) as exc:
+            await webhooks.WebhookService._validate(url, events)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_public_subscription_is_accepted(webhooks):
+    with _resolves_to(webhooks, "93.184.216.34", "2606:2800:220:1:248:1893:25c8:1946"):
+        await webhooks.WebhookService._validate("https://hooks.example.com/in", ["*"])
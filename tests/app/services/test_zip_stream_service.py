@@ -0,0 +1,85 @@
+import asyncio
+import io
+import threading
+import time
+import zipfile
+
+from app.services import zip_stream_service as zip_module
+from app.services.zip_stream_service import ZipEntry, ZipStreamService
+
+
+def _collect(entries, prefetch=None):
+    async def consume():
+        return [chunk async for chunk in ZipStreamService.stream(entries, prefetch)]
+    return asyncio.run(consume())
+
+
+def _archive(chunks) -> zipfile.ZipFile:
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+def test_stream_produces_valid_archive_in_order():
+    entries = [ZipEntry(f"file{i}.txt", lambda i=i: f"content-{i}".encode() * 100) for i in range(5)]
+    archive = _archive(_collect(entries))
+
+    assert archive.testzip() is None
+    assert archive.namelist() == [f"file{i}.txt" for i in range(5)]
+    assert archive.read("file3.txt") == b"content-3" * 100
+
+
+def test_pdfs_are_stored_and_other_files_deflated():
+    entries = [ZipEntry("signed.PDF", lambda: b"%PDF" * 500), ZipEntry("notes.txt", lambda: b"a" * 2000)]
+    archive = _archive(_collect(entries))
+
+    assert archive.getinfo("signed.PDF").compress_type == zipfile.ZIP_STORED
+    assert archive.getinfo("notes.txt").compress_type == zipfile.ZIP_DEFLATED
+    assert archive.read("signed.PDF") == b"%PDF" * 500
+
+
+def test_failed_and_missing_entries_are_skipped():
+    def broken():
+        raise RuntimeError("decrypt failed")
+
+    entries = [ZipEntry("a.txt", lambda: b"a"), ZipEntry("b.txt", broken), ZipEntry("c.txt", lambda: None)]
+    assert _archive(_collect(entries)).namelist() == ["a.txt"]
+
+
+def test_entries_are_flushed_as_they_arrive():
+    def entries():
+        yield ZipEntry("first.txt", lambda: b"first")
+        yield ZipEntry("second.txt", lambda: time.sleep(0.2) or b"second")
+
+    async def first_chunk():
+        stream = ZipStreamService.stream(entries(), prefetch=1)
+        started = time.monotonic()
+        chunk = await stream.__anext__()
+        elapsed = time.monotonic() - started
+        await stream.aclose()
+        return chunk, elapsed
+
+    chunk, elapsed = asyncio.run(first_chunk())
+    assert b"first.txt" in chunk
+    assert elapsed < 0.2
+
+
+def test_prefetch_window_bounds_parallel_loads():
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def slow_load():
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return b"x"
+
+    entries = [ZipEntry(f"f{i}.txt", slow_load) for i in range(8)]
+    assert len(_archive(_collect(entries, prefetch=3)).namelist()) == 8
+    assert peak[0] == 3
+
+
+def test_response_sets_download_headers():
+    response = zip_module.ZipStreamService.response([ZipEntry("a.pdf", lambda: b"x")], "bundle.zip")
+    assert response.media_type == "application/zip"
+    assert response.headers["content-disposition"] == "attachment; filename=bundle.zip"
@@ -209,10 +209,12 @@ async def test_update_user_preferences_success():
     preferences = MagicMock()
     preferences.timezone = None
     preferences.dict.return_value = {"theme": "dark"}
-    current_user = {"id": "uid"}
-    with patch.object(auth_verify.AuthService, "update_user_preferences", new=AsyncMock(return_value=True)):
+    current_user = {"id": "uid", "email": "user@x.com"}
+    with patch.object(auth_verify.AuthService, "update_user_preferences", new=AsyncMock(return_value=True)), \
+            patch.object(auth_verify.AuthService, "invalidate_profile") as invalidate:
         resp = await auth_verify.update_user_preferences(preferences, current_user)
         assert resp == {"message": "Preferences updated successfully"}
+        invalidate.assert_called_once_with("user@x.com")
 
 @pytest.mark.asyncio
 async def test_update_user_preferences_invalid_timezone():
@@ -0,0 +1,140 @@
+import importlib
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from auth_app.app.services.permission_cache import RouteTrie
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._docs:
+            raise StopAsyncIteration
+        return self._docs.pop(0)
+
+
+DEFAULT_ROLES = [
+    {"role_name": "user", "api_permissions": [{"method": "GET", "url": "/contacts/{contact_id}"}]},
+    {"role_name": "admin", "api_permissions": [{"method": "DELETE", "url": "/contacts/{contact_id}"}]},
+]
+ORG_ROLES = {"org_name": "acme", "roles": [
+    {"role_name": "editor", "api_permissions": [{"method": "PUT", "url": "/roles/{role_name}"}]},
+]}
+
+
+@pytest.fixture
+def cache():
+    db = MagicMock()
+    db["default_roles"].find.side_effect = lambda *a, **kw: _Cursor(DEFAULT_ROLES)
+    db["org_roles"].find_one = AsyncMock(return_value=ORG_ROLES)
+    with patch.dict(sys.modules, {"auth_app.app.database.connection": MagicMock(db=db)}):
+        sys.modules.pop("auth_app.app.services.permission_cache", None)
+        module = importlib.import_module("auth_app.app.services.permission_cache")
+        module.db = db
+        yield module
+    sys.modules.pop("auth_app.app.services.permission_cache", None)
+
+
+@pytest.mark.parametrize("method, path, allowed", [
+    ("GET", "/contacts/42", True),
+    ("get", "/contacts/42", True),
+    ("POST", "/contacts/42", False),
+    ("GET", "/contacts/", False),
+    ("GET", "/contacts/42/extra", False),
+    ("GET", "/contacts", True),
+    ("GET", "/files/abc.pdf", True),
+    ("GET", "/files/abc.txt", False),
+    ("GET", "/folders/", True),
+])
+def test_route_trie_matches_like_fastapi_path_patterns(method, path, allowed):
+    trie = RouteTrie([
+        {"method": "GET", "url": "/contacts/{contact_id}"},
+        {"method": "GET", "url": "/contacts"},
+        {"method": "GET", "url": "/files/{name}.pdf"},
+        {"method": "GET", "url": "/folders/"},
+    ])
+    assert trie.match(method, path) is allowed
+
+
+def test_literal_and_param_segments_are_both_tried():
+    trie = RouteTrie([
+        {"method": "GET", "url": "/notifications/all/details"},
+        {"method": "GET", "url": "/notifications/{notification_id}"},
+    ])
+    assert trie.match("GET", "/notifications/all")
+    assert trie.match("GET", "/notifications/all/details")
+
+
+@pytest.mark.asyncio
+async def test_org_roles_then_default_roles_are_compiled_once(cache):
+    pc = cache.PermissionCache
+
+    assert await pc.is_allowed("acme", ["editor"], "PUT", "/roles/viewer")
+    assert await pc.is_allowed("acme", ["editor", "user"], "GET", "/contacts/1")
+    assert not await pc.is_allowed("acme", ["editor"], "DELETE", "/contacts/1")
+    assert not await pc.is_allowed(None, ["editor"], "PUT", "/roles/viewer")
+
+    cache.db["org_roles"].find_one.assert_awaited_once()
+    assert cache.db["default_roles"].find.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidation_reloads_the_org(cache):
+    pc = cache.PermissionCache
+    assert not await pc.is_allowed("acme", ["viewer"], "GET", "/roles")
+
+    cache.db["org_roles"].find_one.return_value = {"org_name": "acme", "roles": [
+        {"role_name": "viewer", "api_permissions": [{"method": "GET", "url": "/roles"}]},
+    ]}
+    with patch.dict(sys.modules, {"database.redis_db": MagicMock()}) as modules:
+        pc.invalidate("acme")
+        modules["database.redis_db"].redis_client.publish.assert_called_once_with(
+            cache.RBAC_INVALIDATION_CHANNEL, "acme")
+
+    assert await pc.is_allowed("acme", ["viewer"], "GET", "/roles")
+    # Default roles were not affected
+    assert cache.db["default_roles"].find.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_load_racing_an_invalidation_is_not_cached(cache):
+    pc = cache.PermissionCache
+
+    async def find_one(*args, **kwargs):
+        pc.invalidate_local("acme")
+        return ORG_ROLES
+
+    cache.db["org_roles"].find_one.side_effect = find_one
+    assert await pc.is_allowed("acme", ["editor"], "PUT", "/roles/x")
+    assert "acme" not in pc._orgs
+
+
+@pytest.mark.asyncio
+async def test_dynamic_permission_check_denies_unlisted_routes():
+    from fastapi import HTTPException
+    from auth_app.app.api.routes import deps
+
+    request = MagicMock(method="POST")
+    request.url.path = "/contacts/"
+    with patch.object(deps.permission_cache, "is_allowed", AsyncMock(return_value=False)) as is_allowed:
+        with pytest.raises(HTTPException) as exc:
+            await deps.dynamic_permission_check(request, ["user"], "acme")
+    assert exc.value.status_code == 403
+    is_allowed.assert_awaited_once_with("acme", ["user"], "POST", "/contacts/")
+
+
+@pytest.mark.asyncio
+async def test_third_party_token_roles_skip_the_user_lookup():
+    from auth_app.app.api.routes import deps
+
+    with patch.object(deps, "db") as db:
+        roles = await deps.get_roles_from_token({"email": "x@y.com", "role": "third-party"})
+    assert roles == ["third-party"]
+    db.__getitem__.assert_not_called()
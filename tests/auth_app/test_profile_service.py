@@ -0,0 +1,135 @@
+import asyncio
+import importlib
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+
+MASTER_ID = str(ObjectId())
+
+
+@pytest.fixture
+def profiles():
+    users, masters = MagicMock(find_one=AsyncMock()), MagicMock(find_one=AsyncMock())
+    db = MagicMock()
+    db.__getitem__.side_effect = {"users": users, "master": masters}.__getitem__
+    with patch.dict(sys.modules, {"auth_app.app.database.connection": MagicMock(db=db)}):
+        for name in ("auth_app.app.services.profile_service", "auth_app.app.schema.AuthSchema"):
+            sys.modules.pop(name, None)
+        module = importlib.import_module("auth_app.app.services.profile_service")
+        module.users, module.masters = users, masters
+        yield module
+    sys.modules.pop("auth_app.app.services.profile_service", None)
+
+
+def _user(**extra):
+    user = {
+        "extra": {"logo": "acme.png"},
+        "theme": "#ff0000",
+        "organization": "Acme",
+        "master_id": MASTER_ID,
+        "parent_email": "admin@acme.com",
+        "preferences": {"dateFormat": "DD/MM/YYYY", "timezone": "Asia/Kolkata"},
+    }
+    user.update(extra)
+    return user
+
+
+@pytest.mark.asyncio
+async def test_profile_combines_branding_domain_and_preferences(profiles):
+    profiles.users.find_one.return_value = _user()
+    profiles.masters.find_one.return_value = {"domain_name": "acme.com"}
+
+    profile = await profiles.ProfileService.get_profile("bob@acme.com")
+
+    assert profile.branding == {"logo": "acme.png", "theme": "#ff0000", "organization": "Acme"}
+    assert (profile.domain_name, profile.master_domain, profile.master_missing) == ("acme.com", "acme.com", False)
+    assert profile.preferences.dateFormat == "DD/MM/YYYY"
+    assert profile.preferences.timeFormat is None
+
+
+@pytest.mark.asyncio
+async def test_user_without_master_uses_parent_email(profiles):
+    profiles.users.find_one.return_value = _user(master_id=None, theme=None, extra={})
+
+    profile = await profiles.ProfileService.get_profile("bob@gmail.com")
+
+    assert (profile.domain_name, profile.master_domain) == ("admin@acme.com", None)
+    assert profile.theme == profiles.DEFAULT_THEME
+    profiles.masters.find_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_profile_is_loaded_once_for_concurrent_and_repeated_calls(profiles):
+    profiles.users.find_one.return_value = _user()
+    profiles.masters.find_one.return_value = {"domain_name": "acme.com"}
+
+    results = await asyncio.gather(*(profiles.ProfileService.get_profile("bob@acme.com") for _ in range(20)))
+    await profiles.ProfileService.get_profile("bob@acme.com")
+
+    assert len({id(profile) for profile in results}) == 1
+    assert profiles.users.find_one.await_count == 1
+    assert profiles.masters.find_one.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_or_invalidated_profile_is_reloaded(profiles):
+    profiles.users.find_one.return_value = _user(master_id=None)
+    await profiles.ProfileService.get_profile("bob@acme.com")
+
+    profiles.users.find_one.return_value = _user(master_id=None, theme="#00ff00")
+    assert (await profiles.ProfileService.get_profile("bob@acme.com")).theme == "#ff0000"
+
+    profiles.ProfileService.invalidate("bob@acme.com")
+    assert (await profiles.ProfileService.get_profile("bob@acme.com")).theme == "#00ff00"
+
+    with patch.object(profiles, "PROFILE_CACHE_TTL", 0):
+        profiles.ProfileService.invalidate()
+        await profiles.ProfileService.get_profile("bob@acme.com")
+        await profiles.ProfileService.get_profile("bob@acme.com")
+    assert profiles.users.find_one.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_fresh_read_skips_and_refreshes_the_cache(profiles):
+    profiles.users.find_one.return_value = _user()
+    profiles.masters.find_one.return_value = {"domain_name": "acme.com"}
+    await profiles.ProfileService.get_profile("bob@acme.com")
+
+    # Reassigned through another worker: this process was never told
+    profiles.masters.find_one.return_value = {"domain_name": "globex.com"}
+    assert (await profiles.ProfileService.get_profile("bob@acme.com")).master_domain == "acme.com"
+    assert (await profiles.ProfileService.get_profile("bob@acme.com", fresh=True)).master_domain == "globex.com"
+    assert (await profiles.ProfileService.get_profile("bob@acme.com")).master_domain == "globex.com"
+    assert profiles.users.find_one.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_update_during_load_is_not_cached(profiles):
+    async def slow_read(*_):
+        profiles.ProfileService.invalidate("bob@acme.com")  # settings saved while we were reading
+        return _user(master_id=None)
+
+    profiles.users.find_one.side_effect = slow_read
+    await profiles.ProfileService.get_profile("bob@acme.com")
+    await profiles.ProfileService.get_profile("bob@acme.com")
+    assert profiles.users.find_one.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_user_is_not_cached(profiles):
+    profiles.users.find_one.return_value = None
+    assert await profiles.ProfileService.get_profile("new@acme.com") is None
+
+    profiles.users.find_one.return_value = _user(master_id=None)
+    assert await profiles.ProfileService.get_profile("new@acme.com") is not None
+
+
+@pytest.mark.asyncio
+async def test_missing_master_record_is_flagged(profiles):
+    profiles.users.find_one.return_value = _user()
+    profiles.masters.find_one.return_value = None
+
+    profile = await profiles.ProfileService.get_profile("bob@acme.com")
+    assert profile.master_missing and profile.master_domain is None
@@ -0,0 +1,30 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from auth_app.app.aspects import subscription_guard
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("feature, reserved, status_code", [
+    (False, True, 403),
+    (True, False, 429),
+])
+async def test_bulk_send_must_fit_the_remaining_quota(feature, reserved, status_code):
+    with patch.object(subscription_guard, "has_feature", AsyncMock(return_value=feature)), \
+            patch.object(subscription_guard, "get_monthly_send_limit", AsyncMock(return_value=10)), \
+            patch.object(subscription_guard, "reserve_sends_for_user", AsyncMock(return_value=reserved)):
+        with pytest.raises(HTTPException) as exc:
+            await subscription_guard.enforce_bulk_send_policy("user@x.com", 3)
+    assert exc.value.status_code == status_code
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [None, 3])
+async def test_bulk_send_reserves_the_whole_count_at_once(limit):
+    with patch.object(subscription_guard, "has_feature", AsyncMock(return_value=True)), \
+            patch.object(subscription_guard, "get_monthly_send_limit", AsyncMock(return_value=limit)), \
+            patch.object(subscription_guard, "reserve_sends_for_user", AsyncMock(return_value=True)) as reserve:
+        year, month = await subscription_guard.enforce_bulk_send_policy("user@x.com", 3)
+    reserve.assert_awaited_once_with("user@x.com", year, month, 3, limit)
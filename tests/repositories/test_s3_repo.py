@@ -209,6 +209,27 @@ def test_load_document_metadata_other_error(mock_s3_client, mock_config, mock_lo
     assert exc.value.status_code == 500
     assert "error loading document metadata" in str(exc.value.detail).lower()
 
+def test_upload_meta_batch_s3_writes_summary_once():
+    mock_s3_client = MagicMock()
+    mock_s3_client.exceptions = type("MockExceptions", (), {"NoSuchKey": ClientError})
+    doc_obj = {'Body': MagicMock()}
+    doc_obj['Body'].read.return_value = json.dumps(
+        {"document_id": "doc1", "trackings": {"old": {"status": "completed"}}}
+    ).encode()
+    mock_s3_client.get_object.return_value = doc_obj
+
+    trackings = [{"tracking_id": f"track{i}", "parties": []} for i in range(5)]
+    with patch.object(s3_repo, "s3_client", mock_s3_client), patch.object(s3_repo, "config"):
+        s3_repo.upload_meta_batch_s3("user", "doc1", trackings)
+
+    mock_s3_client.get_object.assert_called_once()
+    keys = [c.kwargs["Key"] for c in mock_s3_client.put_object.call_args_list]
+    assert keys.count("user/metadata/document/doc1.json") == 1
+    assert sorted(k for k in keys if "/tracking/" in k) == [f"user/metadata/tracking/doc1/track{i}.json" for i in range(5)]
+    summary = json.loads(mock_s3_client.put_object.call_args_list[-1].kwargs["Body"])
+    assert set(summary["trackings"]) == {"old"} | {t["tracking_id"] for t in trackings}
+    assert summary["trackings"]["track0"]["status"] == "in_progress"
+
     @pytest.fixture
     def mock_config():
         with patch('repositories.s3_repo.config') as mock_cfg:
@@ -380,7 +401,7 @@ def test_load_document_metadata_other_error(mock_s3_client, mock_config, mock_lo
             def encrypt(self, content): return b"enc"
         monkeypatch.setattr(s3_repo, "AESCipher", DummyCipher)
         result = s3_repo.render_sign_update("user", b"pdfbytes", "track1", "doc1")
-        assert isinstance(result, str)
+        assert result == b"pdfbytes"
 
     def test_get_signed_success(monkeypatch, mock_s3_client, mock_config):
         class DummyCipher:
@@ -825,8 +846,6 @@ def test_load_document_metadata_other_error(mock_s3_client, mock_config, mock_lo
             }
         monkeypatch.setattr("app.api.routes.files_api.get_storage", lambda t: DummyStorage())
         monkeypatch.setattr(s3_repo, "AESCipher", lambda email: MagicMock(decrypt=lambda x: b"pdf"))
-        mock_s3_client.generate_presigned_url.return_value = "http://example.com"
-        monkeypatch.setattr(s3_repo.requests, "get", lambda url: MagicMock(json=lambda: {}, raise_for_status=lambda: None))
         mock_obj = {'Body': MagicMock()}
         mock_obj['Body'].read.return_value = b"encrypted"
         mock_s3_client.get_object.return_value = mock_obj
@@ -845,7 +864,7 @@ def test_load_document_metadata_other_error(mock_s3_client, mock_config, mock_lo
             def encrypt(self, content): return b"enc"
         monkeypatch.setattr(s3_repo, "AESCipher", DummyCipher)
         result = s3_repo.render_sign_update("user", b"pdfbytes", "track1", "doc1")
-        assert isinstance(result, str)
+        assert result == b"pdfbytes"
 
     def test_get_signed_success(monkeypatch, mock_s3_client, mock_config):
         class DummyCipher:
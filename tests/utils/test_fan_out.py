@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+import pytest
+
+from utils.fan_out import fan_out
+
+
+@pytest.mark.asyncio
+async def test_fan_out_takes_as_long_as_slowest_item():
+    async def worker(delay):
+        await asyncio.sleep(delay)
+        return delay * 10
+
+    started = time.monotonic()
+    outcomes = await fan_out([0.2, 0.1, 0.2, 0.1], worker)
+
+    assert time.monotonic() - started < 0.5
+    assert [o.result for o in outcomes] == [2.0, 1.0, 2.0, 1.0]
+    assert all(o.ok for o in outcomes)
+
+
+@pytest.mark.asyncio
+async def test_fan_out_bounds_concurrency():
+    running, peak = 0, 0
+
+    async def worker(_):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await fan_out(range(10), worker, concurrency=3)
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_fan_out_collects_errors_per_item():
+    async def worker(item):
+        if item == "bad":
+            raise RuntimeError("smtp down")
+        return item.upper()
+
+    outcomes = await fan_out(["a", "bad", "c"], worker)
+
+    assert [o.result for o in outcomes] == ["A", None, "C"]
+    assert not outcomes[1].ok and str(outcomes[1].error) == "smtp down"
+    assert outcomes[1].item == "bad"
@@ -0,0 +1,24 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.fitz_executor import run_fitz
+
+
+@pytest.mark.asyncio
+async def test_fitz_work_never_overlaps_and_stays_off_the_loop():
+    active, overlaps, threads = [0], [], set()
+
+    def render(n):
+        active[0] += 1
+        overlaps.append(active[0])
+        threads.add(threading.current_thread().name)
+        time.sleep(0.02)
+        active[0] -= 1
+        return n
+
+    assert await asyncio.gather(*(run_fitz(render, n) for n in range(6))) == list(range(6))
+    assert max(overlaps) == 1
+    assert len(threads) == 1 and threading.current_thread().name not in threads
@@ -1,5 +1,6 @@
 import base64
 import os
+from functools import lru_cache
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 
@@ -13,6 +14,7 @@ def get_drive_service():
         SERVICE_ACCOUNT_FILE, scopes=SCOPES)
     return build('drive', 'v3', credentials=creds)
 
+@lru_cache(maxsize=16)
 def get_base64_logo(path: str) -> str:
     with open(path, "rb") as image_file:
         encoded = base64.b64encode(image_file.read()).decode("utf-8")
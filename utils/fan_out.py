@@ -0,0 +1,38 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, List, NamedTuple, Optional, TypeVar
+
+T = TypeVar("T")
+
+FAN_OUT_CONCURRENCY = 8
+
+
+class Outcome(NamedTuple):
+    item: Any
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def fan_out(
+    items: Iterable[T],
+    worker: Callable[[T], Awaitable[Any]],
+    concurrency: int = FAN_OUT_CONCURRENCY,
+) -> List[Outcome]:
+    """
+    Run `worker` on every item with at most `concurrency` in flight, so the whole
+    call takes about as long as the slowest item. A failing item does not cancel the
+    others; each outcome carries either its result or its error, in input order.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item: T) -> Outcome:
+        async with semaphore:
+            try:
+                return Outcome(item, await worker(item))
+            except Exception as e:
+                return Outcome(item, error=e)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
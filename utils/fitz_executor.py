@@ -0,0 +1,14 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# PyMuPDF is not thread-safe: two threads inside fitz at once can corrupt output or crash
+# the process. All fitz work (open, render, insert, save, close) runs on this one thread,
+# which keeps it off the event loop while serialising it.
+_fitz_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fitz")
+
+
+async def run_fitz(func, *args, **kwargs):
+    """Run `func`, which may touch PyMuPDF objects, on the PyMuPDF thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_fitz_executor, functools.partial(func, *args, **kwargs))
@@ -7,6 +7,7 @@ from apscheduler.triggers.date import DateTrigger
 from app.schemas.tracking_schemas import DocumentRequest
 from auth_app.app.database.connection import db
 from auth_app.app.utils.security import scheduler
+from config import config
 from utils.logger import logger
 
 jobs_collection = db["scheduled_jobs"]
@@ -31,6 +32,10 @@ class SchedulerManager:
         Schedule a job in APScheduler.
         If the schedule_time is in the past, execute immediately.
         """
+        if job["action"] == "reminder" and config.REMINDER_DIGEST_WINDOW > 0:
+            # Digest mode: due reminders are collected per recipient by ReminderDigest.process_due
+            return
+
         schedule_time = job["schedule_time"]
 
         # 🔹 Ensure schedule_time is timezone-aware (UTC)
@@ -132,42 +137,47 @@ class SchedulerManager:
             logger.info(f"✅ Job {job['job_id']} completed.")
 
         except Exception as e:
-            retries = db_job.get("retries", 0)
-            max_retries = db_job.get("max_retries", 3)
-            retry_delay = db_job.get("retry_delay", 60)
-
-            if retries < max_retries:
-                new_time = datetime.now(timezone.utc) + timedelta(seconds=retry_delay)
-                await jobs_collection.update_one(
-                    {"job_id": job["job_id"]},
-                    {
-                        "$set": {
-                            "status": "pending",
-                            "error": str(e),
-                            "schedule_time": new_time,
-                        },
-                        "$inc": {"retries": 1},
-                    },
-                )
-                SchedulerManager._schedule_job({**job, "schedule_time": new_time})
-                logger.warning(
-                    f"🔄 Job {job['job_id']} failed ({e}), retry {retries + 1}/{max_retries}, "
-                    f"rescheduled at {new_time}"
-                )
-            else:
-                await jobs_collection.update_one(
-                    {"job_id": job["job_id"]},
-                    {
-                        "$set": {
-                            "status": "failed",
-                            "error": str(e),
-                            "failed_at": datetime.now(timezone.utc),
-                        }
+            await SchedulerManager.retry_or_fail(db_job, e)
+
+    @staticmethod
+    async def retry_or_fail(db_job: dict, error: Exception):
+        """Reschedule a failed job after its retry delay, or mark it failed once out of retries."""
+        retries = db_job.get("retries", 0)
+        max_retries = db_job.get("max_retries", 3)
+        retry_delay = db_job.get("retry_delay", 60)
+
+        if retries < max_retries:
+            new_time = datetime.now(timezone.utc) + timedelta(seconds=retry_delay)
+            await jobs_collection.update_one(
+                {"job_id": db_job["job_id"]},
+                {
+                    "$set": {
+                        "status": "pending",
+                        "error": str(error),
+                        "schedule_time": new_time,
                     },
-                )
-                logger.error(
-                    f"❌ Job {job['job_id']} permanently failed after {max_retries} retries: {e}"
-                )
+                    "$inc": {"retries": 1},
+                },
+            )
+            SchedulerManager._schedule_job({**db_job, "schedule_time": new_time})
+            logger.warning(
+                f"🔄 Job {db_job['job_id']} failed ({error}), retry {retries + 1}/{max_retries}, "
+                f"rescheduled at {new_time}"
+            )
+        else:
+            await jobs_collection.update_one(
+                {"job_id": db_job["job_id"]},
+                {
+                    "$set": {
+                        "status": "failed",
+                        "error": str(error),
+                        "failed_at": datetime.now(timezone.utc),
+                    }
+                },
+            )
+            logger.error(
+                f"❌ Job {db_job['job_id']} permanently failed after {max_retries} retries: {error}"
+            )
 
     @staticmethod
     async def _send_reminder(job: dict):